@@ -0,0 +1,607 @@
+# -*- coding: utf-8 -*-
+"""
+Batched demand engine: the hourly space conditioning procedure of :py:func:`cea.demand.thermal_loads.calc_Qhs_Qcs`
+stepped through the year for a chunk of buildings at once.
+
+The per-building procedure pays the Python overhead of ~30 function calls with scalar ``tsd[...][t]`` indexing for
+every hour of every building. Here, each time step data variable of the chunk is stacked into a
+``(HOURS_IN_YEAR, number of buildings)`` array and each hour is computed with array operations over all buildings of
+the chunk, so the per-hour overhead is paid once per chunk.
+
+The batched procedure follows the SIA 2044 R-C-model and control logic of
+:py:mod:`cea.demand.hourly_procedure_heating_cooling_system_load` equation by equation. It supports buildings with
+radiative emission systems (radiators, floor heating, ceiling and floor cooling) or no system at all, with the static
+infiltration calculation. All other buildings of a chunk (central / decentralized AC, dynamic infiltration) fall back
+to the per-building procedure. Results agree with the per-building procedure up to floating point rounding (relative
+differences below 1e-9 for the hourly values), i.e. the demand *.csv files are the same at their precision of
+three decimals.
+"""
+
+
+
+
+import warnings
+from collections import OrderedDict
+
+import numpy as np
+
+from cea.constants import HOURS_IN_YEAR, BOLTZMANN, KELVIN_OFFSET
+from cea.demand import thermal_loads, latent_loads, constants, rc_model_SIA, space_emission_systems
+from cea.demand import control_heating_cooling_systems, ventilation_air_flows_simple
+from cea.demand.control_ventilation_systems import has_mechanical_ventilation, has_window_ventilation, \
+    has_mechanical_ventilation_heat_recovery, has_night_flushing, has_mechanical_ventilation_economizer
+
+B_F = constants.B_F
+RSE = constants.RSE
+ETA_REC = constants.ETA_REC
+TEMPERATURE_ZONE_CONTROL_NIGHT_FLUSHING = constants.TEMPERATURE_ZONE_CONTROL_NIGHT_FLUSHING
+DELTA_T_NIGHT_FLUSHING = constants.DELTA_T_NIGHT_FLUSHING
+FLOOR_HEIGHT = constants.H_F
+
+# temperature tolerance of the temperature sensor (see rc_model_SIA.has_sensible_heating_demand)
+TEMP_TOLERANCE = 0.001
+
+BATCHED_HEATING_SYSTEMS = ['NONE', 'RADIATOR', 'FLOOR_HEATING']
+BATCHED_COOLING_SYSTEMS = ['NONE', 'CEILING_COOLING', 'FLOOR_COOLING']
+
+# time step data read (but not written) by the hourly procedure
+TSD_KEYS_BATCH_INPUTS = ['T_ext', 'T_sky', 'rh_ext', 'El', 'Ea', 'Epro', 'Qs', 'Qcdata_sys', 'Qcre_sys', 'w_int',
+                         'ta_hs_set', 'ta_cs_set', 'm_ve_required', 'm_ve_inf']
+
+# time step data written by the hourly procedure
+TSD_KEYS_BATCH_OUTPUTS = ['T_int', 'theta_m', 'theta_c', 'theta_o', 'theta_ve_mech',
+                          'x_int', 'x_ve_inf', 'x_ve_mech', 'g_hu_ld', 'g_dhu_ld',
+                          'm_ve_mech', 'm_ve_window',
+                          'I_sol_and_I_rad', 'I_rad', 'I_sol',
+                          'Qhs_sen_rc', 'Qhs_sen_shu', 'Qhs_sen_ahu', 'Qhs_sen_aru', 'Qhs_lat_ahu', 'Qhs_lat_aru',
+                          'Qhs_sen_sys', 'Qhs_lat_sys', 'Qhs_em_ls', 'Ehs_lat_aux',
+                          'Qcs_sen_rc', 'Qcs_sen_scu', 'Qcs_sen_ahu', 'Qcs_sen_aru', 'Qcs_lat_ahu', 'Qcs_lat_aru',
+                          'Qcs_sen_sys', 'Qcs_lat_sys', 'Qcs_em_ls',
+                          'ma_sup_hs_ahu', 'ta_sup_hs_ahu', 'ta_re_hs_ahu', 'ma_sup_hs_aru', 'ta_sup_hs_aru',
+                          'ta_re_hs_aru',
+                          'ma_sup_cs_ahu', 'ta_sup_cs_ahu', 'ta_re_cs_ahu', 'ma_sup_cs_aru', 'ta_sup_cs_aru',
+                          'ta_re_cs_aru',
+                          'Q_gain_sen_light', 'Q_gain_sen_app', 'Q_gain_sen_pro', 'Q_gain_sen_data',
+                          'Q_gain_sen_peop', 'Q_gain_sen_wall', 'Q_gain_sen_base', 'Q_gain_sen_roof',
+                          'Q_gain_sen_wind', 'Q_gain_sen_vent']
+
+TSD_KEYS_BATCH_STATUS = ['sys_status_ahu', 'sys_status_aru', 'sys_status_sen']
+
+
+def calc_thermal_loads_batch(building_names, bprs, weather_data, date_range, locator,
+                             use_dynamic_infiltration_calculation, resolution_outputs, loads_output, massflows_output,
+                             temperatures_output, config, debug):
+    """
+    Calculate the thermal loads of a chunk of buildings. This is the batched version of
+    :py:func:`cea.demand.thermal_loads.calc_thermal_loads` and has the same side effects (the demand results file and
+    the temporary total file of each building).
+
+    :param building_names: names of the buildings in the chunk
+    :type building_names: list[str]
+    :param bprs: the building properties of each building in the chunk
+    :type bprs: list[cea.demand.building_properties.BuildingPropertiesRow]
+
+    See :py:func:`cea.demand.thermal_loads.calc_thermal_loads` for the other parameters.
+
+    :returns: This function does not return anything
+    :rtype: NoneType
+    """
+    schedules = []
+    tsds = []
+    for building_name, bpr in zip(building_names, bprs):
+        building_schedules, tsd = thermal_loads.initialize_inputs(bpr, weather_data, locator)
+        tsd = thermal_loads.calc_loads_before_space_conditioning(bpr, tsd, building_schedules, locator)
+        if thermal_loads.has_conditioned_area(bpr):
+            tsd = latent_loads.calc_Qgain_lat(tsd, building_schedules)
+            tsd = thermal_loads.calc_set_points(bpr, date_range, tsd, building_name, config, locator,
+                                                building_schedules)
+        schedules.append(building_schedules)
+        tsds.append(tsd)
+
+    # group the buildings that can be batched by the start hour of their simulation
+    batches = OrderedDict()
+    for i, bpr in enumerate(bprs):
+        if not thermal_loads.has_conditioned_area(bpr):
+            continue
+        if can_be_batched(bpr, use_dynamic_infiltration_calculation):
+            batches.setdefault(next(thermal_loads.get_hours(bpr)), []).append(i)
+        else:
+            tsds[i] = thermal_loads.calc_Qhs_Qcs(bpr, tsds[i], use_dynamic_infiltration_calculation)
+
+    for batch in batches.values():
+        calc_Qhs_Qcs_batch([bprs[i] for i in batch], [tsds[i] for i in batch])
+
+    for building_name, bpr, building_schedules, tsd in zip(building_names, bprs, schedules, tsds):
+        if thermal_loads.has_conditioned_area(bpr):
+            tsd = thermal_loads.calc_space_conditioning_system_loads(bpr, tsd)
+        else:
+            tsd = thermal_loads.calc_space_conditioning_no_conditioned_area(bpr, tsd)
+        tsd = thermal_loads.calc_loads_after_space_conditioning(bpr, tsd, building_schedules)
+        thermal_loads.write_results(bpr, building_name, date_range, loads_output, locator, massflows_output,
+                                    resolution_outputs, temperatures_output, tsd, debug, config.demand.results_format)
+
+
+def can_be_batched(bpr, use_dynamic_infiltration_calculation):
+    """
+    True, if the hourly procedure of the building is supported by :py:func:`calc_Qhs_Qcs_batch`, i.e. radiative
+    emission systems (or no system) and static infiltration.
+
+    :param bpr: BuildingPropertiesRow
+    :type bpr: cea.demand.building_properties.BuildingPropertiesRow
+    :param bool use_dynamic_infiltration_calculation: the dynamic infiltration calculation is only supported by the
+        per-building procedure
+    :rtype: bool
+    """
+    return (not use_dynamic_infiltration_calculation
+            and bpr.hvac['class_hs'] in BATCHED_HEATING_SYSTEMS
+            and bpr.hvac['class_cs'] in BATCHED_COOLING_SYSTEMS)
+
+
+class BatchProperties(object):
+    """The building properties needed by the hourly procedure, as one array per property (one value per building)"""
+
+    def __init__(self, bprs, tsds):
+        def column(get):
+            return np.array([get(bpr) for bpr in bprs], dtype=float)
+
+        def flag(get):
+            return np.array([bool(get(bpr)) for bpr in bprs], dtype=bool)
+
+        # areas and transmittance
+        self.Af = column(lambda bpr: bpr.rc_model['Af'])
+        self.Aef = column(lambda bpr: bpr.rc_model['Aef'])
+        self.Awall_ag = column(lambda bpr: bpr.rc_model['Awall_ag'])
+        self.Awin_ag = column(lambda bpr: bpr.rc_model['Awin_ag'])
+        self.Aroof = column(lambda bpr: bpr.rc_model['Aroof'])
+        self.Aop_bg = column(lambda bpr: bpr.rc_model['Aop_bg'])
+        self.U_wall = column(lambda bpr: bpr.rc_model['U_wall'])
+        self.U_win = column(lambda bpr: bpr.rc_model['U_win'])
+        self.U_roof = column(lambda bpr: bpr.rc_model['U_roof'])
+        self.U_base = column(lambda bpr: bpr.rc_model['U_base'])
+        self.e_wall = column(lambda bpr: bpr.architecture.e_wall)
+        self.e_win = column(lambda bpr: bpr.architecture.e_win)
+        self.e_roof = column(lambda bpr: bpr.architecture.e_roof)
+        self.I_sol = np.column_stack([np.asarray(bpr.solar.I_sol, dtype=float) for bpr in bprs])
+
+        # internal gains and solar gains are accounted for proportionally
+        self.f_internal_gains = np.minimum(self.Af / self.Aef, 1.0)
+        self.f_solar_gains = np.sqrt(column(lambda bpr: bpr.architecture.Hs_ag))
+
+        # rc model (time independent coefficients of SIA 2044, see rc_model_SIA._calc_rc_model_temperatures)
+        a_t = column(lambda bpr: bpr.rc_model['Atot'])
+        a_m = column(lambda bpr: bpr.rc_model['Am'])
+        a_w = self.Awin_ag
+        self.h_ec = column(lambda bpr: bpr.rc_model['Htr_w'])  # (12)
+        self.h_ac = a_t / (1 / rc_model_SIA.h_cv_i - 1 / rc_model_SIA.h_ic)  # (8)
+        self.f_sc = (a_t - a_m - a_w - self.h_ec / rc_model_SIA.h_ic) / (a_t - a_w)  # (18)
+        self.f_ic = (a_t - a_m - self.h_ec / rc_model_SIA.h_ic) / a_t  # (17)
+        self.h_op_m = column(lambda bpr: bpr.rc_model['Htr_op'])  # (9)
+        self.h_mc = rc_model_SIA.h_ic * a_m  # (7)
+        self.h_em = 1.0 / (1.0 / self.h_op_m - 1.0 / self.h_mc)  # (10)
+        self.f_im = a_m / a_t  # (19)
+        self.f_sm = a_m / (a_t - a_w)  # (20)
+        self.c_m = column(lambda bpr: bpr.rc_model['Cm']) / 3600  # (Wh/K) SIA 2044 unit is Wh/K, ISO unit is J/K
+        self.Hs_ag = column(lambda bpr: bpr.architecture.Hs_ag)
+
+        # ventilation
+        self.has_mechanical_ventilation = flag(has_mechanical_ventilation)
+        self.has_window_ventilation = flag(has_window_ventilation)
+        self.has_heat_recovery = flag(has_mechanical_ventilation_heat_recovery)
+        self.has_night_flushing = flag(has_night_flushing)
+        self.has_economizer = flag(has_mechanical_ventilation_economizer)
+        self.m_ve_required_max = np.array([np.max(tsd['m_ve_required']) for tsd in tsds], dtype=float)
+
+        # comfort
+        self.RH_max_pc = column(lambda bpr: bpr.comfort['RH_max_pc'])
+        self.Tcs_set_C = column(lambda bpr: bpr.comfort['Tcs_set_C'])
+        self.vol_int_a = self.Af * FLOOR_HEIGHT
+
+        # heating and cooling systems
+        self.heating_season = np.column_stack([control_heating_cooling_systems.calc_heating_season_mask(bpr)
+                                               for bpr in bprs])
+        self.cooling_season = np.column_stack([control_heating_cooling_systems.calc_cooling_season_mask(bpr)
+                                               for bpr in bprs])
+        self.has_heating_system = flag(lambda bpr: control_heating_cooling_systems.has_heating_system(
+            bpr.hvac['class_hs']))
+        self.has_cooling_system = flag(lambda bpr: control_heating_cooling_systems.has_cooling_system(
+            bpr.hvac['class_cs']))
+        self.t_sup_air_cooling = column(lambda bpr: max(bpr.hvac['Tc_sup_air_ahu_C'], bpr.hvac['Tc_sup_air_aru_C']))
+        self.f_hc_cv_heating = np.array([rc_model_SIA.lookup_f_hc_cv_heating(bpr) if has_system else 0.0
+                                         for bpr, has_system in zip(bprs, self.has_heating_system)], dtype=float)
+        self.f_hc_cv_cooling = np.array([rc_model_SIA.lookup_f_hc_cv_cooling(bpr) if has_system else 0.0
+                                         for bpr, has_system in zip(bprs, self.has_cooling_system)], dtype=float)
+        self.phi_h_max = column(lambda bpr: bpr.hvac['Qhsmax_Wm2']) * self.Af
+        self.phi_c_max = -column(lambda bpr: bpr.hvac['Qcsmax_Wm2']) * self.Af
+        self.delta_theta_int_inc_heating = column(space_emission_systems.calc_delta_theta_int_inc_heating)
+        self.delta_theta_int_inc_cooling = column(space_emission_systems.calc_delta_theta_int_inc_cooling)
+        self.delta_theta_e_sol = column(lambda bpr: space_emission_systems.get_delta_theta_e_sol(bpr)
+                                        if control_heating_cooling_systems.has_cooling_system(bpr.hvac['class_cs'])
+                                        else 0.0)
+
+        self.names = [bpr.name for bpr in bprs]
+
+
+def calc_Qhs_Qcs_batch(bprs, tsds):
+    """
+    Batched version of :py:func:`cea.demand.thermal_loads.calc_Qhs_Qcs` for buildings that share the same simulation
+    hours (see :py:func:`cea.demand.thermal_loads.get_hours`) and can be batched (see :py:func:`can_be_batched`).
+
+    :param bprs: building properties of the buildings in the batch
+    :type bprs: list[cea.demand.building_properties.BuildingPropertiesRow]
+    :param tsds: time step data of the buildings in the batch - updated in place
+    :type tsds: list[dict]
+    :return: tsds
+    :rtype: list[dict]
+    """
+    # get ventilation flows
+    for bpr, tsd in zip(bprs, tsds):
+        ventilation_air_flows_simple.calc_m_ve_required(tsd)
+        ventilation_air_flows_simple.calc_m_ve_leakage_simple(bpr, tsd)
+
+    bp = BatchProperties(bprs, tsds)
+    tsd_batch = dict((key, np.column_stack([np.asarray(tsd[key], dtype=float) for tsd in tsds]))
+                     for key in TSD_KEYS_BATCH_INPUTS + TSD_KEYS_BATCH_OUTPUTS)
+    tsd_batch.update((key, np.column_stack([np.asarray(tsd[key]) for tsd in tsds]))
+                     for key in TSD_KEYS_BATCH_STATUS)
+
+    # the moisture content of the ventilation air flows does not depend on the state of the zone
+    x_ext = convert_rh_to_moisture_content(tsd_batch['rh_ext'], tsd_batch['T_ext'])
+    tsd_batch['x_ve_inf'][:] = x_ext
+    tsd_batch['x_ve_mech'][:] = x_ext
+
+    # "Q_loss_sen_ref" is set to a single value in detailed_thermal_balance_to_tsd
+    q_loss_sen_ref = np.zeros(len(bprs)) * np.nan
+
+    # end-use demand calculation
+    for t in thermal_loads.get_hours(bprs[0]):
+        # heat flows in [W]
+        calc_Qgain_sen_batch(t, tsd_batch, bp)
+
+        # ventilation air flows [kg/s] and ventilation air temperature
+        calc_air_mass_flows_and_theta_ve_mech_batch(t, tsd_batch, bp)
+
+        # heating / cooling demand of building
+        calc_heating_cooling_loads_batch(t, tsd_batch, bp, q_loss_sen_ref)
+
+    for i, tsd in enumerate(tsds):
+        for key in TSD_KEYS_BATCH_OUTPUTS + TSD_KEYS_BATCH_STATUS:
+            tsd[key][:] = tsd_batch[key][:, i]
+        if not np.isnan(q_loss_sen_ref[i]):
+            tsd['Q_loss_sen_ref'] = q_loss_sen_ref[i]
+    return tsds
+
+
+def calc_Qgain_sen_batch(t, tsd_batch, bp):
+    """Batched version of :py:func:`cea.demand.sensible_loads.calc_Qgain_sen`"""
+    temp_s_prev = tsd_batch['theta_c'][t - 1]
+    temp_s_prev = np.where(np.isnan(temp_s_prev), tsd_batch['T_ext'][t - 1], temp_s_prev)
+
+    # theta_ss is the is the arithmetic average of the surface temperature and the sky temperature, in °C.
+    theta_ss = 0.5 * (tsd_batch['T_sky'][t] + temp_s_prev)  # [see 11.4.6 in ISO 13790]
+
+    # delta_theta_er is the average difference between outdoor air temperature and sky temperature
+    delta_theta_er = tsd_batch['T_ext'][t] - tsd_batch['T_sky'][t]  # [see 11.3.5 in ISO 13790]
+
+    Fform_wall, Fform_win, Fform_roof = 0.5, 0.5, 1  # 50% re-irradiated by vertical surfaces and 100% by horizontal
+    I_rad_win = RSE * bp.U_win * calc_hr(bp.e_win, theta_ss) * bp.Awin_ag * delta_theta_er
+    I_rad_roof = RSE * bp.U_roof * calc_hr(bp.e_roof, theta_ss) * bp.Aroof * delta_theta_er
+    I_rad_wall = RSE * bp.U_wall * calc_hr(bp.e_wall, theta_ss) * bp.Awall_ag * delta_theta_er
+    I_rad = Fform_wall * I_rad_wall + Fform_win * I_rad_win + Fform_roof * I_rad_roof
+
+    I_sol_gross = bp.I_sol[t]
+    tsd_batch['I_sol_and_I_rad'][t] = I_sol_gross - I_rad  # Eq. (43) in 11.3.1, I_rad gets subtracted here
+    tsd_batch['I_rad'][t] = I_rad
+    tsd_batch['I_sol'][t] = I_sol_gross
+
+
+def calc_hr(emissivity, theta_ss):
+    """Array version of :py:func:`cea.demand.sensible_loads.calc_hr`"""
+    return 4.0 * emissivity * BOLTZMANN * (theta_ss + KELVIN_OFFSET) ** 3.0
+
+
+def calc_air_mass_flows_and_theta_ve_mech_batch(t, tsd_batch, bp):
+    """
+    Batched version of :py:func:`cea.demand.ventilation_air_flows_simple.calc_air_mass_flow_mechanical_ventilation`,
+    :py:func:`cea.demand.ventilation_air_flows_simple.calc_air_mass_flow_window_ventilation` and
+    :py:func:`cea.demand.ventilation_air_flows_simple.calc_theta_ve_mech` including the controls of
+    :py:mod:`cea.demand.control_ventilation_systems`.
+    """
+    t_int_prev = tsd_batch['T_int'][t - 1]
+    t_ext = tsd_batch['T_ext'][t]
+    m_ve_required = tsd_batch['m_ve_required'][t]
+    m_ve_inf = tsd_batch['m_ve_inf'][t]
+
+    # system controls
+    night_flushing = (bp.has_night_flushing & (not is_day_time(t))
+                      & (t_int_prev > TEMPERATURE_ZONE_CONTROL_NIGHT_FLUSHING)
+                      & (t_int_prev > t_ext + DELTA_T_NIGHT_FLUSHING)
+                      & (tsd_batch['rh_ext'][t] < bp.RH_max_pc))
+    economizer = bp.has_economizer & (t_int_prev > bp.Tcs_set_C) & (bp.Tcs_set_C >= t_ext)
+    mechanical_ventilation = bp.has_mechanical_ventilation & ((m_ve_required > 0) | night_flushing)
+    window_ventilation = bp.has_window_ventilation & ~mechanical_ventilation
+
+    m_ve_demand = np.maximum(m_ve_required - m_ve_inf, 0.0)
+
+    # mechanical ventilation fulfills requirement - minimum ventilation provided by infiltration, night flushing and
+    # economizer ventilate with the maximum required ventilation rate
+    tsd_batch['m_ve_mech'][t] = np.select(
+        [mechanical_ventilation & ~night_flushing & ~economizer,
+         bp.has_mechanical_ventilation & night_flushing,
+         bp.has_mechanical_ventilation & economizer],
+        [m_ve_demand, bp.m_ve_required_max, bp.m_ve_required_max], 0.0)
+
+    # window ventilation fulfills requirement (control by occupants similar to CO2 sensor)
+    tsd_batch['m_ve_window'][t] = np.select([window_ventilation & ~night_flushing, window_ventilation & night_flushing],
+                                            [m_ve_demand, bp.m_ve_required_max], 0.0)
+
+    # heat recovery is deactivated for night flushing and economizer and in the cooling case, if outdoor air
+    # conditions are colder than indoor (free cooling)
+    heat_recovery_possible = mechanical_ventilation & bp.has_heat_recovery
+    heat_recovery = np.where(heat_recovery_possible & bp.heating_season[t],
+                             ~(night_flushing | economizer),
+                             heat_recovery_possible & bp.cooling_season[t] & (t_int_prev < t_ext))
+    tsd_batch['theta_ve_mech'][t] = np.where(heat_recovery, t_ext + ETA_REC * (t_int_prev - t_ext), t_ext)
+
+
+def is_day_time(t):
+    """Same as :py:func:`cea.demand.control_ventilation_systems.is_day_time`"""
+    start_night = 21  # 21:00
+    stop_night = 7  # 07:00
+    hour_of_day = t % 24
+    return stop_night < hour_of_day < start_night
+
+
+def calc_heating_cooling_loads_batch(t, tsd_batch, bp, q_loss_sen_ref):
+    """
+    Batched version of :py:func:`cea.demand.hourly_procedure_heating_cooling_system_load.calc_heating_cooling_loads`
+    for radiative emission systems.
+    """
+    t_int_prev = tsd_batch['T_int'][t - 1]
+    ta_hs_set = tsd_batch['ta_hs_set'][t]
+    ta_cs_set = tsd_batch['ta_cs_set'][t]
+
+    heating_season = bp.heating_season[t] & ~bp.cooling_season[t]
+    cooling_season = bp.cooling_season[t] & ~bp.heating_season[t]
+    if not np.all(heating_season | cooling_season):
+        warnings.warn('Timestep %s not in heating season nor cooling season' % t)
+
+    heating = heating_season & bp.has_heating_system & ~np.isnan(ta_hs_set)
+    cooling = cooling_season & bp.has_cooling_system & ~np.isnan(ta_cs_set) & ~(t_int_prev <= bp.t_sup_air_cooling)
+
+    # STEP 1: temperatures with zero heating / cooling power
+    rc_0 = calc_rc_model_temperatures_batch(0.0, 0.0, tsd_batch, bp, t)
+    t_int_0 = rc_0['T_int']
+
+    with np.errstate(invalid='ignore'):
+        heating_demand = heating & (t_int_0 < ta_hs_set - TEMP_TOLERANCE)
+        cooling_demand = cooling & (t_int_0 > ta_cs_set + TEMP_TOLERANCE)
+    demand = heating_demand | cooling_demand
+
+    phi_hc = np.zeros(len(bp.names))
+    if demand.any():
+        f_hc_cv = np.where(heating_demand, bp.f_hc_cv_heating, bp.f_hc_cv_cooling)
+
+        # STEP 2: temperatures with 10 W/m2 heating / cooling power
+        phi_hc_10 = 10.0 * bp.Af
+        rc_10 = calc_rc_model_temperatures_batch(f_hc_cv * phi_hc_10, (1 - f_hc_cv) * phi_hc_10, tsd_batch, bp, t,
+                                                 demand)
+        t_int_set = np.where(heating_demand, ta_hs_set, ta_cs_set)
+
+        # interpolate heating power
+        # (64) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
+        with np.errstate(invalid='ignore', divide='ignore'):
+            phi_hc_ul = phi_hc_10 * (t_int_set - t_int_0) / (rc_10['T_int'] - t_int_0)
+
+            # STEP 3: check if available power is sufficient
+            if np.any(heating_demand & ~(phi_hc_ul > 0.0)):
+                raise Exception("Unexpected status in 'calc_rc_heating_demand'")
+            if np.any(cooling_demand & ~(phi_hc_ul < 0.0)):
+                raise Exception("Unexpected status in 'calc_rc_cooling_demand'")
+            phi_hc = np.select([heating_demand, cooling_demand],
+                               [np.minimum(phi_hc_ul, bp.phi_h_max), np.maximum(phi_hc_ul, bp.phi_c_max)], 0.0)
+
+        # STEP 4: temperatures with the actual heating / cooling power
+        rc_act = calc_rc_model_temperatures_batch(f_hc_cv * phi_hc, (1 - f_hc_cv) * phi_hc, tsd_batch, bp, t, demand)
+        rc = dict((key, np.where(demand, rc_act[key], rc_0[key])) for key in rc_0)
+    else:
+        rc = rc_0
+
+    # a radiative system does not act on humidity
+    tsd_batch['g_hu_ld'][t] = 0.0
+    tsd_batch['g_dhu_ld'][t] = 0.0
+    calc_moisture_content_in_zone_local_batch(t, tsd_batch, bp)
+
+    # write temperatures to tsd
+    for key in ['T_int', 'theta_m', 'theta_c', 'theta_o']:
+        tsd_batch[key][t] = rc[key]
+
+    # heating and cooling loads (no loads = no system, system off or no demand)
+    no_loads = ~(heating | cooling)
+    set_values(tsd_batch, t, ~heating,
+               Qhs_sen_rc=0.0, Qhs_sen_shu=0.0, Qhs_sen_aru=0.0, Qhs_sen_ahu=0.0, Qhs_lat_aru=0.0, Qhs_lat_ahu=0.0,
+               Qhs_sen_sys=0.0, Qhs_lat_sys=0.0, Qhs_em_ls=0.0, Ehs_lat_aux=0.0,
+               ma_sup_hs_ahu=0.0, ta_sup_hs_ahu=np.nan, ta_re_hs_ahu=np.nan,
+               ma_sup_hs_aru=0.0, ta_sup_hs_aru=np.nan, ta_re_hs_aru=np.nan)
+    set_values(tsd_batch, t, ~cooling,
+               Qcs_sen_rc=0.0, Qcs_sen_scu=0.0, Qcs_sen_aru=0.0, Qcs_sen_ahu=0.0, Qcs_lat_aru=0.0, Qcs_lat_ahu=0.0,
+               Qcs_sen_sys=0.0, Qcs_lat_sys=0.0, Qcs_em_ls=0.0,
+               ma_sup_cs_ahu=0.0, ta_sup_cs_ahu=np.nan, ta_re_cs_ahu=np.nan,
+               ma_sup_cs_aru=0.0, ta_sup_cs_aru=np.nan, ta_re_cs_aru=np.nan)
+    set_values(tsd_batch, t, no_loads,
+               sys_status_ahu=b'system off', sys_status_aru=b'system off', sys_status_sen=b'system off')
+
+    if heating.any():
+        t_int = rc['T_int']
+        q_em_ls_heating = calc_q_em_ls_batch(phi_hc, bp.delta_theta_int_inc_heating,
+                                             t_int + bp.delta_theta_int_inc_heating, tsd_batch['T_ext'][t],
+                                             bp.phi_h_max)
+        set_values(tsd_batch, t, heating,
+                   Qhs_sen_rc=phi_hc, Qhs_sen_shu=phi_hc, Qhs_sen_ahu=0.0, Qhs_sen_aru=0.0, Qhs_sen_sys=phi_hc,
+                   Qhs_lat_sys=0.0, Ehs_lat_aux=0.0,
+                   ma_sup_hs_ahu=0.0, ta_sup_hs_ahu=np.nan, ta_re_hs_ahu=np.nan,
+                   ma_sup_hs_aru=0.0, ta_sup_hs_aru=np.nan, ta_re_hs_aru=np.nan,
+                   Qhs_em_ls=q_em_ls_heating,
+                   sys_status_ahu=b'no system', sys_status_aru=b'no system',
+                   sys_status_sen=np.where(phi_hc > 0.0, b'On', b'Off'))
+
+    if cooling.any():
+        t_int = rc['T_int']
+        q_em_ls_cooling = calc_q_em_ls_batch(phi_hc, bp.delta_theta_int_inc_cooling,
+                                             t_int + bp.delta_theta_int_inc_cooling,
+                                             tsd_batch['T_ext'][t] + bp.delta_theta_e_sol, bp.phi_c_max)
+        set_values(tsd_batch, t, cooling,
+                   Qcs_sen_rc=phi_hc, Qcs_sen_scu=phi_hc, Qcs_sen_ahu=0.0, Qcs_sen_aru=0.0, Qcs_sen_sys=phi_hc,
+                   Qcs_lat_ahu=0.0, Qcs_lat_aru=0.0, Qcs_lat_sys=0.0,
+                   ma_sup_cs_ahu=0.0, ta_sup_cs_ahu=np.nan, ta_re_cs_ahu=np.nan,
+                   ma_sup_cs_aru=0.0, ta_sup_cs_aru=np.nan, ta_re_cs_aru=np.nan,
+                   Qcs_em_ls=q_em_ls_cooling,
+                   sys_status_ahu=b'no system', sys_status_aru=b'no system',
+                   sys_status_sen=np.where(phi_hc < 0.0, b'On', b'Off'))
+
+    # for dashboard
+    detailed_thermal_balance_to_tsd_batch(t, tsd_batch, bp, rc, heating_season | cooling_season, q_loss_sen_ref)
+
+
+def set_values(tsd_batch, t, mask, **values):
+    """Set the values of the time step data at hour ``t`` for the buildings selected by ``mask``"""
+    if not mask.any():
+        return
+    for key, value in values.items():
+        row = tsd_batch[key][t]
+        row[mask] = value[mask] if isinstance(value, np.ndarray) else value
+
+
+def calc_rc_model_temperatures_batch(phi_hc_cv, phi_hc_r, tsd_batch, bp, t, mask=None):
+    """
+    Batched version of :py:func:`cea.demand.rc_model_SIA.calc_rc_model_temperatures`. The equations are those of
+    :py:func:`cea.demand.rc_model_SIA._calc_rc_model_temperatures`, with the time independent coefficients taken from
+    :py:class:`BatchProperties`.
+
+    :param mask: only the buildings selected by the mask are checked for temperatures out of bounds (the values of
+        the other buildings are ignored by the caller)
+    :return: R-C-Model node temperatures (and intermediate results) of all buildings
+    :rtype: dict
+    """
+    theta_m_t_1 = tsd_batch['theta_m'][t - 1]
+    theta_m_t_1 = np.where(np.isnan(theta_m_t_1), tsd_batch['T_ext'][t - 1], theta_m_t_1)
+
+    # copy data required for calculation from `tsd` for this timestep
+    m_ve_mech = tsd_batch['m_ve_mech'][t]
+    m_ve_window = tsd_batch['m_ve_window'][t]
+    m_ve_inf = tsd_batch['m_ve_inf'][t]
+    phi_i_l = 0.9 * (tsd_batch['El'][t] * bp.f_internal_gains)
+    phi_i_a = 0.9 * (tsd_batch['Ea'][t] * bp.f_internal_gains + tsd_batch['Epro'][t])  # include processes
+    phi_i_p = tsd_batch['Qs'][t]
+    # account for a proportion of solar gains. This is very simplified for now.
+    phi_s = tsd_batch['I_sol_and_I_rad'][t] * bp.f_solar_gains
+    T_ext = tsd_batch['T_ext'][t]
+    theta_ve_mech = tsd_batch['theta_ve_mech'][t]
+
+    f_sa, f_r_l, f_r_p, f_r_a = rc_model_SIA.f_sa, rc_model_SIA.f_r_l, rc_model_SIA.f_r_p, rc_model_SIA.f_r_a
+    h_ec, h_ac, h_em, h_mc = bp.h_ec, bp.h_ac, bp.h_em, bp.h_mc
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        h_ea = (m_ve_mech * 3600 + m_ve_window * 3600 + m_ve_inf * 3600) * (1.005 / 3.6)  # (13)
+        h_1 = 1 / (1 / h_ea + 1 / h_ac)  # (26)
+        phi_a = f_sa * phi_s + (1 - f_r_l) * phi_i_l + (1 - f_r_p) * phi_i_p + (1 - f_r_a) * phi_i_a + phi_hc_cv  # (14)
+        phi_m = bp.f_im * (f_r_l * phi_i_l + f_r_p * phi_i_p + f_r_a * phi_i_a + phi_hc_r) + (
+            1 - f_sa) * bp.f_sm * phi_s  # (16)
+        phi_c = bp.f_ic * (f_r_l * phi_i_l + f_r_p * phi_i_p + f_r_a * phi_i_a + phi_hc_r) + (
+            1 - f_sa) * bp.f_sc * phi_s  # (15)
+        theta_ea = (m_ve_mech * theta_ve_mech + (m_ve_window + m_ve_inf) * T_ext) / (
+            m_ve_mech + m_ve_window + m_ve_inf)  # (21)
+        theta_em = T_ext  # (23)
+        theta_ec = T_ext  # (22)
+        h_2 = h_1 + h_ec  # (27)
+        h_3 = 1.0 / (1.0 / h_2 + 1.0 / h_mc)  # (28)
+        phi_m_tot = phi_m + h_em * theta_em + (h_3 * (phi_c + h_ec * theta_ec + h_1 * (phi_a / h_ea + theta_ea))) / h_2
+        theta_m_t = (theta_m_t_1 * (bp.c_m - 0.5 * (h_3 + h_em)) + phi_m_tot) / (bp.c_m + 0.5 * (h_3 + h_em))  # (25)
+        theta_m = (theta_m_t + theta_m_t_1) / 2  # (30)
+        theta_c = (h_mc * theta_m + phi_c + h_ec * theta_ec + h_1 * (phi_a / h_ea + theta_ea)) / (
+            h_mc + h_ec + h_1)  # (31)
+        T_int = (h_ac * theta_c + h_ea * theta_ea + phi_a) / (h_ac + h_ea)  # (32)
+        theta_o = T_int * 0.31 + theta_c * 0.69  # (33)
+
+        out_of_bounds = ((rc_model_SIA.T_WARNING_LOW > T_int) | (rc_model_SIA.T_WARNING_LOW > theta_c)
+                         | (rc_model_SIA.T_WARNING_LOW > theta_m) | (T_int > rc_model_SIA.T_WARNING_HIGH)
+                         | (theta_c > rc_model_SIA.T_WARNING_HIGH) | (theta_m > rc_model_SIA.T_WARNING_HIGH))
+    if mask is not None:
+        out_of_bounds &= mask
+    if out_of_bounds.any():
+        i = np.flatnonzero(out_of_bounds)[0]
+        raise Exception("Temperature in RC-Model of building {} out of bounds! First occured at timestep = {}."
+                        " The results were Tint = {}, theta_c = {}, theta_m = {},"
+                        " Check building geometry and internal loads! Building might be too small in size or"
+                        " architecture parameter Hs_ag = {} might be too small for this geometry. Current bounds of"
+                        " range for RC-model temperatures are between {} and {}.".format(
+                            bp.names[i], t, T_int[i], theta_c[i], theta_m[i], bp.Hs_ag[i],
+                            rc_model_SIA.T_WARNING_LOW, rc_model_SIA.T_WARNING_HIGH))
+
+    return {'theta_m': theta_m, 'theta_c': theta_c, 'T_int': T_int, 'theta_o': theta_o, 'theta_ea': theta_ea,
+            'theta_ec': theta_ec, 'theta_em': theta_em, 'h_ea': h_ea}
+
+
+def calc_moisture_content_in_zone_local_batch(t, tsd_batch, bp):
+    """Batched version of :py:func:`cea.demand.latent_loads.calc_moisture_content_in_zone_local`"""
+    m_ve_mech = tsd_batch['m_ve_mech'][t]
+    m_ve_inf = tsd_batch['m_ve_inf'][t] + tsd_batch['m_ve_window'][t]
+    rho_vol_dt = (latent_loads.RHO_A * bp.vol_int_a) / latent_loads.DELTA_T
+
+    # sum ventilation moisture + (de)humidification
+    x_int_a_t = (m_ve_mech * tsd_batch['x_ve_mech'][t] + m_ve_inf * tsd_batch['x_ve_inf'][t] +
+                 tsd_batch['g_hu_ld'][t] + tsd_batch['g_dhu_ld'][t] + tsd_batch['w_int'][t] +
+                 rho_vol_dt * tsd_batch['x_int'][t - 1]) / ((m_ve_mech + m_ve_inf) + rho_vol_dt)
+
+    if np.any(x_int_a_t < 0):
+        raise Exception("Bug in moisture balance in zone. Negative moisture content detected.")
+
+    tsd_batch['x_int'][t] = x_int_a_t
+
+
+def convert_rh_to_moisture_content(rh, theta):
+    """Array version of :py:func:`cea.demand.latent_loads.convert_rh_to_moisture_content`"""
+    p_sat = 611.2 * np.exp(17.62 * theta / (243.12 + theta))
+    return 0.622 * rh / 100 * p_sat / latent_loads.P_ATM
+
+
+def calc_q_em_ls_batch(q_em_out, delta_theta_int_inc, theta_int_inc, theta_e_comb, q_em_max):
+    """Array version of :py:func:`cea.demand.space_emission_systems.calc_q_em_ls`"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        q_em_ls = q_em_out * (delta_theta_int_inc / (theta_int_inc - theta_e_comb))
+
+    # cap emission losses at absolute capacity
+    q_em_ls = np.where(np.abs(q_em_ls + q_em_out) > np.abs(q_em_max), q_em_max - q_em_out, q_em_ls)
+
+    # prevent form negative emission losses
+    q_em_ls = np.where(np.sign(q_em_ls) == np.sign(q_em_out), q_em_ls, 0.0)
+
+    # prevent division by zero
+    return np.where(np.abs(theta_int_inc - theta_e_comb) < 1e-6, 0.0, q_em_ls)
+
+
+def detailed_thermal_balance_to_tsd_batch(t, tsd_batch, bp, rc, mask, q_loss_sen_ref):
+    """
+    Batched version of :py:func:`cea.demand.hourly_procedure_heating_cooling_system_load.detailed_thermal_balance_to_tsd`
+    """
+    if not mask.any():
+        return
+
+    El, Ea, Epro = tsd_batch['El'][t], tsd_batch['Ea'][t], tsd_batch['Epro'][t]
+    q_loss_sen_ref[mask] = -tsd_batch['Qcre_sys'][t][mask]
+
+    # backwards calculate individual heat transfer coefficient
+    h_wall_em = bp.h_em * bp.Awall_ag * bp.U_wall / bp.h_op_m
+    h_base_em = bp.h_em * bp.Aop_bg * B_F * bp.U_base / bp.h_op_m
+    h_roof_em = bp.h_em * bp.Aroof * bp.U_roof / bp.h_op_m
+
+    set_values(tsd_batch, t, mask,
+               Q_gain_sen_light=0.9 * El,
+               Q_gain_sen_app=(0.9 * (Ea + Epro) - 0.9 * Epro) / 0.9,
+               Q_gain_sen_pro=Epro,
+               Q_gain_sen_data=tsd_batch['Qcdata_sys'][t],
+               Q_gain_sen_peop=tsd_batch['Qs'][t],
+               Q_gain_sen_wall=h_wall_em * (rc['theta_em'] - rc['theta_m']),
+               Q_gain_sen_base=h_base_em * (rc['theta_em'] - rc['theta_m']),
+               Q_gain_sen_roof=h_roof_em * (rc['theta_em'] - rc['theta_m']),
+               Q_gain_sen_wind=bp.h_ec * (rc['theta_ec'] - rc['theta_c']),
+               Q_gain_sen_vent=rc['h_ea'] * (rc['theta_ea'] - rc['T_int']))
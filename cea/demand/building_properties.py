@@ -9,6 +9,7 @@ from datetime import datetime
 from collections import namedtuple
 from cea.demand import constants
 from cea.utilities.dbf import dbf_to_dataframe
+from cea.utilities.input_cache import shapefile_to_geodataframe
 from cea.technologies import blinds
 from typing import List
 
@@ -56,7 +57,7 @@ class BuildingProperties(object):
 
         self.building_names = building_names
         print("read input files")
-        prop_geometry = Gdf.from_file(locator.get_zone_geometry())
+        prop_geometry = shapefile_to_geodataframe(locator.get_zone_geometry())
         prop_geometry['footprint'] = prop_geometry.area
         prop_geometry['perimeter'] = prop_geometry.length
         prop_geometry['Blength'], prop_geometry['Bwidth'] = self.calc_bounding_box_geom(locator.get_zone_geometry())
@@ -987,9 +988,9 @@ def calc_Isol_daysim(building_name, locator, prop_envelope, prop_rc_model, therm
                  radiation_data['windows_north_kW'] +
                  radiation_data['windows_south_kW']).values * 1000  # in W
 
-    Fsh_win = np.vectorize(blinds.calc_blinds_activation)(I_sol_win,
-                                                          prop_envelope.loc[building_name, 'G_win'],
-                                                          prop_envelope.loc[building_name, 'rf_sh'])
+    Fsh_win = blinds.calc_blinds_activation_array(I_sol_win,
+                                                  prop_envelope.loc[building_name, 'G_win'],
+                                                  prop_envelope.loc[building_name, 'rf_sh'])
 
     I_sol_win = I_sol_win * \
                 Fsh_win * \
@@ -348,6 +348,54 @@ def is_cooling_season(t, bpr):
         # no cooling season
         return False
 
+
+def calc_heating_season_mask(bpr):
+    """
+    Array version of :py:func:`is_heating_season` for all hours of the year
+
+    :param bpr: BuildingPropertiesRow
+    :type bpr: cea.demand.building_properties.BuildingPropertiesRow
+    :return: True for every hour of the year that is part of the heating season of the building
+    :rtype: numpy.ndarray[bool]
+    """
+    if not bpr.hvac['has-heating-season']:
+        return np.zeros(HOURS_IN_YEAR, dtype=bool)
+    return calc_season_mask(convert_date_to_hour(bpr.hvac['heat_starts']),
+                            convert_date_to_hour(bpr.hvac['heat_ends']) + 23)  # end at the last hour of the day
+
+
+def calc_cooling_season_mask(bpr):
+    """
+    Array version of :py:func:`is_cooling_season` for all hours of the year
+
+    :param bpr: BuildingPropertiesRow
+    :type bpr: cea.demand.building_properties.BuildingPropertiesRow
+    :return: True for every hour of the year that is part of the cooling season of the building
+    :rtype: numpy.ndarray[bool]
+    """
+    if not bpr.hvac['has-cooling-season']:
+        return np.zeros(HOURS_IN_YEAR, dtype=bool)
+    return calc_season_mask(convert_date_to_hour(bpr.hvac['cool_starts']),
+                            convert_date_to_hour(bpr.hvac['cool_ends']) + 23)  # end at the last hour of the day
+
+
+def calc_season_mask(season_start, season_end):
+    """
+    :param int season_start: first hour of the season
+    :param int season_end: last hour of the season
+    :return: True for every hour of the year between ``season_start`` and ``season_end`` (wrapping around the year end)
+    :rtype: numpy.ndarray[bool]
+    """
+    hours = np.arange(HOURS_IN_YEAR)
+    if season_start < season_end:
+        # season in the middle of the year
+        return (season_start <= hours) & (hours <= season_end)
+    elif season_start > season_end:
+        # season over the year end
+        return (season_start <= hours) | (hours <= season_end)
+    else:
+        return np.zeros(HOURS_IN_YEAR, dtype=bool)
+
 # temperature controllers
 
 
@@ -362,16 +410,48 @@ def get_temperature_setpoints_incl_seasonality(tsd, bpr, schedules):
     :return: tsd with updated columns
     :rtype: dict
     """
-    hours_in_the_year_vector = range(HOURS_IN_YEAR)
-    tsd['ta_hs_set'] = np.vectorize(get_heating_system_set_point, otypes=[float])(hours_in_the_year_vector,
-                                                                                  schedules['Ths_set_C'],
-                                                                                  bpr)
-    tsd['ta_cs_set'] = np.vectorize(get_cooling_system_set_point, otypes=[float])(hours_in_the_year_vector,
-                                                                                  schedules['Tcs_set_C'],
-                                                                                  bpr)
+    tsd['ta_hs_set'] = get_heating_system_set_point_array(schedules['Ths_set_C'], bpr)
+    tsd['ta_cs_set'] = get_cooling_system_set_point_array(schedules['Tcs_set_C'], bpr)
     return tsd
 
 
+def get_heating_system_set_point_array(Ths_set_C, bpr):
+    """
+    Array version of :py:func:`get_heating_system_set_point` for all hours of the year
+
+    :param Ths_set_C: heating set point schedule [°C], ``np.nan`` or ``'OFF'`` when the system is off
+    :param bpr: BuildingPropertiesRow
+    :type bpr: cea.demand.building_properties.BuildingPropertiesRow
+    :return: heating system set point temperature [°C], ``np.nan`` outside of the heating season
+    :rtype: numpy.ndarray
+    """
+    return np.where(calc_heating_season_mask(bpr), convert_set_point_schedule_to_float(Ths_set_C), np.nan)
+
+
+def get_cooling_system_set_point_array(Tcs_set_C, bpr):
+    """
+    Array version of :py:func:`get_cooling_system_set_point` for all hours of the year
+
+    :param Tcs_set_C: cooling set point schedule [°C], ``np.nan`` or ``'OFF'`` when the system is off
+    :param bpr: BuildingPropertiesRow
+    :type bpr: cea.demand.building_properties.BuildingPropertiesRow
+    :return: cooling system set point temperature [°C], ``np.nan`` outside of the cooling season
+    :rtype: numpy.ndarray
+    """
+    return np.where(calc_cooling_season_mask(bpr), convert_set_point_schedule_to_float(Tcs_set_C), np.nan)
+
+
+def convert_set_point_schedule_to_float(T_set_C):
+    """
+    :return: the set point schedule as floats with ``'OFF'`` replaced by ``np.nan``
+    :rtype: numpy.ndarray
+    """
+    T_set_C = np.asarray(T_set_C)
+    if T_set_C.dtype.kind in 'fiu':
+        return T_set_C.astype(float)
+    return np.where(T_set_C == 'OFF', np.nan, T_set_C).astype(float)
+
+
 def get_heating_system_set_point(t, Ths_set_C, bpr):
     """
 
@@ -53,6 +53,22 @@ def calc_mcpcdata(Qcdata_sys):
         mcpcdata_sys = 0.0
     return mcpcdata_sys, Tcdata_sys_re, Tcdata_sys_sup
 
+
+def calc_mcpcdata_array(Qcdata_sys):
+    """
+    Array version of :py:func:`calc_mcpcdata` for all hours of the year
+
+    :return: mcpcdata_sys, Tcdata_sys_re, Tcdata_sys_sup
+    :rtype: tuple[numpy.ndarray]
+    """
+    Qcdata_sys = np.asarray(Qcdata_sys, dtype=float)
+    on = Qcdata_sys > 0.0
+    Tcdata_sys_re = np.where(on, T_C_DATA_RE_0, np.nan)
+    Tcdata_sys_sup = np.where(on, T_C_DATA_SUP_0, np.nan)
+    mcpcdata_sys = np.zeros(Qcdata_sys.shape)
+    mcpcdata_sys[on] = Qcdata_sys[on] / (T_C_DATA_RE_0 - T_C_DATA_SUP_0)
+    return mcpcdata_sys, Tcdata_sys_re, Tcdata_sys_sup
+
 def calc_Qcdata_sys(bpr, tsd):
     # calculate cooling loads for data center
     tsd['Qcdata'] = 0.9 * tsd['Edata'] * -1.0  # cooling loads are negative
@@ -65,7 +81,7 @@ def calc_Qcdata_sys(bpr, tsd):
     # calculate system loads for data center
     #WHATCHOUT! if we change it, then the optimization use of wasteheat breaks. mcpdata has to be positive and Qcdata_sys too!
     tsd['Qcdata_sys'] = abs(tsd['Qcdata'] + Qcdata_d_ls) # convert to positive so we get the mcp in positive numbers
-    tsd['mcpcdata_sys'], tsd['Tcdata_sys_re'], tsd['Tcdata_sys_sup'] = np.vectorize(calc_mcpcdata)(abs(tsd['Qcdata_sys']))
+    tsd['mcpcdata_sys'], tsd['Tcdata_sys_re'], tsd['Tcdata_sys_sup'] = calc_mcpcdata_array(abs(tsd['Qcdata_sys']))
 
     return tsd
 
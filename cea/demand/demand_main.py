@@ -6,14 +6,14 @@ Analytical energy demand model algorithm
 import os
 import time
 import warnings
-from itertools import repeat
 
 import cea.config
 import cea.inputlocator
 import cea.utilities.parallel
+from cea.utilities.parallel import broadcast
 from . import demand_writers
 from cea import MissingInputDataException
-from cea.demand import thermal_loads
+from cea.demand import thermal_loads, batched_thermal_loads
 from cea.demand.building_properties import BuildingProperties
 from cea.utilities import epwreader
 from cea.utilities.date import get_date_range_hours_from_year
@@ -104,27 +104,41 @@ def demand_calculation(locator, config):
         print('Warning! The following list of buildings have less than 100 m2 of gross floor area, CEA might fail: %s' % list_buildings_less_100m2)
 
     # DEMAND CALCULATION
-    n = len(building_names)
-    calc_thermal_loads = cea.utilities.parallel.vectorize(thermal_loads.calc_thermal_loads,
-                                                          config.get_number_of_processes(), on_complete=print_progress)
+    if config.demand.calculation_engine == 'batched':
+        # each batch of buildings is passed as one list of names and one list of building properties
+        batch_size = max(config.demand.batch_size, 1)
+        building_names_arg = [building_names[i:i + batch_size] for i in range(0, len(building_names), batch_size)]
+        building_properties_arg = [[building_properties[b] for b in batch] for batch in building_names_arg]
+        calc_thermal_loads = cea.utilities.parallel.vectorize(batched_thermal_loads.calc_thermal_loads_batch,
+                                                              config.get_number_of_processes(),
+                                                              on_complete=print_batch_progress)
+    else:
+        building_names_arg = building_names
+        building_properties_arg = [building_properties[b] for b in building_names]
+        calc_thermal_loads = cea.utilities.parallel.vectorize(thermal_loads.calc_thermal_loads,
+                                                              config.get_number_of_processes(),
+                                                              on_complete=print_progress)
 
     calc_thermal_loads(
-        building_names,
-        [building_properties[b] for b in building_names],
-        repeat(weather_data, n),
-        repeat(date_range, n),
-        repeat(locator, n),
-        repeat(use_dynamic_infiltration, n),
-        repeat(resolution_output, n),
-        repeat(loads_output, n),
-        repeat(massflows_output, n),
-        repeat(temperatures_output, n),
-        repeat(config, n),
-        repeat(debug, n))
+        building_names_arg,
+        building_properties_arg,
+        broadcast(weather_data),
+        broadcast(date_range),
+        broadcast(locator),
+        broadcast(use_dynamic_infiltration),
+        broadcast(resolution_output),
+        broadcast(loads_output),
+        broadcast(massflows_output),
+        broadcast(temperatures_output),
+        broadcast(config),
+        broadcast(debug))
 
     # WRITE TOTAL YEARLY VALUES
     writer_totals = demand_writers.YearlyDemandWriter(loads_output, massflows_output, temperatures_output)
-    totals, time_series = writer_totals.write_to_csv(building_names, locator)
+    if config.demand.results_format == 'hdf5':
+        totals, time_series = writer_totals.write_to_hdf5(building_names, locator)
+    else:
+        totals, time_series = writer_totals.write_to_csv(building_names, locator)
     time_elapsed = time.perf_counter() - t0
     print('done - time elapsed: %d.2 seconds' % time_elapsed)
 
@@ -135,6 +149,10 @@ def print_progress(i, n, args, _):
     print("Building No. {i} completed out of {n}: {building}".format(i=i + 1, n=n, building=args[0]))
 
 
+def print_batch_progress(i, n, args, _):
+    print("Batch No. {i} completed out of {n}: {buildings}".format(i=i + 1, n=n, buildings=", ".join(args[0])))
+
+
 def main(config):
     assert os.path.exists(config.scenario), 'Scenario not found: %s' % config.scenario
     locator = cea.inputlocator.InputLocator(scenario=config.scenario)
@@ -142,6 +160,7 @@ def main(config):
     print('Running demand calculation with dynamic infiltration=%s' %
           config.demand.use_dynamic_infiltration_calculation)
     print('Running demand calculation with multiprocessing=%s' % config.multiprocessing)
+    print('Running demand calculation with calculation engine=%s' % config.demand.calculation_engine)
     if config.debug:
         print('Running demand in debug mode: Instant visualization of tsd activated.')
         print('Running demand calculation with write detailed output')
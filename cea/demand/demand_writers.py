@@ -2,12 +2,19 @@
 A collection of classes that write out the demand results files. The default is `HourlyDemandWriter`. A `MonthlyDemandWriter` is provided
 that sums the values up monthly. See the `cea.analysis.sensitivity.sensitivity_demand` module for an example of using
 the `MonthlyDemandWriter`.
+
+The results of each building are written either to a csv file per building (``demand:results-format = csv``) or as one
+table per building to the demand results store (``demand:results-format = hdf5``, see
+``InputLocator.get_demand_results_store``). Use :py:func:`read_demand_results` to read the results of a building
+independent of the format.
 """
 
 
 
 
 
+import os
+
 import numpy as np
 import pandas as pd
 
@@ -34,15 +41,15 @@ class DemandWriter(object):
         self.OTHER_VARS = ['Name', 'Af_m2', 'Aroof_m2', 'GFA_m2', 'Aocc_m2', 'people0']
 
     def results_to_hdf5(self, tsd, bpr, locator, date, building_name):
+        # save hourly data - the buildings are calculated in parallel, so the data is collected in the demand results
+        # store by `YearlyDemandWriter.write_to_hdf5` once all buildings are done
         columns, hourly_data = self.calc_hourly_dataframe(building_name, date, tsd)
         self.write_to_hdf5(building_name, columns, hourly_data, locator)
 
         # save total for the year
         columns, data = self.calc_yearly_dataframe(bpr, building_name, tsd)
         # save to disc
-        partial_total_data = pd.DataFrame(data, index=[0])
-        partial_total_data.drop('Name', inplace=True, axis=1)
-        partial_total_data.to_hdf(
+        pd.DataFrame(data, index=[0])[columns].to_hdf(
             locator.get_temporary_file('%(building_name)sT.hdf' % locals()),
             key='dataset')
 
@@ -65,7 +72,7 @@ class DemandWriter(object):
         data.update(dict((x + '0_kW', tsd[x].max() / 1000) for x in self.load_vars))
         # get order of columns
         keys = data.keys()
-        columns = self.OTHER_VARS
+        columns = list(self.OTHER_VARS)
         columns.extend(keys)
         # add other default elements
         data.update({'Name': building_name, 'Af_m2': bpr.rc_model['Af'], 'Aroof_m2': bpr.rc_model['Aroof'],
@@ -110,9 +117,9 @@ class HourlyDemandWriter(DemandWriter):
                            float_format=FLOAT_FORMAT, na_rep='nan')
 
     def write_to_hdf5(self, building_name, columns, hourly_data, locator):
-        # fixing columns with strings
-        hourly_data.drop('Name', inplace=True, axis=1)
-        hourly_data.to_hdf(locator.get_demand_results_file(building_name, 'hdf'), key='dataset')
+        # the name of the building is the key of the table in the demand results store
+        hourly_data[[c for c in columns if c != 'Name']].to_hdf(
+            locator.get_temporary_file('%(building_name)s.hdf' % locals()), key='dataset')
 
 
 class MonthlyDemandWriter(DemandWriter):
@@ -132,7 +139,7 @@ class MonthlyDemandWriter(DemandWriter):
     def write_to_hdf5(self, building_name, columns, hourly_data, locator):
         # get monthly totals and rename to MWhyr
         monthly_data_new = self.calc_monthly_dataframe(building_name, hourly_data)
-        monthly_data_new.to_hdf(locator.get_demand_results_file(building_name, 'hdf'), key=building_name)
+        monthly_data_new.to_hdf(locator.get_temporary_file('%(building_name)s.hdf' % locals()), key='dataset')
 
     def calc_monthly_dataframe(self, building_name, hourly_data):
         monthly_data = hourly_data[[x + '_kWh' for x in self.load_vars]].groupby(
@@ -161,15 +168,14 @@ class YearlyDemandWriter(DemandWriter):
 
     def write_to_csv(self, list_buildings, locator):
         """read in the temporary results files and append them to the Totals.csv file."""
-        df = None
-        for name in list_buildings:
-            temporary_file = locator.get_temporary_file('%(name)sT.csv' % locals())
-            if df is None:
-                df = pd.read_csv(temporary_file)
-            else:
-                df = df.append(pd.read_csv(temporary_file), ignore_index=True)
+        df = pd.concat([pd.read_csv(locator.get_temporary_file('%(name)sT.csv' % locals()))
+                        for name in list_buildings], ignore_index=True)
         df.to_csv(locator.get_total_demand('csv'), index=False, float_format='%.3f', na_rep='nan')
 
+        # the results of the buildings are in the csv files now, their tables in the demand results store are outdated
+        # (the tables of the other buildings are kept)
+        locator.get_demand_results_store.remove(list_buildings)
+
         """read saved data of monthly values and return as totals"""
         monthly_data_buildings = [pd.read_csv(locator.get_demand_results_file(building_name, 'csv')) for building_name
                                   in
@@ -177,18 +183,75 @@ class YearlyDemandWriter(DemandWriter):
         return df, monthly_data_buildings
 
     def write_to_hdf5(self, list_buildings, locator):
-        """read in the temporary results files and append them to the Totals.csv file."""
-        df = None
-        for name in list_buildings:
-            temporary_file = locator.get_temporary_file('%(name)sT.hdf' % locals())
-            if df is None:
-                df = pd.read_hdf(temporary_file, key='dataset')
-            else:
-                df = df.append(pd.read_hdf(temporary_file, key='dataset'))
-        df.to_hdf(locator.get_total_demand('hdf'), key='dataset')
+        """
+        read in the temporary results files, append the totals to the Totals.csv file and collect the results of each
+        building in the demand results store.
+        """
+        df = pd.concat([pd.read_hdf(locator.get_temporary_file('%(name)sT.hdf' % locals()), key='dataset')
+                        for name in list_buildings], ignore_index=True)
+        df.to_csv(locator.get_total_demand('csv'), index=False, float_format='%.3f', na_rep='nan')
 
-        """read saved data of monthly values and return as totals"""
-        monthly_data_buildings = [pd.read_hdf(locator.get_demand_results_file(building_name, 'hdf'), key=building_name)
-                                  for building_name in
-                                  list_buildings]
+        # the table of each building of this run replaces its table of a previous run, the tables of the other
+        # buildings are kept
+        monthly_data_buildings = []
+        for building_name in list_buildings:
+            temporary_file = locator.get_temporary_file('%(building_name)s.hdf' % locals())
+            building_data = pd.read_hdf(temporary_file, key='dataset')
+            locator.get_demand_results_store.write(building_data, key=building_name)
+            monthly_data_buildings.append(building_data)
+            os.remove(temporary_file)
+
+            # the results of the building are in the store now, a csv file of a previous run is outdated
+            if os.path.exists(locator.get_demand_results_file(building_name, 'csv')):
+                os.remove(locator.get_demand_results_file(building_name, 'csv'))
         return df, monthly_data_buildings
+
+
+def get_demand_results_path(locator, building_name):
+    """
+    The file with the demand results of a building: the demand results store, if it contains a table of the building,
+    otherwise the csv file of the building (see :py:func:`read_demand_results`).
+
+    :param locator: the input locator
+    :type locator: cea.inputlocator.InputLocator
+    :param str building_name: name of the building
+    :rtype: str
+    """
+    if locator.get_demand_results_store.contains(building_name):
+        return locator.get_demand_results_store()
+    return locator.get_demand_results_file(building_name)
+
+
+def read_demand_results(locator, building_name, columns=None):
+    """
+    Read the demand results of a building, either from the demand results store or from the csv file of the building,
+    depending on the ``demand:results-format`` used for the demand calculation of the building. Only the ``columns``
+    requested are read.
+
+    :param locator: the input locator
+    :type locator: cea.inputlocator.InputLocator
+    :param str building_name: name of the building
+    :param columns: the columns to read (default: all columns)
+    :type columns: list[str]
+    :return: the demand results of the building (the hourly results include the ``DATE`` column, if all columns are
+        read)
+    :rtype: pd.DataFrame
+    """
+    path = get_demand_results_path(locator, building_name)
+    if path != locator.get_demand_results_store():
+        return pd.read_csv(path, usecols=columns)
+
+    # the tables in the store don't repeat the name of the building
+    store_columns = None if columns is None else [c for c in columns if c != 'Name']
+    df = locator.get_demand_results_store.read(key=building_name, columns=store_columns)
+    if columns is None and df.index.name == 'DATE':
+        # same layout as the csv file
+        df = df.reset_index()
+    if (columns is None or 'Name' in columns) and 'Name' not in df.columns:
+        df.insert(1 if 'DATE' in df.columns else 0, 'Name', building_name)
+    return df
+
+
+def demand_results_exist(locator, building_name):
+    """True, if the demand results of the building exist (in either format, see :py:func:`read_demand_results`)"""
+    return os.path.exists(get_demand_results_path(locator, building_name))
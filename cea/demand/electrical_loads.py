@@ -140,7 +140,7 @@ def calc_Eaux_fw(tsd, bpr, schedules):
         effective_height = (bpr.geometry['height_ag'] - (5 * H_F))  # solo apartir de 5 pisos
         deltaP_kPa = DELTA_P_1 * effective_height
         b = 1  # assuming a good pumping system
-        tsd['Eaux_fw'] = np.vectorize(calc_Eauxf_fw)(tsd['vfw_m3perh'], deltaP_kPa, b)
+        tsd['Eaux_fw'] = calc_Eauxf_fw_array(tsd['vfw_m3perh'], deltaP_kPa, b)
     else:
         tsd['Eaux_fw'] = np.zeros(HOURS_IN_YEAR)
     return tsd
@@ -164,7 +164,7 @@ def calc_Eaux_ww(tsd, bpr):
     else:
         b = 2
 
-    tsd['Eaux_ww'] = np.vectorize(calc_Eauxf_ww)(Qww, deltaP_kPa, b, Mww)
+    tsd['Eaux_ww'] = calc_Eauxf_ww_array(Qww, deltaP_kPa, b, Mww)
 
     return tsd
 
@@ -205,22 +205,22 @@ def calc_Eaux_Qhs_Qcs(tsd, bpr):
     nf_ag = bpr.geometry['floors_ag']
 
     # split up the final demands according to the fraction of energy
-    frac_heat_ahu = [ahu / sys if sys > 0 else 0 for ahu, sys in zip(tsd['Qhs_sen_ahu'], tsd['Qhs_sen_sys'])]
+    frac_heat_ahu = calc_heating_fraction(tsd['Qhs_sen_ahu'], tsd['Qhs_sen_sys'])
     Qhs_sys_ahu = Qhs_sys * frac_heat_ahu
     Qhs_sys_0_ahu = np.nanmax(Qhs_sys_ahu)
-    frac_heat_aru = [aru / sys if sys > 0 else 0 for aru, sys in zip(tsd['Qhs_sen_aru'], tsd['Qhs_sen_sys'])]
+    frac_heat_aru = calc_heating_fraction(tsd['Qhs_sen_aru'], tsd['Qhs_sen_sys'])
     Qhs_sys_aru = Qhs_sys * frac_heat_aru
     Qhs_sys_0_aru = np.nanmax(Qhs_sys_aru)
-    frac_heat_shu = [shu / sys if sys > 0 else 0 for shu, sys in zip(tsd['Qhs_sen_shu'], tsd['Qhs_sen_sys'])]
+    frac_heat_shu = calc_heating_fraction(tsd['Qhs_sen_shu'], tsd['Qhs_sen_sys'])
     Qhs_sys_shu = Qhs_sys * frac_heat_shu
     Qhs_sys_0_shu = np.nanmax(Qhs_sys_shu)
-    frac_cool_ahu = [ahu / sys if sys < 0 else 0 for ahu, sys in zip(tsd['Qcs_sen_ahu'], tsd['Qcs_sen_sys'])]
+    frac_cool_ahu = calc_cooling_fraction(tsd['Qcs_sen_ahu'], tsd['Qcs_sen_sys'])
     Qcs_sys_ahu = Qcs_sys * frac_cool_ahu
     Qcs_sys_0_ahu = np.nanmin(Qcs_sys_ahu)
-    frac_cool_aru = [aru / sys if sys < 0 else 0 for aru, sys in zip(tsd['Qcs_sen_aru'], tsd['Qcs_sen_sys'])]
+    frac_cool_aru = calc_cooling_fraction(tsd['Qcs_sen_aru'], tsd['Qcs_sen_sys'])
     Qcs_sys_aru = Qcs_sys * frac_cool_aru
     Qcs_sys_0_aru = np.nanmin(Qcs_sys_aru)
-    frac_cool_scu = [scu / sys if sys < 0 else 0 for scu, sys in zip(tsd['Qcs_sen_scu'], tsd['Qcs_sen_sys'])]
+    frac_cool_scu = calc_cooling_fraction(tsd['Qcs_sen_scu'], tsd['Qcs_sen_sys'])
     Qcs_sys_scu = Qcs_sys * frac_cool_scu
     Qcs_sys_0_scu = np.nanmin(Qcs_sys_scu)
 
@@ -236,12 +236,12 @@ def calc_Eaux_Qhs_Qcs(tsd, bpr):
     if control_heating_cooling_systems.has_heating_system(bpr.hvac["class_hs"]):
 
         # for all subsystems
-        Eaux_hs_ahu = np.vectorize(calc_Eauxf_hs_dis)(Qhs_sys_ahu, Qhs_sys_0_ahu, deltaP_kPa, b, Ths_sup_ahu,
-                                                      Ths_re_ahu)
-        Eaux_hs_aru = np.vectorize(calc_Eauxf_hs_dis)(Qhs_sys_aru, Qhs_sys_0_aru, deltaP_kPa, b, Ths_sup_aru,
-                                                      Ths_re_aru)
-        Eaux_hs_shu = np.vectorize(calc_Eauxf_hs_dis)(Qhs_sys_shu, Qhs_sys_0_shu, deltaP_kPa, b, Ths_sup_shu,
-                                                      Ths_re_shu)
+        Eaux_hs_ahu = calc_Eauxf_hs_dis_array(Qhs_sys_ahu, Qhs_sys_0_ahu, deltaP_kPa, b, Ths_sup_ahu,
+                                              Ths_re_ahu)
+        Eaux_hs_aru = calc_Eauxf_hs_dis_array(Qhs_sys_aru, Qhs_sys_0_aru, deltaP_kPa, b, Ths_sup_aru,
+                                              Ths_re_aru)
+        Eaux_hs_shu = calc_Eauxf_hs_dis_array(Qhs_sys_shu, Qhs_sys_0_shu, deltaP_kPa, b, Ths_sup_shu,
+                                              Ths_re_shu)
         tsd['Eaux_hs'] = Eaux_hs_ahu + Eaux_hs_aru + Eaux_hs_shu  # sum up
     else:
         tsd['Eaux_hs'] = np.zeros(HOURS_IN_YEAR)
@@ -249,12 +249,12 @@ def calc_Eaux_Qhs_Qcs(tsd, bpr):
     if control_heating_cooling_systems.has_cooling_system(bpr.hvac["class_cs"]):
 
         # for all subsystems
-        Eaux_cs_ahu = np.vectorize(calc_Eauxf_cs_dis)(Qcs_sys_ahu, Qcs_sys_0_ahu, deltaP_kPa, b, Tcs_sup_ahu,
-                                                      Tcs_re_ahu)
-        Eaux_cs_aru = np.vectorize(calc_Eauxf_cs_dis)(Qcs_sys_aru, Qcs_sys_0_aru, deltaP_kPa, b, Tcs_sup_aru,
-                                                      Tcs_re_aru)
-        Eaux_cs_scu = np.vectorize(calc_Eauxf_cs_dis)(Qcs_sys_scu, Qcs_sys_0_scu, deltaP_kPa, b, Tcs_sup_scu,
-                                                      Tcs_re_scu)
+        Eaux_cs_ahu = calc_Eauxf_cs_dis_array(Qcs_sys_ahu, Qcs_sys_0_ahu, deltaP_kPa, b, Tcs_sup_ahu,
+                                              Tcs_re_ahu)
+        Eaux_cs_aru = calc_Eauxf_cs_dis_array(Qcs_sys_aru, Qcs_sys_0_aru, deltaP_kPa, b, Tcs_sup_aru,
+                                              Tcs_re_aru)
+        Eaux_cs_scu = calc_Eauxf_cs_dis_array(Qcs_sys_scu, Qcs_sys_0_scu, deltaP_kPa, b, Tcs_sup_scu,
+                                              Tcs_re_scu)
         tsd['Eaux_cs'] = Eaux_cs_ahu + Eaux_cs_aru + Eaux_cs_scu  # sum up
     else:
         tsd['Eaux_cs'] = np.zeros(HOURS_IN_YEAR)
@@ -277,6 +277,22 @@ def calc_Eauxf_hs_dis(Qhs_sys, Qhs_sys0, deltaP_kPa, b, ts, tr):
     return Eaux_hs  # in #W
 
 
+def calc_Eauxf_hs_dis_array(Qhs_sys, Qhs_sys0, deltaP_kPa, b, ts, tr):
+    """
+    Array version of :py:func:`calc_Eauxf_hs_dis` for all hours of the year
+
+    :return: auxiliary electricity of the heating distribution pumps in [W]
+    :rtype: numpy.ndarray
+    """
+    Qhs_sys, ts, tr = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (Qhs_sys, ts, tr)))
+    Eaux_hs = np.zeros(Qhs_sys.shape)
+    on = (Qhs_sys > 0) & ((ts - tr) != 0.0)
+    m_kgs = (Qhs_sys[on] / ((ts[on] - tr[on]) * HEAT_CAPACITY_OF_WATER_JPERKGK))
+    Phydr_kW = deltaP_kPa * (m_kgs / P_WATER_KGPERM3)
+    Eaux_hs[on] = calc_pump_power_W(Phydr_kW, b)
+    return Eaux_hs  # in #W
+
+
 def calc_Eauxf_cs_dis(Qcs_sys, Qcs_sys0, deltaP_kPa, b, ts, tr):
     # Following EN 15316-3-2:2007 Annex F
 
@@ -295,6 +311,64 @@ def calc_Eauxf_cs_dis(Qcs_sys, Qcs_sys0, deltaP_kPa, b, ts, tr):
     return Eaux_cs  # in #W
 
 
+def calc_Eauxf_cs_dis_array(Qcs_sys, Qcs_sys0, deltaP_kPa, b, ts, tr):
+    """
+    Array version of :py:func:`calc_Eauxf_cs_dis` for all hours of the year
+
+    :return: auxiliary electricity of the cooling distribution pumps in [W]
+    :rtype: numpy.ndarray
+    """
+    Qcs_sys, ts, tr = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (Qcs_sys, ts, tr)))
+    Eaux_cs = np.zeros(Qcs_sys.shape)
+    on = (Qcs_sys < 0) & ((ts - tr) != 0)
+    m_kgs = (Qcs_sys[on] / ((ts[on] - tr[on]) * HEAT_CAPACITY_OF_WATER_JPERKGK))
+    Phydr_kW = deltaP_kPa * (m_kgs / P_WATER_KGPERM3)
+    Eaux_cs[on] = calc_pump_power_W(Phydr_kW, b)
+    return Eaux_cs  # in #W
+
+
+def calc_pump_power_W(Phydr_kW, b):
+    """
+    Electric power of a circulation pump following EN 15316-3-2:2007 Annex F (shared by the ``*_array`` functions)
+
+    :param Phydr_kW: hydraulic power of the pump in [kW]
+    :param b: factor for the quality of the pumping system (1 for good, 2 for old systems)
+    :return: electric power of the pump in [W]
+    """
+    Cpump = 0.97
+    feff = (1.5 * b) / (0.015 * (Phydr_kW) ** 0.74 + 0.4)
+    epmp_eff = feff * Cpump * 1 ** -0.94
+    return epmp_eff * Phydr_kW * 1000
+
+
+def calc_heating_fraction(Qhs_sen_subsystem, Qhs_sen_sys):
+    """
+    Fraction of the sensible heating load covered by a sub-system (0 in hours without heating)
+
+    :rtype: numpy.ndarray
+    """
+    Qhs_sen_subsystem = np.asarray(Qhs_sen_subsystem, dtype=float)
+    Qhs_sen_sys = np.asarray(Qhs_sen_sys, dtype=float)
+    frac = np.zeros(Qhs_sen_sys.shape)
+    on = Qhs_sen_sys > 0
+    frac[on] = Qhs_sen_subsystem[on] / Qhs_sen_sys[on]
+    return frac
+
+
+def calc_cooling_fraction(Qcs_sen_subsystem, Qcs_sen_sys):
+    """
+    Fraction of the sensible cooling load covered by a sub-system (0 in hours without cooling)
+
+    :rtype: numpy.ndarray
+    """
+    Qcs_sen_subsystem = np.asarray(Qcs_sen_subsystem, dtype=float)
+    Qcs_sen_sys = np.asarray(Qcs_sen_sys, dtype=float)
+    frac = np.zeros(Qcs_sen_sys.shape)
+    on = Qcs_sen_sys < 0
+    frac[on] = Qcs_sen_subsystem[on] / Qcs_sen_sys[on]
+    return frac
+
+
 def calc_Eve(tsd):
     """
     calculation of electricity consumption of mechanical ventilation and AC fans
@@ -349,6 +423,21 @@ def calc_Eauxf_ww(Qww, deltaP_kPa, b, m_kgs):
     return Eaux_ww  # in #W
 
 
+def calc_Eauxf_ww_array(Qww, deltaP_kPa, b, m_kgs):
+    """
+    Array version of :py:func:`calc_Eauxf_ww` for all hours of the year
+
+    :return: auxiliary electricity of the hot water circulation pump in [W]
+    :rtype: numpy.ndarray
+    """
+    Qww, m_kgs = np.broadcast_arrays(np.asarray(Qww, dtype=float), np.asarray(m_kgs, dtype=float))
+    Eaux_ww = np.zeros(Qww.shape)
+    on = (Qww > 0.0) & (m_kgs != 0.0)
+    Phydr_kW = deltaP_kPa * (m_kgs[on] / P_WATER_KGPERM3)
+    Eaux_ww[on] = calc_pump_power_W(Phydr_kW, b)
+    return Eaux_ww  # in #W
+
+
 def calc_Eauxf_fw(Vfw_m3h, deltaP_kPa, b):
     """
     #Following EN 15316-3-2:2007 Annex F
@@ -367,3 +456,18 @@ def calc_Eauxf_fw(Vfw_m3h, deltaP_kPa, b):
     else:
         Eaux_fw = 0.0
     return Eaux_fw
+
+
+def calc_Eauxf_fw_array(Vfw_m3h, deltaP_kPa, b):
+    """
+    Array version of :py:func:`calc_Eauxf_fw` for all hours of the year
+
+    :return: auxiliary electricity of the fresh water pump in [W]
+    :rtype: numpy.ndarray
+    """
+    Vfw_m3h = np.asarray(Vfw_m3h, dtype=float)
+    Eaux_fw = np.zeros(Vfw_m3h.shape)
+    on = Vfw_m3h > 0.0
+    Phydr_kW = deltaP_kPa * Vfw_m3h[on] * 1 / 3600
+    Eaux_fw[on] = calc_pump_power_W(Phydr_kW, b)
+    return Eaux_fw
@@ -4,7 +4,6 @@ Hotwater load (it also calculates fresh water needs)
 
 from cea.constants import *
 import numpy as np
-import scipy
 import math
 from math import pi
 from cea.demand import constants
@@ -99,10 +98,10 @@ def calc_Qww_sys(bpr, tsd):
 
     # distribution and circulation losses
     V_dist_pipes_m3 = Lsww_dis * ((D / 1000) / 2) ** 2 * pi  # m3, volume inside distribution pipe
-    Qww_dis_ls_r_W = np.vectorize(calc_Qww_dis_ls_r)(T_int_C, tsd['Qww'].copy(), Lsww_dis, Lcww_dis, Y[1], Qww_nom_W,
-                                                 V_dist_pipes_m3,Tww_sup_0_C)
-    Qww_dis_ls_nr_W = np.vectorize(calc_Qww_dis_ls_nr)(T_int_C, tsd['Qww'].copy(), Lvww_dis, Lvww_c, Y[0], Qww_nom_W,
-                                                   V_dist_pipes_m3,Tww_sup_0_C, T_ext_C)
+    Qww_dis_ls_r_W = calc_Qww_dis_ls_r_array(T_int_C, tsd['Qww'], Lsww_dis, Lcww_dis, Y[1], Qww_nom_W,
+                                             V_dist_pipes_m3, Tww_sup_0_C)
+    Qww_dis_ls_nr_W = calc_Qww_dis_ls_nr_array(T_int_C, tsd['Qww'], Lvww_dis, Lvww_c, Y[0], Qww_nom_W,
+                                               V_dist_pipes_m3, Tww_sup_0_C, T_ext_C)
     # storage losses
     Tww_tank_C, tsd['Qww_sys'] = calc_DH_ww_with_tank_losses(T_ext_C, T_int_C, tsd['Qww'].copy(), tsd['vww_m3perh'],
                                                             Qww_dis_ls_r_W, Qww_dis_ls_nr_W)
@@ -139,7 +138,7 @@ def calc_Qww(bpr, tsd, schedules):
     tsd['mww_kgs'] = tsd['vww_m3perh'] * P_WATER / 3600  # kg/s
     tsd['mcptw'] = (tsd['vfw_m3perh'] - tsd['vww_m3perh']) * CP_KJPERKGK * P_WATER / 3600  # kW_K tap water
 
-    tsd['Qww'] = np.vectorize(function)(tsd['mww_kgs'], Tww_sup_0_C, tsd['Tww_re'])
+    tsd['Qww'] = function(tsd['mww_kgs'], Tww_sup_0_C, np.asarray(tsd['Tww_re']))
 
     return tsd
 
@@ -275,6 +274,57 @@ def calc_Qww_dis_ls_nr(tair, Qww, Lvww_dis, Lvww_c, Y, Qww_0, V, twws, te):
     return Qww_d_ls_nr
 
 
+def calc_Qww_dis_ls_r_array(Tair, Qww, Lsww_dis, Lcww_dis, Y, Qww_0, V, twws):
+    """
+    Array version of :py:func:`calc_Qww_dis_ls_r` for all hours of the year
+
+    :return: recoverable distribution losses of DHW in [Wh]
+    :rtype: numpy.ndarray
+    """
+    Tair, Qww = np.broadcast_arrays(np.asarray(Tair, dtype=float), np.asarray(Qww, dtype=float))
+    Qww_d_ls_r = np.zeros(Qww.shape)
+    on = Qww > 0
+    tamb = Tair[on]
+    circ_ls = (twws - tamb) * Y * Lcww_dis * (Qww[on] / Qww_0)
+    dis_ls = calc_disls_array(tamb, Qww[on], V, twws, Lsww_dis, Y)
+    Qww_d_ls_r[on] = circ_ls + dis_ls
+    return Qww_d_ls_r
+
+
+def calc_Qww_dis_ls_nr_array(tair, Qww, Lvww_dis, Lvww_c, Y, Qww_0, V, twws, te):
+    """
+    Array version of :py:func:`calc_Qww_dis_ls_nr` for all hours of the year
+
+    :return: non-recoverable distribution losses of DHW in [Wh]
+    :rtype: numpy.ndarray
+    """
+    tair, Qww, te = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (tair, Qww, te)))
+    Qww_d_ls_nr = np.zeros(Qww.shape)
+    on = Qww > 0
+    tamb = tair[on] - B_F * (tair[on] - te[on])
+    d_circ_ls = (twws - tamb) * Y * (Lvww_c) * (Qww[on] / Qww_0)
+    d_dis_ls = calc_disls_array(tamb, Qww[on], V, twws, Lvww_dis, Y)
+    Qww_d_ls_nr[on] = d_dis_ls + d_circ_ls
+    return Qww_d_ls_nr
+
+
+def calc_disls_array(tamb, Vww, V, twws, Lsww_dis, Y):
+    """
+    Array version of :py:func:`calc_disls`
+
+    :return: recoverable/non-recoverable losses due to distribution of DHW in [Wh]
+    :rtype: numpy.ndarray
+    """
+    tamb, Vww = np.broadcast_arrays(np.asarray(tamb, dtype=float), np.asarray(Vww, dtype=float))
+    losses = np.zeros(Vww.shape)
+    on = Vww > 0
+    TR = np.minimum(3600 / ((Vww[on] / 1000) / FLOWTAP), 3600)  # Thermal response of insulated piping
+    exponential = np.exp(-(Y * Lsww_dis * TR) / (P_WATER * CP_KJPERKGK * V * 1000))
+    tamb_on = tamb[on] + (twws - tamb[on]) * exponential
+    losses[on] = (twws - tamb_on) * V * CP_KJPERKGK * P_WATER / 3.6  # in Wh
+    return losses
+
+
 def calc_disls(tamb, Vww, V, twws, Lsww_dis, Y):
     """
     Calculates distribution losses in Wh according to Fonseca & Schlueter (2015) Eq. 24, which is in turn based
@@ -296,7 +346,7 @@ def calc_disls(tamb, Vww, V, twws, Lsww_dis, Y):
         if TR > 3600:
             TR = 3600
         try:
-            exponential = scipy.exp(-(Y * Lsww_dis * TR) / (P_WATER * CP_KJPERKGK * V * 1000))
+            exponential = np.exp(-(Y * Lsww_dis * TR) / (P_WATER * CP_KJPERKGK * V * 1000))
         except ZeroDivisionError:
             print('twws: {twws:.2f}, tamb: {tamb:.2f}, p: {p:.2f}, cpw: {cpw:.2f}, V: {V:.2f}'.format(
                 twws=twws, tamb=tamb, p=P_WATER, cpw=CP_KJPERKGK, V=V))
@@ -326,28 +376,18 @@ def calc_DH_ww_with_tank_losses(T_ext_C, T_int_C, Qww, Vww, Qww_dis_ls_r, Qww_di
     :type Qww_dis_ls_nr: ndarray
     :return:
     """
-    Qww_sys = np.zeros(HOURS_IN_YEAR)
-    Qww_st_ls = np.zeros(HOURS_IN_YEAR)
-    Tww_tank_C = np.zeros(HOURS_IN_YEAR)
-    Qd = np.zeros(HOURS_IN_YEAR)
     # calculate DHW tank size [in m3] based on the peak DHW demand in the building
     V_tank_m3 = Vww.max()  # size the tank with the highest flow rate
     T_tank_start_C = TWW_SETPOINT  # assume the tank temperature at timestep 0 is at the dhw set point
 
     if V_tank_m3 > 0:
-        for k in range(HOURS_IN_YEAR):
-            area_tank_surface_m2 = storage_tank.calc_tank_surface_area(V_tank_m3)
-            Q_tank_discharged_W = Qww[k] + Qww_dis_ls_r[k] + Qww_dis_ls_nr[k]
-            Qww_st_ls[k], Qd[k], Qww_sys[k] = storage_tank.calc_dhw_tank_heat_balance(T_int_C[k], T_ext_C[k],
-                                                                                   T_tank_start_C, V_tank_m3,
-                                                                                   Q_tank_discharged_W,
-                                                                                   area_tank_surface_m2)
-            Tww_tank_C[k] = storage_tank.calc_tank_temperature(T_tank_start_C, Qww_st_ls[k], Qd[k], Qww_sys[k], V_tank_m3,
-                                                               'hot_water')
-            T_tank_start_C = Tww_tank_C[k]  # update the tank temperature at the beginning of the next time step
+        area_tank_surface_m2 = storage_tank.calc_tank_surface_area(V_tank_m3)
+        Q_tank_discharged_W = Qww + Qww_dis_ls_r + Qww_dis_ls_nr
+        Tww_tank_C, Qww_st_ls, Qww_sys = storage_tank.calc_dhw_tank(T_int_C, T_ext_C, Q_tank_discharged_W, V_tank_m3,
+                                                                    area_tank_surface_m2, T_tank_start_C)
     else:
-        for k in range(HOURS_IN_YEAR):
-            Tww_tank_C[k] = np.nan
+        Qww_sys = np.zeros(HOURS_IN_YEAR)
+        Tww_tank_C = np.full(HOURS_IN_YEAR, np.nan)
     return Tww_tank_C, Qww_sys
 
 
@@ -1,16 +1,15 @@
 import os
-import random
+import zlib
 
 import numpy as np
 import pandas as pd
-from geopandas import GeoDataFrame as Gdf
 
 import warnings
-from itertools import repeat
 
 import cea.config
 import cea.inputlocator
 import cea.utilities.parallel
+from cea.utilities.parallel import broadcast
 from cea.constants import HOURS_IN_YEAR, MONTHS_IN_YEAR
 from cea.datamanagement.schedule_helper import read_cea_schedule
 from cea.demand.building_properties import calc_useful_areas
@@ -18,6 +17,7 @@ from cea.demand.constants import VARIABLE_CEA_SCHEDULE_RELATION
 from cea.utilities import epwreader
 from cea.utilities.date import get_date_range_hours_from_year
 from cea.utilities.dbf import dbf_to_dataframe
+from cea.utilities.input_cache import shapefile_to_geodataframe
 
 __author__ = "Jimeno A. Fonseca"
 __copyright__ = "Copyright 2015, Architecture and Building Systems - ETH Zurich"
@@ -33,6 +33,7 @@ def schedule_maker_main(locator, config, building=None):
     # local variables
     buildings = config.schedule_maker.buildings
     schedule_model = config.schedule_maker.schedule_model
+    random_seed = config.schedule_maker.random_seed
 
     if schedule_model == 'deterministic':
         stochastic_schedule = False
@@ -50,7 +51,7 @@ def schedule_maker_main(locator, config, building=None):
     architecture = dbf_to_dataframe(locator.get_building_architecture()).set_index('Name')
 
     # get building properties
-    prop_geometry = Gdf.from_file(locator.get_zone_geometry())
+    prop_geometry = shapefile_to_geodataframe(locator.get_zone_geometry())
     prop_geometry['footprint'] = prop_geometry.area
     prop_geometry['GFA_m2'] = prop_geometry['footprint'] * (prop_geometry['floors_ag'] + prop_geometry['floors_bg'])
     prop_geometry['GFA_ag_m2'] = prop_geometry['footprint'] * prop_geometry['floors_ag']
@@ -68,18 +69,18 @@ def schedule_maker_main(locator, config, building=None):
     date_range = get_date_range_hours_from_year(year)
 
     # SCHEDULE MAKER
-    n = len(buildings)
     calc_schedules_multiprocessing = cea.utilities.parallel.vectorize(calc_schedules,
                                                                       config.get_number_of_processes(),
                                                                       on_complete=print_progress)
 
-    calc_schedules_multiprocessing(repeat(locator, n),
+    calc_schedules_multiprocessing(broadcast(locator),
                                    buildings,
-                                   repeat(date_range, n),
+                                   broadcast(date_range),
                                    [internal_loads.loc[b] for b in buildings],
                                    [indoor_comfort.loc[b] for b in buildings],
                                    [prop_geometry.loc[b] for b in buildings],
-                                   repeat(stochastic_schedule, n))
+                                   broadcast(stochastic_schedule),
+                                   broadcast(random_seed))
     return None
 
 
@@ -93,7 +94,8 @@ def calc_schedules(locator,
                    internal_loads_building,
                    indoor_comfort_building,
                    prop_geometry_building,
-                   stochastic_schedule):
+                   stochastic_schedule,
+                   random_seed=None):
     """
     Calculate the profile of occupancy, electricity demand and domestic hot water consumption from the input schedules.
     For variables that depend on the number of people (humidity gains, heat gains and ventilation demand), additional
@@ -115,6 +117,8 @@ def calc_schedules(locator,
     :param indoor_comfort_building: indoor comfort properties for the current building (from case study inputs)
     :param prop_geometry_building: building geometry (from case study inputs)
     :param stochastic_schedule: Boolean that defines whether the stochastic occupancy model should be used
+    :param random_seed: seed of the stochastic occupancy model (the same seed always creates the same schedules for a
+        building), ``None`` for different schedules at each run
 
     .. [Page, J., et al., 2008] Page, J., et al. A generalised stochastic model for the simulation of occupant presence.
         Energy and Buildings, Vol. 40, No. 2, 2008, pp 83-98.
@@ -127,17 +131,22 @@ def calc_schedules(locator,
 
     final_schedule = {}
     days_in_schedule = len(list(set(daily_schedule_building['DAY'])))
+    schedule_indices = get_yearly_schedule_indices(date_range)
 
     # SCHEDULE FOR PEOPLE OCCUPANCY
     array = daily_schedule_building[VARIABLE_CEA_SCHEDULE_RELATION['Occ_m2pax']]
     if internal_loads_building['Occ_m2pax'] > 0.0:
-        yearly_array = get_yearly_vectors(date_range, days_in_schedule, array, monthly_multiplier)
+        yearly_array = get_yearly_vectors(schedule_indices, days_in_schedule, array, monthly_multiplier)
         number_of_occupants = np.int(1 / internal_loads_building['Occ_m2pax'] * prop_geometry_building['Aocc'])
         if stochastic_schedule:
-            # if the stochastic schedules are used, the stochastic schedule generator is called once for every occupant
-            final_schedule['Occ_m2pax'] = np.zeros(HOURS_IN_YEAR)
-            for occupant in range(number_of_occupants):
-                final_schedule['Occ_m2pax'] += calc_individual_occupant_schedule(yearly_array)
+            # if the stochastic schedules are used, the stochastic schedule generator simulates all occupants at once
+            # the random numbers depend on the seed and the building name, so each building is reproducible on its own
+            if random_seed is None:
+                random_generator = np.random.default_rng()
+            else:
+                random_generator = np.random.default_rng([random_seed, zlib.crc32(building.encode('utf-8'))])
+            final_schedule['Occ_m2pax'] = calc_stochastic_occupancy(yearly_array, number_of_occupants,
+                                                                    random_generator)
         else:
             final_schedule['Occ_m2pax'] = np.round(yearly_array * number_of_occupants)
     else:
@@ -155,7 +164,7 @@ def calc_schedules(locator,
     for variable in ['Vww_lpdpax', 'Vw_lpdpax']:
         if internal_loads_building[variable] > 0.0:
             array = daily_schedule_building[VARIABLE_CEA_SCHEDULE_RELATION[variable]]
-            yearly_array = get_yearly_vectors(date_range,
+            yearly_array = get_yearly_vectors(schedule_indices,
                                               days_in_schedule,
                                               array,
                                               monthly_multiplier,
@@ -179,10 +188,10 @@ def calc_schedules(locator,
         # adjust the demand for appliances based on the number of occupants
         if stochastic_schedule:
             # get yearly array for occupant-related loads
-            yearly_array = get_yearly_vectors(date_range, days_in_schedule, occupant_load, monthly_multiplier)
+            yearly_array = get_yearly_vectors(schedule_indices, days_in_schedule, occupant_load, monthly_multiplier)
             # adjust the yearly array based on the number of occupants produced by the stochastic occupancy model
             deterministic_occupancy_array = np.round(
-                get_yearly_vectors(date_range, days_in_schedule,
+                get_yearly_vectors(schedule_indices, days_in_schedule,
                                    daily_schedule_building[VARIABLE_CEA_SCHEDULE_RELATION['Occ_m2pax']],
                                    monthly_multiplier) * 1 / internal_loads_building['Occ_m2pax'] *
                 prop_geometry_building['Aocc'])
@@ -199,7 +208,7 @@ def calc_schedules(locator,
             final_schedule[variable] = (adjusted_array + base_load) * internal_loads_building[variable] * \
                                        prop_geometry_building['Aef']
         else:
-            yearly_array = get_yearly_vectors(date_range, days_in_schedule, occupant_load,
+            yearly_array = get_yearly_vectors(schedule_indices, days_in_schedule, occupant_load,
                                               monthly_multiplier) + base_load
             final_schedule[variable] = yearly_array * internal_loads_building[variable] * \
                                        prop_geometry_building['Aef']
@@ -213,7 +222,7 @@ def calc_schedules(locator,
     base_load = np.min(array)
     occupant_load = array - base_load
     # this schedule is assumed to be independent of occupant presence
-    yearly_array = get_yearly_vectors(date_range, days_in_schedule, occupant_load, monthly_multiplier) + base_load
+    yearly_array = get_yearly_vectors(schedule_indices, days_in_schedule, occupant_load, monthly_multiplier) + base_load
     final_schedule[variable] = yearly_array * internal_loads_building[variable] * prop_geometry_building['Aef']
 
     # ELECTROMOVILITYSCHEDULE
@@ -223,14 +232,14 @@ def calc_schedules(locator,
     base_load = np.min(array)
     occupant_load = array - base_load
     # this schedule is assumed to be independent of occupant presence
-    yearly_array = get_yearly_vectors(date_range, days_in_schedule, occupant_load, monthly_multiplier) + base_load
+    yearly_array = get_yearly_vectors(schedule_indices, days_in_schedule, occupant_load, monthly_multiplier) + base_load
     final_schedule[variable] = yearly_array * internal_loads_building[variable] * 1000  # convert to Wh
 
     # DATACENTRE AND PROCESS ENERGY DEMAND SCHEDULES
     for variable in ['Ed_Wm2', 'Epro_Wm2', 'Qcre_Wm2', 'Qhpro_Wm2', 'Qcpro_Wm2']:
         # these schedules are assumed to be independent of occupant presence and have no monthly variations
         array = daily_schedule_building[VARIABLE_CEA_SCHEDULE_RELATION[variable]]
-        yearly_array = get_yearly_vectors(date_range, days_in_schedule, array,
+        yearly_array = get_yearly_vectors(schedule_indices, days_in_schedule, array,
                                           monthly_multiplier=list(np.ones(MONTHS_IN_YEAR)))
         final_schedule[variable] = yearly_array * internal_loads_building[variable] * prop_geometry_building['Aef']
 
@@ -243,7 +252,7 @@ def calc_schedules(locator,
                                                                      indoor_comfort_building['Ths_setb_C'],
                                                                      indoor_comfort_building['Tcs_set_C'],
                                                                      indoor_comfort_building['Tcs_setb_C'])
-        final_schedule[variable] = get_yearly_vectors(date_range, days_in_schedule, array,
+        final_schedule[variable] = get_yearly_vectors(schedule_indices, days_in_schedule, array,
                                                       monthly_multiplier=list(np.ones(MONTHS_IN_YEAR)))
 
     final_dict = {
@@ -315,48 +324,48 @@ def convert_schedule_string_to_temperature(schedule_string, schedule_type, Ths_s
     return schedule_float
 
 
-def calc_individual_occupant_schedule(deterministic_schedule):
+def calc_stochastic_occupancy(deterministic_schedule, number_of_occupants, random_generator):
     """
-    Calculates the stochastic occupancy pattern for an individual based on Page et al. (2008). The so-called parameter
-    of mobility mu is assumed to be a uniformly-distributed random float between 0 and 0.5 based on the range of values
-    presented in the aforementioned paper.
+    Calculates the stochastic occupancy pattern of all occupants of a building based on Page et al. (2008). The
+    so-called parameter of mobility mu of each occupant is assumed to be a uniformly-distributed random float between 0
+    and 0.5 based on the range of values presented in the aforementioned paper.
+
+    The occupants are simulated together: at each time step, the states of all occupants are drawn at once.
 
     :param deterministic_schedule: deterministic schedule of occupancy provided in the user inputs
     :type deterministic_schedule: array(float)
+    :param number_of_occupants: number of occupants in the building
+    :type number_of_occupants: int
+    :param random_generator: source of the random numbers of the model
+    :type random_generator: np.random.Generator
 
-    :return pattern: yearly occupancy pattern for a given occupant in a given occupancy type
-    :rtype pattern: list[int]
+    :return occupancy: yearly number of occupants present in a given occupancy type
+    :rtype occupancy: array(float)
     """
+    deterministic_schedule = np.asarray(deterministic_schedule, dtype=float)
 
-    # get a random mobility parameter mu between 0 and 0.5
-    mu = random.uniform(0, 0.5)
+    # get a random mobility parameter mu between 0 and 0.5 for each occupant
+    mu = random_generator.uniform(0, 0.5, number_of_occupants)
 
     # assign initial state by comparing a random number to the deterministic schedule's probability of occupant presence at t = 0
-    if random.random() <= deterministic_schedule[0]:
-        state = 1
-    else:
-        state = 0
+    state = random_generator.random(number_of_occupants) <= deterministic_schedule[0]
 
-    # start list of occupancy states throughout the year
-    pattern = [state]
+    # number of occupants present throughout the year
+    occupancy = np.zeros(len(deterministic_schedule))
+    occupancy[0] = np.count_nonzero(state)
 
     # calculate probability of presence for each hour of the year
-    for i in range(len(deterministic_schedule[:-1])):
+    for i in range(len(deterministic_schedule) - 1):
         # get probability of presence at t and t+1 from archetypal schedule
         p_0 = deterministic_schedule[i]
         p_1 = deterministic_schedule[i + 1]
         # calculate probability of transition from absence to presence (T01) and from presence to presence (T11)
         T01, T11 = calculate_transition_probabilities(mu, p_0, p_1)
 
-        if state == 1:
-            next = get_random_presence(T11)
-        else:
-            next = get_random_presence(T01)
-
-        pattern.append(next)
-        state = next
+        state = get_random_presence(np.where(state, T11, T01), random_generator)
+        occupancy[i + 1] = np.count_nonzero(state)
 
-    return np.array(pattern)
+    return occupancy
 
 
 def calculate_transition_probabilities(mu, P0, P1):
@@ -365,17 +374,17 @@ def calculate_transition_probabilities(mu, P0, P1):
     probability of arriving (T01) and the probability of staying in (T11) given the parameter of mobility mu, the
     probability of the present state (P0), and the probability of the next state t+1 (P1).
 
-    :param mu: parameter of mobility
-    :type mu: float
+    :param mu: parameter of mobility (of each occupant)
+    :type mu: float or array(float)
     :param P0: probability of presence at the current time step t
     :type P0: float
     :param P1: probability of presence at the next time step t+1
     :type P1: float
 
     :return T01: probability of transition from absence to presence at current time step
-    :rtype T01: float
+    :rtype T01: float or array(float)
     :return T11: probability of transition from presence to presence at current time step
-    :rtype T11: float
+    :rtype T11: float or array(float)
     """
 
     # Calculate mobility factor fraction from Page et al. equation 5
@@ -386,83 +395,66 @@ def calculate_transition_probabilities(mu, P0, P1):
     if P0 != 0:
         T11 = ((P0 - 1) / P0) * (m * P0 + P1) + P1 / P0
     else:
-        T11 = 0
+        T11 = np.zeros_like(T01)
 
     # For some instances of mu the probabilities are bigger than 1, so the min function is used in the return statement.
-    return min(1, T01), min(1, T11)
+    return np.minimum(1, T01), np.minimum(1, T11)
 
 
-def get_random_presence(p):
+def get_random_presence(p, random_generator):
     """
-    Get the current occupant state (presence=1 or absence=0) at the current time step given a probability p.
+    Get the current occupant states (presence=True or absence=False) at the current time step given the probabilities
+    of presence p. The probabilities are truncated to whole percents.
 
-    :param p: A probability (e.g. T01, T11)
-    :type p: float
+    :param p: probabilities (e.g. T01, T11) of each occupant
+    :type p: array(float)
+    :param random_generator: source of the random numbers of the model
+    :type random_generator: np.random.Generator
 
-    Returns the randomly-chosen state (0 or 1).
+    Returns the randomly-chosen states.
     """
+    return random_generator.random(np.shape(p)) < np.trunc(p * 100) / 100
 
-    # Calculate probability of presence
-    P1 = int(p * 100)
-    # Calculate probability of absence
-    P0 = 100 - P1
 
-    # Create population of possible values and choose one value
-    weighted_choices = [(1, P1), (0, P0)]
-    population = [val for val, cnt in weighted_choices for i in range(cnt)]
+def get_yearly_schedule_indices(date_range):
+    """
+    Calculate the position of each hour of the year in the daily schedules and in the monthly multipliers, so the yearly
+    schedules can be read from the daily schedules with a single lookup (see :py:func:`get_yearly_vectors`).
 
-    return random.choice(population)
+    :param DatetimeIndex date_range: range of dates being considered
+    :return: the type of day (0: weekday, 1: saturday, 2: sunday), hour of the day and month (0 to 11) of each hour
+    :rtype: (array(int), array(int), array(int))
+    """
+    day_type = np.clip(np.asarray(date_range.dayofweek) - 4, 0, 2)
+    return day_type, np.asarray(date_range.hour), np.asarray(date_range.month) - 1
 
 
-def get_yearly_vectors(date_range, days_in_schedule, schedule_array, monthly_multiplier,
+def get_yearly_vectors(schedule_indices, days_in_schedule, schedule_array, monthly_multiplier,
                        normalize_first_daily_profile=False):
+    """
+    Create the yearly schedule from the daily schedules (weekday, saturday, sunday) and the monthly multipliers.
+
+    :param schedule_indices: type of day, hour of the day and month of each hour of the year, as calculated by
+        :py:func:`get_yearly_schedule_indices`
+    :param days_in_schedule: number of days in the daily schedules
+    :param schedule_array: daily schedules of weekdays, saturdays and sundays one after the other
+    :param monthly_multiplier: multiplier of each month of the year
+    :param normalize_first_daily_profile: normalize each daily schedule to a sum of 1 (for water consumption)
+    :rtype: array(float)
+    """
+    day_type, hour_day, month = schedule_indices
     # transform into arrays
     # per weekday, saturday, sunday
-    array_per_day = schedule_array.reshape(3, int(len(schedule_array) / days_in_schedule))
-    array_week = array_per_day[0]
-    array_sat = array_per_day[1]
-    array_sun = array_per_day[2]
+    array_per_day = np.asarray(schedule_array).reshape(3, int(len(schedule_array) / days_in_schedule))
     if normalize_first_daily_profile:
         # for water consumption we need to normalize to the daily maximum
         # this is to account for typical units of water consumption in liters per person per day (lpd).
-
-        if array_week.sum() != 0.0:
-            norm_weekday_max = array_week.sum() ** -1
-        else:
-            norm_weekday_max = 0.0
-
-        if array_sat.sum() != 0.0:
-            norm_sat_max = array_sat.sum() ** -1
-        else:
-            norm_sat_max = 0.0
-
-        if array_sun.sum() != 0.0:
-            norm_sun_max = array_sun.sum() ** -1
-        else:
-            norm_sun_max = 0.0
+        norm_max = np.array([array.sum() ** -1 if array.sum() != 0.0 else 0.0 for array in array_per_day])
     else:
-        norm_weekday_max = 1.0
-        norm_sat_max = 1.0
-        norm_sun_max = 1.0
-
-    yearly_array = [
-        calc_hourly_value(date, array_week, array_sat, array_sun, norm_weekday_max, norm_sat_max, norm_sun_max,
-                          monthly_multiplier) for date in date_range]
-
-    return np.array(yearly_array)
-
-
-def calc_hourly_value(date, array_week, array_sat, array_sun, norm_weekday_max, norm_sat_max, norm_sun_max,
-                      monthly_multiplier):
-    month_year = monthly_multiplier[date.month - 1]
-    hour_day = date.hour
-    dayofweek = date.dayofweek
-    if 0 <= dayofweek < 5:  # weekday
-        return array_week[hour_day] * month_year * norm_weekday_max  # normalized dhw demand flow rates
-    elif dayofweek == 5:  # saturday
-        return array_sat[hour_day] * month_year * norm_sat_max  # normalized dhw demand flow rates
-    else:  # sunday
-        return array_sun[hour_day] * month_year * norm_sun_max  # normalized dhw demand flow rates
+        norm_max = np.ones(3)
+
+    # normalized dhw demand flow rates
+    return array_per_day[day_type, hour_day] * np.asarray(monthly_multiplier)[month] * norm_max[day_type]
 
 
 def main(config):
@@ -162,7 +162,7 @@ def calc_Qhs_sys_Qcs_sys(tsd):
 def calc_temperatures_emission_systems(bpr, tsd):
     """
     Calculate temperature of emission systems.
-    Using radiator function also for cooling ('radiators.calc_radiator')
+    Using radiator function also for cooling ('radiators.calc_radiator_array')
     Modified from legacy
 
     Gabriel Happle, Feb. 2018
@@ -205,9 +205,9 @@ def calc_temperatures_emission_systems(bpr, tsd):
         tsd['Ths_sys_re_aru'] = np.zeros(HOURS_IN_YEAR) * np.nan  # in C  #FIXME: I don't like that non-existing temperatures are 0
         tsd['mcphs_sys_aru'] = np.zeros(HOURS_IN_YEAR)
 
-        Ths_sup, Ths_re, mcphs = np.vectorize(radiators.calc_radiator)(tsd['Qhs_sys'], tsd['T_int'], Qhs_sys_0, Ta_heating_0,
-                                                                       bpr.building_systems['Ths_sup_shu_0'],
-                                                                       bpr.building_systems['Ths_re_shu_0'])
+        Ths_sup, Ths_re, mcphs = radiators.calc_radiator_array(tsd['Qhs_sys'], tsd['T_int'], Qhs_sys_0, Ta_heating_0,
+                                                               bpr.building_systems['Ths_sup_shu_0'],
+                                                               bpr.building_systems['Ths_re_shu_0'])
 
         tsd['Ths_sys_sup_shu'] = Ths_sup
         tsd['Ths_sys_re_shu'] = Ths_re
@@ -226,12 +226,12 @@ def calc_temperatures_emission_systems(bpr, tsd):
         ma_sup_0 = tsd['ma_sup_hs_ahu'][index[0][0]]
         Ta_sup_0 = tsd['ta_sup_hs_ahu'][index[0][0]] + KELVIN_OFFSET
         Ta_re_0 = tsd['ta_re_hs_ahu'][index[0][0]] + KELVIN_OFFSET
-        Ths_sup, Ths_re, mcphs = np.vectorize(heating_coils.calc_heating_coil)(qhs_sys_ahu, Qhs_sys_ahu_0, tsd['ta_sup_hs_ahu'],
-                                                                               tsd['ta_re_hs_ahu'],
-                                                                               bpr.building_systems['Ths_sup_ahu_0'],
-                                                                               bpr.building_systems['Ths_re_ahu_0'],
-                                                                               tsd['ma_sup_hs_ahu'], ma_sup_0,
-                                                                               Ta_sup_0, Ta_re_0)
+        Ths_sup, Ths_re, mcphs = heating_coils.calc_heating_coil_array(qhs_sys_ahu, Qhs_sys_ahu_0, tsd['ta_sup_hs_ahu'],
+                                                                       tsd['ta_re_hs_ahu'],
+                                                                       bpr.building_systems['Ths_sup_ahu_0'],
+                                                                       bpr.building_systems['Ths_re_ahu_0'],
+                                                                       tsd['ma_sup_hs_ahu'], ma_sup_0,
+                                                                       Ta_sup_0, Ta_re_0)
         tsd['Ths_sys_sup_ahu'] = Ths_sup  # in C
         tsd['Ths_sys_re_ahu'] = Ths_re  # in C
         tsd['mcphs_sys_ahu'] = mcphs
@@ -247,13 +247,13 @@ def calc_temperatures_emission_systems(bpr, tsd):
         ma_sup_0 = tsd['ma_sup_hs_aru'][index[0][0]]
         Ta_sup_0 = tsd['ta_sup_hs_aru'][index[0][0]] + KELVIN_OFFSET
         Ta_re_0 = tsd['ta_re_hs_aru'][index[0][0]] + KELVIN_OFFSET
-        Ths_sup, Ths_re, mcphs = np.vectorize(heating_coils.calc_heating_coil)(qhs_sys_aru, Qhs_sys_aru_0,
-                                                                               tsd['ta_sup_hs_aru'],
-                                                                               tsd['ta_re_hs_aru'],
-                                                                               bpr.building_systems['Ths_sup_aru_0'],
-                                                                               bpr.building_systems['Ths_re_aru_0'],
-                                                                               tsd['ma_sup_hs_aru'], ma_sup_0,
-                                                                               Ta_sup_0, Ta_re_0)
+        Ths_sup, Ths_re, mcphs = heating_coils.calc_heating_coil_array(qhs_sys_aru, Qhs_sys_aru_0,
+                                                                       tsd['ta_sup_hs_aru'],
+                                                                       tsd['ta_re_hs_aru'],
+                                                                       bpr.building_systems['Ths_sup_aru_0'],
+                                                                       bpr.building_systems['Ths_re_aru_0'],
+                                                                       tsd['ma_sup_hs_aru'], ma_sup_0,
+                                                                       Ta_sup_0, Ta_re_0)
         tsd['Ths_sys_sup_aru'] = Ths_sup  # in C
         tsd['Ths_sys_re_aru'] = Ths_re  # in C
         tsd['mcphs_sys_aru'] = mcphs
@@ -275,9 +275,9 @@ def calc_temperatures_emission_systems(bpr, tsd):
         tsd['Ths_sys_re_aru'] = np.zeros(HOURS_IN_YEAR) * np.nan  # in C  #FIXME: I don't like that non-existing temperatures are 0
         tsd['mcphs_sys_aru'] = np.zeros(HOURS_IN_YEAR)
 
-        Ths_sup, Ths_re, mcphs = np.vectorize(radiators.calc_radiator)(tsd['Qhs_sys'], tsd['T_int'], Qhs_sys_0, Ta_heating_0,
-                                                                       bpr.building_systems['Ths_sup_shu_0'],
-                                                                       bpr.building_systems['Ths_re_shu_0'])
+        Ths_sup, Ths_re, mcphs = radiators.calc_radiator_array(tsd['Qhs_sys'], tsd['T_int'], Qhs_sys_0, Ta_heating_0,
+                                                               bpr.building_systems['Ths_sup_shu_0'],
+                                                               bpr.building_systems['Ths_re_shu_0'])
         tsd['Ths_sys_sup_shu'] = Ths_sup
         tsd['Ths_sys_re_shu'] = Ths_re
         tsd['mcphs_sys_shu'] = mcphs
@@ -315,12 +315,12 @@ def calc_temperatures_emission_systems(bpr, tsd):
         ma_sup_0 = tsd['ma_sup_cs_ahu'][index[0][0]]
         Ta_sup_0 = tsd['ta_sup_cs_ahu'][index[0][0]] + KELVIN_OFFSET
         Ta_re_0 = tsd['ta_re_cs_ahu'][index[0][0]] + KELVIN_OFFSET
-        Tcs_sup, Tcs_re, mcpcs = np.vectorize(heating_coils.calc_cooling_coil)(qcs_sys_ahu, Qcs_sys_ahu_0, tsd['ta_sup_cs_ahu'],
-                                                                               tsd['ta_re_cs_ahu'],
-                                                                               bpr.building_systems['Tcs_sup_ahu_0'],
-                                                                               bpr.building_systems['Tcs_re_ahu_0'],
-                                                                               tsd['ma_sup_cs_ahu'], ma_sup_0,
-                                                                               Ta_sup_0, Ta_re_0)
+        Tcs_sup, Tcs_re, mcpcs = heating_coils.calc_cooling_coil_array(qcs_sys_ahu, Qcs_sys_ahu_0, tsd['ta_sup_cs_ahu'],
+                                                                       tsd['ta_re_cs_ahu'],
+                                                                       bpr.building_systems['Tcs_sup_ahu_0'],
+                                                                       bpr.building_systems['Tcs_re_ahu_0'],
+                                                                       tsd['ma_sup_cs_ahu'], ma_sup_0,
+                                                                       Ta_sup_0, Ta_re_0)
         tsd['Tcs_sys_sup_ahu'] = Tcs_sup  # in C
         tsd['Tcs_sys_re_ahu'] = Tcs_re  # in C
         tsd['mcpcs_sys_ahu'] = mcpcs
@@ -336,12 +336,12 @@ def calc_temperatures_emission_systems(bpr, tsd):
         ma_sup_0 = tsd['ma_sup_cs_aru'][index[0][0]]
         Ta_sup_0 = tsd['ta_sup_cs_aru'][index[0][0]] + KELVIN_OFFSET
         Ta_re_0 = tsd['ta_re_cs_aru'][index[0][0]] + KELVIN_OFFSET
-        Tcs_sup, Tcs_re, mcpcs = np.vectorize(heating_coils.calc_cooling_coil)(qcs_sys_aru, Qcs_sys_aru_0, tsd['ta_sup_cs_aru'],
-                                                                               tsd['ta_re_cs_aru'],
-                                                                               bpr.building_systems['Tcs_sup_aru_0'],
-                                                                               bpr.building_systems['Tcs_re_aru_0'],
-                                                                               tsd['ma_sup_cs_aru'], ma_sup_0,
-                                                                               Ta_sup_0, Ta_re_0)
+        Tcs_sup, Tcs_re, mcpcs = heating_coils.calc_cooling_coil_array(qcs_sys_aru, Qcs_sys_aru_0, tsd['ta_sup_cs_aru'],
+                                                                       tsd['ta_re_cs_aru'],
+                                                                       bpr.building_systems['Tcs_sup_aru_0'],
+                                                                       bpr.building_systems['Tcs_re_aru_0'],
+                                                                       tsd['ma_sup_cs_aru'], ma_sup_0,
+                                                                       Ta_sup_0, Ta_re_0)
         tsd['Tcs_sys_sup_aru'] = Tcs_sup  # in C
         tsd['Tcs_sys_re_aru'] = Tcs_re  # in C
         tsd['mcpcs_sys_aru'] = mcpcs
@@ -370,13 +370,13 @@ def calc_temperatures_emission_systems(bpr, tsd):
         ma_sup_0 = tsd['ma_sup_cs_aru'][index[0][0]]
         Ta_sup_0 = tsd['ta_sup_cs_aru'][index[0][0]] + KELVIN_OFFSET
         Ta_re_0 = tsd['ta_re_cs_aru'][index[0][0]] + KELVIN_OFFSET
-        Tcs_sup, Tcs_re, mcpcs = np.vectorize(heating_coils.calc_cooling_coil)(qcs_sys_aru, Qcs_sys_aru_0,
-                                                                               tsd['ta_sup_cs_aru'],
-                                                                               tsd['ta_re_cs_aru'],
-                                                                               bpr.building_systems['Tcs_sup_aru_0'],
-                                                                               bpr.building_systems['Tcs_re_aru_0'],
-                                                                               tsd['ma_sup_cs_aru'], ma_sup_0,
-                                                                               Ta_sup_0, Ta_re_0)
+        Tcs_sup, Tcs_re, mcpcs = heating_coils.calc_cooling_coil_array(qcs_sys_aru, Qcs_sys_aru_0,
+                                                                       tsd['ta_sup_cs_aru'],
+                                                                       tsd['ta_re_cs_aru'],
+                                                                       bpr.building_systems['Tcs_sup_aru_0'],
+                                                                       bpr.building_systems['Tcs_re_aru_0'],
+                                                                       tsd['ma_sup_cs_aru'], ma_sup_0,
+                                                                       Ta_sup_0, Ta_re_0)
         tsd['Tcs_sys_sup_aru'] = Tcs_sup  # in C
         tsd['Tcs_sys_re_aru'] = Tcs_re  # in C
         tsd['mcpcs_sys_aru'] = mcpcs
@@ -400,13 +400,13 @@ def calc_temperatures_emission_systems(bpr, tsd):
         ma_sup_0 = tsd['ma_sup_cs_ahu'][index[0][0]]
         Ta_sup_0 = tsd['ta_sup_cs_ahu'][index[0][0]] + KELVIN_OFFSET
         Ta_re_0 = tsd['ta_re_cs_ahu'][index[0][0]] + KELVIN_OFFSET
-        Tcs_sup, Tcs_re, mcpcs = np.vectorize(heating_coils.calc_cooling_coil)(qcs_sys_ahu, Qcs_sys_ahu_0,
-                                                                               tsd['ta_sup_cs_ahu'],
-                                                                               tsd['ta_re_cs_ahu'],
-                                                                               bpr.building_systems['Tcs_sup_ahu_0'],
-                                                                               bpr.building_systems['Tcs_re_ahu_0'],
-                                                                               tsd['ma_sup_cs_ahu'], ma_sup_0,
-                                                                               Ta_sup_0, Ta_re_0)
+        Tcs_sup, Tcs_re, mcpcs = heating_coils.calc_cooling_coil_array(qcs_sys_ahu, Qcs_sys_ahu_0,
+                                                                       tsd['ta_sup_cs_ahu'],
+                                                                       tsd['ta_re_cs_ahu'],
+                                                                       bpr.building_systems['Tcs_sup_ahu_0'],
+                                                                       bpr.building_systems['Tcs_re_ahu_0'],
+                                                                       tsd['ma_sup_cs_ahu'], ma_sup_0,
+                                                                       Ta_sup_0, Ta_re_0)
         tsd['Tcs_sys_sup_ahu'] = Tcs_sup  # in C
         tsd['Tcs_sys_re_ahu'] = Tcs_re  # in C
         tsd['mcpcs_sys_ahu'] = mcpcs
@@ -424,13 +424,13 @@ def calc_temperatures_emission_systems(bpr, tsd):
         ma_sup_0 = tsd['ma_sup_cs_aru'][index[0][0]]
         Ta_sup_0 = tsd['ta_sup_cs_aru'][index[0][0]] + KELVIN_OFFSET
         Ta_re_0 = tsd['ta_re_cs_aru'][index[0][0]] + KELVIN_OFFSET
-        Tcs_sup, Tcs_re, mcpcs = np.vectorize(heating_coils.calc_cooling_coil)(qcs_sys_aru, Qcs_sys_aru_0,
-                                                                               tsd['ta_sup_cs_aru'],
-                                                                               tsd['ta_re_cs_aru'],
-                                                                               bpr.building_systems['Tcs_sup_aru_0'],
-                                                                               bpr.building_systems['Tcs_re_aru_0'],
-                                                                               tsd['ma_sup_cs_aru'], ma_sup_0,
-                                                                               Ta_sup_0, Ta_re_0)
+        Tcs_sup, Tcs_re, mcpcs = heating_coils.calc_cooling_coil_array(qcs_sys_aru, Qcs_sys_aru_0,
+                                                                       tsd['ta_sup_cs_aru'],
+                                                                       tsd['ta_re_cs_aru'],
+                                                                       bpr.building_systems['Tcs_sup_aru_0'],
+                                                                       bpr.building_systems['Tcs_re_aru_0'],
+                                                                       tsd['ma_sup_cs_aru'], ma_sup_0,
+                                                                       Ta_sup_0, Ta_re_0)
         tsd['Tcs_sys_sup_aru'] = Tcs_sup  # in C
         tsd['Tcs_sys_re_aru'] = Tcs_re  # in C
         tsd['mcpcs_sys_aru'] = mcpcs
@@ -444,9 +444,9 @@ def calc_temperatures_emission_systems(bpr, tsd):
         Qcs_sys_scu_0 = np.nanmin(qcs_sys_scu)  # in W
         Ta_cooling_0 = np.nanmin(tsd['ta_cs_set'])
 
-        Tcs_sup, Tcs_re, mcpcs = np.vectorize(radiators.calc_radiator)(qcs_sys_scu, tsd['T_int'], Qcs_sys_scu_0, Ta_cooling_0,
-                                                                       bpr.building_systems['Tcs_sup_scu_0'],
-                                                                       bpr.building_systems['Tcs_re_scu_0'])
+        Tcs_sup, Tcs_re, mcpcs = radiators.calc_radiator_array(qcs_sys_scu, tsd['T_int'], Qcs_sys_scu_0, Ta_cooling_0,
+                                                               bpr.building_systems['Tcs_sup_scu_0'],
+                                                               bpr.building_systems['Tcs_re_scu_0'])
         tsd['Tcs_sys_sup_scu'] = Tcs_sup  # in C
         tsd['Tcs_sys_re_scu'] = Tcs_re  # in C
         tsd['mcpcs_sys_scu'] = mcpcs
@@ -463,9 +463,9 @@ def calc_temperatures_emission_systems(bpr, tsd):
         Ta_cooling_0 = np.nanmin(tsd['ta_cs_set'])
 
         # use radiator for ceiling cooling calculation
-        Tcs_sup, Tcs_re, mcpcs = np.vectorize(radiators.calc_radiator)(qcs_sys_scu, tsd['T_int'], Qcs_sys_scu_0, Ta_cooling_0,
-                                                                       bpr.building_systems['Tcs_sup_scu_0'],
-                                                                       bpr.building_systems['Tcs_re_scu_0'])
+        Tcs_sup, Tcs_re, mcpcs = radiators.calc_radiator_array(qcs_sys_scu, tsd['T_int'], Qcs_sys_scu_0, Ta_cooling_0,
+                                                               bpr.building_systems['Tcs_sup_scu_0'],
+                                                               bpr.building_systems['Tcs_re_scu_0'])
 
         tsd['Tcs_sys_sup_scu'] = Tcs_sup  # in C
         tsd['Tcs_sys_re_scu'] = Tcs_re  # in C
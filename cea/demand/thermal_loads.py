@@ -52,6 +52,9 @@ def calc_thermal_loads(building_name, bpr, weather_data, date_range, locator,
 
       * ``${Name}T.csv`` for each building
 
+    (with ``demand:results-format = hdf5``, ``${Name}.hdf`` and ``${Name}T.hdf`` in the temporary folder instead, see
+    :py:class:`cea.demand.demand_writers.YearlyDemandWriter`)
+
     daren-thomas: as far as I can tell, these are the only side-effects.
 
     :param building_name: name of building
@@ -73,6 +76,45 @@ def calc_thermal_loads(building_name, bpr, weather_data, date_range, locator,
 """
     schedules, tsd = initialize_inputs(bpr, weather_data, locator)
 
+    # CALCULATE ELECTRICITY, REFRIGERATION, PROCESS AND DATA CENTER LOADS
+    tsd = calc_loads_before_space_conditioning(bpr, tsd, schedules, locator)
+
+    # CALCULATE SPACE CONDITIONING DEMANDS
+    if not has_conditioned_area(bpr):  # if building does not have conditioned area
+        tsd = calc_space_conditioning_no_conditioned_area(bpr, tsd)
+    else:
+        tsd = latent_loads.calc_Qgain_lat(tsd, schedules)
+        tsd = calc_set_points(bpr, date_range, tsd, building_name, config, locator,
+                              schedules)  # calculate the setpoints for every hour
+        tsd = calc_Qhs_Qcs(bpr, tsd,
+                           use_dynamic_infiltration_calculation)  # end-use demand latent and sensible + ventilation
+        tsd = calc_space_conditioning_system_loads(bpr, tsd)
+
+    # CALCULATE HOT WATER LOADS, SUMS AND FINAL ELECTRICITY
+    tsd = calc_loads_after_space_conditioning(bpr, tsd, schedules)
+
+    # WRITE SOLAR RESULTS
+    write_results(bpr, building_name, date_range, loads_output, locator, massflows_output,
+                  resolution_outputs, temperatures_output, tsd, debug, config.demand.results_format)
+
+    return
+
+
+def calc_loads_before_space_conditioning(bpr, tsd, schedules, locator):
+    """
+    Calculate the loads that do not depend on the hourly space conditioning procedure: electricity for appliances and
+    lighting, refrigeration, process heating / cooling and data centers.
+
+    :param bpr: a collection of building properties for the building used for thermal loads calculation
+    :type bpr: BuildingPropertiesRow
+    :param tsd: time step data
+    :type tsd: dict
+    :param schedules: the yearly schedules of the building (see :py:func:`initialize_inputs`)
+    :param locator: the input locator
+    :type locator: cea.inputlocator.InputLocator
+    :return: updated tsd
+    :rtype: dict
+    """
     # CALCULATE ELECTRICITY LOADS
     tsd = electrical_loads.calc_Eal_Epro(tsd, schedules)
 
@@ -101,34 +143,65 @@ def calc_thermal_loads(building_name, bpr, weather_data, date_range, locator,
         tsd['mcpcdata_sys'] = tsd['Tcdata_sys_re'] = tsd['Tcdata_sys_sup'] = np.zeros(HOURS_IN_YEAR)
         tsd['Edata'] = tsd['E_cdata'] = np.zeros(HOURS_IN_YEAR)
 
-    # CALCULATE SPACE CONDITIONING DEMANDS
-    if np.isclose(bpr.rc_model['Af'], 0.0):  # if building does not have conditioned area
-        tsd['T_int'] = tsd['T_ext']
-        tsd['x_int'] = np.vectorize(convert_rh_to_moisture_content)(tsd['rh_ext'], tsd['T_int'])
-        tsd['E_cs'] = tsd['E_hs'] = np.zeros(HOURS_IN_YEAR)
-        tsd['Eaux_cs'] = tsd['Eaux_hs'] = tsd['Ehs_lat_aux'] = np.zeros(HOURS_IN_YEAR)
-        print(f"building {bpr.name} does not have an air-conditioned area")
-    else:
-        tsd = latent_loads.calc_Qgain_lat(tsd, schedules)
-        tsd = calc_set_points(bpr, date_range, tsd, building_name, config, locator,
-                              schedules)  # calculate the setpoints for every hour
-        tsd = calc_Qhs_Qcs(bpr, tsd,
-                           use_dynamic_infiltration_calculation)  # end-use demand latent and sensible + ventilation
-        tsd = sensible_loads.calc_Qhs_Qcs_loss(bpr, tsd)  # losses
-        tsd = sensible_loads.calc_Qhs_sys_Qcs_sys(tsd)  # system (incl. losses)
-        tsd = sensible_loads.calc_temperatures_emission_systems(bpr, tsd)  # calculate temperatures
-        tsd = electrical_loads.calc_Eve(tsd)  # calc auxiliary loads ventilation
-        tsd = electrical_loads.calc_Eaux_Qhs_Qcs(tsd, bpr)  # calc auxiliary loads heating and cooling
-        tsd = calc_Qcs_sys(bpr, tsd)  # final : including fuels and renewables
-        tsd = calc_Qhs_sys(bpr, tsd)  # final : including fuels and renewables
-
-        # Positive loads
-        tsd['Qcs_lat_sys'] = abs(tsd['Qcs_lat_sys'])
-        tsd['DC_cs'] = abs(tsd['DC_cs'])
-        tsd['Qcs_sys'] = abs(tsd['Qcs_sys'])
-        tsd['Qcre_sys'] = abs(tsd['Qcre_sys'])  # inverting sign of cooling loads for reporting and graphs
-        tsd['Qcdata_sys'] = abs(tsd['Qcdata_sys'])  # inverting sign of cooling loads for reporting and graphs
+    return tsd
+
+
+def has_conditioned_area(bpr):
+    """True, if the building has a conditioned floor area and the hourly space conditioning procedure applies"""
+    return not np.isclose(bpr.rc_model['Af'], 0.0)
+
+
+def calc_space_conditioning_no_conditioned_area(bpr, tsd):
+    """Set the space conditioning results of a building without conditioned area"""
+    tsd['T_int'] = tsd['T_ext']
+    tsd['x_int'] = np.vectorize(convert_rh_to_moisture_content)(tsd['rh_ext'], tsd['T_int'])
+    tsd['E_cs'] = tsd['E_hs'] = np.zeros(HOURS_IN_YEAR)
+    tsd['Eaux_cs'] = tsd['Eaux_hs'] = tsd['Ehs_lat_aux'] = np.zeros(HOURS_IN_YEAR)
+    print(f"building {bpr.name} does not have an air-conditioned area")
+    return tsd
+
 
+def calc_space_conditioning_system_loads(bpr, tsd):
+    """
+    Calculate the system and final space conditioning loads from the end-use demand of the hourly procedure
+    (:py:func:`calc_Qhs_Qcs`).
+
+    :param bpr: a collection of building properties for the building used for thermal loads calculation
+    :type bpr: BuildingPropertiesRow
+    :param tsd: time step data
+    :type tsd: dict
+    :return: updated tsd
+    :rtype: dict
+    """
+    tsd = sensible_loads.calc_Qhs_Qcs_loss(bpr, tsd)  # losses
+    tsd = sensible_loads.calc_Qhs_sys_Qcs_sys(tsd)  # system (incl. losses)
+    tsd = sensible_loads.calc_temperatures_emission_systems(bpr, tsd)  # calculate temperatures
+    tsd = electrical_loads.calc_Eve(tsd)  # calc auxiliary loads ventilation
+    tsd = electrical_loads.calc_Eaux_Qhs_Qcs(tsd, bpr)  # calc auxiliary loads heating and cooling
+    tsd = calc_Qcs_sys(bpr, tsd)  # final : including fuels and renewables
+    tsd = calc_Qhs_sys(bpr, tsd)  # final : including fuels and renewables
+
+    # Positive loads
+    tsd['Qcs_lat_sys'] = abs(tsd['Qcs_lat_sys'])
+    tsd['DC_cs'] = abs(tsd['DC_cs'])
+    tsd['Qcs_sys'] = abs(tsd['Qcs_sys'])
+    tsd['Qcre_sys'] = abs(tsd['Qcre_sys'])  # inverting sign of cooling loads for reporting and graphs
+    tsd['Qcdata_sys'] = abs(tsd['Qcdata_sys'])  # inverting sign of cooling loads for reporting and graphs
+    return tsd
+
+
+def calc_loads_after_space_conditioning(bpr, tsd, schedules):
+    """
+    Calculate hot water loads, the aggregated heating and cooling loads and the final electricity loads.
+
+    :param bpr: a collection of building properties for the building used for thermal loads calculation
+    :type bpr: BuildingPropertiesRow
+    :param tsd: time step data
+    :type tsd: dict
+    :param schedules: the yearly schedules of the building (see :py:func:`initialize_inputs`)
+    :return: updated tsd
+    :rtype: dict
+    """
     # CALCULATE HOT WATER LOADS
     if hotwater_loads.has_hot_water_technical_system(bpr):
         tsd = electrical_loads.calc_Eaux_fw(tsd, bpr, schedules)
@@ -151,12 +224,7 @@ def calc_thermal_loads(building_name, bpr, weather_data, date_range, locator,
     tsd = electrical_loads.calc_Eaux(tsd)  # auxiliary totals
     tsd = electrical_loads.calc_E_sys(tsd)  # system (incl. losses)
     tsd = electrical_loads.calc_Ef(bpr, tsd)  # final (incl. self. generated)
-
-    # WRITE SOLAR RESULTS
-    write_results(bpr, building_name, date_range, loads_output, locator, massflows_output,
-                  resolution_outputs, temperatures_output, tsd, debug)
-
-    return
+    return tsd
 
 
 def calc_QH_sys_QC_sys(tsd):
@@ -167,7 +235,7 @@ def calc_QH_sys_QC_sys(tsd):
 
 
 def write_results(bpr, building_name, date, loads_output, locator, massflows_output,
-                  resolution_outputs, temperatures_output, tsd, debug):
+                  resolution_outputs, temperatures_output, tsd, debug, results_format='csv'):
     if resolution_outputs == 'hourly':
         writer = demand_writers.HourlyDemandWriter(loads_output, massflows_output, temperatures_output)
     elif resolution_outputs == 'monthly':
@@ -181,6 +249,8 @@ def write_results(bpr, building_name, date, loads_output, locator, massflows_out
         print('Writing detailed demand results of {} to .xls file.'.format(building_name))
         reporting.quick_visualization_tsd(tsd, locator.get_demand_results_folder(), building_name)
         reporting.full_report_to_xls(tsd, locator.get_demand_results_folder(), building_name)
+    elif results_format == 'hdf5':
+        writer.results_to_hdf5(tsd, bpr, locator, date, building_name)
     else:
         writer.results_to_csv(tsd, bpr, locator, date, building_name)
 
@@ -257,6 +257,12 @@ class InputLocator(object):
         return os.path.join(self.get_optimization_decentralized_folder(),
                             'DiscOp_' + building + '_result_heating_activation.csv')
 
+    def get_optimization_decentralized_folder_building_inputs_hash(self, building, network_type):
+        """scenario/outputs/data/optimization/decentralized/${building}_${network_type}_inputs_hash.txt
+        Hash of the inputs of the decentralized supply systems of a building (to reuse the results between runs)"""
+        return os.path.join(self.get_optimization_decentralized_folder(),
+                            building + '_' + network_type + '_inputs_hash.txt')
+
     def get_optimization_network_results_summary(self, network_type, district_network_barcode):
         """scenario/outputs/data/calibration/clustering/checkpoints/..."""
         district_network_barcode_hex = hex(int(str(district_network_barcode), 2))
@@ -309,6 +315,11 @@ class InputLocator(object):
         Operation pattern for decentralized buildings"""
         return self._ensure_folder(self.get_optimization_results_folder(), "decentralized")
 
+    def get_optimization_evaluation_cache_folder(self, inputs_hash):
+        """scenario/outputs/data/optimization/evaluation-cache/${inputs_hash}
+        Evaluation results of the individuals of the optimization for a given set of inputs (kept between runs)"""
+        return self._ensure_folder(self.get_optimization_results_folder(), "evaluation-cache", inputs_hash)
+
     def get_optimization_checkpoint(self, generation):
         """scenario/outputs/data/calibration/clustering/checkpoints/..."""
         return os.path.join(self.get_optimization_master_results_folder(),
@@ -881,10 +892,23 @@ class InputLocator(object):
         """scenario/outputs/data/solar-radiation/${building}_insolation_Whm2.json"""
         return os.path.join(self.get_solar_radiation_folder(), '%s_insolation_Whm2.json' % building)
 
+    def get_radiation_building_sensors_npy(self, building):
+        """scenario/outputs/data/solar-radiation/${building}_insolation_Whm2.npy"""
+        return os.path.join(self.get_solar_radiation_folder(), '%s_insolation_Whm2.npy' % building)
+
+    def get_radiation_building_sensors_index(self, building):
+        """scenario/outputs/data/solar-radiation/${building}_insolation_sensors.csv"""
+        return os.path.join(self.get_solar_radiation_folder(), '%s_insolation_sensors.csv' % building)
+
     def get_radiation_metadata(self, building):
         """scenario/outputs/data/solar-radiation/{building}_geometrgy.csv"""
         return os.path.join(self.get_solar_radiation_folder(), '%s_geometry.csv' % building)
 
+    def get_radiation_fingerprints(self):
+        """scenario/outputs/data/solar-radiation/radiation_fingerprints.csv
+        Fingerprint of the inputs of the radiation results of each building (for incremental runs)"""
+        return os.path.join(self.get_solar_radiation_folder(), 'radiation_fingerprints.csv')
+
     def get_radiation_materials(self):
         """scenario/outputs/data/solar-radiation/{building}_geometrgy.csv"""
         return os.path.join(self.get_solar_radiation_folder(), 'buidling_materials.csv')
@@ -955,6 +979,10 @@ class InputLocator(object):
         """scenario/outputs/data/demand/{building}.csv"""
         return os.path.join(self.get_demand_results_folder(), '%(building)s.%(format)s' % locals())
 
+    def get_demand_results_store(self):
+        """scenario/outputs/data/demand/demand_results.h5"""
+        return os.path.join(self.get_demand_results_folder(), 'demand_results.h5')
+
     # EMISSIONS
     def get_lca_emissions_results_folder(self):
         """scenario/outputs/data/emissions"""
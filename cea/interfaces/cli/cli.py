@@ -13,6 +13,7 @@ import importlib
 import datetime
 import cea.config
 import cea.scripts
+import cea.utilities.jit
 import cea
 from typing import List
 
@@ -55,6 +56,7 @@ def main(config=None):
         sys.exit(0)
     script_name = args.pop(0)
     cea_script = cea.scripts.by_name(script_name, config.plugins)
+    cea.utilities.jit.configure(config.jit)
     config.restrict_to(cea_script.parameters)
     config.apply_command_line_args(args, cea_script.parameters)
 
@@ -63,6 +65,7 @@ def main(config=None):
     config.save(cea.config.CEA_CONFIG)
 
     cea_script.print_script_configuration(config)
+    print("Numeric kernels: %s" % cea.utilities.jit.get_backend())
     if list(cea_script.missing_input_files(config)):
         cea_script.print_missing_input_files(config)
         sys.exit(cea.MissingInputDataException.rc)
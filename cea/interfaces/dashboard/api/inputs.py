@@ -10,6 +10,7 @@ from flask_restplus import Namespace, Resource, abort
 
 import cea.inputlocator
 import cea.utilities.dbf
+import cea.utilities.input_cache
 import cea.scripts
 import cea.schemas
 from cea.datamanagement.databases_verification import InputFileValidator
@@ -217,7 +218,7 @@ def get_building_properties():
         db_columns = db_info['columns']
         try:
             if file_type == 'shp':
-                table_df = geopandas.GeoDataFrame.from_file(file_path)
+                table_df = cea.utilities.input_cache.shapefile_to_geodataframe(file_path)
                 table_df = pandas.DataFrame(
                     table_df.drop(columns='geometry'))
                 if 'geometry' in db_columns:
@@ -28,6 +28,7 @@ import cea.technologies.thermal_storage as thermal_storage
 from cea.optimization.constants import N_PVT, PUMP_ETA, ACH_TYPE_DOUBLE, N_SC_ET, N_SC_FP
 from cea.optimization.constants import VCC_CODE_CENTRALIZED
 from cea.optimization.master.emissions_model import calc_emissions_Whyr_to_tonCO2yr
+from cea.optimization.optimization_data import OptimizationData
 from cea.technologies.pumps import calc_Cinv_pump
 from cea.technologies.supply_systems_database import SupplySystemsDatabase
 from cea.analysis.costs.equations import calc_capex_annualized, calc_opex_annualized
@@ -144,15 +145,13 @@ def calc_substations_costs_heating(building_names, district_network_barcode, loc
     Capex_Substations_USD = 0.0
     Capex_a_Substations_USD = 0.0
     Opex_fixed_Substations_USD = 0.0
+    optimization_data = OptimizationData.for_locator(locator)
     for (index, building_name) in zip(district_network_barcode, building_names):
         if index == "1":
-            df = pd.read_csv(
+            Q_max_W = optimization_data.substation_peak_load(
                 locator.get_optimization_substations_results_file(building_name, "DH", district_network_barcode),
-                usecols=["Q_dhw_W", "Q_heating_W"])
-
-            subsArray = np.array(df)
-            Q_max_W = np.amax(subsArray[:, 0] + subsArray[:, 1])
-            HEX_cost_data = pd.read_excel(locator.get_database_conversion_systems(), sheet_name="HEX")
+                ["Q_dhw_W", "Q_heating_W"])
+            HEX_cost_data = optimization_data.database_table(locator.get_database_conversion_systems(), "HEX")
             HEX_cost_data = HEX_cost_data[HEX_cost_data['code'] == 'HEX1']
             # if the Q_design is below the lowest capacity available for the technology, then it is replaced by the least
             # capacity for the corresponding technology from the database
@@ -371,21 +370,19 @@ def calc_substations_costs_cooling(building_names, master_to_slave_vars, distric
     Capex_a_Substations_USD = 0.0
     Opex_fixed_Substations_USD = 0.0
     Opex_var_Substations_USD = 0.0  # it is asssumed as 0 in substations
+    optimization_data = OptimizationData.for_locator(locator)
     for (index, building_name) in zip(district_network_barcode, building_names):
         if index == "1":
             district_heating_network = master_to_slave_vars.DHN_exists
             if district_heating_network and master_to_slave_vars.WasteServersHeatRecovery == 1:
-                df = pd.read_csv(
+                Q_max_W = optimization_data.substation_peak_load(
                     locator.get_optimization_substations_results_file(building_name, "DC", district_network_barcode),
-                    usecols=["Q_space_cooling_and_refrigeration_W"])
+                    ["Q_space_cooling_and_refrigeration_W"])
             else:
-                df = pd.read_csv(
+                Q_max_W = optimization_data.substation_peak_load(
                     locator.get_optimization_substations_results_file(building_name, "DC", district_network_barcode),
-                    usecols=["Q_space_cooling_data_center_and_refrigeration_W"])
-
-            subsArray = np.array(df)
-            Q_max_W = np.amax(subsArray)
-            HEX_cost_data = pd.read_excel(locator.get_database_conversion_systems(), sheet_name="HEX")
+                    ["Q_space_cooling_data_center_and_refrigeration_W"])
+            HEX_cost_data = optimization_data.database_table(locator.get_database_conversion_systems(), "HEX")
             HEX_cost_data = HEX_cost_data[HEX_cost_data['code'] == 'HEX1']
             # if the Q_design is below the lowest capacity available for the technology, then it is replaced by the least
             # capacity for the corresponding technology from the database
@@ -1008,11 +1005,12 @@ def calc_costs_emissions_decentralized_DC(DCN_barcode, buildings_names_with_cool
     Capex_total_sys_building_scale_USD = 0.0
     Opex_fixed_sys_building_scale_USD = 0.0
     capacity_installed_df = pd.DataFrame()
+    optimization_data = OptimizationData.for_locator(locator)
     for (index, building_name) in zip(DCN_barcode, buildings_names_with_cooling_load):
         if index == "0":  # choose the best decentralized configuration
-            df = pd.read_csv(locator.get_optimization_decentralized_folder_building_result_cooling(building_name,
-                                                                                                   configuration='AHU_ARU_SCU'))
-            dfBest = df[df["Best configuration"] == 1]
+            dfBest = optimization_data.best_decentralized_configuration(
+                locator.get_optimization_decentralized_folder_building_result_cooling(building_name,
+                                                                                      configuration='AHU_ARU_SCU'))
             GHG_sys_building_scale_tonCO2yr += dfBest["GHG_tonCO2"].iloc[0]  # [ton CO2]
             Capex_total_sys_building_scale_USD += dfBest["Capex_total_USD"].iloc[0]
             Capex_a_sys_building_scale_USD += dfBest["Capex_a_USD"].iloc[0]
@@ -1045,10 +1043,11 @@ def calc_costs_emissions_decentralized_DH(DHN_barcode, buildings_names_with_heat
     Capex_total_sys_building_scale_USD = 0.0
     Opex_fixed_sys_building_scale_USD = 0.0
     capacity_installed_df = pd.DataFrame()
+    optimization_data = OptimizationData.for_locator(locator)
     for (index, building_name) in zip(DHN_barcode, buildings_names_with_heating_load):
         if index == "0":
-            df = pd.read_csv(locator.get_optimization_decentralized_folder_building_result_heating(building_name))
-            dfBest = df[df["Best configuration"] == 1]
+            dfBest = optimization_data.best_decentralized_configuration(
+                locator.get_optimization_decentralized_folder_building_result_heating(building_name))
             CostDiscBuild += dfBest["TAC_USD"].iloc[0]  # [USD]
             GHG_sys_building_scale_tonCO2yr += dfBest["GHG_tonCO2"].iloc[0]  # [ton CO2]
             Capex_total_sys_building_scale_USD += dfBest["Capex_total_USD"].iloc[0]
@@ -0,0 +1,99 @@
+"""
+Persistent cache of the evaluation of individuals of the optimization
+
+"""
+
+
+
+
+import gzip
+import hashlib
+import json
+import os
+import pickle
+
+
+class EvaluationCache(object):
+    """
+    Stores the fitness (TAC, GHG) and the results of ``evaluation.evaluation_main`` of each individual, so individuals
+    that were evaluated before - in earlier generations or in earlier runs with the same inputs - are not simulated
+    again.
+
+    Entries are addressed by the genes of the individual, in a folder specific to a hash of the inputs of the
+    evaluation (see :py:func:`calc_inputs_hash`). Each entry is written to a temporary file first and then renamed,
+    so the cache can be shared by the processes evaluating the individuals in parallel.
+    """
+
+    def __init__(self, locator, inputs_hash):
+        self.folder = locator.get_optimization_evaluation_cache_folder(inputs_hash)
+
+    @staticmethod
+    def key(individual):
+        """Content address of an individual (the hash of its genes)"""
+        genes = json.dumps([float(gene) for gene in individual])
+        return hashlib.sha256(genes.encode('utf-8')).hexdigest()
+
+    def get_fitness(self, individual):
+        """Return the cached (TAC, GHG) of the individual or ``None`` if it was not evaluated yet"""
+        fitness_path = os.path.join(self.folder, self.key(individual) + '.json')
+        if not os.path.exists(fitness_path):
+            return None
+        with open(fitness_path, 'r') as fp:
+            return tuple(json.load(fp))
+
+    def get_results(self, individual):
+        """Return the cached results of ``evaluation.evaluation_main`` or ``None`` if they are not in the cache"""
+        results_path = os.path.join(self.folder, self.key(individual) + '.pickle.gz')
+        if not os.path.exists(results_path):
+            return None
+        try:
+            with gzip.open(results_path, 'rb') as fp:
+                return pickle.load(fp)
+        except (EOFError, OSError, pickle.UnpicklingError):
+            # incomplete entry (e.g. the run was stopped while writing), evaluate again
+            return None
+
+    def store(self, individual, results):
+        """Store the results of ``evaluation.evaluation_main`` (the first two are the fitness TAC and GHG)"""
+        key = self.key(individual)
+        self._write(os.path.join(self.folder, key + '.pickle.gz'),
+                    lambda fp: pickle.dump(results, fp, protocol=pickle.HIGHEST_PROTOCOL),
+                    lambda path: gzip.open(path, 'wb', compresslevel=1))
+        # the fitness is written last, so its presence means the entry is complete
+        self._write(os.path.join(self.folder, key + '.json'),
+                    lambda fp: json.dump([float(results[0]), float(results[1])], fp),
+                    lambda path: open(path, 'w'))
+
+    @staticmethod
+    def _write(path, dump, open_file):
+        temporary_path = '%s.%i.tmp' % (path, os.getpid())
+        with open_file(temporary_path) as fp:
+            dump(fp)
+        os.replace(temporary_path, path)
+
+
+def calc_inputs_hash(locator, *evaluation_inputs):
+    """
+    Hash of everything the evaluation of an individual depends on, apart from its genes: the input files of the
+    scenario, the demand and potentials results, the thermal network results and the ``evaluation_inputs`` (e.g. the
+    building names, prices, lca, network and weather features), which must be picklable.
+
+    :param locator: InputLocator of the scenario
+    :param evaluation_inputs: further inputs of the evaluation
+    :rtype: str
+    """
+    inputs_hash = hashlib.sha256()
+    for folder in [locator.get_input_folder(),
+                   locator.get_demand_results_folder(),
+                   locator.get_potentials_folder(),
+                   locator.get_thermal_network_folder()]:
+        for root, dirs, files in os.walk(folder):
+            dirs.sort()
+            for file_name in sorted(files):
+                path = os.path.join(root, file_name)
+                inputs_hash.update(os.path.relpath(path, locator.scenario).encode('utf-8'))
+                with open(path, 'rb') as fp:
+                    for chunk in iter(lambda: fp.read(1 << 20), b''):
+                        inputs_hash.update(chunk)
+    inputs_hash.update(pickle.dumps(evaluation_inputs, protocol=pickle.HIGHEST_PROTOCOL))
+    return inputs_hash.hexdigest()[:16]
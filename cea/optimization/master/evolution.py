@@ -0,0 +1,135 @@
+"""
+Evolution schemes of the genetic algorithm of the optimization (NSGA-III)
+
+"""
+
+
+
+
+import queue
+import random
+
+from deap import algorithms
+
+MAX_BREEDING_ATTEMPTS = 100  # number of offspring bred in a row without finding an individual that is not evaluated yet
+
+
+def evolve_generational(pop, toolbox, evaluation_args, normalize, mu, cxpb, mutpb, number_of_generations):
+    """
+    Generational evolution: breed the offspring of the whole population, evaluate them (with ``toolbox.map``) and
+    select the next population from the parents and the offspring. Each generation waits for all of its individuals
+    to be evaluated.
+
+    :param pop: the evaluated initial population
+    :param toolbox: DEAP toolbox with ``mate``, ``mutate``, ``select``, ``evaluate`` and ``map``
+    :param evaluation_args: ``evaluation_args(individuals, individual_numbers, generation)`` returns the arguments of
+        ``toolbox.evaluate`` for each individual
+    :param normalize: ``normalize(fitnesses)`` returns the normalized fitnesses
+    :param int mu: size of the population
+    :param float cxpb: crossover probability
+    :param float mutpb: mutation probability
+    :param int number_of_generations: number of generations
+    :return: yields the generation, the population and the individuals evaluated in the generation
+    """
+    for generation in range(1, number_of_generations + 1):
+        print("Evaluating Generation %s of %s generations" % (generation, number_of_generations + 1))
+        offspring = algorithms.varAnd(pop, toolbox, cxpb, mutpb)
+
+        # Evaluate the individuals with an invalid fitness
+        invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
+        invalid_ind = [ind for ind in invalid_ind if ind not in pop]
+        fitnesses = toolbox.map(toolbox.evaluate, evaluation_args(invalid_ind, range(len(invalid_ind)), generation))
+        fitnesses = normalize(list(fitnesses))
+        for ind, fit in zip(invalid_ind, fitnesses):
+            ind.fitness.values = fit
+
+        # Select the next generation population from parents and offspring
+        pop = toolbox.select(pop + invalid_ind, mu)
+        yield generation, pop, invalid_ind
+
+
+def evolve_steady_state(pop, toolbox, evaluation_args, normalize, mu, cxpb, mutpb, number_of_generations,
+                        number_of_processes):
+    """
+    Asynchronous steady-state evolution: ``number_of_processes`` individuals are evaluated at any time (with
+    ``toolbox.apply_async``, which has the signature of ``multiprocessing.Pool.apply_async``). Each individual enters
+    the population (by selection) as soon as it is evaluated and a new offspring of the current population is sent to
+    the free worker, so no worker waits for the slowest individual of a generation.
+
+    For the bookkeeping of the optimization (results, checkpoints), the individuals are grouped in generations of
+    (at most) ``mu`` individuals in the order they are bred. A generation is yielded as soon as all of its individuals
+    are evaluated - while the individuals of the next generation are already being evaluated.
+
+    See :py:func:`evolve_generational` for the parameters.
+
+    :param int number_of_processes: number of individuals evaluated at the same time
+    :return: yields the generation, the population and the individuals evaluated in the generation
+    """
+    results = queue.Queue()  # (individual number, generation, fitness or exception)
+    generations = {generation: {'quota': mu, 'bred': [], 'evaluated': 0}
+                   for generation in range(1, number_of_generations + 1)}
+    in_flight = []
+    offspring = []
+    breeding_generation = 1
+    next_generation = 1
+
+    def breed():
+        """Return a new offspring of the current population or ``None`` if no new individual is found"""
+        for _ in range(MAX_BREEDING_ATTEMPTS):
+            if not offspring:
+                offspring.extend(algorithms.varAnd(random.sample(pop, min(2, len(pop))), toolbox, cxpb, mutpb))
+            ind = offspring.pop(0)
+            if not ind.fitness.valid and ind not in pop and ind not in in_flight:
+                return ind
+        return None
+
+    while next_generation <= number_of_generations:
+        # keep the workers busy
+        while len(in_flight) < number_of_processes and breeding_generation <= number_of_generations:
+            bred = generations[breeding_generation]['bred']
+            ind = breed()
+            if ind is None:
+                # the population converged, finish this generation with the individuals bred so far
+                generations[breeding_generation]['quota'] = len(bred)
+            else:
+                individual_number = len(bred)
+                bred.append(ind)
+                in_flight.append(ind)
+                args = next(iter(evaluation_args([ind], [individual_number], breeding_generation)))
+                toolbox.apply_async(toolbox.evaluate, (args,),
+                                    callback=lambda fit, n=individual_number, g=breeding_generation: results.put(
+                                        (n, g, fit)),
+                                    error_callback=lambda e, n=individual_number, g=breeding_generation: results.put(
+                                        (n, g, e)))
+            if len(bred) >= generations[breeding_generation]['quota']:
+                print("Evaluating Generation %s of %s generations" % (breeding_generation, number_of_generations + 1))
+                breeding_generation += 1
+
+        generation = generations[next_generation]
+        if len(generation['bred']) >= generation['quota'] and generation['evaluated'] == generation['quota']:
+            yield next_generation, pop, generation['bred']
+            del generations[next_generation]
+            next_generation += 1
+            continue
+
+        individual_number, bred_generation, fitness = results.get()
+        if isinstance(fitness, Exception):
+            raise fitness
+        ind = generations[bred_generation]['bred'][individual_number]
+        in_flight.remove(ind)
+        ind.fitness.values = normalize([fitness])[0]
+        generations[bred_generation]['evaluated'] += 1
+        pop = toolbox.select(pop + [ind], mu)
+
+
+def apply_synchronously(func, args=(), callback=None, error_callback=None):
+    """Stand-in for ``multiprocessing.Pool.apply_async`` that evaluates in the calling process"""
+    try:
+        result = func(*args)
+    except Exception as e:
+        if error_callback is None:
+            raise
+        error_callback(e)
+    else:
+        if callback is not None:
+            callback(result)
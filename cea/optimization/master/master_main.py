@@ -8,7 +8,6 @@ from math import sqrt
 
 import numpy as np
 import pandas as pd
-from deap import algorithms
 from deap import tools, creator, base
 
 from cea.optimization.constants import DH_CONVERSION_TECHNOLOGIES_SHARE, DC_CONVERSION_TECHNOLOGIES_SHARE, DH_ACRONYM, \
@@ -16,6 +15,8 @@ from cea.optimization.constants import DH_CONVERSION_TECHNOLOGIES_SHARE, DC_CONV
 from cea.optimization.master import evaluation
 from cea.optimization.master.crossover import crossover_main
 from cea.optimization.master.data_saver import save_results
+from cea.optimization.master.evaluation_cache import EvaluationCache, calc_inputs_hash
+from cea.optimization.master.evolution import evolve_generational, evolve_steady_state, apply_synchronously
 from cea.optimization.master.generation import generate_main
 from cea.optimization.master.generation import individual_to_barcode
 from cea.optimization.master.mutations import mutation_main
@@ -56,17 +57,54 @@ def objective_function(individual,
                        technologies_heating_allowed,
                        technologies_cooling_allowed,
                        column_names,
+                       evaluation_cache=None,
                        print_final_results=False):
     """
     Objective function is used to calculate the costs, CO2, primary energy and the variables corresponding to the
     individual
     :param individual: Input individual
     :type individual: list
+    :param evaluation_cache: results of individuals evaluated before, ``None`` to evaluate every individual
+    :type evaluation_cache: cea.optimization.master.evaluation_cache.EvaluationCache
     :return: returns costs, CO2, primary energy and the master_to_slave_vars
     """
     print('cea optimization progress: individual ' + str(individual_number) + ' and generation ' + str(
         generation_number) + '/' + str(config.optimization.number_of_generations))
 
+    save_results_to_disk = config.debug or print_final_results
+    results = None
+    if evaluation_cache is not None:
+        fitness = evaluation_cache.get_fitness(individual)
+        if fitness is not None:
+            if not save_results_to_disk:
+                print("INDIVIDUAL FOUND IN THE EVALUATION CACHE")
+                return fitness
+            results = evaluation_cache.get_results(individual)
+
+    if results is None:
+        results = evaluation.evaluation_main(individual,
+                                             building_names_all,
+                                             locator,
+                                             network_features,
+                                             weather_features,
+                                             config,
+                                             prices, lca,
+                                             individual_number,
+                                             generation_number,
+                                             column_names,
+                                             column_names_buildings_heating,
+                                             column_names_buildings_cooling,
+                                             building_names_heating,
+                                             building_names_cooling,
+                                             building_names_electricity,
+                                             district_heating_network,
+                                             district_cooling_network,
+                                             technologies_heating_allowed,
+                                             technologies_cooling_allowed,
+                                             )
+        if evaluation_cache is not None:
+            evaluation_cache.store(individual, results)
+
     TAC_sys_USD, \
     GHG_sys_tonCO2, \
     buildings_district_scale_costs, \
@@ -83,28 +121,9 @@ def objective_function(individual,
     district_cooling_capacity_installed, \
     district_electricity_capacity_installed, \
     buildings_building_scale_heating_capacities, \
-    buildings_building_scale_cooling_capacities = evaluation.evaluation_main(individual,
-                                                                             building_names_all,
-                                                                             locator,
-                                                                             network_features,
-                                                                             weather_features,
-                                                                             config,
-                                                                             prices, lca,
-                                                                             individual_number,
-                                                                             generation_number,
-                                                                             column_names,
-                                                                             column_names_buildings_heating,
-                                                                             column_names_buildings_cooling,
-                                                                             building_names_heating,
-                                                                             building_names_cooling,
-                                                                             building_names_electricity,
-                                                                             district_heating_network,
-                                                                             district_cooling_network,
-                                                                             technologies_heating_allowed,
-                                                                             technologies_cooling_allowed,
-                                                                             )
-
-    if config.debug or print_final_results:  # print for the last generation and
+    buildings_building_scale_cooling_capacities = results
+
+    if save_results_to_disk:  # print for the last generation and
         print("SAVING RESULTS TO DISK")
         save_results(locator,
                      weather_features.date,
@@ -255,10 +274,46 @@ def non_dominated_sorting_genetic_algorithm(locator,
     toolbox.register("select",
                      tools.selNSGA3WithMemory(ref_points))
 
+    # individuals evaluated before (in this run or earlier runs with the same inputs) are read from the cache
+    if config.optimization.evaluation_cache:
+        inputs_hash = calc_inputs_hash(locator, building_names_all, building_names_heating, building_names_cooling,
+                                       building_names_electricity, column_names, network_features, weather_features,
+                                       prices, lca)
+        evaluation_cache = EvaluationCache(locator, inputs_hash)
+    else:
+        evaluation_cache = None
+
     # configure multiprocessing
+    number_of_processes = config.get_number_of_processes()
     if config.multiprocessing:
-        pool = multiprocessing.Pool(processes=multiprocessing.cpu_count())
+        pool = multiprocessing.Pool(processes=number_of_processes)
         toolbox.register("map", pool.map)
+        toolbox.register("apply_async", pool.apply_async)
+    else:
+        toolbox.register("apply_async", apply_synchronously)
+
+    def evaluation_args(individuals, individual_numbers, generation):
+        """arguments of the objective function for each of the ``individuals``"""
+        n = len(individuals)
+        return zip(individuals, individual_numbers, repeat(generation, n),
+                   repeat(building_names_all, n),
+                   repeat(column_names_buildings_heating, n),
+                   repeat(column_names_buildings_cooling, n),
+                   repeat(building_names_heating, n),
+                   repeat(building_names_cooling, n),
+                   repeat(building_names_electricity, n),
+                   repeat(locator, n),
+                   repeat(network_features, n),
+                   repeat(weather_features, n),
+                   repeat(config, n),
+                   repeat(prices, n),
+                   repeat(lca, n),
+                   repeat(district_heating_network, n),
+                   repeat(district_cooling_network, n),
+                   repeat(technologies_heating_allowed, n),
+                   repeat(technologies_cooling_allowed, n),
+                   repeat(column_names, n),
+                   repeat(evaluation_cache, n))
 
     # Initialize statistics object
     paretofrontier = tools.ParetoFront()
@@ -277,24 +332,7 @@ def non_dominated_sorting_genetic_algorithm(locator,
 
     # Evaluate the individuals with an invalid fitness
     invalid_ind = [ind for ind in pop if not ind.fitness.valid]
-    fitnesses = toolbox.map(toolbox.evaluate, zip(invalid_ind, range(len(invalid_ind)), repeat(0, len(invalid_ind)),
-                                                  repeat(building_names_all, len(invalid_ind)),
-                                                  repeat(column_names_buildings_heating, len(invalid_ind)),
-                                                  repeat(column_names_buildings_cooling, len(invalid_ind)),
-                                                  repeat(building_names_heating, len(invalid_ind)),
-                                                  repeat(building_names_cooling, len(invalid_ind)),
-                                                  repeat(building_names_electricity, len(invalid_ind)),
-                                                  repeat(locator, len(invalid_ind)),
-                                                  repeat(network_features, len(invalid_ind)),
-                                                  repeat(weather_features, len(invalid_ind)),
-                                                  repeat(config, len(invalid_ind)),
-                                                  repeat(prices, len(invalid_ind)),
-                                                  repeat(lca, len(invalid_ind)),
-                                                  repeat(district_heating_network, len(invalid_ind)),
-                                                  repeat(district_cooling_network, len(invalid_ind)),
-                                                  repeat(technologies_heating_allowed, len(invalid_ind)),
-                                                  repeat(technologies_cooling_allowed, len(invalid_ind)),
-                                                  repeat(column_names, len(invalid_ind))))
+    fitnesses = toolbox.map(toolbox.evaluate, evaluation_args(invalid_ind, range(len(invalid_ind)), 0))
 
     # normalization of the first generation
     fitnesses = list(fitnesses)  # fitnesses is a map object - store a copy for iterating over multiple times
@@ -319,45 +357,16 @@ def non_dominated_sorting_genetic_algorithm(locator,
                                                                           invalid_ind=invalid_ind)
     print(logbook.stream)
 
-    # Begin the generational process
-    # Initialization of variables
-    for gen in range(1, NGEN + 1):
-        print("Evaluating Generation %s of %s generations" % (gen, NGEN + 1))
-        # Select and clone the next generation individuals
-        offspring = algorithms.varAnd(pop, toolbox, CXPB, MUTPB)
-
-        # Evaluate the individuals with an invalid fitness
-        invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
-        invalid_ind = [ind for ind in invalid_ind if ind not in pop]
-        fitnesses = toolbox.map(toolbox.evaluate,
-                                zip(invalid_ind, range(len(invalid_ind)), repeat(gen, len(invalid_ind)),
-                                    repeat(building_names_all, len(invalid_ind)),
-                                    repeat(column_names_buildings_heating, len(invalid_ind)),
-                                    repeat(column_names_buildings_cooling, len(invalid_ind)),
-                                    repeat(building_names_heating, len(invalid_ind)),
-                                    repeat(building_names_cooling, len(invalid_ind)),
-                                    repeat(building_names_electricity, len(invalid_ind)),
-                                    repeat(locator, len(invalid_ind)),
-                                    repeat(network_features, len(invalid_ind)),
-                                    repeat(weather_features, len(invalid_ind)),
-                                    repeat(config, len(invalid_ind)),
-                                    repeat(prices, len(invalid_ind)),
-                                    repeat(lca, len(invalid_ind)),
-                                    repeat(district_heating_network, len(invalid_ind)),
-                                    repeat(district_cooling_network, len(invalid_ind)),
-                                    repeat(technologies_heating_allowed, len(invalid_ind)),
-                                    repeat(technologies_cooling_allowed, len(invalid_ind)),
-                                    repeat(column_names, len(invalid_ind))))
-        # normalization of the second generation on
-        fitnesses = list(fitnesses)  # fitnesses is a map object - store a copy for iterating over multiple times
-        fitnesses = normalize_fitnesses(scaler_dict, fitnesses)
-
-        for ind, fit in zip(invalid_ind, fitnesses):
-            ind.fitness.values = fit
-
-        # Select the next generation population from parents and offspring
-        pop = toolbox.select(pop + invalid_ind, MU)
-
+    # Begin the evolution (the individuals of the second generation on are normalized with the scaler of the first)
+    if config.optimization.evolution_scheme == 'steady-state':
+        generations = evolve_steady_state(pop, toolbox, evaluation_args,
+                                          lambda fitnesses: normalize_fitnesses(scaler_dict, fitnesses),
+                                          MU, CXPB, MUTPB, NGEN, number_of_processes)
+    else:
+        generations = evolve_generational(pop, toolbox, evaluation_args,
+                                          lambda fitnesses: normalize_fitnesses(scaler_dict, fitnesses),
+                                          MU, CXPB, MUTPB, NGEN)
+    for gen, pop, invalid_ind in generations:
         # get paretofront and update dictionary of individuals evaluated
         paretofrontier.update(pop)
         record_individuals_tested = calc_dictionary_of_all_individuals_tested(record_individuals_tested, gen=gen,
@@ -418,7 +427,8 @@ def non_dominated_sorting_genetic_algorithm(locator,
                                                                          district_cooling_network,
                                                                          technologies_heating_allowed,
                                                                          technologies_cooling_allowed,
-                                                                         column_names)
+                                                                         column_names,
+                                                                         evaluation_cache)
 
         # Create Checkpoint if necessary
         print("Creating CheckPoint", gen, "\n")
@@ -458,7 +468,8 @@ def save_final_generation_pareto_individuals(toolbox,
                                              district_cooling_network,
                                              technologies_heating_allowed,
                                              technologies_cooling_allowed,
-                                             column_names):
+                                             column_names,
+                                             evaluation_cache=None):
     # local variables
     performance_totals_pareto = pd.DataFrame()
     individual_number_list = []
@@ -499,6 +510,7 @@ def save_final_generation_pareto_individuals(toolbox,
                                                   repeat(technologies_heating_allowed, len(individual_in_pareto_list)),
                                                   repeat(technologies_cooling_allowed, len(individual_in_pareto_list)),
                                                   repeat(column_names, len(individual_in_pareto_list)),
+                                                  repeat(evaluation_cache, len(individual_in_pareto_list)),
                                                   repeat(print_final_results, len(individual_in_pareto_list))))
 
     # fitnesses is a map object of lazy results - iterate over it to actually evaluate
@@ -6,13 +6,13 @@ Evaluation function of an individual
 
 
 
-import os
-
 import pandas as pd
 
 from cea.optimization import slave_data
+from cea.optimization.optimization_data import OptimizationData
 from cea.optimization.constants import *
 from cea.optimization.constants import DH_CONVERSION_TECHNOLOGIES_SHARE, DC_CONVERSION_TECHNOLOGIES_SHARE
+from cea.optimization.master import network_summary_cache
 from cea.optimization.master import summarize_network
 from cea.technologies import substation
 
@@ -119,43 +119,22 @@ def thermal_networks_in_individual(locator,
     ground_temp = weather_features.ground_temp
 
     # EVALUATE CASES TO CREATE A NETWORK OR NOT
+    # networks shared by several individuals are only calculated once (see network_summary_cache)
     if district_heating_network:  # network exists
-        if not os.path.exists(locator.get_optimization_network_results_summary('DH', DHN_barcode)):
-            total_demand = createTotalNtwCsv(DHN_barcode, locator, column_names_buildings_heating)
-            num_total_buildings = len(column_names_buildings_heating)
-            buildings_in_heating_network = total_demand.Name.values
-            # Run the substation and distribution routines
-            substation.substation_main_heating(locator,
-                                               total_demand,
-                                               buildings_in_heating_network,
-                                               DHN_barcode=DHN_barcode)
-            DH_network_summary_individual = summarize_network.network_main(locator,
-                                                                           buildings_in_heating_network,
-                                                                           ground_temp,
-                                                                           num_total_buildings,
-                                                                           "DH", DHN_barcode)
-        else:
-            DH_network_summary_individual = pd.read_csv(
-                locator.get_optimization_network_results_summary('DH', DHN_barcode))
+        DH_network_summary_individual = network_summary_cache.get_network_summary(locator, 'DH', DHN_barcode,
+                                                                                  calc_heating_network_summary,
+                                                                                  locator, DHN_barcode,
+                                                                                  column_names_buildings_heating,
+                                                                                  ground_temp)
     else:
         DH_network_summary_individual = None
 
     if district_cooling_network:  # network exists
-        if not os.path.exists(locator.get_optimization_network_results_summary('DC', DCN_barcode)):
-            total_demand = createTotalNtwCsv(DCN_barcode, locator, column_names_buildings_cooling)
-            num_total_buildings = len(column_names_buildings_cooling)
-            buildings_in_cooling_network = total_demand.Name.values
-
-            # Run the substation and distribution routines
-            substation.substation_main_cooling(locator, total_demand, buildings_in_cooling_network,
-                                               DCN_barcode=DCN_barcode)
-            DC_network_summary_individual = summarize_network.network_main(locator, buildings_in_cooling_network,
-                                                                           ground_temp,
-                                                                           num_total_buildings,
-                                                                           'DC', DCN_barcode)
-        else:
-            DC_network_summary_individual = pd.read_csv(
-                locator.get_optimization_network_results_summary('DC', DCN_barcode))
+        DC_network_summary_individual = network_summary_cache.get_network_summary(locator, 'DC', DCN_barcode,
+                                                                                  calc_cooling_network_summary,
+                                                                                  locator, DCN_barcode,
+                                                                                  column_names_buildings_cooling,
+                                                                                  ground_temp)
     else:
         DC_network_summary_individual = None
 
@@ -163,6 +142,36 @@ def thermal_networks_in_individual(locator,
     return DH_network_summary_individual, DC_network_summary_individual
 
 
+def calc_heating_network_summary(locator, DHN_barcode, column_names_buildings_heating, ground_temp):
+    total_demand = createTotalNtwCsv(DHN_barcode, locator, column_names_buildings_heating)
+    num_total_buildings = len(column_names_buildings_heating)
+    buildings_in_heating_network = total_demand.Name.values
+    # Run the substation and distribution routines
+    substation.substation_main_heating(locator,
+                                       total_demand,
+                                       buildings_in_heating_network,
+                                       DHN_barcode=DHN_barcode)
+    return summarize_network.network_main(locator,
+                                          buildings_in_heating_network,
+                                          ground_temp,
+                                          num_total_buildings,
+                                          "DH", DHN_barcode)
+
+
+def calc_cooling_network_summary(locator, DCN_barcode, column_names_buildings_cooling, ground_temp):
+    total_demand = createTotalNtwCsv(DCN_barcode, locator, column_names_buildings_cooling)
+    num_total_buildings = len(column_names_buildings_cooling)
+    buildings_in_cooling_network = total_demand.Name.values
+
+    # Run the substation and distribution routines
+    substation.substation_main_cooling(locator, total_demand, buildings_in_cooling_network,
+                                       DCN_barcode=DCN_barcode)
+    return summarize_network.network_main(locator, buildings_in_cooling_network,
+                                          ground_temp,
+                                          num_total_buildings,
+                                          'DC', DCN_barcode)
+
+
 # +++++++++++++++++++++++++++++++++++
 # Boundary conditions
 # +++++++++++++++++++++++++++++
@@ -348,8 +357,10 @@ def calc_available_area_solar(locator, buildings, share_allowed, technology):
     """
     area_m2 = 0.0
     locator_methods = {"PVT": locator.PVT_results, "PV": locator.PV_results}
+    optimization_data = OptimizationData.for_locator(locator)
     for building in buildings:
-        solar_technology_potential = pd.read_csv(locator_methods[technology](building))
+        solar_technology_potential = optimization_data.csv_columns(locator_methods[technology](building),
+                                                                   ['Area_' + technology + '_m2'])
         area_m2 += solar_technology_potential['Area_' + technology + '_m2'][0]
 
     return area_m2 * share_allowed
@@ -365,8 +376,10 @@ def calc_available_area_solar_collectors(locator, buildings, share_allowed, pane
     :return:
     """
     area_m2 = 0.0
+    optimization_data = OptimizationData.for_locator(locator)
     for building in buildings:
-        solar_technology_potential = pd.read_csv(locator.SC_results(building, panel_type))
+        solar_technology_potential = optimization_data.csv_columns(locator.SC_results(building, panel_type),
+                                                                   ['Area_SC_m2'])
         area_m2 += solar_technology_potential['Area_SC_m2'][0]
 
     return area_m2 * share_allowed
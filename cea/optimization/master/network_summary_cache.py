@@ -0,0 +1,75 @@
+"""
+Cache of the network summaries of the district networks evaluated during the optimization
+
+"""
+
+
+
+
+import collections
+import os
+import time
+
+import pandas as pd
+
+MEMORY_CACHE_SIZE = 32  # number of network summaries kept in memory by each process
+LOCK_POLL_INTERVAL_SECONDS = 0.2
+LOCK_TIMEOUT_SECONDS = 3600  # locks older than this are left over from processes that stopped while calculating
+
+_memory_cache = collections.OrderedDict()  # {(scenario, network type, barcode): network summary}
+
+
+def get_network_summary(locator, network_type, district_network_barcode, calc_network_summary, *args):
+    """
+    Return the summary of the district network with the buildings in ``district_network_barcode``, calculating it with
+    ``calc_network_summary(*args)`` only if it was not calculated before in this run.
+
+    The individuals of the optimization are evaluated in parallel and many of them share the same network, so each
+    network summary is calculated once by the first process that needs it (which holds a lock file for the barcode
+    while calculating). Other processes wait for it and read the stored result. The results are written to a binary
+    file next to the csv file of the network summary and the last results are kept in memory.
+
+    :param locator: InputLocator of the scenario
+    :param network_type: 'DH' or 'DC'
+    :param district_network_barcode: buildings connected to the network
+    :param calc_network_summary: function calculating the network summary (e.g. ``summarize_network.network_main``)
+    :rtype: pd.DataFrame
+    """
+    summary_path = os.path.splitext(locator.get_optimization_network_results_summary(network_type,
+                                                                                    district_network_barcode))[0]
+    result_path = summary_path + '.pickle'
+    lock_path = summary_path + '.lock'
+
+    # the results of earlier runs are deleted by the pre-processing of the optimization
+    key = (locator.scenario, network_type, district_network_barcode)
+    if key in _memory_cache and os.path.exists(result_path):
+        _memory_cache.move_to_end(key)
+        return _memory_cache[key].copy()
+
+    while not os.path.exists(result_path):
+        try:
+            lock = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except (FileExistsError, PermissionError):
+            # another process is calculating this network
+            try:
+                if time.time() - os.path.getmtime(lock_path) > LOCK_TIMEOUT_SECONDS:
+                    os.remove(lock_path)
+            except OSError:
+                pass  # the lock was released in the meantime
+            time.sleep(LOCK_POLL_INTERVAL_SECONDS)
+            continue
+        try:
+            if not os.path.exists(result_path):
+                network_summary = calc_network_summary(*args)
+                temporary_path = '%s.%i.tmp' % (result_path, os.getpid())
+                network_summary.to_pickle(temporary_path)
+                os.replace(temporary_path, result_path)
+        finally:
+            os.close(lock)
+            os.remove(lock_path)
+
+    network_summary = pd.read_pickle(result_path)
+    _memory_cache[key] = network_summary
+    if len(_memory_cache) > MEMORY_CACHE_SIZE:
+        _memory_cache.popitem(last=False)
+    return network_summary.copy()
@@ -0,0 +1,165 @@
+"""
+Inputs of the slave routines of the optimization, read once by each process evaluating individuals
+
+"""
+
+
+
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from cea.demand.demand_writers import read_demand_results, get_demand_results_path
+
+
+class OptimizationData(object):
+    """
+    In-memory data context of the evaluation of the individuals of the optimization. The hourly demand, potentials,
+    solar and decentralized results of the buildings don't change during a run, but they used to be read from their
+    files for every individual. They are kept here instead - as read-only arrays by building and column, where only
+    the columns requested by the slave routines are read - together with the database tables and the peak loads of the
+    substations.
+
+    The data of a file is read again if the file changed (e.g. a new run of the pre-processing of the optimization),
+    so a data context can be kept for the whole life time of a process.
+    """
+    data_contexts = {}  # {scenario: OptimizationData}
+
+    def __init__(self, locator):
+        self.locator = locator
+        self._columns = {}  # {path or key: (file stamp, {column: array})}
+        self._values = {}  # {(path, what): (file stamp, value)}
+        self._demand_paths = {}  # {building name: (file stamp of the demand results store, path)}
+
+    @classmethod
+    def for_locator(cls, locator):
+        """Return the data context of the scenario of ``locator`` (the same one for each call within a process)"""
+        if locator.scenario not in cls.data_contexts:
+            cls.data_contexts[locator.scenario] = cls(locator)
+        return cls.data_contexts[locator.scenario]
+
+    def demand(self, building_name, columns):
+        """
+        Hourly demand results of a building (see :py:func:`cea.demand.demand_writers.read_demand_results`).
+
+        The file with the results of the building is looked up again only if the demand results store changed, so
+        the results in memory cost one ``os.stat`` of the store (and one of the csv file of the building, if its
+        results are not in the store).
+
+        :param str building_name: name of the building
+        :param list[str] columns: names of the columns
+        :return: the hourly values of each column
+        :rtype: dict[str, np.ndarray]
+        """
+        store_path = self.locator.get_demand_results_store()
+        store_stamp = self._file_stamp_if_exists(store_path)
+        path_stamp, path = self._demand_paths.get(building_name, (None, None))
+        if path is None or path_stamp != store_stamp:
+            path = get_demand_results_path(self.locator, building_name)
+            self._demand_paths[building_name] = (store_stamp, path)
+        return self.read_columns(path, columns,
+                                 lambda missing: read_demand_results(self.locator, building_name, columns=missing),
+                                 key=(path, building_name), stamp=store_stamp if path == store_path else None)
+
+    def solar_results(self, path, columns):
+        """
+        Hourly results of the PV, PVT or SC potentials of a building (``locator.PV_results`` etc.), where missing
+        values are zero.
+
+        :param str path: path to the results of the building
+        :param list[str] columns: names of the columns
+        :rtype: dict[str, np.ndarray]
+        """
+        return self.read_columns(path, columns, lambda missing: pd.read_csv(path, usecols=missing).fillna(value=0.0),
+                                 key=(path, 'fillna'))
+
+    def csv_columns(self, path, columns):
+        """
+        Columns of a csv file (e.g. the potentials of the sewage, water bodies and the ground, or the activation of the
+        decentralized supply systems of a building).
+
+        :param str path: path to the csv file
+        :param list[str] columns: names of the columns
+        :rtype: dict[str, np.ndarray]
+        """
+        return self.read_columns(path, columns, lambda missing: pd.read_csv(path, usecols=missing))
+
+    def read_columns(self, path, columns, read, key=None, stamp=None):
+        """
+        Return the ``columns`` of the file in ``path``, reading the ones that are not in memory yet with
+        ``read(missing_columns)`` (which returns a ``pd.DataFrame``).
+
+        :param key: key of the columns in memory, for files with several tables or read in different ways (default:
+            ``path``)
+        :param stamp: the file stamp of ``path``, if known already (see :py:meth:`_file_stamp`)
+        :rtype: dict[str, np.ndarray]
+        """
+        key = path if key is None else key
+        stamp = self._file_stamp(path) if stamp is None else stamp
+        table_stamp, table = self._columns.get(key, (None, None))
+        if table_stamp != stamp:
+            table = {}
+            self._columns[key] = (stamp, table)
+        missing = [column for column in columns if column not in table]
+        if missing:
+            df = read(missing)
+            for column in missing:
+                values = np.array(df[column].values)
+                values.setflags(write=False)
+                table[column] = values
+        return {column: table[column] for column in columns}
+
+    def best_decentralized_configuration(self, path):
+        """
+        The results of the best configuration of the decentralized supply system of a building (from
+        ``locator.get_optimization_decentralized_folder_building_result_heating`` etc.)
+
+        :rtype: pd.DataFrame
+        """
+        def read():
+            df = pd.read_csv(path)
+            return df[df["Best configuration"] == 1]
+
+        return self._read_value(path, 'best configuration', read).copy()
+
+    def substation_peak_load(self, path, columns):
+        """
+        Peak of the sum of the ``columns`` of the substation results of a building (from
+        ``locator.get_optimization_substations_results_file``). Only the peak is kept in memory, as the results
+        are specific to each network.
+
+        :rtype: float
+        """
+        return self._read_value(path, ('peak',) + tuple(columns),
+                                lambda: np.amax(np.array(pd.read_csv(path, usecols=columns)).sum(axis=1)))
+
+    def database_table(self, path, sheet_name):
+        """
+        A sheet of a database (e.g. ``locator.get_database_conversion_systems()``)
+
+        :rtype: pd.DataFrame
+        """
+        return self._read_value(path, sheet_name, lambda: pd.read_excel(path, sheet_name=sheet_name)).copy()
+
+    def _read_value(self, path, what, read):
+        stamp = self._file_stamp(path)
+        value_stamp, value = self._values.get((path, what), (None, None))
+        if value_stamp != stamp:
+            value = read()
+            self._values[(path, what)] = (stamp, value)
+        return value
+
+    @staticmethod
+    def _file_stamp(path):
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def _file_stamp_if_exists(path):
+        """The file stamp of ``path`` (see :py:meth:`_file_stamp`) or ``None``, if the file does not exist"""
+        try:
+            return OptimizationData._file_stamp(path)
+        except FileNotFoundError:
+            return None
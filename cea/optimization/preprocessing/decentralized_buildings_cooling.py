@@ -27,6 +27,7 @@ from cea.constants import HEAT_CAPACITY_OF_WATER_JPERKGK
 from cea.optimization.constants import (T_GENERATOR_FROM_FP_C, T_GENERATOR_FROM_ET_C,
                                         Q_LOSS_DISCONNECTED, ACH_TYPE_SINGLE, VCC_CODE_DECENTRALIZED)
 from cea.optimization.lca_calculations import LcaCalculations
+from cea.optimization.preprocessing.decentralized_cache import DecentralizedCache, calc_database_hash, calc_inputs_hash
 from cea.technologies.thermal_network.thermal_network import calculate_ground_temperature
 from cea.technologies.supply_systems_database import SupplySystemsDatabase
 import cea.utilities.parallel
@@ -71,18 +72,19 @@ def disconnected_buildings_cooling_main(locator, building_names, total_demand, c
         repeat(lca, n),
         repeat(locator, n),
         repeat(prices, n),
-        repeat(total_demand, n))
+        repeat(total_demand, n),
+        repeat(calc_database_hash(locator), n))
 
     print(time.perf_counter() - t0, "seconds process time for the decentralized Building Routine \n")
 
 
-def disconnected_cooling_for_building(building_name, supply_systems, lca, locator, prices, total_demand):
-    chiller_prop = supply_systems.Absorption_chiller
-    boiler_cost_data = supply_systems.Boiler
-
-    scale = 'BUILDING'
-    VCC_chiller = chiller_vapor_compression.VaporCompressionChiller(locator, scale)
-
+def disconnected_cooling_for_building(building_name, supply_systems, lca, locator, prices, total_demand,
+                                      database_hash=None):
+    """
+    Calculates the decentralized cooling supply configurations of a building and saves the results and the
+    activation of the best configuration. The results of an earlier run are kept if the inputs of the building did
+    not change (``database_hash`` is the version of the supply systems database, ``None`` to always calculate).
+    """
     ## Calculate cooling loads for different combinations
     # SENSIBLE COOLING UNIT
     Qc_nom_SCU_W, \
@@ -102,6 +104,33 @@ def disconnected_cooling_for_building(building_name, supply_systems, lca, locato
     T_sup_AHU_ARU_SCU_K, \
     mdot_AHU_ARU_SCU_kgpers = calc_combined_cooling_loads(building_name, locator, total_demand,
                                                           cooling_configuration=['ahu', 'aru', 'scu'])
+
+    # the cooling loads are the inputs of the supply systems: the substation results file holds the last combination
+    # calculated (AHU + ARU + SCU), the other combinations are part of the hash
+    cache = DecentralizedCache(locator, building_name, "DC",
+                               [locator.get_optimization_decentralized_folder_building_result_cooling(building_name),
+                                locator.get_optimization_decentralized_folder_building_cooling_activation(
+                                    building_name)],
+                               calc_inputs_hash([locator.get_optimization_substations_results_file(building_name, "DC",
+                                                                                                   ""),
+                                                 locator.SC_results(building_name, "FP"),
+                                                 locator.SC_results(building_name, "ET"),
+                                                 locator.get_weather_file()],
+                                                database_hash, lca, prices,
+                                                T_re_SCU_K, T_sup_SCU_K, mdot_SCU_kgpers,
+                                                T_re_AHU_ARU_K, T_sup_AHU_ARU_K, mdot_AHU_ARU_kgpers))
+    if database_hash is not None and cache.is_up_to_date():
+        print('{building_name} decentralized cooling supply systems are up to date'.format(
+            building_name=building_name))
+        return
+    cache.invalidate()
+
+    chiller_prop = supply_systems.Absorption_chiller
+    boiler_cost_data = supply_systems.Boiler
+
+    scale = 'BUILDING'
+    VCC_chiller = chiller_vapor_compression.VaporCompressionChiller(locator, scale)
+
     ## Get hourly hot water supply condition of Solar Collectors (SC)
     # Flate Plate Solar Collectors
     SC_FP_data, T_hw_in_FP_C, el_aux_SC_FP_Wh, q_sc_gen_FP_Wh = get_SC_data(building_name, locator, panel_type="FP")
@@ -126,7 +155,7 @@ def disconnected_cooling_for_building(building_name, supply_systems, lca, locato
     ## 0. DX operation
     print('{building_name} Config 0: Direct Expansion Units -> AHU,ARU,SCU'.format(building_name=building_name))
     el_DX_hourly_Wh, \
-    q_DX_chw_Wh = np.vectorize(dx.calc_DX)(mdot_AHU_ARU_SCU_kgpers, T_sup_AHU_ARU_SCU_K, T_re_AHU_ARU_SCU_K)
+    q_DX_chw_Wh = dx.calc_DX(mdot_AHU_ARU_SCU_kgpers, T_sup_AHU_ARU_SCU_K, T_re_AHU_ARU_SCU_K)
     DX_Status = np.where(q_DX_chw_Wh > 0.0, 1, 0)
     # add electricity costs, CO2, PE
     operation_results[0][7] += sum(prices.ELEC_PRICE * el_DX_hourly_Wh)
@@ -452,26 +481,27 @@ def disconnected_cooling_for_building(building_name, supply_systems, lca, locato
     best_activation_df = pd.DataFrame.from_dict(cooling_dispatch[indexBest])  #
     best_activation_df.to_csv(
         locator.get_optimization_decentralized_folder_building_cooling_activation(building_name), index=False)
+    cache.store()
 
 
 def calc_VCC_operation(T_chw_re_K, T_chw_sup_K, mdot_kgpers, VCC_chiller):
     from cea.optimization.constants import VCC_T_COOL_IN
     q_chw_Wh = mdot_kgpers * HEAT_CAPACITY_OF_WATER_JPERKGK * (T_chw_re_K - T_chw_sup_K)
     peak_cooling_load = np.nanmax(q_chw_Wh)
-    VCC_operation = np.vectorize(chiller_vapor_compression.calc_VCC)(peak_cooling_load,
-                                                                     q_chw_Wh,
-                                                                     T_chw_sup_K,
-                                                                     T_chw_re_K,
-                                                                     VCC_T_COOL_IN,
-                                                                     VCC_chiller)
-    q_cw_Wh = np.asarray([x['q_cw_W'] for x in VCC_operation])
-    el_VCC_Wh = np.asarray([x['wdot_W'] for x in VCC_operation])
+    VCC_operation = chiller_vapor_compression.calc_VCC(peak_cooling_load,
+                                                       q_chw_Wh,
+                                                       T_chw_sup_K,
+                                                       T_chw_re_K,
+                                                       VCC_T_COOL_IN,
+                                                       VCC_chiller)
+    q_cw_Wh = VCC_operation['q_cw_W']
+    el_VCC_Wh = VCC_operation['wdot_W']
     return el_VCC_Wh, q_cw_Wh, q_chw_Wh
 
 
 def calc_CT_operation(q_CT_load_Wh):
     Q_nom_CT_W = np.max(q_CT_load_Wh)
-    el_CT_Wh = np.vectorize(cooling_tower.calc_CT)(q_CT_load_Wh, Q_nom_CT_W)
+    el_CT_Wh = cooling_tower.calc_CT(q_CT_load_Wh, Q_nom_CT_W)
     return Q_nom_CT_W, el_CT_Wh
 
 
@@ -480,7 +510,7 @@ def calc_boiler_operation(Q_ACH_size_W, T_hw_out_from_ACH_K, q_hw_single_ACH_Wh,
         q_boiler_load_Wh = q_hw_single_ACH_Wh - q_sc_gen_FP_Wh
         Q_nom_Boilers_W = np.max(q_boiler_load_Wh)
         T_re_boiler_K = T_hw_out_from_ACH_K
-        boiler_eff = np.vectorize(boiler.calc_Cop_boiler)(q_boiler_load_Wh, Q_nom_Boilers_W, T_re_boiler_K)
+        boiler_eff = boiler.calc_Cop_boiler(q_boiler_load_Wh, Q_nom_Boilers_W, T_re_boiler_K)
         Q_gas_for_boiler_Wh = np.divide(q_boiler_load_Wh, boiler_eff,
                                         out=np.zeros_like(q_boiler_load_Wh), where=boiler_eff != 0.0)
     else:
@@ -494,7 +524,7 @@ def calc_burner_operation(Q_ACH_size_W, q_hw_single_ACH_Wh, q_sc_gen_ET_Wh):
     if not np.isclose(Q_ACH_size_W, 0.0):
         q_burner_load_Wh = q_hw_single_ACH_Wh - q_sc_gen_ET_Wh
         Q_nom_Burners_W = np.max(q_burner_load_Wh)
-        burner_eff = np.vectorize(burner.calc_cop_burner)(q_burner_load_Wh, Q_nom_Burners_W)
+        burner_eff = burner.calc_cop_burner(q_burner_load_Wh, Q_nom_Burners_W)
         q_gas_for_burber_Wh = np.divide(q_burner_load_Wh, burner_eff,
                                         out=np.zeros_like(q_burner_load_Wh), where=burner_eff != 0)
     else:
@@ -567,18 +597,18 @@ def initialize_result_tables_for_supply_configurations(Qc_nom_SCU_W):
 def calc_ACH_operation(T_ground_K, T_SC_hw_in_C, T_chw_re_K, T_chw_sup_K, absorption_chiller, mdot_chw_kgpers,
                        ACH_type):
     absorption_chiller = chiller_absorption.AbsorptionChiller(absorption_chiller, ACH_type)
-    SC_to_single_ACH_operation = np.vectorize(chiller_absorption.calc_chiller_main)(mdot_chw_kgpers,
-                                                                                    T_chw_sup_K,
-                                                                                    T_chw_re_K,
-                                                                                    T_SC_hw_in_C,
-                                                                                    T_ground_K,
-                                                                                    absorption_chiller)
-
-    el_ACH_Wh = np.asarray([x['wdot_W'] for x in SC_to_single_ACH_operation])
-    q_chw_ACH_Wh = np.asarray([x['q_chw_W'] for x in SC_to_single_ACH_operation])
-    q_cw_ACH_Wh = np.asarray([x['q_cw_W'] for x in SC_to_single_ACH_operation])
-    q_hw_ACH_Wh = np.asarray([x['q_hw_W'] for x in SC_to_single_ACH_operation])
-    T_hw_out_ACH_K = np.asarray([x['T_hw_out_C'] + 273.15 for x in SC_to_single_ACH_operation])
+    SC_to_single_ACH_operation = chiller_absorption.calc_chiller_main(mdot_chw_kgpers,
+                                                                      T_chw_sup_K,
+                                                                      T_chw_re_K,
+                                                                      T_SC_hw_in_C,
+                                                                      T_ground_K,
+                                                                      absorption_chiller)
+
+    el_ACH_Wh = SC_to_single_ACH_operation['wdot_W']
+    q_chw_ACH_Wh = SC_to_single_ACH_operation['q_chw_W']
+    q_cw_ACH_Wh = SC_to_single_ACH_operation['q_cw_W']
+    q_hw_ACH_Wh = SC_to_single_ACH_operation['q_hw_W']
+    T_hw_out_ACH_K = SC_to_single_ACH_operation['T_hw_out_C'] + 273.15
     return T_hw_out_ACH_K, el_ACH_Wh, q_cw_ACH_Wh, q_hw_ACH_Wh, q_chw_ACH_Wh
 
 
@@ -590,9 +620,9 @@ def get_SC_data(building_name, locator, panel_type):
     q_sc_gen_Wh = np.where(q_sc_gen_Wh < 0.0, 0.0, q_sc_gen_Wh)
     el_aux_SC_Wh = SC_data['Eaux_SC_kWh'] * 1000
     if panel_type == "FP":
-        T_hw_in_C = [x if x > T_GENERATOR_FROM_FP_C else T_GENERATOR_FROM_FP_C for x in SC_data['T_SC_re_C']]
+        T_hw_in_C = np.where(SC_data['T_SC_re_C'] > T_GENERATOR_FROM_FP_C, SC_data['T_SC_re_C'], T_GENERATOR_FROM_FP_C)
     elif panel_type == "ET":
-        T_hw_in_C = [x if x > T_GENERATOR_FROM_ET_C else T_GENERATOR_FROM_ET_C for x in SC_data['T_SC_re_C']]
+        T_hw_in_C = np.where(SC_data['T_SC_re_C'] > T_GENERATOR_FROM_ET_C, SC_data['T_SC_re_C'], T_GENERATOR_FROM_ET_C)
     else:
         print('invalid panel type: ', panel_type)
     return SC_data, T_hw_in_C, el_aux_SC_Wh, q_sc_gen_Wh
@@ -610,7 +640,7 @@ def calc_combined_cooling_loads(building_name, locator, total_demand, cooling_co
     T_sup_K = substation_operation["T_supply_DC_space_cooling_data_center_and_refrigeration_result_K"].values
     mdot_kgpers = substation_operation["mdot_space_cooling_data_center_and_refrigeration_result_kgpers"].values
     # calculate combined load
-    Qc_load_W = np.vectorize(calc_new_load)(mdot_kgpers, T_sup_K, T_re_K)
+    Qc_load_W = calc_new_load(mdot_kgpers, T_sup_K, T_re_K)
     Qc_design_W = Qc_load_W.max()
     return Qc_design_W, T_re_K, T_sup_K, mdot_kgpers
 
@@ -634,19 +664,16 @@ def calc_new_load(mdot_kgpers, T_sup_K, T_re_K):
     :param mdot_kgpers: mass flow
     :param T_sup_K: chilled water supply temperautre
     :param T_re_K: chilled water return temperature
-    :type mdot_kgpers: float
-    :type TsupDH: float
-    :type T_re_K: float
+    :type mdot_kgpers: float or np.ndarray
+    :type TsupDH: float or np.ndarray
+    :type T_re_K: float or np.ndarray
     :return: Q_cooling_load: load of the distribution
-    :rtype: float
+    :rtype: float or np.ndarray
     """
-    if mdot_kgpers > 0:
-        Q_cooling_load_W = mdot_kgpers * HEAT_CAPACITY_OF_WATER_JPERKGK * (T_re_K - T_sup_K) * (
-                1 + Q_LOSS_DISCONNECTED)  # for cooling load
-        if Q_cooling_load_W < 0:
-            raise ValueError('Q_cooling_load less than zero, check temperatures!')
-    else:
-        Q_cooling_load_W = 0
+    Q_cooling_load_W = np.where(mdot_kgpers > 0, mdot_kgpers * HEAT_CAPACITY_OF_WATER_JPERKGK * (T_re_K - T_sup_K) * (
+            1 + Q_LOSS_DISCONNECTED), 0.0)  # for cooling load
+    if np.any(Q_cooling_load_W < 0):
+        raise ValueError('Q_cooling_load less than zero, check temperatures!')
 
     return Q_cooling_load_W
 
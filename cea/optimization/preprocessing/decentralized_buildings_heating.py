@@ -20,11 +20,14 @@ import cea.technologies.substation as substation
 import cea.utilities.parallel
 from cea.constants import HEAT_CAPACITY_OF_WATER_JPERKGK
 from cea.optimization.constants import GHP_A, GHP_HMAX_SIZE
+from cea.optimization.preprocessing.decentralized_cache import DecentralizedCache, calc_database_hash, calc_inputs_hash
 from cea.resources.geothermal import calc_ground_temperature
 from cea.utilities import dbf
 from cea.utilities import epwreader
 from cea.technologies.supply_systems_database import SupplySystemsDatabase
 
+NUMBER_OF_GHP_CONFIGURATIONS = 10  # configurations 3-12: the boiler supplies 0%, 10%, ... 90% of the nominal load
+
 
 def disconnected_buildings_heating_main(locator, total_demand, building_names, config, prices, lca):
     """
@@ -63,23 +66,43 @@ def disconnected_buildings_heating_main(locator, total_demand, building_names, c
         repeat(geothermal_potential_data, n),
         repeat(lca, n),
         repeat(locator, n),
-        repeat(prices, n))
+        repeat(prices, n),
+        repeat(calc_database_hash(locator), n))
 
     print(time.perf_counter() - t0, "seconds process time for the Disconnected Building Routine \n")
 
 
 def disconnected_heating_for_building(building_name, supply_systems, T_ground_K, geothermal_potential_data, lca,
-                                      locator, prices):
+                                      locator, prices, database_hash=None):
+    """
+    Calculates the decentralized heating supply configurations of a building and saves the results and the
+    activation of the best configuration. The results of an earlier run are kept if the inputs of the building did
+    not change (``database_hash`` is the version of the supply systems database, ``None`` to always calculate).
+    """
+    geothermal_potential = geothermal_potential_data.set_index('Name')
+    substation_results_path = locator.get_optimization_substations_results_file(building_name, "DH", "")
+    cache = DecentralizedCache(locator, building_name, "DH",
+                               [locator.get_optimization_decentralized_folder_building_result_heating(building_name),
+                                locator.get_optimization_decentralized_folder_building_result_heating_activation(
+                                    building_name)],
+                               calc_inputs_hash([substation_results_path], database_hash, T_ground_K,
+                                                geothermal_potential.loc[building_name, 'Area_geo'], lca, prices))
+    if database_hash is not None and cache.is_up_to_date():
+        print('{building_name} decentralized heating supply systems are up to date'.format(
+            building_name=building_name))
+        return
+    cache.invalidate()
+
     print('{building_name} disconnected heating supply system simulations...'.format(building_name=building_name))
     GHP_cost_data = supply_systems.HP
     BH_cost_data = supply_systems.BH
     boiler_cost_data = supply_systems.Boiler
 
     # run substation model to derive temperatures of the building
-    substation_results = pd.read_csv(locator.get_optimization_substations_results_file(building_name, "DH", ""))
-    q_load_Wh = np.vectorize(calc_new_load)(substation_results["mdot_DH_result_kgpers"],
-                                            substation_results["T_supply_DH_result_K"],
-                                            substation_results["T_return_DH_result_K"])
+    substation_results = pd.read_csv(substation_results_path)
+    q_load_Wh = calc_new_load(substation_results["mdot_DH_result_kgpers"].values,
+                              substation_results["T_supply_DH_result_K"].values,
+                              substation_results["T_return_DH_result_K"].values)
     Qnom_W = q_load_Wh.max()
     # Create empty matrices
     Opex_a_var_USD = np.zeros((13, 7))
@@ -94,8 +117,6 @@ def disconnected_heating_for_building(building_name, supply_systems, T_ground_K,
     Opex_a_var_USD[1][1] = 1  # Boiler BG
     Opex_a_var_USD[2][2] = 1  # Fuel Cell
     resourcesRes = np.zeros((13, 4))
-    Q_Boiler_for_GHP_W = np.zeros((10, 1))  # Save peak capacity of GHP Backup Boilers
-    GHP_el_size_W = np.zeros((10, 1))  # Save peak capacity of GHP
     # save supply system activation of all supply configurations
     heating_dispatch = {}
     # Supply with the Boiler / FC / GHP
@@ -106,7 +127,7 @@ def disconnected_heating_for_building(building_name, supply_systems, T_ground_K,
     print(building_name, ' decentralized heating supply systems simulations...')
     Tret_K = np.where(Tret_K > 0.0, Tret_K, Tsup_K)
     ## 0: Boiler NG
-    BoilerEff = np.vectorize(Boiler.calc_Cop_boiler)(q_load_Wh, Qnom_W, Tret_K)
+    BoilerEff = Boiler.calc_Cop_boiler(q_load_Wh, Qnom_W, Tret_K)
     Qgas_to_Boiler_Wh = np.divide(q_load_Wh, BoilerEff, out=np.zeros_like(q_load_Wh), where=BoilerEff != 0.0)
     Boiler_Status = np.where(Qgas_to_Boiler_Wh > 0.0, 1, 0)
     # add costs
@@ -150,62 +171,43 @@ def disconnected_heating_for_building(building_name, supply_systems, T_ground_K,
                            'E_Fuelcell_gen_export_W': el_from_FC_Wh,
                            'E_hs_ww_req_W': np.zeros(8760)}
     # 3-13: Boiler NG + GHP
-    for i in range(10):
-        # set nominal size for Boiler and GHP
-        QnomBoiler_W = i / 10.0 * Qnom_W
-        QnomGHP_W = Qnom_W - QnomBoiler_W
+    GHP_configurations = calc_GHP_configurations(Qnom_W, q_load_Wh, T_ground_K, Tret_K, Tsup_K, mdot_kgpers)
+    el_GHP_Wh = GHP_configurations['el_GHP_Wh']
+    q_load_NG_Boiler_Wh = GHP_configurations['q_load_NG_Boiler_Wh']
+    qhot_missing_Wh = GHP_configurations['qhot_missing_Wh']
+    q_from_GHP_Wh = GHP_configurations['q_from_GHP_Wh']
+    Qgas_to_GHPBoiler_Wh = GHP_configurations['Qgas_to_GHPBoiler_Wh']
+    Qgas_to_Boiler_Wh = GHP_configurations['Qgas_to_Boiler_Wh']
+    GHP_el_size_W = GHP_configurations['GHP_el_size_W']
+    Q_Boiler_for_GHP_W = GHP_configurations['Q_Boiler_for_GHP_W']
+    GHP_Status = np.where(q_from_GHP_Wh > 0.0, 1, 0)
+    GHPbackupBoiler_Status = np.where(qhot_missing_Wh > 0.0, 1, 0)
+    Boiler_Status = np.where(q_load_NG_Boiler_Wh > 0.0, 1, 0)
 
-        # GHP operation
-        Texit_GHP_nom_K = QnomGHP_W / (mdot_kgpers * HEAT_CAPACITY_OF_WATER_JPERKGK) + Tret_K
-        el_GHP_Wh, q_load_NG_Boiler_Wh, \
-        qhot_missing_Wh, \
-        Texit_GHP_K, q_from_GHP_Wh = np.vectorize(calc_GHP_operation)(QnomGHP_W, T_ground_K, Texit_GHP_nom_K,
-                                                                      Tret_K, Tsup_K, mdot_kgpers, q_load_Wh)
-        GHP_el_size_W[i][0] = max(el_GHP_Wh)
-        GHP_Status = np.where(q_from_GHP_Wh > 0.0, 1, 0)
-
-        # GHP Backup Boiler operation
-        if max(qhot_missing_Wh) > 0.0:
-            print("GHP unable to cover the whole demand, boiler activated!")
-            Qnom_GHP_Backup_Boiler_W = max(qhot_missing_Wh)
-            BoilerEff = np.vectorize(Boiler.calc_Cop_boiler)(qhot_missing_Wh, Qnom_GHP_Backup_Boiler_W, Texit_GHP_K)
-            Qgas_to_GHPBoiler_Wh = np.divide(qhot_missing_Wh, BoilerEff,
-                                             out=np.zeros_like(qhot_missing_Wh), where=BoilerEff != 0.0)
-        else:
-            Qgas_to_GHPBoiler_Wh = np.zeros(q_load_Wh.shape[0])
-            Qnom_GHP_Backup_Boiler_W = 0.0
-        Q_Boiler_for_GHP_W[i][0] = Qnom_GHP_Backup_Boiler_W
-        GHPbackupBoiler_Status = np.where(qhot_missing_Wh > 0.0, 1, 0)
-
-        # NG Boiler operation
-        BoilerEff = np.vectorize(Boiler.calc_Cop_boiler)(q_load_NG_Boiler_Wh, QnomBoiler_W, Texit_GHP_K)
-        Qgas_to_Boiler_Wh = np.divide(q_load_NG_Boiler_Wh, BoilerEff,
-                                      out=np.zeros_like(q_load_NG_Boiler_Wh), where=BoilerEff != 0.0)
-        Boiler_Status = np.where(q_load_NG_Boiler_Wh > 0.0, 1, 0)
-
-        # add costs
-        # electricity
-        el_total_Wh = el_GHP_Wh
-        Opex_a_var_USD[3 + i][4] += sum(prices.ELEC_PRICE * el_total_Wh)  # CHF
-        GHG_tonCO2[3 + i][5] += sum(calc_emissions_Whyr_to_tonCO2yr(el_total_Wh, lca.EL_TO_CO2_EQ))  # ton CO2
-        # gas
-        Q_gas_total_Wh = Qgas_to_GHPBoiler_Wh + Qgas_to_Boiler_Wh
-        Opex_a_var_USD[3 + i][4] += sum(prices.NG_PRICE * Q_gas_total_Wh)  # CHF
-        GHG_tonCO2[3 + i][5] += sum(calc_emissions_Whyr_to_tonCO2yr(Q_gas_total_Wh, lca.NG_TO_CO2_EQ))  # ton CO2
-        # add activation
-        resourcesRes[3 + i][0] = sum(qhot_missing_Wh + q_load_NG_Boiler_Wh)
-        resourcesRes[3 + i][2] = sum(el_GHP_Wh)
-        resourcesRes[3 + i][3] = sum(q_from_GHP_Wh)
-
-        heating_dispatch[3 + i] = {'Q_GHP_gen_directload_W': q_from_GHP_Wh,
-                                   'Q_BackupBoiler_gen_directload_W': qhot_missing_Wh,
-                                   'Q_Boiler_gen_directload_W': q_load_NG_Boiler_Wh,
-                                   'GHP_Status': GHP_Status,
-                                   'BackupBoiler_Status': GHPbackupBoiler_Status,
-                                   'Boiler_Status': Boiler_Status,
-                                   'NG_BackupBoiler_req_Wh': Qgas_to_GHPBoiler_Wh,
-                                   'NG_Boiler_req_Wh': Qgas_to_Boiler_Wh,
-                                   'E_hs_ww_req_W': el_GHP_Wh}
+    # add costs
+    # electricity
+    el_total_Wh = el_GHP_Wh
+    Opex_a_var_USD[3:, 4] += np.sum(prices.ELEC_PRICE * el_total_Wh, axis=1)  # CHF
+    GHG_tonCO2[3:, 5] += np.sum(calc_emissions_Whyr_to_tonCO2yr(el_total_Wh, lca.EL_TO_CO2_EQ), axis=1)  # ton CO2
+    # gas
+    Q_gas_total_Wh = Qgas_to_GHPBoiler_Wh + Qgas_to_Boiler_Wh
+    Opex_a_var_USD[3:, 4] += np.sum(prices.NG_PRICE * Q_gas_total_Wh, axis=1)  # CHF
+    GHG_tonCO2[3:, 5] += np.sum(calc_emissions_Whyr_to_tonCO2yr(Q_gas_total_Wh, lca.NG_TO_CO2_EQ), axis=1)  # ton CO2
+    # add activation
+    resourcesRes[3:, 0] = np.sum(qhot_missing_Wh + q_load_NG_Boiler_Wh, axis=1)
+    resourcesRes[3:, 2] = np.sum(el_GHP_Wh, axis=1)
+    resourcesRes[3:, 3] = np.sum(q_from_GHP_Wh, axis=1)
+
+    for i in range(NUMBER_OF_GHP_CONFIGURATIONS):
+        heating_dispatch[3 + i] = {'Q_GHP_gen_directload_W': q_from_GHP_Wh[i],
+                                   'Q_BackupBoiler_gen_directload_W': qhot_missing_Wh[i],
+                                   'Q_Boiler_gen_directload_W': q_load_NG_Boiler_Wh[i],
+                                   'GHP_Status': GHP_Status[i],
+                                   'BackupBoiler_Status': GHPbackupBoiler_Status[i],
+                                   'Boiler_Status': Boiler_Status[i],
+                                   'NG_BackupBoiler_req_Wh': Qgas_to_GHPBoiler_Wh[i],
+                                   'NG_Boiler_req_Wh': Qgas_to_Boiler_Wh[i],
+                                   'E_hs_ww_req_W': el_GHP_Wh[i]}
     # Add all costs
     # 0: Boiler NG
     Capex_a_Boiler_USD, Opex_a_fixed_Boiler_USD, Capex_Boiler_USD = Boiler.calc_Cinv_boiler(Qnom_W, 'BO1',
@@ -226,7 +228,7 @@ def disconnected_heating_for_building(building_name, supply_systems, T_ground_K,
     Opex_a_fixed_USD[2][0] = Opex_fixed_FC_USD
     Capex_opex_a_fixed_only_USD[2][0] = Capex_a_FC_USD + Opex_fixed_FC_USD  # TODO:variable price?
     # 3-13: BOILER + GHP
-    for i in range(10):
+    for i in range(NUMBER_OF_GHP_CONFIGURATIONS):
         Opex_a_var_USD[3 + i][0] = i / 10.0  # Boiler share
         Opex_a_var_USD[3 + i][3] = 1 - i / 10.0  # GHP share
 
@@ -242,7 +244,7 @@ def disconnected_heating_for_building(building_name, supply_systems, T_ground_K,
             0] += Capex_a_Boiler_USD + Opex_a_fixed_Boiler_USD  # TODO:variable price?
 
         # Get back up boiler costs
-        Qnom_Backup_Boiler_W = Q_Boiler_for_GHP_W[i][0]
+        Qnom_Backup_Boiler_W = Q_Boiler_for_GHP_W[i]
         Capex_a_GHPBoiler_USD, Opex_a_fixed_GHPBoiler_USD, Capex_GHPBoiler_USD = Boiler.calc_Cinv_boiler(
             Qnom_Backup_Boiler_W, 'BO1', boiler_cost_data)
 
@@ -253,7 +255,7 @@ def disconnected_heating_for_building(building_name, supply_systems, T_ground_K,
             0] += Capex_a_GHPBoiler_USD + Opex_a_fixed_GHPBoiler_USD  # TODO:variable price?
 
         # Get ground source heat pump costs
-        Capex_a_GHP_USD, Opex_a_fixed_GHP_USD, Capex_GHP_USD = HP.calc_Cinv_GHP(GHP_el_size_W[i][0], GHP_cost_data,
+        Capex_a_GHP_USD, Opex_a_fixed_GHP_USD, Capex_GHP_USD = HP.calc_Cinv_GHP(GHP_el_size_W[i], GHP_cost_data,
                                                                                 BH_cost_data)
         Capex_total_USD[3 + i][0] += Capex_GHP_USD
         Capex_a_USD[3 + i][0] += Capex_a_GHP_USD
@@ -277,9 +279,8 @@ def disconnected_heating_for_building(building_name, supply_systems, T_ground_K,
     optsearch = np.empty(el)
     optsearch.fill(3)
     indexBest = 0
-    geothermal_potential = geothermal_potential_data.set_index('Name')
     # Check the GHP area constraint
-    for i in range(10):
+    for i in range(NUMBER_OF_GHP_CONFIGURATIONS):
         QGHP = (1 - i / 10.0) * Qnom_W
         areaAvail = geothermal_potential.loc[building_name, 'Area_geo']
         Qallowed = np.ceil(areaAvail / GHP_A) * GHP_HMAX_SIZE  # [W_th]
@@ -318,22 +319,71 @@ def disconnected_heating_for_building(building_name, supply_systems, T_ground_K,
     best_activation_df = pd.DataFrame.from_dict(heating_dispatch[indexBest])  #
     best_activation_df.to_csv(
         locator.get_optimization_decentralized_folder_building_result_heating_activation(building_name), index=False)
+    cache.store()
+
+
+def calc_GHP_configurations(Qnom_W, q_load_Wh, T_ground_K, Tret_K, Tsup_K, mdot_kgpers):
+    """
+    Operation of the configurations 3-12 (a NG boiler and a GHP with a backup boiler, the NG boiler supplies 0%, 10%,
+    ... 90% of the nominal load ``Qnom_W``). All configurations are calculated at once, with one row of the matrices per
+    configuration and one column per hour.
+
+    :return: the hourly operation of the configurations (matrices) and the peak capacities of the GHP and of the backup
+        boiler of each configuration (arrays)
+    :rtype: dict[str, np.ndarray]
+    """
+    boiler_share = np.arange(NUMBER_OF_GHP_CONFIGURATIONS)[:, None] / 10.0
+    QnomBoiler_W = boiler_share * Qnom_W
+    QnomGHP_W = Qnom_W - QnomBoiler_W
+
+    # GHP operation
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Texit_GHP_nom_K = QnomGHP_W / (mdot_kgpers * HEAT_CAPACITY_OF_WATER_JPERKGK) + Tret_K
+        el_GHP_Wh, q_load_NG_Boiler_Wh, \
+        qhot_missing_Wh, \
+        Texit_GHP_K, q_from_GHP_Wh = calc_GHP_operation(QnomGHP_W, T_ground_K, Texit_GHP_nom_K,
+                                                        Tret_K, Tsup_K, mdot_kgpers, q_load_Wh)
+    GHP_el_size_W = el_GHP_Wh.max(axis=1)  # Save peak capacity of GHP
+
+    # GHP Backup Boiler operation
+    Q_Boiler_for_GHP_W = qhot_missing_Wh.max(axis=1)  # Save peak capacity of GHP Backup Boilers
+    if Q_Boiler_for_GHP_W.max() > 0.0:
+        print("GHP unable to cover the whole demand, boiler activated!")
+    BoilerEff = Boiler.calc_Cop_boiler(qhot_missing_Wh, Q_Boiler_for_GHP_W[:, None], Texit_GHP_K)
+    Qgas_to_GHPBoiler_Wh = np.divide(qhot_missing_Wh, BoilerEff,
+                                     out=np.zeros_like(qhot_missing_Wh), where=BoilerEff != 0.0)
+
+    # NG Boiler operation
+    BoilerEff = Boiler.calc_Cop_boiler(q_load_NG_Boiler_Wh, QnomBoiler_W, Texit_GHP_K)
+    Qgas_to_Boiler_Wh = np.divide(q_load_NG_Boiler_Wh, BoilerEff,
+                                  out=np.zeros_like(q_load_NG_Boiler_Wh), where=BoilerEff != 0.0)
+
+    return {'el_GHP_Wh': el_GHP_Wh,
+            'q_load_NG_Boiler_Wh': q_load_NG_Boiler_Wh,
+            'qhot_missing_Wh': qhot_missing_Wh,
+            'q_from_GHP_Wh': q_from_GHP_Wh,
+            'Qgas_to_GHPBoiler_Wh': Qgas_to_GHPBoiler_Wh,
+            'Qgas_to_Boiler_Wh': Qgas_to_Boiler_Wh,
+            'GHP_el_size_W': GHP_el_size_W,
+            'Q_Boiler_for_GHP_W': Q_Boiler_for_GHP_W}
 
 
 def calc_GHP_operation(QnomGHP_W, T_ground_K, Texit_GHP_nom_K, Tret_K, Tsup_K, mdot_kgpers, q_load_Wh):
-    if q_load_Wh <= QnomGHP_W:
-        q_load_NG_Boiler_Wh = 0.0
-        (el_GHP_Wh, qcolddot_Wh, qhot_missing_Wh, tsup2_K) = HP.calc_Cop_GHP(T_ground_K,
-                                                                             mdot_kgpers,
-                                                                             Tsup_K, Tret_K)
-        q_from_GHP_Wh = q_load_Wh - qhot_missing_Wh
-
-    else:
-        (el_GHP_Wh, qcolddot_Wh, qhot_missing_Wh, tsup2_K) = HP.calc_Cop_GHP(T_ground_K,
-                                                                             mdot_kgpers,
-                                                                             Texit_GHP_nom_K, Tret_K)
-        q_from_GHP_Wh = QnomGHP_W - qhot_missing_Wh
-        q_load_NG_Boiler_Wh = q_load_Wh - QnomGHP_W
+    """
+    Operation of a ground source heat pump of the nominal size ``QnomGHP_W``, the load above the nominal size is
+    supplied by a NG boiler. The inputs are broadcast, e.g. to calculate several sizes (a column) for all hours (a row)
+    at once.
+
+    :return: the electricity of the GHP, the load of the NG boiler, the heat the GHP is missing (supplied by the
+        backup boiler), the supply temperature of the GHP and the heat supplied by the GHP
+    """
+    within_nominal_size = q_load_Wh <= QnomGHP_W
+    T_GHP_sup_K = np.where(within_nominal_size, Tsup_K, Texit_GHP_nom_K)
+    (el_GHP_Wh, qcolddot_Wh, qhot_missing_Wh, tsup2_K) = HP.calc_Cop_GHP(np.asarray(T_ground_K),
+                                                                         mdot_kgpers,
+                                                                         T_GHP_sup_K, Tret_K)
+    q_from_GHP_Wh = np.where(within_nominal_size, q_load_Wh, QnomGHP_W) - qhot_missing_Wh
+    q_load_NG_Boiler_Wh = np.where(within_nominal_size, 0.0, q_load_Wh - QnomGHP_W)
 
     return el_GHP_Wh, q_load_NG_Boiler_Wh, qhot_missing_Wh, tsup2_K, q_from_GHP_Wh
 
@@ -344,13 +394,12 @@ def calc_new_load(mdot_kgpers, TsupDH, Tret):
     :param mdot_kgpers: mass flow
     :param TsupDH: supply temeperature
     :param Tret: return temperature
-    :type mdot_kgpers: float
-    :type TsupDH: float
-    :type Tret: float
+    :type mdot_kgpers: float or np.ndarray
+    :type TsupDH: float or np.ndarray
+    :type Tret: float or np.ndarray
     :return: Qload_W: load of the distribution
-    :rtype: float
+    :rtype: float or np.ndarray
     """
     Qload_W = mdot_kgpers * HEAT_CAPACITY_OF_WATER_JPERKGK * (TsupDH - Tret)
-    if Qload_W < 0:
-        Qload_W = 0
+    Qload_W = np.where(Qload_W < 0, 0.0, Qload_W)
     return Qload_W
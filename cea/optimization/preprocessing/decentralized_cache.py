@@ -0,0 +1,85 @@
+"""
+Cache of the results of the decentralized supply systems of each building
+
+"""
+
+
+
+
+import hashlib
+import os
+import pickle
+
+
+def calc_database_hash(locator):
+    """
+    Version of the supply systems database: a hash of the conversion systems, distribution systems and feedstocks
+    databases of the scenario.
+
+    :param locator: InputLocator of the scenario
+    :rtype: str
+    """
+    return calc_inputs_hash([locator.get_database_conversion_systems(),
+                             locator.get_database_distribution_systems(),
+                             locator.get_database_feedstocks()])
+
+
+def calc_inputs_hash(paths, *inputs):
+    """
+    Hash of the contents of the files in ``paths`` and of the ``inputs`` (which must be picklable).
+
+    :param list paths: paths of the input files (a missing file is hashed as missing)
+    :param inputs: further inputs, e.g. the database hash, prices and lca
+    :rtype: str
+    """
+    inputs_hash = hashlib.sha256()
+    for path in paths:
+        inputs_hash.update(os.path.basename(path).encode('utf-8'))
+        if not os.path.exists(path):
+            inputs_hash.update(b'missing')
+            continue
+        with open(path, 'rb') as fp:
+            for chunk in iter(lambda: fp.read(1 << 20), b''):
+                inputs_hash.update(chunk)
+    inputs_hash.update(pickle.dumps(inputs, protocol=pickle.HIGHEST_PROTOCOL))
+    return inputs_hash.hexdigest()[:16]
+
+
+class DecentralizedCache(object):
+    """
+    Keeps the results of the decentralized supply systems of a building between runs of the preprocessing: the
+    results are only calculated again if the inputs of the building changed (e.g. its demand, the supply systems
+    database or the prices).
+
+    The hash of the inputs is written after the results, so results of an interrupted run are calculated again.
+    """
+
+    def __init__(self, locator, building_name, network_type, result_paths, inputs_hash):
+        """
+        :param locator: InputLocator of the scenario
+        :param str building_name: name of the building
+        :param str network_type: "DH" or "DC"
+        :param list result_paths: the result files of the building
+        :param str inputs_hash: hash of the inputs of the building (see :py:func:`calc_inputs_hash`)
+        """
+        self.hash_path = locator.get_optimization_decentralized_folder_building_inputs_hash(building_name,
+                                                                                            network_type)
+        self.result_paths = result_paths
+        self.inputs_hash = inputs_hash
+
+    def is_up_to_date(self):
+        """True if the results of the building were calculated with the same inputs"""
+        if not all(os.path.exists(path) for path in self.result_paths + [self.hash_path]):
+            return False
+        with open(self.hash_path, 'r') as fp:
+            return fp.read().strip() == self.inputs_hash
+
+    def invalidate(self):
+        """Remove the hash of the inputs, before the results are written"""
+        if os.path.exists(self.hash_path):
+            os.remove(self.hash_path)
+
+    def store(self):
+        """Store the hash of the inputs, after the results are written"""
+        with open(self.hash_path, 'w') as fp:
+            fp.write(self.inputs_hash)
@@ -10,6 +10,7 @@ It is considered that whenever the case, the most competitive alternative is to
 
 
 import pandas as pd
+from cea.demand.demand_writers import read_demand_results
 from cea.technologies import boiler
 from cea.technologies.constants import BOILER_ETA_HP
 from cea.constants import HOURS_IN_YEAR, WH_TO_J
@@ -37,7 +38,7 @@ def calc_pareto_Qhp(locator, total_demand, prices, lca):
 
         for name in df.Name :
             # Extract process heat needs
-            Qhpro_sys_kWh = pd.read_csv(locator.get_demand_results_file(name), usecols=["Qhpro_sys_kWh"]).Qhpro_sys_kWh.values
+            Qhpro_sys_kWh = read_demand_results(locator, name, columns=["Qhpro_sys_kWh"]).Qhpro_sys_kWh.values
 
             Qnom_Wh = 0
             Qannual_Wh = 0
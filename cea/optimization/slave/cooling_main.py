@@ -10,13 +10,14 @@ If Lake exhausted, then use other supply technologies
 
 
 import numpy as np
-import pandas as pd
 import cea.inputlocator
 
 from cea.constants import HOURS_IN_YEAR
 from cea.optimization.constants import T_TANK_FULLY_DISCHARGED_K, DT_COOL, VCC_T_COOL_IN, ACH_T_IN_FROM_CHP_K, VCC_CODE_CENTRALIZED
 from cea.optimization.master import cost_model
-from cea.optimization.slave.cooling_resource_activation import calc_vcc_CT_operation, cooling_resource_activator
+from cea.optimization.optimization_data import OptimizationData
+from cea.optimization.slave.cooling_resource_activation import calc_vcc_CT_operation, cooling_resource_activator, \
+    cooling_resource_dispatch
 from cea.optimization.slave.daily_storage.load_leveling import LoadLevelingDailyStorage
 from cea.technologies.chiller_vapor_compression import VaporCompressionChiller
 from cea.technologies.cogeneration import calc_cop_CCGT
@@ -71,7 +72,8 @@ def district_cooling_network(locator,
 
         # Import Data - potentials lake heat
         if master_to_slave_variables.WS_BaseVCC_on == 1 or master_to_slave_variables.WS_PeakVCC_on == 1:
-            HPlake_Data = pd.read_csv(locator.get_water_body_potential())
+            HPlake_Data = OptimizationData.for_locator(locator).csv_columns(locator.get_water_body_potential(),
+                                                                            ['QLake_kW', 'Ts_C'])
             Q_therm_Lake = np.array(HPlake_Data['QLake_kW']) * 1E3
             total_WS_VCC_installed = master_to_slave_variables.WS_BaseVCC_size_W + master_to_slave_variables.WS_PeakVCC_size_W
             Q_therm_Lake_W = [x if x < total_WS_VCC_installed else total_WS_VCC_installed for x in Q_therm_Lake]
@@ -81,74 +83,115 @@ def district_cooling_network(locator,
             T_source_average_Lake_K = np.zeros(HOURS_IN_YEAR)
 
         # get properties of technology used in this script
-        absorption_chiller = AbsorptionChiller(pd.read_excel(locator.get_database_conversion_systems(), sheet_name="Absorption_chiller"), 'double')
+        absorption_chiller = AbsorptionChiller(
+            OptimizationData.for_locator(locator).database_table(locator.get_database_conversion_systems(),
+                                                                 "Absorption_chiller"), 'double')
         CCGT_prop = calc_cop_CCGT(master_to_slave_variables.NG_Trigen_ACH_size_W, ACH_T_IN_FROM_CHP_K, "NG")
 
         scale = 'DISTRICT'
         VCC_chiller = VaporCompressionChiller(locator, scale)
 
-        # initialize variables
-        Q_Trigen_NG_gen_W = np.zeros(HOURS_IN_YEAR)
-        Q_BaseVCC_WS_gen_W = np.zeros(HOURS_IN_YEAR)
-        Q_PeakVCC_WS_gen_W = np.zeros(HOURS_IN_YEAR)
-        Q_BaseVCC_AS_gen_W = np.zeros(HOURS_IN_YEAR)
-        Q_PeakVCC_AS_gen_W = np.zeros(HOURS_IN_YEAR)
-        Q_DailyStorage_gen_directload_W = np.zeros(HOURS_IN_YEAR)
-
-        E_Trigen_NG_gen_W = np.zeros(HOURS_IN_YEAR)
-        E_BaseVCC_AS_req_W = np.zeros(HOURS_IN_YEAR)
-        E_PeakVCC_AS_req_W = np.zeros(HOURS_IN_YEAR)
-        E_BaseVCC_WS_req_W = np.zeros(HOURS_IN_YEAR)
-        E_PeakVCC_WS_req_W = np.zeros(HOURS_IN_YEAR)
-        NG_Trigen_req_W = np.zeros(HOURS_IN_YEAR)
-        Q_BackupVCC_AS_gen_W = np.zeros(HOURS_IN_YEAR)
+        if daily_storage.storage_on:
+            # the state of the daily storage carries over to the next hour, so the hours are dispatched in order
+            # initialize variables
+            Q_Trigen_NG_gen_W = np.zeros(HOURS_IN_YEAR)
+            Q_BaseVCC_WS_gen_W = np.zeros(HOURS_IN_YEAR)
+            Q_PeakVCC_WS_gen_W = np.zeros(HOURS_IN_YEAR)
+            Q_BaseVCC_AS_gen_W = np.zeros(HOURS_IN_YEAR)
+            Q_PeakVCC_AS_gen_W = np.zeros(HOURS_IN_YEAR)
+            Q_DailyStorage_gen_directload_W = np.zeros(HOURS_IN_YEAR)
+
+            E_Trigen_NG_gen_W = np.zeros(HOURS_IN_YEAR)
+            E_BaseVCC_AS_req_W = np.zeros(HOURS_IN_YEAR)
+            E_PeakVCC_AS_req_W = np.zeros(HOURS_IN_YEAR)
+            E_BaseVCC_WS_req_W = np.zeros(HOURS_IN_YEAR)
+            E_PeakVCC_WS_req_W = np.zeros(HOURS_IN_YEAR)
+            NG_Trigen_req_W = np.zeros(HOURS_IN_YEAR)
+            Q_BackupVCC_AS_gen_W = np.zeros(HOURS_IN_YEAR)
+
+            Q_Trigen_NG_gen_directload_W = np.zeros(HOURS_IN_YEAR)
+            Q_BaseVCC_WS_gen_directload_W = np.zeros(HOURS_IN_YEAR)
+            Q_PeakVCC_WS_gen_directload_W = np.zeros(HOURS_IN_YEAR)
+            Q_BaseVCC_AS_gen_directload_W = np.zeros(HOURS_IN_YEAR)
+            Q_PeakVCC_AS_gen_directload_W = np.zeros(HOURS_IN_YEAR)
+            Q_BackupVCC_AS_directload_W = np.zeros(HOURS_IN_YEAR)
+
+            for hour in range(HOURS_IN_YEAR):  # cooling supply for all buildings excluding cooling loads from data centers
+                if Q_thermal_req_W[hour] > 0.0:  # only if there is a cooling load!
+                    daily_storage, \
+                    thermal_output, \
+                    electricity_output, \
+                    gas_output = cooling_resource_activator(Q_thermal_req_W[hour],
+                                                            T_district_cooling_supply_K[hour],
+                                                            T_district_cooling_return_K[hour],
+                                                            Q_therm_Lake_W[hour],
+                                                            T_source_average_Lake_K[hour],
+                                                            daily_storage,
+                                                            T_ground_K[hour],
+                                                            master_to_slave_variables,
+                                                            absorption_chiller,
+                                                            CCGT_prop,
+                                                            VCC_chiller)
+
+                    Q_DailyStorage_gen_directload_W[hour] = thermal_output['Q_DailyStorage_gen_directload_W']
+                    Q_Trigen_NG_gen_directload_W[hour] = thermal_output['Q_Trigen_NG_gen_directload_W']
+                    Q_BaseVCC_WS_gen_directload_W[hour] = thermal_output['Q_BaseVCC_WS_gen_directload_W']
+                    Q_PeakVCC_WS_gen_directload_W[hour] = thermal_output['Q_PeakVCC_WS_gen_directload_W']
+                    Q_BaseVCC_AS_gen_directload_W[hour] = thermal_output['Q_BaseVCC_AS_gen_directload_W']
+                    Q_PeakVCC_AS_gen_directload_W[hour] = thermal_output['Q_PeakVCC_AS_gen_directload_W']
+                    Q_BackupVCC_AS_directload_W[hour] = thermal_output['Q_BackupVCC_AS_directload_W']
+
+                    Q_Trigen_NG_gen_W[hour] = thermal_output['Q_Trigen_NG_gen_W']
+                    Q_BaseVCC_WS_gen_W[hour] = thermal_output['Q_BaseVCC_WS_gen_W']
+                    Q_PeakVCC_WS_gen_W[hour] = thermal_output['Q_PeakVCC_WS_gen_W']
+                    Q_BaseVCC_AS_gen_W[hour] = thermal_output['Q_BaseVCC_AS_gen_W']
+                    Q_PeakVCC_AS_gen_W[hour] = thermal_output['Q_PeakVCC_AS_gen_W']
+                    Q_BackupVCC_AS_gen_W[hour] = thermal_output['Q_BackupVCC_AS_gen_W']
+
+                    E_BaseVCC_WS_req_W[hour] = electricity_output['E_BaseVCC_WS_req_W']
+                    E_PeakVCC_WS_req_W[hour] = electricity_output['E_PeakVCC_WS_req_W']
+                    E_BaseVCC_AS_req_W[hour] = electricity_output['E_BaseVCC_AS_req_W']
+                    E_PeakVCC_AS_req_W[hour] = electricity_output['E_PeakVCC_AS_req_W']
+                    E_Trigen_NG_gen_W[hour] = electricity_output['E_Trigen_NG_gen_W']
+
+                    NG_Trigen_req_W[hour] = gas_output['NG_Trigen_req_W']
 
-        Q_Trigen_NG_gen_directload_W = np.zeros(HOURS_IN_YEAR)
-        Q_BaseVCC_WS_gen_directload_W = np.zeros(HOURS_IN_YEAR)
-        Q_PeakVCC_WS_gen_directload_W = np.zeros(HOURS_IN_YEAR)
-        Q_BaseVCC_AS_gen_directload_W = np.zeros(HOURS_IN_YEAR)
-        Q_PeakVCC_AS_gen_directload_W = np.zeros(HOURS_IN_YEAR)
-        Q_BackupVCC_AS_directload_W = np.zeros(HOURS_IN_YEAR)
-
-        for hour in range(HOURS_IN_YEAR):  # cooling supply for all buildings excluding cooling loads from data centers
-            if Q_thermal_req_W[hour] > 0.0:  # only if there is a cooling load!
-                daily_storage, \
-                thermal_output, \
-                electricity_output, \
-                gas_output = cooling_resource_activator(Q_thermal_req_W[hour],
-                                                        T_district_cooling_supply_K[hour],
-                                                        T_district_cooling_return_K[hour],
-                                                        Q_therm_Lake_W[hour],
-                                                        T_source_average_Lake_K[hour],
-                                                        daily_storage,
-                                                        T_ground_K[hour],
-                                                        master_to_slave_variables,
-                                                        absorption_chiller,
-                                                        CCGT_prop,
-                                                        VCC_chiller)
-
-                Q_DailyStorage_gen_directload_W[hour] = thermal_output['Q_DailyStorage_gen_directload_W']
-                Q_Trigen_NG_gen_directload_W[hour] = thermal_output['Q_Trigen_NG_gen_directload_W']
-                Q_BaseVCC_WS_gen_directload_W[hour] = thermal_output['Q_BaseVCC_WS_gen_directload_W']
-                Q_PeakVCC_WS_gen_directload_W[hour] = thermal_output['Q_PeakVCC_WS_gen_directload_W']
-                Q_BaseVCC_AS_gen_directload_W[hour] = thermal_output['Q_BaseVCC_AS_gen_directload_W']
-                Q_PeakVCC_AS_gen_directload_W[hour] = thermal_output['Q_PeakVCC_AS_gen_directload_W']
-                Q_BackupVCC_AS_directload_W[hour] = thermal_output['Q_BackupVCC_AS_directload_W']
-
-                Q_Trigen_NG_gen_W[hour] = thermal_output['Q_Trigen_NG_gen_W']
-                Q_BaseVCC_WS_gen_W[hour] = thermal_output['Q_BaseVCC_WS_gen_W']
-                Q_PeakVCC_WS_gen_W[hour] = thermal_output['Q_PeakVCC_WS_gen_W']
-                Q_BaseVCC_AS_gen_W[hour] = thermal_output['Q_BaseVCC_AS_gen_W']
-                Q_PeakVCC_AS_gen_W[hour] = thermal_output['Q_PeakVCC_AS_gen_W']
-                Q_BackupVCC_AS_gen_W[hour] = thermal_output['Q_BackupVCC_AS_gen_W']
-
-                E_BaseVCC_WS_req_W[hour] = electricity_output['E_BaseVCC_WS_req_W']
-                E_PeakVCC_WS_req_W[hour] = electricity_output['E_PeakVCC_WS_req_W']
-                E_BaseVCC_AS_req_W[hour] = electricity_output['E_BaseVCC_AS_req_W']
-                E_PeakVCC_AS_req_W[hour] = electricity_output['E_PeakVCC_AS_req_W']
-                E_Trigen_NG_gen_W[hour] = electricity_output['E_Trigen_NG_gen_W']
-
-                NG_Trigen_req_W[hour] = gas_output['NG_Trigen_req_W']
+        else:
+            thermal_output, \
+            electricity_output, \
+            gas_output = cooling_resource_dispatch(Q_thermal_req_W,
+                                                   T_district_cooling_supply_K,
+                                                   T_district_cooling_return_K,
+                                                   Q_therm_Lake_W,
+                                                   T_source_average_Lake_K,
+                                                   T_ground_K,
+                                                   master_to_slave_variables,
+                                                   absorption_chiller,
+                                                   CCGT_prop,
+                                                   VCC_chiller)
+
+            Q_DailyStorage_gen_directload_W = thermal_output['Q_DailyStorage_gen_directload_W']
+            Q_Trigen_NG_gen_directload_W = thermal_output['Q_Trigen_NG_gen_directload_W']
+            Q_BaseVCC_WS_gen_directload_W = thermal_output['Q_BaseVCC_WS_gen_directload_W']
+            Q_PeakVCC_WS_gen_directload_W = thermal_output['Q_PeakVCC_WS_gen_directload_W']
+            Q_BaseVCC_AS_gen_directload_W = thermal_output['Q_BaseVCC_AS_gen_directload_W']
+            Q_PeakVCC_AS_gen_directload_W = thermal_output['Q_PeakVCC_AS_gen_directload_W']
+            Q_BackupVCC_AS_directload_W = thermal_output['Q_BackupVCC_AS_directload_W']
+
+            Q_Trigen_NG_gen_W = thermal_output['Q_Trigen_NG_gen_W']
+            Q_BaseVCC_WS_gen_W = thermal_output['Q_BaseVCC_WS_gen_W']
+            Q_PeakVCC_WS_gen_W = thermal_output['Q_PeakVCC_WS_gen_W']
+            Q_BaseVCC_AS_gen_W = thermal_output['Q_BaseVCC_AS_gen_W']
+            Q_PeakVCC_AS_gen_W = thermal_output['Q_PeakVCC_AS_gen_W']
+            Q_BackupVCC_AS_gen_W = thermal_output['Q_BackupVCC_AS_gen_W']
+
+            E_BaseVCC_WS_req_W = electricity_output['E_BaseVCC_WS_req_W']
+            E_PeakVCC_WS_req_W = electricity_output['E_PeakVCC_WS_req_W']
+            E_BaseVCC_AS_req_W = electricity_output['E_BaseVCC_AS_req_W']
+            E_PeakVCC_AS_req_W = electricity_output['E_PeakVCC_AS_req_W']
+            E_Trigen_NG_gen_W = electricity_output['E_Trigen_NG_gen_W']
+
+            NG_Trigen_req_W = gas_output['NG_Trigen_req_W']
 
         #calculate the electrical capacity as a function of the peak produced by the turbine
         master_to_slave_variables.NG_Trigen_CCGT_size_electrical_W = E_Trigen_NG_gen_W.max()
@@ -158,12 +201,12 @@ def district_cooling_network(locator,
         size_chiller_CT = master_to_slave_variables.AS_BackupVCC_size_W
         if master_to_slave_variables.AS_BackupVCC_size_W != 0.0:
             master_to_slave_variables.AS_BackupVCC_on = 1
-            Q_BackupVCC_AS_gen_W, E_BackupVCC_AS_req_W = np.vectorize(calc_vcc_CT_operation)(Q_BackupVCC_AS_gen_W,
-                                                                                             T_district_cooling_return_K,
-                                                                                             T_district_cooling_supply_K,
-                                                                                             VCC_T_COOL_IN,
-                                                                                             size_chiller_CT,
-                                                                                             VCC_chiller)
+            Q_BackupVCC_AS_gen_W, E_BackupVCC_AS_req_W = calc_vcc_CT_operation(Q_BackupVCC_AS_gen_W,
+                                                                               T_district_cooling_return_K,
+                                                                               T_district_cooling_supply_K,
+                                                                               VCC_T_COOL_IN,
+                                                                               size_chiller_CT,
+                                                                               VCC_chiller)
         else:
             E_BackupVCC_AS_req_W = np.zeros(HOURS_IN_YEAR)
 
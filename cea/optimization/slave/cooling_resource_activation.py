@@ -9,6 +9,7 @@ import cea.technologies.chiller_vapor_compression as chiller_vapor_compression
 import cea.technologies.cooling_tower as CTModel
 from cea.constants import HEAT_CAPACITY_OF_WATER_JPERKGK
 from cea.optimization.constants import VCC_T_COOL_IN, DT_COOL, ACH_T_IN_FROM_CHP_K
+from cea.optimization.slave.dispatch import capped, hourly, operate
 from cea.technologies.constants import G_VALUE_CENTRALIZED  # this is where to differentiate chiller performances
 from cea.technologies.pumps import calc_water_body_uptake_pumping
 import cea.technologies.chiller_absorption
@@ -25,7 +26,7 @@ __status__ = "Production"
 
 
 def calc_vcc_operation(Qc_from_VCC_W, T_DCN_re_K, T_DCN_sup_K, T_source_K, chiller_size, VCC_chiller):
-    Qc_from_VCC_W = min(Qc_from_VCC_W, chiller_size) # The chiller can not supply more cooling than the installed capacity allows
+    Qc_from_VCC_W = np.minimum(Qc_from_VCC_W, chiller_size) # The chiller can not supply more cooling than the installed capacity allows
     VCC_operation = chiller_vapor_compression.calc_VCC(chiller_size, Qc_from_VCC_W, T_DCN_sup_K, T_DCN_re_K, T_source_K, VCC_chiller)
 
     # unpack outputs
@@ -59,11 +60,9 @@ def calc_vcc_CT_operation(Qc_from_VCC_W,
 
 def calc_chiller_absorption_operation(Qc_ACH_req_W, T_DCN_re_K, T_DCN_sup_K, T_ACH_in_C, T_ground_K, chiller_prop,
                                       size_ACH_W):
-    if T_DCN_re_K == T_DCN_sup_K:
-        mdot_ACH_kgpers = 0
-    else:
-        mdot_ACH_kgpers = Qc_ACH_req_W / (
-                (T_DCN_re_K - T_DCN_sup_K) * HEAT_CAPACITY_OF_WATER_JPERKGK)  # required chw flow rate from ACH
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mdot_ACH_kgpers = np.where(T_DCN_re_K == T_DCN_sup_K, 0.0, Qc_ACH_req_W / (
+                (T_DCN_re_K - T_DCN_sup_K) * HEAT_CAPACITY_OF_WATER_JPERKGK))  # required chw flow rate from ACH
 
     ACH_operation = chiller_absorption.calc_chiller_main(mdot_ACH_kgpers,
                                                          T_DCN_sup_K,
@@ -168,12 +167,12 @@ def cooling_resource_activator(Q_thermal_req,
             if Qh_CCGT_req_W <= Q_output_CC_max_W:  # Normal operation Possible within partload regime
                 Q_CHP_gen_W = float(Qh_CCGT_req_W)
                 NG_Trigen_req_W = Q_used_prim_CC_fn_W(Q_CHP_gen_W)
-                E_Trigen_NG_gen_W = np.float(eta_elec_interpol(NG_Trigen_req_W)) * NG_Trigen_req_W
+                E_Trigen_NG_gen_W = float(eta_elec_interpol(NG_Trigen_req_W)) * NG_Trigen_req_W
 
             else:  # Only part of the demand can be delivered as 100% load achieved
                 Q_CHP_gen_W = Q_output_CC_max_W
                 NG_Trigen_req_W = Q_used_prim_CC_fn_W(Q_CHP_gen_W)
-                E_Trigen_NG_gen_W = np.float(eta_elec_interpol(NG_Trigen_req_W)) * NG_Trigen_req_W
+                E_Trigen_NG_gen_W = float(eta_elec_interpol(NG_Trigen_req_W)) * NG_Trigen_req_W
         else:
             Q_Trigen_gen_W = 0.0
             NG_Trigen_req_W = 0.0
@@ -390,3 +389,222 @@ def cooling_resource_activator(Q_thermal_req,
     }
 
     return daily_storage_class, thermal_output, electricity_output, gas_output
+
+
+def cooling_resource_dispatch(Q_thermal_req_W,
+                              T_district_cooling_supply_K,
+                              T_district_cooling_return_K,
+                              Q_therm_Lake_W,
+                              T_source_average_Lake_K,
+                              T_ground_K,
+                              master_to_slave_variables,
+                              absorption_chiller,
+                              CCGT_operation_data,
+                              VCC_chiller):
+    """
+    Dispatch of the cooling units of the district cooling network for all hours at once, when there is no daily
+    storage. The units supply the requirement in the same order as in :py:func:`cooling_resource_activator` (which
+    dispatches one hour at a time, as the state of the daily storage carries over from one hour to the next).
+
+    :param Q_thermal_req_W: hourly cooling requirement of the network
+    :param T_district_cooling_supply_K: hourly supply temperature of the network
+    :param T_district_cooling_return_K: hourly return temperature of the network
+    :param Q_therm_Lake_W: hourly potential of the lake
+    :param T_source_average_Lake_K: hourly temperature of the lake
+    :param T_ground_K: hourly temperature of the ground
+    :param master_to_slave_variables:
+    :param cea.technologies.chiller_absorption.AbsorptionChiller absorption_chiller:
+    :param CCGT_operation_data:
+    :param VCC_chiller:
+    :return: thermal_output, electricity_output, gas_output with the same keys as the outputs of
+        :py:func:`cooling_resource_activator` and an array of all hours for each key
+    """
+    ## initializing unmet cooling load
+    Q_cooling_unmet_W = np.array(Q_thermal_req_W, dtype=float)
+    number_of_hours = len(Q_cooling_unmet_W)
+    T_district_cooling_supply_K = hourly(T_district_cooling_supply_K, number_of_hours)
+    T_district_cooling_return_K = hourly(T_district_cooling_return_K, number_of_hours)
+    Q_therm_Lake_W = hourly(Q_therm_Lake_W, number_of_hours)
+    T_source_average_Lake_K = hourly(T_source_average_Lake_K, number_of_hours)
+    T_ground_K = hourly(T_ground_K, number_of_hours)
+    network_operating = ~np.isclose(T_district_cooling_supply_K, T_district_cooling_return_K)
+
+    ## ACTIVATE THE TRIGEN
+    size_trigen_W = master_to_slave_variables.NG_Trigen_ACH_size_W
+    operating = (master_to_slave_variables.NG_Trigen_on == 1) & (Q_cooling_unmet_W > 0.0) & network_operating
+    Q_Trigen_gen_W = np.where(operating, capped(Q_cooling_unmet_W, size_trigen_W), 0.0)
+
+    # GET THE ABSORPTION CHILLER PERFORMANCE
+    T_ACH_in_C = ACH_T_IN_FROM_CHP_K - 273
+    Qc_CT_ACH_W, \
+    Qh_CCGT_req_W, \
+    E_ACH_req_W = operate(calc_chiller_absorption_operation, operating, 3,
+                          Q_Trigen_gen_W,
+                          T_district_cooling_return_K,
+                          T_district_cooling_supply_K,
+                          T_ACH_in_C,
+                          T_ground_K,
+                          absorption_chiller,
+                          size_trigen_W,
+                          array_native=True)
+
+    # operation of the CCGT, possible if above minimal load
+    Q_used_prim_CC_fn_W = CCGT_operation_data['q_input_fn_q_output_W']
+    q_output_CC_min_W = CCGT_operation_data['q_output_min_W']
+    Q_output_CC_max_W = CCGT_operation_data['q_output_max_W']
+    eta_elec_interpol = CCGT_operation_data['eta_el_fn_q_input']
+    operating = operating & (Qh_CCGT_req_W >= q_output_CC_min_W)
+    Q_Trigen_gen_W = np.where(operating, Q_Trigen_gen_W, 0.0)
+    Q_Trigen_NG_gen_directload_W = Q_Trigen_gen_W
+    NG_Trigen_req_W = np.zeros(number_of_hours)
+    E_Trigen_NG_gen_W = np.zeros(number_of_hours)
+    if operating.any():
+        # only part of the demand can be delivered above 100% load
+        Q_CHP_gen_W = np.where(Qh_CCGT_req_W[operating] <= Q_output_CC_max_W, Qh_CCGT_req_W[operating],
+                               Q_output_CC_max_W)
+        NG_Trigen_req_W[operating] = Q_used_prim_CC_fn_W(Q_CHP_gen_W)
+        E_Trigen_NG_gen_W[operating] = eta_elec_interpol(NG_Trigen_req_W[operating]) * NG_Trigen_req_W[operating]
+
+    # update unmet cooling load
+    Q_cooling_unmet_W = Q_cooling_unmet_W - Q_Trigen_NG_gen_directload_W
+
+    # Base VCC water-source
+    Q_BaseVCC_WS_gen_directload_W, \
+    Q_BaseVCC_WS_gen_W, \
+    E_BaseVCC_WS_req_W = dispatch_water_source_vcc(master_to_slave_variables.WS_BaseVCC_on,
+                                                   master_to_slave_variables.WS_BaseVCC_size_W,
+                                                   Q_cooling_unmet_W,
+                                                   Q_therm_Lake_W,
+                                                   T_source_average_Lake_K,
+                                                   T_district_cooling_supply_K,
+                                                   T_district_cooling_return_K,
+                                                   network_operating,
+                                                   VCC_chiller)
+    Q_therm_Lake_W = Q_therm_Lake_W - Q_BaseVCC_WS_gen_W  # discount availability
+    Q_cooling_unmet_W = Q_cooling_unmet_W - Q_BaseVCC_WS_gen_W
+
+    # Peak VCC water-source
+    Q_PeakVCC_WS_gen_directload_W, \
+    Q_PeakVCC_WS_gen_W, \
+    E_PeakVCC_WS_req_W = dispatch_water_source_vcc(master_to_slave_variables.WS_PeakVCC_on,
+                                                   master_to_slave_variables.WS_PeakVCC_size_W,
+                                                   Q_cooling_unmet_W,
+                                                   Q_therm_Lake_W,
+                                                   T_source_average_Lake_K,
+                                                   T_district_cooling_supply_K,
+                                                   T_district_cooling_return_K,
+                                                   network_operating,
+                                                   VCC_chiller)
+    Q_cooling_unmet_W = Q_cooling_unmet_W - Q_PeakVCC_WS_gen_W
+
+    # Base VCC air-source with a cooling tower
+    size_AS_BaseVCC_W = master_to_slave_variables.AS_BaseVCC_size_W
+    operating = (master_to_slave_variables.AS_BaseVCC_on == 1) & (Q_cooling_unmet_W > 0.0) & network_operating
+    Q_BaseVCC_AS_gen_directload_W = np.where(operating, capped(Q_cooling_unmet_W, size_AS_BaseVCC_W), 0.0)
+    Q_BaseVCC_AS_gen_W, E_BaseVCC_AS_req_W = operate(calc_vcc_CT_operation, operating, 2,
+                                                     Q_BaseVCC_AS_gen_directload_W,
+                                                     T_district_cooling_return_K,
+                                                     T_district_cooling_supply_K,
+                                                     VCC_T_COOL_IN,
+                                                     size_AS_BaseVCC_W,
+                                                     VCC_chiller,
+                                                     array_native=True)
+    Q_cooling_unmet_W = Q_cooling_unmet_W - Q_BaseVCC_AS_gen_directload_W
+
+    # Peak VCC air-source with a cooling tower
+    size_AS_PeakVCC_W = master_to_slave_variables.AS_PeakVCC_size_W
+    operating = (master_to_slave_variables.AS_PeakVCC_on == 1) & (Q_cooling_unmet_W > 0.0) & network_operating
+    Q_PeakVCC_AS_gen_directload_W = np.where(operating, capped(Q_cooling_unmet_W, size_AS_PeakVCC_W), 0.0)
+    Q_PeakVCC_AS_gen_W, E_PeakVCC_AS_req_W = operate(calc_vcc_CT_operation, operating, 2,
+                                                     Q_PeakVCC_AS_gen_directload_W,
+                                                     T_district_cooling_return_K,
+                                                     T_district_cooling_supply_K,
+                                                     VCC_T_COOL_IN,
+                                                     size_AS_PeakVCC_W,
+                                                     VCC_chiller,
+                                                     array_native=True)
+    # the direct load of the base VCC is only reported in the hours the peak VCC operates, like in
+    # cooling_resource_activator
+    Q_BaseVCC_AS_gen_directload_W = np.where(operating, Q_BaseVCC_AS_gen_directload_W, 0.0)
+    Q_cooling_unmet_W = Q_cooling_unmet_W - Q_PeakVCC_AS_gen_directload_W
+
+    # this will become the back-up chiller
+    Q_BackupVCC_AS_gen_W = np.where(Q_cooling_unmet_W > 1.0E-3, Q_cooling_unmet_W, 0.0)
+    Q_BackupVCC_AS_directload_W = Q_BackupVCC_AS_gen_W
+
+    ## writing outputs
+    electricity_output = {
+        'E_BaseVCC_WS_req_W': E_BaseVCC_WS_req_W,
+        'E_PeakVCC_WS_req_W': E_PeakVCC_WS_req_W,
+        'E_BaseVCC_AS_req_W': E_BaseVCC_AS_req_W,
+        'E_PeakVCC_AS_req_W': E_PeakVCC_AS_req_W,
+        'E_Trigen_NG_gen_W': E_Trigen_NG_gen_W
+    }
+
+    thermal_output = {
+        # cooling total
+        'Q_Trigen_NG_gen_W': Q_Trigen_gen_W,
+        'Q_BaseVCC_WS_gen_W': Q_BaseVCC_WS_gen_W,
+        'Q_PeakVCC_WS_gen_W': Q_PeakVCC_WS_gen_W,
+        'Q_BaseVCC_AS_gen_W': Q_BaseVCC_AS_gen_W,
+        'Q_PeakVCC_AS_gen_W': Q_PeakVCC_AS_gen_W,
+        'Q_BackupVCC_AS_gen_W': Q_BackupVCC_AS_gen_W,
+
+        # cooling to direct load
+        'Q_DailyStorage_gen_directload_W': np.zeros(number_of_hours),
+        "Q_Trigen_NG_gen_directload_W": Q_Trigen_NG_gen_directload_W,
+        "Q_BaseVCC_WS_gen_directload_W": Q_BaseVCC_WS_gen_directload_W,
+        "Q_PeakVCC_WS_gen_directload_W": Q_PeakVCC_WS_gen_directload_W,
+        "Q_BaseVCC_AS_gen_directload_W": Q_BaseVCC_AS_gen_directload_W,
+        "Q_PeakVCC_AS_gen_directload_W": Q_PeakVCC_AS_gen_directload_W,
+        "Q_BackupVCC_AS_directload_W": Q_BackupVCC_AS_directload_W,
+    }
+
+    gas_output = {
+        'NG_Trigen_req_W': NG_Trigen_req_W
+    }
+
+    return thermal_output, electricity_output, gas_output
+
+
+def dispatch_water_source_vcc(VCC_on,
+                              size_VCC_W,
+                              Q_cooling_unmet_W,
+                              Q_therm_Lake_W,
+                              T_source_average_Lake_K,
+                              T_district_cooling_supply_K,
+                              T_district_cooling_return_K,
+                              network_operating,
+                              VCC_chiller):
+    """
+    Dispatch of a VCC with the lake as water source for all hours. Free cooling is possible from the lake if it is
+    colder than the supply temperature of the network, otherwise the VCC uses the lake water as source if it is colder
+    than the source of a cooling tower.
+
+    :return: the hourly direct load, cooling generated and electricity required of the VCC
+    :rtype: tuple[np.ndarray, np.ndarray, np.ndarray]
+    """
+    operating = (VCC_on == 1) & (Q_cooling_unmet_W > 0.0) & (
+            T_source_average_Lake_K < VCC_T_COOL_IN) & network_operating
+    # limiting factors being the size and the thermal capacity of the lake
+    Q_VCC_gen_directload_W = np.where(operating, capped(Q_cooling_unmet_W, np.minimum(size_VCC_W, Q_therm_Lake_W)),
+                                      0.0)
+    chiller_operating = operating & (T_district_cooling_supply_K - DT_COOL < T_source_average_Lake_K)
+    Q_chiller_gen_W, E_chiller_req_W = operate(calc_vcc_operation, chiller_operating, 2,
+                                               Q_VCC_gen_directload_W,
+                                               T_district_cooling_return_K,
+                                               T_district_cooling_supply_K,
+                                               T_source_average_Lake_K,
+                                               size_VCC_W,
+                                               VCC_chiller,
+                                               array_native=True)
+    Q_VCC_gen_W = np.where(chiller_operating, Q_chiller_gen_W, Q_VCC_gen_directload_W)
+
+    # Delta P from linearization after distribution optimization
+    E_pump_WS_req_W, = operate(calc_water_body_uptake_pumping, operating, 1,
+                               Q_VCC_gen_W,
+                               T_district_cooling_return_K,
+                               T_district_cooling_supply_K)
+    E_VCC_req_W = E_chiller_req_W + E_pump_WS_req_W
+
+    return Q_VCC_gen_directload_W, Q_VCC_gen_W, E_VCC_req_W
@@ -0,0 +1,47 @@
+"""
+Helpers of the hourly dispatch of the supply units of the slave routines, which runs on arrays of all hours at once
+
+"""
+
+
+
+
+import numpy as np
+
+
+def hourly(value, number_of_hours):
+    """Return ``value`` (an array of all hours or a constant) as a float array of all hours"""
+    return np.broadcast_to(np.asarray(value, dtype=float), (number_of_hours,))
+
+
+def capped(Q_unmet_W, Q_max_W):
+    """The part of the unmet load a unit with the (hourly) capacity ``Q_max_W`` can supply (``Q_max_W`` if exceeded)"""
+    return np.where(Q_unmet_W > Q_max_W, Q_max_W, Q_unmet_W)
+
+
+def operate(model, operating, number_of_outputs, *args, array_native=False):
+    """
+    Operate a supply unit in the hours it is dispatched. The ``model`` of the unit is only called for the hours where
+    ``operating`` is true: once with the arrays of these hours if the model is ``array_native``, otherwise one hour at
+    a time.
+
+    :param model: ``model(*args)`` returns the outputs of the unit (a tuple if ``number_of_outputs`` > 1)
+    :param np.ndarray operating: True in the hours the unit is dispatched
+    :param int number_of_outputs: number of outputs of the model
+    :param args: the arguments of the model, arrays of all hours or constants
+    :param bool array_native: the model takes and returns arrays of hours
+    :return: an array of all hours of each output (zero in the hours the unit is not dispatched)
+    :rtype: tuple[np.ndarray]
+    """
+    outputs = np.zeros((number_of_outputs, len(operating)))
+    if array_native:
+        if operating.any():
+            result = model(*[arg[operating] if isinstance(arg, np.ndarray) else arg for arg in args])
+            for output, values in zip(outputs, result if number_of_outputs > 1 else [result]):
+                output[operating] = values
+        return tuple(outputs)
+
+    for hour in np.flatnonzero(operating):
+        result = model(*[arg[hour] if isinstance(arg, np.ndarray) else arg for arg in args])
+        outputs[:, hour] = result if number_of_outputs > 1 else [result]
+    return tuple(outputs)
@@ -12,11 +12,11 @@ and recalculates the imports from grid and exports to the grid
 import os
 
 import numpy as np
-import pandas as pd
 
 import cea.technologies.solar.photovoltaic as pv
 from cea.constants import HOURS_IN_YEAR
 from cea.optimization.master.emissions_model import calc_emissions_Whyr_to_tonCO2yr
+from cea.optimization.optimization_data import OptimizationData
 
 __author__ = "Sreepathi Bhargava Krishna"
 __copyright__ = "Copyright 2018, Architecture and Building Systems - ETH Zurich"
@@ -27,6 +27,9 @@ __maintainer__ = "Daren Thomas"
 __email__ = "cea@arch.ethz.ch"
 __status__ = "Production"
 
+# columns of the demand results used by the electricity and natural gas balances
+DEMAND_COLUMNS = ['E_cs_kWh', 'E_cre_kWh', 'E_cdata_kWh', 'E_hs_kWh', 'E_ww_kWh', 'NG_hs_kWh', 'NG_ww_kWh']
+
 
 def electricity_calculations_of_all_buildings(locator, master_to_slave_vars,
                                               district_heating_generation_dispatch,
@@ -78,13 +81,13 @@ def electricity_calculations_of_all_buildings(locator, master_to_slave_vars,
     E_PV_gen_export_W, \
     E_PVT_gen_directload_W, \
     E_PVT_gen_export_W, \
-    E_GRID_directload_W = np.vectorize(electricity_activation_curve)(E_CHP_gen_W,
-                                                                     E_PVT_gen_W,
-                                                                     E_Furnace_dry_gen_W,
-                                                                     E_Furnace_wet_gen_W,
-                                                                     E_Trigen_NG_gen_W,
-                                                                     E_PV_gen_W,
-                                                                     E_sys_req_W)
+    E_GRID_directload_W = electricity_activation_curve(E_CHP_gen_W,
+                                                       E_PVT_gen_W,
+                                                       E_Furnace_dry_gen_W,
+                                                       E_Furnace_wet_gen_W,
+                                                       E_Trigen_NG_gen_W,
+                                                       E_PV_gen_W,
+                                                       E_sys_req_W)
 
     district_electricity_dispatch = {'E_CHP_gen_directload_W': E_CHP_gen_directload_W,
                                      'E_CHP_gen_export_W': E_CHP_gen_export_W,
@@ -173,107 +176,30 @@ def electricity_activation_curve(E_CHP_gen_W,
                                  E_Trigen_NG_gen_W,
                                  E_PV_gen_W,
                                  E_req_hour_W):
-    # CHP
-    if E_CHP_gen_W > 0.0 and E_req_hour_W > 0.0:
-        delta_E = E_CHP_gen_W - E_req_hour_W
-        if delta_E >= 0.0:
-            E_CHP_gen_export_W = delta_E
-            E_CHP_gen_directload_W = E_req_hour_W
-            E_req_hour_W = 0.0
-        else:
-            E_CHP_gen_export_W = 0.0
-            E_CHP_gen_directload_W = E_CHP_gen_W
-            E_req_hour_W = E_req_hour_W - E_CHP_gen_directload_W
-    else:
-        # since we cannot store it is then exported
-        E_CHP_gen_export_W = E_CHP_gen_W
-        E_CHP_gen_directload_W = 0.0
-
-    # FURNACE DRY
-    if E_Furnace_dry_gen_W > 0.0 and E_req_hour_W > 0.0:
-        delta_E = E_Furnace_dry_gen_W - E_req_hour_W
-        if delta_E >= 0.0:
-            E_Furnace_dry_gen_export_W = delta_E
-            E_Furnace_dry_gen_directload_W = E_req_hour_W
-            E_req_hour_W = 0.0
-        else:
-            E_Furnace_dry_gen_export_W = 0.0
-            E_Furnace_dry_gen_directload_W = E_Furnace_dry_gen_W
-            E_req_hour_W = E_req_hour_W - E_Furnace_dry_gen_directload_W
-    else:
-        # since we cannot store it is then exported
-        E_Furnace_dry_gen_export_W = E_Furnace_dry_gen_W
-        E_Furnace_dry_gen_directload_W = 0.0
-
-    # FURNACE WET
-    if E_Furnace_wet_gen_W > 0.0 and E_req_hour_W > 0.0:
-        delta_E = E_Furnace_wet_gen_W - E_req_hour_W
-        if delta_E >= 0.0:
-            E_Furnace_wet_gen_export_W = delta_E
-            E_Furnace_wet_gen_directload_W = E_req_hour_W
-            E_req_hour_W = 0.0
-        else:
-            E_Furnace_wet_gen_export_W = 0.0
-            E_Furnace_wet_gen_directload_W = E_Furnace_wet_gen_W
-            E_req_hour_W = E_req_hour_W - E_Furnace_wet_gen_directload_W
-    else:
-        # since we cannot store it is then exported
-        E_Furnace_wet_gen_export_W = E_Furnace_wet_gen_W
-        E_Furnace_wet_gen_directload_W = 0.0
-
-    # CCGT_cooling
-    if E_Trigen_NG_gen_W > 0.0 and E_req_hour_W > 0.0:
-        delta_E = E_Trigen_NG_gen_W - E_req_hour_W
-        if delta_E >= 0.0:
-            E_Trigen_gen_export_W = delta_E
-            E_Trigen_gen_directload_W = E_req_hour_W
-            E_req_hour_W = 0.0
-        else:
-            E_Trigen_gen_export_W = 0.0
-            E_Trigen_gen_directload_W = E_Trigen_NG_gen_W
-            E_req_hour_W = E_req_hour_W - E_Trigen_gen_directload_W
-    else:
-        # since we cannot store it is then exported
-        E_Trigen_gen_export_W = E_Trigen_NG_gen_W
-        E_Trigen_gen_directload_W = 0.0
-
-    # PV
-    if E_PV_gen_W > 0.0 and E_req_hour_W > 0.0:
-        delta_E = E_PV_gen_W - E_req_hour_W
-        if delta_E >= 0.0:
-            E_PV_gen_export_W = delta_E
-            E_PV_gen_directload_W = E_req_hour_W
-            E_req_hour_W = 0.0
-        else:
-            E_PV_gen_export_W = 0.0
-            E_PV_gen_directload_W = E_PV_gen_W
-            E_req_hour_W = E_req_hour_W - E_PV_gen_directload_W
-    else:
-        # since we cannot store it is then exported
-        E_PV_gen_export_W = E_PV_gen_W
-        E_PV_gen_directload_W = 0.0
-
-    # PVT
-    if E_PVT_gen_W > 0.0 and E_req_hour_W > 0.0:
-        delta_E = E_PVT_gen_W - E_req_hour_W
-        if delta_E >= 0.0:
-            E_PVT_gen_export_W = delta_E
-            E_PVT_gen_directload_W = E_req_hour_W
-            E_req_hour_W = 0.0
-        else:
-            E_PVT_gen_export_W = 0.0
-            E_PVT_gen_directload_W = E_PVT_gen_W
-            E_req_hour_W = E_req_hour_W - E_PVT_gen_directload_W
-    else:
-        # since we cannot store it is then exported
-        E_PVT_gen_export_W = E_PVT_gen_W
-        E_PVT_gen_directload_W = 0.0
+    """
+    Dispatch of the electricity generated in the district to the electricity requirement of the system for all hours
+    at once. The generation units supply the requirement in a fixed order (CHP, dry furnace, wet furnace, trigeneration,
+    PV, PVT), the rest of their generation is exported and the requirement that is left is imported from the grid.
+
+    :param E_req_hour_W: hourly electricity requirement, the other parameters are the hourly generation of each unit
+    :type E_req_hour_W: np.ndarray
+    :return: the hourly direct load and export of each unit and the hourly imports from the grid
+    """
+    E_req_hour_W = np.asarray(E_req_hour_W, dtype=float)
+    E_CHP_gen_directload_W, E_CHP_gen_export_W, E_req_hour_W = supply_electricity(E_CHP_gen_W, E_req_hour_W)
+    E_Furnace_dry_gen_directload_W, \
+    E_Furnace_dry_gen_export_W, \
+    E_req_hour_W = supply_electricity(E_Furnace_dry_gen_W, E_req_hour_W)
+    E_Furnace_wet_gen_directload_W, \
+    E_Furnace_wet_gen_export_W, \
+    E_req_hour_W = supply_electricity(E_Furnace_wet_gen_W, E_req_hour_W)
+    E_Trigen_gen_directload_W, E_Trigen_gen_export_W, E_req_hour_W = supply_electricity(E_Trigen_NG_gen_W,
+                                                                                         E_req_hour_W)
+    E_PV_gen_directload_W, E_PV_gen_export_W, E_req_hour_W = supply_electricity(E_PV_gen_W, E_req_hour_W)
+    E_PVT_gen_directload_W, E_PVT_gen_export_W, E_req_hour_W = supply_electricity(E_PVT_gen_W, E_req_hour_W)
 
     # COVERED BY THE GRID (IMPORTS)
-    if E_req_hour_W > 0.0:
-        E_GRID_directload_W = E_req_hour_W
-    else:
-        E_GRID_directload_W = 0.0
+    E_GRID_directload_W = np.where(E_req_hour_W > 0.0, E_req_hour_W, 0.0)
 
     return E_CHP_gen_directload_W, \
            E_CHP_gen_export_W, \
@@ -290,6 +216,23 @@ def electricity_activation_curve(E_CHP_gen_W,
            E_GRID_directload_W
 
 
+def supply_electricity(E_gen_W, E_req_hour_W):
+    """
+    Supply the hourly electricity requirement with the generation of a unit, since the electricity cannot be stored
+    the rest of the generation is exported.
+
+    :return: the hourly direct load and export of the unit and the hourly requirement that is left
+    :rtype: tuple[np.ndarray, np.ndarray, np.ndarray]
+    """
+    E_gen_W = np.asarray(E_gen_W, dtype=float)
+    supplying = (E_gen_W > 0.0) & (E_req_hour_W > 0.0)
+    covering = supplying & (E_gen_W - E_req_hour_W >= 0.0)
+    E_gen_directload_W = np.where(covering, E_req_hour_W, np.where(supplying, E_gen_W, 0.0))
+    E_gen_export_W = np.where(covering, E_gen_W - E_req_hour_W, np.where(supplying, 0.0, E_gen_W))
+    E_req_hour_W = np.where(covering, 0.0, np.where(supplying, E_req_hour_W - E_gen_W, E_req_hour_W))
+    return E_gen_directload_W, E_gen_export_W, E_req_hour_W
+
+
 def calc_district_system_electricity_generated(locator,
                                                master_to_slave_vars):
     # TECHNOLOGEIS THAT ONLY GENERATE ELECTRICITY
@@ -310,9 +253,10 @@ def calc_available_generation_PV(locator, buildings, share_allowed):
     :param share_allowed:
     :return:
     """
+    optimization_data = OptimizationData.for_locator(locator)
     E_PV_gen_kWh = np.zeros(HOURS_IN_YEAR)
     for building in buildings:
-        building_PVT = pd.read_csv(locator.PV_results(building)).fillna(value=0.0)
+        building_PVT = optimization_data.solar_results(locator.PV_results(building), ['E_PV_gen_kWh'])
         E_PV_gen_kWh += building_PVT['E_PV_gen_kWh']
     E_PVT_gen_Wh = E_PV_gen_kWh * share_allowed * 1000
     return E_PVT_gen_Wh
@@ -355,6 +299,7 @@ def extract_electricity_demand_buildings(master_to_slave_vars, building_names, l
     E_cs_cre_cdata_req_building_scale_W = np.zeros(HOURS_IN_YEAR)
 
     # End-use demands
+    optimization_data = OptimizationData.for_locator(locator)
     Eal_req_W = np.zeros(HOURS_IN_YEAR)
     Edata_req_W = np.zeros(HOURS_IN_YEAR)
     Epro_req_W = np.zeros(HOURS_IN_YEAR)
@@ -362,17 +307,17 @@ def extract_electricity_demand_buildings(master_to_slave_vars, building_names, l
 
     # for all buildings with electricity demand
     for name in building_names:  # adding the electricity demand of
-        building_demand = pd.read_csv(locator.get_demand_results_file(name))
+        building_demand = optimization_data.demand(name, ['Eal_kWh', 'Edata_kWh', 'Epro_kWh', 'Eaux_kWh'])
         # end-use electrical demands
-        Eal_req_W += (building_demand['Eal_kWh'] * 1000).values
-        Edata_req_W += (building_demand['Edata_kWh'] * 1000).values
-        Epro_req_W += (building_demand['Epro_kWh'] * 1000).values
-        Eaux_req_W += (building_demand['Eaux_kWh'] * 1000).values
+        Eal_req_W += building_demand['Eal_kWh'] * 1000
+        Edata_req_W += building_demand['Edata_kWh'] * 1000
+        Epro_req_W += building_demand['Epro_kWh'] * 1000
+        Eaux_req_W += building_demand['Eaux_kWh'] * 1000
 
     # when the two networks are present
     if master_to_slave_vars.DHN_exists and master_to_slave_vars.DCN_exists:
         for name in building_names:
-            building_demand = pd.read_csv(locator.get_demand_results_file(name))
+            building_demand = optimization_data.demand(name, DEMAND_COLUMNS)
             if name in buildings_district_scale_to_district_heating and name in buildings_district_scale_to_district_cooling:
                 # if connected to the heating network
                 E_hs_ww_req_W += np.zeros(HOURS_IN_YEAR)
@@ -382,62 +327,66 @@ def extract_electricity_demand_buildings(master_to_slave_vars, building_names, l
                 E_hs_ww_req_W += np.zeros(HOURS_IN_YEAR)
                 if master_to_slave_vars.WasteServersHeatRecovery == 1:
                     E_cs_cre_cdata_req_W += ((building_demand['E_cs_kWh'] +
-                                             building_demand['E_cre_kWh']) * 1000).values  # to W
+                                             building_demand['E_cre_kWh']) * 1000)  # to W
                 else:
                     E_cs_cre_cdata_req_W += ((building_demand['E_cs_kWh'] +
                                              building_demand['E_cre_kWh'] +
-                                             building_demand['E_cdata_kWh']) * 1000).values  # to W
+                                             building_demand['E_cdata_kWh']) * 1000)  # to W
             elif name in buildings_district_scale_to_district_cooling:
                 E_hs_ww_req_W += ((building_demand['E_hs_kWh'] +
-                                  building_demand['E_ww_kWh']) * 1000).values  # to W
+                                  building_demand['E_ww_kWh']) * 1000)  # to W
                 E_cs_cre_cdata_req_W += np.zeros(HOURS_IN_YEAR)
             else:
-                building_dencentralized_system_heating = pd.read_csv(
-                    locator.get_optimization_decentralized_folder_building_result_heating_activation(name))
-                building_dencentralized_system_cooling = pd.read_csv(
-                    locator.get_optimization_decentralized_folder_building_cooling_activation(name))
-                E_hs_ww_req_building_scale_W += building_dencentralized_system_heating['E_hs_ww_req_W'].values
-                E_cs_cre_cdata_req_building_scale_W += building_dencentralized_system_cooling['E_cs_cre_cdata_req_W'].values
+                building_dencentralized_system_heating = optimization_data.csv_columns(
+                    locator.get_optimization_decentralized_folder_building_result_heating_activation(name),
+                    ['E_hs_ww_req_W'])
+                building_dencentralized_system_cooling = optimization_data.csv_columns(
+                    locator.get_optimization_decentralized_folder_building_cooling_activation(name),
+                    ['E_cs_cre_cdata_req_W'])
+                E_hs_ww_req_building_scale_W += building_dencentralized_system_heating['E_hs_ww_req_W']
+                E_cs_cre_cdata_req_building_scale_W += building_dencentralized_system_cooling['E_cs_cre_cdata_req_W']
 
     # if only a district heating network exists.
     elif master_to_slave_vars.DHN_exists:
         for name in building_names:
-            building_demand = pd.read_csv(locator.get_demand_results_file(name))
+            building_demand = optimization_data.demand(name, DEMAND_COLUMNS)
             if name in buildings_district_scale_to_district_heating:
                 # if connected to the heating network
                 E_hs_ww_req_W += np.zeros(HOURS_IN_YEAR)  # because it is connected to the heating network
                 if master_to_slave_vars.WasteServersHeatRecovery == 1:
                     E_cs_cre_cdata_req_W += ((building_demand['E_cs_kWh'] +
-                                             building_demand['E_cre_kWh']) * 1000).values  # to W
+                                             building_demand['E_cre_kWh']) * 1000)  # to W
                 else:
                     E_cs_cre_cdata_req_W += ((building_demand['E_cs_kWh'] +
                                              building_demand['E_cre_kWh'] +
-                                             building_demand['E_cdata_kWh']) * 1000).values  # to W
+                                             building_demand['E_cdata_kWh']) * 1000)  # to W
             else:
                 # if not then get airconditioning loads of the baseline
                 E_cs_cre_cdata_req_W += ((building_demand['E_cs_kWh'] +
                                          building_demand['E_cre_kWh'] +
-                                         building_demand['E_cdata_kWh']) * 1000).values  # to W
+                                         building_demand['E_cdata_kWh']) * 1000)  # to W
                 if name in building_names_heating:
                     # if there is a decentralized heating use it.
-                    building_dencentralized_system = pd.read_csv(
-                        locator.get_optimization_decentralized_folder_building_result_heating_activation(name))
-                    E_hs_ww_req_building_scale_W += building_dencentralized_system['E_hs_ww_req_W'].values
+                    building_dencentralized_system = optimization_data.csv_columns(
+                        locator.get_optimization_decentralized_folder_building_result_heating_activation(name),
+                        ['E_hs_ww_req_W'])
+                    E_hs_ww_req_building_scale_W += building_dencentralized_system['E_hs_ww_req_W']
 
     # if only a district cooling network exists.
     elif master_to_slave_vars.DCN_exists:
         for name in building_names:
-            building_demand = pd.read_csv(locator.get_demand_results_file(name))
+            building_demand = optimization_data.demand(name, DEMAND_COLUMNS)
             E_hs_ww_req_W += ((building_demand['E_hs_kWh'] +
-                               building_demand['E_ww_kWh']) * 1000).values  # to W
+                               building_demand['E_ww_kWh']) * 1000)  # to W
             if name in buildings_district_scale_to_district_cooling:
                 E_cs_cre_cdata_req_W += np.zeros(HOURS_IN_YEAR)
             else:
                 if name in building_names_cooling:
                     # if there is a decentralized cooling use it.
-                    building_dencentralized_system = pd.read_csv(
-                        locator.get_optimization_decentralized_folder_building_cooling_activation(name))
-                    E_cs_cre_cdata_req_building_scale_W += building_dencentralized_system['E_cs_cre_cdata_req_W'].values
+                    building_dencentralized_system = optimization_data.csv_columns(
+                        locator.get_optimization_decentralized_folder_building_cooling_activation(name),
+                        ['E_cs_cre_cdata_req_W'])
+                    E_cs_cre_cdata_req_building_scale_W += building_dencentralized_system['E_cs_cre_cdata_req_W']
 
     E_req_buildings = {
         # end-use demands
@@ -465,12 +414,13 @@ def extract_fuels_demand_buildings(master_to_slave_vars, building_names, locator
     building_names_heating = master_to_slave_vars.building_names_heating
 
     # system requirements
+    optimization_data = OptimizationData.for_locator(locator)
     NG_hs_ww_req_W = np.zeros(HOURS_IN_YEAR)
 
     # when the two networks are present
     if master_to_slave_vars.DHN_exists and master_to_slave_vars.DCN_exists:
         for name in building_names:
-            building_demand = pd.read_csv(locator.get_demand_results_file(name))
+            building_demand = optimization_data.demand(name, DEMAND_COLUMNS)
             if name in buildings_district_scale_to_district_heating and name in buildings_district_scale_to_district_cooling:
                 # if connected to the heating network
                 NG_hs_ww_req_W += 0.0
@@ -480,8 +430,9 @@ def extract_fuels_demand_buildings(master_to_slave_vars, building_names, locator
             elif name in buildings_district_scale_to_district_cooling:
                 NG_hs_ww_req_W += (building_demand['NG_hs_kWh'] + building_demand['NG_ww_kWh']) * 1000  # to W
             else:
-                building_dencentralized_system_heating = pd.read_csv(
-                    locator.get_optimization_decentralized_folder_building_result_heating_activation(name))
+                building_dencentralized_system_heating = optimization_data.csv_columns(
+                    locator.get_optimization_decentralized_folder_building_result_heating_activation(name),
+                    ['NG_BackupBoiler_req_Wh', 'NG_Boiler_req_Wh'])
                 NG_hs_ww_req_W += building_dencentralized_system_heating['NG_BackupBoiler_req_Wh'] + \
                                   building_dencentralized_system_heating['NG_Boiler_req_Wh']
 
@@ -495,8 +446,9 @@ def extract_fuels_demand_buildings(master_to_slave_vars, building_names, locator
                 # if not then get airconditioning loads of the baseline
                 if name in building_names_heating:
                     # if there is a decentralized heating use it.
-                    building_dencentralized_system = pd.read_csv(
-                        locator.get_optimization_decentralized_folder_building_result_heating_activation(name))
+                    building_dencentralized_system = optimization_data.csv_columns(
+                        locator.get_optimization_decentralized_folder_building_result_heating_activation(name),
+                        ['NG_BackupBoiler_req_Wh', 'NG_Boiler_req_Wh'])
                     NG_hs_ww_req_W += building_dencentralized_system['NG_BackupBoiler_req_Wh'] + \
                                       building_dencentralized_system['NG_Boiler_req_Wh']
                 else:
@@ -506,7 +458,7 @@ def extract_fuels_demand_buildings(master_to_slave_vars, building_names, locator
     # if only a district cooling network exists.
     elif master_to_slave_vars.DCN_exists:
         for name in building_names:
-            building_demand = pd.read_csv(locator.get_demand_results_file(name))
+            building_demand = optimization_data.demand(name, DEMAND_COLUMNS)
             # if not then get electric boilers etc form baseline.
             NG_hs_ww_req_W += (building_demand['NG_hs_kWh'] + building_demand['NG_ww_kWh']) * 1000  # to W
 
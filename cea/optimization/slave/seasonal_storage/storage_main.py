@@ -18,11 +18,11 @@ It is possible to turn off the plots by setting Tempplot = 0 and Qplot = 0
 import os
 
 import numpy as np
-import pandas as pd
 
 import cea.optimization.slave.seasonal_storage.design_operation as StDesOp
 from cea.constants import HEAT_CAPACITY_OF_WATER_JPERKGK, DENSITY_OF_WATER_AT_60_DEGREES_KGPERM3, WH_TO_J
 from cea.constants import HOURS_IN_YEAR
+from cea.optimization.optimization_data import OptimizationData
 
 __author__ = "Tim Vollrath"
 __copyright__ = "Copyright 2015, Architecture and Building Systems - ETH Zurich"
@@ -401,8 +401,11 @@ def calc_available_generation_PVT(locator, buildings, share_allowed):
     E_PVT_req_kWh = np.zeros(HOURS_IN_YEAR)
     mcp_x_T = np.zeros(HOURS_IN_YEAR)
     mcp = np.zeros(HOURS_IN_YEAR)
+    optimization_data = OptimizationData.for_locator(locator)
     for building in buildings:
-        building_PVT = pd.read_csv(locator.PVT_results(building)).fillna(value=0.0)
+        building_PVT = optimization_data.solar_results(locator.PVT_results(building),
+                                                       ['E_PVT_gen_kWh', 'Q_PVT_gen_kWh', 'Eaux_PVT_kWh', 'Area_PVT_m2',
+                                                        'mcp_PVT_kWperC', 'T_PVT_sup_C'])
         E_PVT_gen_kWh += building_PVT['E_PVT_gen_kWh']
         Q_PVT_gen_kWh += building_PVT['Q_PVT_gen_kWh']
         E_PVT_req_kWh += building_PVT['Eaux_PVT_kWh']
@@ -433,8 +436,11 @@ def calc_available_generation_solar(locator, buildings, share_allowed, panel_typ
     E_SC_req_kWh = np.zeros(HOURS_IN_YEAR)
     mcp_x_T = np.zeros(HOURS_IN_YEAR)
     mcp = np.zeros(HOURS_IN_YEAR)
+    optimization_data = OptimizationData.for_locator(locator)
     for building_name in buildings:
-        data = pd.read_csv(locator.SC_results(building_name, panel_type)).fillna(value=0.0)
+        data = optimization_data.solar_results(locator.SC_results(building_name, panel_type),
+                                               ['Q_SC_gen_kWh', 'Eaux_SC_kWh', 'Area_SC_m2', 'mcp_SC_kWperC',
+                                                'T_SC_sup_C'])
         Q_PVT_gen_kWh += data['Q_SC_gen_kWh']
         E_SC_req_kWh += data['Eaux_SC_kWh']
         A_PVT_m2 += data['Area_SC_m2'][0]
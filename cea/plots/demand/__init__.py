@@ -11,6 +11,7 @@ import cea.config
 import cea.inputlocator
 import cea.plots
 import cea.plots.cache
+from cea.demand.demand_writers import read_demand_results, get_demand_results_path
 
 """
 Implements py:class:`cea.plots.DemandPlotBase` as a base class for all plots in the category "demand" and also
@@ -110,7 +111,7 @@ class DemandPlotBase(cea.plots.PlotBase):
         self.input_files = [(self.locator.get_total_demand, [])]  # all these scripts depend on demand
         # Add building to input files if buildings are selected
         if self.buildings:
-            self.input_files += [(self.locator.get_demand_results_file, [building]) for building in self.buildings]
+            self.input_files += [(get_demand_results_path, [self.locator, building]) for building in self.buildings]
 
     @property
     def hourly_loads(self):
@@ -127,7 +128,7 @@ class DemandPlotBase(cea.plots.PlotBase):
         return df1
 
     def _calculate_hourly_loads(self):
-        data_demand = functools.reduce(self.add_fields, (pd.read_csv(self.locator.get_demand_results_file(building))
+        data_demand = functools.reduce(self.add_fields, (read_demand_results(self.locator, building)
                                                          for building in self.buildings)).set_index('DATE')
         return data_demand
 
@@ -137,8 +138,7 @@ class DemandPlotBase(cea.plots.PlotBase):
         return data_demand
 
     def calculate_external_temperature(self):
-        data_path = self.locator.get_demand_results_file(self.buildings[0])
-        data = pd.read_csv(data_path)
+        data = read_demand_results(self.locator, self.buildings[0])
         data = self.resample_time_data(data)
         return data
 
@@ -4,6 +4,7 @@ import os
 import numpy as np
 import pandas as pd
 import py4design.py2radiance as py2radiance
+from scipy.sparse import csr_matrix
 import py4design.py3dmodel.calculate as calculate
 from py4design import py3dmodel
 
@@ -154,7 +155,7 @@ def calc_sensors_zone(building_names, locator, grid_size, geometry_pickle_dir):
 
 
 def isolation_daysim(chunk_n, cea_daysim, building_names, locator, radiance_parameters, write_sensor_data, grid_size,
-                     max_global, weatherfile, geometry_pickle_dir):
+                     max_global, weatherfile, geometry_pickle_dir, sensor_data_format='json'):
     # initialize daysim project
     daysim_project = cea_daysim.initialize_daysim_project('chunk_{n}'.format(n=chunk_n))
     print('Creating daysim project in: {daysim_dir}'.format(daysim_dir=daysim_project.project_path))
@@ -212,56 +213,95 @@ def isolation_daysim(chunk_n, cea_daysim, building_names, locator, radiance_para
         # select sensors data
         selection_of_results = solar_res[index:index + sensors_number_building]
         selection_of_results[np.array(sensor_intersection_building) == 1] = 0
-        items_sensor_name_and_result = dict(zip(sensor_code_building, selection_of_results.tolist()))
         index = index + sensors_number_building
 
         # create summary and save to disk
-        write_aggregated_results(building_name, items_sensor_name_and_result, locator, weatherfile)
+        write_aggregated_results(building_name, sensor_code_building, selection_of_results, locator, weatherfile)
 
         if write_sensor_data:
-            write_sensor_results(building_name, items_sensor_name_and_result, locator)
+            write_sensor_results(building_name, sensor_code_building, selection_of_results, locator,
+                                 sensor_data_format)
 
     # erase daysim folder to avoid conflicts after every iteration
     print('Removing results folder')
     daysim_project.cleanup_project()
 
 
-def write_sensor_results(building_name, items_sensor_name_and_result, locator):
-    with open(locator.get_radiation_building_sensors(building_name), 'w') as outfile:
-        json.dump(items_sensor_name_and_result, outfile)
+def write_sensor_results(building_name, sensor_codes, sensor_results, locator, sensor_data_format='json'):
+    """
+    Write the hourly radiation of each sensor of a building.
 
-
-def write_aggregated_results(building_name, items_sensor_name_and_result, locator, weatherfile):
+    :param list[str] sensor_codes: the code of each sensor (e.g. ``srf0``)
+    :param np.ndarray sensor_results: radiation per sensor and hour in [Wh/m2] (sensors x hours)
+    :param str sensor_data_format: ``json`` (sensor code -> list of hourly values) or ``npy`` (the ``sensor_results``
+        array in NumPy's binary format, plus a csv file with the sensor codes in the same order)
+    """
+    if sensor_data_format == 'npy':
+        np.save(locator.get_radiation_building_sensors_npy(building_name), np.asarray(sensor_results, dtype=float))
+        pd.DataFrame({'SURFACE': sensor_codes}).to_csv(locator.get_radiation_building_sensors_index(building_name),
+                                                      index=False)
+    else:
+        with open(locator.get_radiation_building_sensors(building_name), 'w') as outfile:
+            json.dump(dict(zip(sensor_codes, sensor_results.tolist())), outfile)
+
+
+SOLAR_ANALYSIS_FIELDS = ['windows_east_kW',
+                         'windows_west_kW',
+                         'windows_south_kW',
+                         'windows_north_kW',
+                         'walls_east_kW',
+                         'walls_west_kW',
+                         'walls_south_kW',
+                         'walls_north_kW',
+                         'roofs_top_kW']
+SOLAR_ANALYSIS_FIELDS_AREA = ['windows_east_m2',
+                              'windows_west_m2',
+                              'windows_south_m2',
+                              'windows_north_m2',
+                              'walls_east_m2',
+                              'walls_west_m2',
+                              'walls_south_m2',
+                              'walls_north_m2',
+                              'roofs_top_m2']
+
+
+def calc_sensor_aggregation_matrix(geometry, sensor_codes):
+    """
+    Sparse matrix that sums up the radiation of the sensors, weighted by their area, to the fields in
+    ``SOLAR_ANALYSIS_FIELDS``.
+
+    :param pd.DataFrame geometry: the radiation metadata of the building (``locator.get_radiation_metadata``)
+    :param list[str] sensor_codes: the code of each row of the sensor results
+    :return: a (fields x sensors) matrix with the area of each sensor [m2] in the row of its field
+    :rtype: scipy.sparse.csr_matrix
+    """
+    code = geometry['TYPE'] + '_' + geometry['orientation'] + '_kW'
+    field_index = pd.Index(SOLAR_ANALYSIS_FIELDS).get_indexer(code)
+    in_field = field_index >= 0
+    sensor_index = pd.Index(sensor_codes).get_indexer(geometry['SURFACE'][in_field])
+    if (sensor_index < 0).any():
+        raise KeyError('No results for sensors: %s' % list(geometry['SURFACE'][in_field][sensor_index < 0]))
+    return csr_matrix((geometry['AREA_m2'][in_field].values, (field_index[in_field], sensor_index)),
+                      shape=(len(SOLAR_ANALYSIS_FIELDS), len(sensor_codes)))
+
+
+def write_aggregated_results(building_name, sensor_codes, sensor_results, locator, weatherfile):
+    """
+    Write the hourly radiation of a building per surface type and orientation (``SOLAR_ANALYSIS_FIELDS``) and the area
+    of each of them.
+
+    :param list[str] sensor_codes: the code of each sensor (e.g. ``srf0``)
+    :param np.ndarray sensor_results: radiation per sensor and hour in [Wh/m2] (sensors x hours)
+    """
     geometry = pd.read_csv(locator.get_radiation_metadata(building_name))
-    geometry['code'] = geometry['TYPE'] + '_' + geometry['orientation'] + '_kW'
-    solar_analysis_fields = ['windows_east_kW',
-                             'windows_west_kW',
-                             'windows_south_kW',
-                             'windows_north_kW',
-                             'walls_east_kW',
-                             'walls_west_kW',
-                             'walls_south_kW',
-                             'walls_north_kW',
-                             'roofs_top_kW']
-    solar_analysis_fields_area = ['windows_east_m2',
-                                  'windows_west_m2',
-                                  'windows_south_m2',
-                                  'windows_north_m2',
-                                  'walls_east_m2',
-                                  'walls_west_m2',
-                                  'walls_south_m2',
-                                  'walls_north_m2',
-                                  'roofs_top_m2']
-    dict_not_aggregated = {}
+    aggregation_matrix = calc_sensor_aggregation_matrix(geometry, sensor_codes)
+    fields_kW = aggregation_matrix.dot(np.asarray(sensor_results, dtype=float)) / 1000  # in kWh
+    areas_m2 = np.asarray(aggregation_matrix.sum(axis=1)).ravel()
 
-    for field, field_area in zip(solar_analysis_fields, solar_analysis_fields_area):
-        select_sensors = geometry.loc[geometry['code'] == field].set_index('SURFACE')
-        area_m2 = select_sensors['AREA_m2'].sum()
-        array_field = np.array([select_sensors.loc[surface, 'AREA_m2'] *
-                                np.array(items_sensor_name_and_result[surface])
-                                for surface in select_sensors.index]).sum(axis=0)
-        dict_not_aggregated[field] = array_field / 1000  # in kWh
-        dict_not_aggregated[field_area] = area_m2
+    dict_not_aggregated = {}
+    for i, (field, field_area) in enumerate(zip(SOLAR_ANALYSIS_FIELDS, SOLAR_ANALYSIS_FIELDS_AREA)):
+        dict_not_aggregated[field] = fields_kW[i]
+        dict_not_aggregated[field_area] = areas_m2[i]
 
     data_aggregated_kW = (pd.DataFrame(dict_not_aggregated)).round(2)
     data_aggregated_kW["Date"] = weatherfile["date"]
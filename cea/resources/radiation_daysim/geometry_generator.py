@@ -45,6 +45,10 @@ __maintainer__ = "Daren Thomas"
 __email__ = "cea@arch.ethz.ch"
 __status__ = "Production"
 
+# the facades are checked for intersections 10 cm in front of them, so only buildings with a footprint this close to
+# the footprint of a building can intersect it
+INTERSECTION_SEARCH_DISTANCE = 1.0  # m
+
 
 def identify_surfaces_type(occface_list):
     roof_list = []
@@ -117,14 +121,16 @@ def create_hollowed_facade(surface_facade, window):
     return hollowed_facade_clean, hole_facade
 
 
-def calc_building_solids(buildings_df, geometry_simplification, elevation_map, num_processes):
+def simplify_geometries(buildings_df, geometry_simplification):
+    """The footprints of the buildings, simplified with a tolerance of ``geometry_simplification``"""
+    return buildings_df.geometry.map(
+        lambda geometry: geometry.simplify(geometry_simplification, preserve_topology=True))
+
+
+def calc_building_solids(buildings_df, geometries, elevation_map, num_processes):
     height_col_name = 'height_ag'
     nfloor_col_name = "floors_ag"
 
-    # simplify geometry for buildings of interest
-    geometries = buildings_df.geometry.map(
-        lambda geometry: geometry.simplify(geometry_simplification, preserve_topology=True))
-
     height = buildings_df[height_col_name].astype(float)
     nfloors = buildings_df[nfloor_col_name].astype(int)
     range_floors = nfloors.map(lambda floors: range(floors + 1))
@@ -165,13 +171,16 @@ def calc_building_geometry_surroundings(name, building_solid, geometry_pickle_di
     return name
 
 
-def building_2d_to_3d(locator, zone_df, surroundings_df, elevation_map, config, geometry_pickle_dir):
+def building_2d_to_3d(locator, zone_df, surroundings_df, elevation_map, config, geometry_pickle_dir,
+                      buildings_to_update=None):
     """
     :param locator: InputLocator - provides paths to files in a scenario
     :type locator: cea.inputlocator.InputLocator
     :param config: the configuration object to use
     :type config: cea.config.Configuration
-    :return:
+    :param buildings_to_update: the buildings to generate the geometry of (by default all of them), the geometry
+        pickles of the other buildings are up to date
+    :return: the names of the buildings in the zone and in the surroundings
     """
 
     # Config variables
@@ -180,23 +189,33 @@ def building_2d_to_3d(locator, zone_df, surroundings_df, elevation_map, config,
     surroundings_simplification = config.radiation.surrounding_geometry
     consider_intersections = config.radiation.consider_intersections
 
-    print('Calculating terrain intersection of building geometries')
     zone_buildings_df = zone_df.set_index('Name')
-    zone_building_names = zone_buildings_df.index.values
-    zone_building_solid_list = calc_building_solids(zone_buildings_df, zone_simplification, elevation_map,
-                                                    num_processes)
-
+    zone_footprints = simplify_geometries(zone_buildings_df, zone_simplification)
     surroundings_buildings_df = surroundings_df.set_index('Name')
-    surroundings_building_names = surroundings_buildings_df.index.values
-    surroundings_building_solid_list = calc_building_solids(surroundings_buildings_df, surroundings_simplification,
+    surroundings_footprints = simplify_geometries(surroundings_buildings_df, surroundings_simplification)
+    if buildings_to_update is None:
+        update_zone = np.ones(len(zone_buildings_df), dtype=bool)
+        update_surroundings = np.ones(len(surroundings_buildings_df), dtype=bool)
+    else:
+        update_zone = zone_buildings_df.index.isin(buildings_to_update)
+        update_surroundings = surroundings_buildings_df.index.isin(buildings_to_update)
+
+    print('Calculating terrain intersection of building geometries')
+    zone_building_names = zone_buildings_df.index.values[update_zone]
+    zone_building_solid_list = calc_building_solids(zone_buildings_df[update_zone], zone_footprints[update_zone],
+                                                    elevation_map, num_processes)
+
+    surroundings_building_names = surroundings_buildings_df.index.values[update_surroundings]
+    surroundings_building_solid_list = calc_building_solids(surroundings_buildings_df[update_surroundings],
+                                                            surroundings_footprints[update_surroundings],
                                                             elevation_map, num_processes)
 
     architecture_wwr_df = gdf.from_file(locator.get_building_architecture()).set_index('Name')
 
     # calculate geometry for the surroundings
     print('Generating geometry for surrounding buildings')
-    geometry_3D_surroundings = [calc_building_geometry_surroundings(x, y, geometry_pickle_dir) for x, y in
-                                zip(surroundings_building_names, surroundings_building_solid_list)]
+    for x, y in zip(surroundings_building_names, surroundings_building_solid_list):
+        calc_building_geometry_surroundings(x, y, geometry_pickle_dir)
 
     # calculate geometry for the zone of analysis
     print('Generating geometry for buildings in the zone of analysis')
@@ -206,16 +225,24 @@ def building_2d_to_3d(locator, zone_df, surroundings_df, elevation_map, config,
                                                                           on_complete=print_progress)
 
     if consider_intersections:
-        all_building_solid_list = np.append(zone_building_solid_list, surroundings_building_solid_list)
+        # each building only gets the names of the buildings next to it, the solids are read from the pickles
+        for name, building_solid in zip(np.append(zone_building_names, surroundings_building_names),
+                                        np.append(zone_building_solid_list, surroundings_building_solid_list)):
+            save_building_solid(building_solid, geometry_pickle_dir, name)
+        neighbour_names = calc_neighbour_names(zone_footprints[update_zone],
+                                               list(zone_footprints) + list(surroundings_footprints),
+                                               np.append(zone_buildings_df.index.values,
+                                                         surroundings_buildings_df.index.values),
+                                               INTERSECTION_SEARCH_DISTANCE)
     else:
-        all_building_solid_list = []
-    geometry_3D_zone = calc_zone_geometry_multiprocessing(zone_building_names,
-                                                          zone_building_solid_list,
-                                                          repeat(all_building_solid_list, n),
-                                                          repeat(architecture_wwr_df, n),
-                                                          repeat(geometry_pickle_dir, n),
-                                                          repeat(consider_intersections, n))
-    return geometry_3D_zone, geometry_3D_surroundings
+        neighbour_names = repeat([], n)
+    calc_zone_geometry_multiprocessing(zone_building_names,
+                                       zone_building_solid_list,
+                                       neighbour_names,
+                                       repeat(architecture_wwr_df, n),
+                                       repeat(geometry_pickle_dir, n),
+                                       repeat(consider_intersections, n))
+    return list(zone_buildings_df.index.values), list(surroundings_buildings_df.index.values)
 
 
 def print_progress(i, n, _, __):
@@ -226,15 +253,45 @@ def print_terrain_intersection_progress(i, n, _, __):
     print("Calculation of terrain intersection for building {i} completed out of {n}".format(i=i + 1, n=n))
 
 
-def are_buildings_close_to_eachother(x_1, y_1, solid2):
-    box2 = calculate.get_bounding_box(solid2)
-    x_2 = box2[0]
-    y_2 = box2[1]
-    delta = math.sqrt((y_2 - y_1) ** 2 + (x_2 - x_1) ** 2)
-    if delta <= 100:
-        return True
-    else:
-        return False
+def calc_neighbour_names(footprints, all_footprints, all_building_names, distance):
+    """
+    Find the buildings next to each footprint with a spatial index (R-tree) of all the footprints, which is built
+    once - instead of comparing each building to all the others.
+
+    :param footprints: footprints of the buildings to find the neighbours of
+    :param all_footprints: footprints of all the buildings (zone and surroundings)
+    :param all_building_names: names of the buildings in ``all_footprints``
+    :param float distance: maximum distance between the footprints of neighbours [m]
+    :return: for each footprint, the names of the buildings within ``distance`` (including the building itself)
+    :rtype: list[list[str]]
+    """
+    all_footprints = gpd.GeoSeries(all_footprints)
+    spatial_index = all_footprints.sindex
+    neighbour_names = []
+    for footprint in footprints:
+        candidates = spatial_index.query(footprint.buffer(distance), predicate='intersects')
+        neighbour_names.append([all_building_names[i] for i in sorted(candidates)])
+    return neighbour_names
+
+
+def get_building_solid_path(geometry_pickle_dir, name):
+    return os.path.join(geometry_pickle_dir, 'solids', str(name))
+
+
+def save_building_solid(building_solid, geometry_pickle_dir, name):
+    pickle_location = get_building_solid_path(geometry_pickle_dir, name)
+    dir_name = os.path.dirname(pickle_location)
+    if not os.path.exists(dir_name):
+        os.makedirs(dir_name)
+
+    with open(pickle_location, 'wb') as f:
+        pickle.dump(building_solid, f)
+    return pickle_location
+
+
+def load_building_solid(geometry_pickle_dir, name):
+    with open(get_building_solid_path(geometry_pickle_dir, name), 'rb') as fp:
+        return pickle.load(fp)
 
 
 class BuildingGeometry(object):
@@ -271,7 +328,7 @@ class BuildingGeometry(object):
         return pickle_location
 
 
-def calc_building_geometry_zone(name, building_solid, all_building_solid_list, architecture_wwr_df,
+def calc_building_geometry_zone(name, building_solid, neighbour_names, architecture_wwr_df,
                                 geometry_pickle_dir, consider_intersections):
     # now get all surfaces and create windows only if the buildings are in the area of study
     window_list = []
@@ -282,14 +339,11 @@ def calc_building_geometry_zone(name, building_solid, all_building_solid_list, a
     normals_win = []
     intersect_wall = []
 
-    # check if buildings are close together and it merits to check the intersection
+    # only the buildings close to this one (see calc_neighbour_names) can intersect its facades
     potentially_intersecting_solids = []
     if consider_intersections:
-        box = calculate.get_bounding_box(building_solid)
-        x, y = box[0], box[1]
-        for solid in all_building_solid_list:
-            if are_buildings_close_to_eachother(x, y, solid):
-                potentially_intersecting_solids.append(solid)
+        potentially_intersecting_solids = [load_building_solid(geometry_pickle_dir, neighbour_name)
+                                           for neighbour_name in neighbour_names]
 
     # identify building surfaces according to angle:
     face_list = fetch.faces_frm_solid(building_solid)
@@ -589,13 +643,24 @@ def check_terrain_bounds(zone_df, surroundings_df, terrain_raster):
         raise ValueError('Terrain provided does not cover all building geometries')
 
 
-def geometry_main(locator, config, geometry_pickle_dir):
+def filter_surroundings(zone_df, surroundings_df):
+    """clear in case there are repeated buildings from zone in surroundings file"""
+    filter_surrounding_buildings = ~surroundings_df["Name"].isin(zone_df["Name"])
+    return surroundings_df[filter_surrounding_buildings]
+
+
+def geometry_main(locator, config, geometry_pickle_dir, buildings_to_update=None):
+    """
+    Create the 3D geometry of the terrain and the buildings and save the geometry of each building in
+    ``geometry_pickle_dir``.
+
+    :param buildings_to_update: the buildings to generate the geometry of (by default all of them), see
+        :py:mod:`cea.resources.radiation_daysim.incremental`
+    :return: the terrain and the names of the buildings in the zone and in the surroundings
+    """
     print("Standardizing coordinate systems")
     zone_df, surroundings_df, terrain_raster = standardize_coordinate_systems(locator)
-
-    # clear in case there are repeated buildings from zone in surroundings file
-    filter_surrounding_buildings = ~surroundings_df["Name"].isin(zone_df["Name"])
-    surroundings_df = surroundings_df[filter_surrounding_buildings]
+    surroundings_df = filter_surroundings(zone_df, surroundings_df)
 
     check_terrain_bounds(zone_df, surroundings_df, terrain_raster)
 
@@ -607,7 +672,7 @@ def geometry_main(locator, config, geometry_pickle_dir):
     # transform buildings 2D to 3D and add windows
     print("Creating 3D building surfaces")
     geometry_3D_zone, geometry_3D_surroundings = building_2d_to_3d(locator, zone_df, surroundings_df, elevation_map,
-                                                                   config, geometry_pickle_dir)
+                                                                   config, geometry_pickle_dir, buildings_to_update)
 
     return terrain_tin, geometry_3D_zone, geometry_3D_surroundings
 
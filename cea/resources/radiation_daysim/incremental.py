@@ -0,0 +1,195 @@
+"""
+Incremental radiation simulation (``radiation:incremental``): fingerprints of the inputs of each building, so only the
+buildings whose inputs changed since the last run are generated and simulated again.
+
+The geometry of a building depends on its footprint, height, floors and window-to-wall ratios, on the terrain and the
+level of detail and - with ``radiation:consider-intersections`` - on the buildings next to it. Its radiation depends
+on its geometry and materials, on the geometry and materials of the buildings within ``radiation:shading-radius`` of
+its footprint (its shading context), on the weather and on the simulation parameters. Buildings further away than the
+shading radius are assumed not to affect its radiation.
+
+Like the cache of the decentralized supply systems, the fingerprints are removed before and written after the results
+of a building, so the buildings of an interrupted run are simulated again.
+"""
+
+
+
+
+import hashlib
+import os
+import pickle
+
+import pandas as pd
+
+from cea.resources.radiation_daysim import geometry_generator
+from cea.utilities.input_cache import calc_hash as calc_files_hash
+
+GEOMETRY_FINGERPRINTS_FILE = 'fingerprints.csv'
+GEOMETRY_PARAMETERS = ['zone_geometry', 'surrounding_geometry', 'consider_intersections']
+SIMULATION_PARAMETERS = ['use_latest_daysim_binaries', 'albedo', 'roof_grid', 'walls_grid', 'rad_ab', 'rad_ad',
+                         'rad_as', 'rad_ar', 'rad_aa', 'rad_lr', 'rad_st', 'rad_sj', 'rad_lw', 'rad_dj', 'rad_ds',
+                         'rad_dr', 'rad_dp', 'write_sensor_data', 'sensor_data_format']
+ZONE_COLUMNS = ['height_ag', 'floors_ag']
+SURROUNDINGS_COLUMNS = ['height_ag', 'floors_ag']
+WWR_COLUMNS = ['wwr_north', 'wwr_east', 'wwr_south', 'wwr_west']
+
+
+def calc_fingerprint(*inputs):
+    """
+    Hash of the ``inputs`` (which must be picklable - use python types, so the same values give the same hash)
+
+    :rtype: str
+    """
+    return hashlib.sha256(pickle.dumps(inputs, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()[:16]
+
+
+def calc_own_fingerprints(footprints, properties_df):
+    """
+    Fingerprint of the footprint and properties of each building
+
+    :param footprints: the (simplified) footprint of each building
+    :type footprints: geopandas.GeoSeries
+    :param properties_df: the properties of each building that affect its geometry (indexed by the building name)
+    :type properties_df: pandas.DataFrame
+    :return: the fingerprint of each building
+    :rtype: dict
+    """
+    return {name: calc_fingerprint(footprint.wkb, properties)
+            for name, footprint, properties in zip(properties_df.index, footprints,
+                                                   properties_df.values.tolist())}
+
+
+def calc_geometry_fingerprints(zone_df, surroundings_df, architecture_df, terrain_path, settings):
+    """
+    Fingerprint of everything the geometry pickles of each building depend on.
+
+    :param zone_df: the zone buildings (as returned by
+        :py:func:`cea.resources.radiation_daysim.geometry_generator.standardize_coordinate_systems`)
+    :param surroundings_df: the surrounding buildings, without the zone buildings
+    :param architecture_df: the architecture of the zone buildings (indexed by the building name)
+    :param terrain_path: path of the terrain raster
+    :param settings: the ``radiation`` section of the configuration
+    :return: the fingerprint of each building of the zone and the surroundings and the (simplified) footprints of the
+        zone and the surroundings
+    """
+    zone_buildings_df = zone_df.set_index('Name')
+    zone_footprints = geometry_generator.simplify_geometries(zone_buildings_df, settings.zone_geometry)
+    surroundings_buildings_df = surroundings_df.set_index('Name')
+    surroundings_footprints = geometry_generator.simplify_geometries(surroundings_buildings_df,
+                                                                     settings.surrounding_geometry)
+
+    zone_properties_df = zone_buildings_df[ZONE_COLUMNS].join(architecture_df[WWR_COLUMNS])
+    own_fingerprints = calc_own_fingerprints(zone_footprints, zone_properties_df)
+    own_fingerprints.update(calc_own_fingerprints(surroundings_footprints,
+                                                  surroundings_buildings_df[SURROUNDINGS_COLUMNS]))
+
+    geometry_settings = [getattr(settings, parameter) for parameter in GEOMETRY_PARAMETERS]
+    geometry_settings.append(calc_files_hash([terrain_path]))
+
+    zone_building_names = list(zone_buildings_df.index)
+    if settings.consider_intersections:
+        all_footprints = list(zone_footprints) + list(surroundings_footprints)
+        all_building_names = zone_building_names + list(surroundings_buildings_df.index)
+        neighbour_names = geometry_generator.calc_neighbour_names(zone_footprints, all_footprints,
+                                                                  all_building_names,
+                                                                  geometry_generator.INTERSECTION_SEARCH_DISTANCE)
+    else:
+        neighbour_names = [[]] * len(zone_building_names)
+
+    geometry_fingerprints = {}
+    for name, neighbours in zip(zone_building_names, neighbour_names):
+        geometry_fingerprints[name] = calc_fingerprint('zone', geometry_settings, own_fingerprints[name],
+                                                       [(n, own_fingerprints[n]) for n in neighbours if n != name])
+    for name in surroundings_buildings_df.index:
+        geometry_fingerprints[name] = calc_fingerprint('surroundings', geometry_settings, own_fingerprints[name])
+    return geometry_fingerprints, zone_footprints, surroundings_footprints
+
+
+def calc_simulation_fingerprints(geometry_fingerprints, zone_footprints, surroundings_footprints,
+                                 building_surface_properties, weather_path, settings):
+    """
+    Fingerprint of everything the radiation results of each zone building depend on: its geometry and materials,
+    the geometry and materials of the buildings within ``settings.shading_radius``, the weather and the simulation
+    parameters.
+
+    :param dict geometry_fingerprints: see :py:func:`calc_geometry_fingerprints`
+    :param zone_footprints: the (simplified) footprints of the zone buildings (indexed by the building name)
+    :param surroundings_footprints: the (simplified) footprints of the surrounding buildings
+    :param building_surface_properties: the materials of the zone buildings (see
+        :py:func:`cea.resources.radiation_daysim.radiation_main.reader_surface_properties`)
+    :param weather_path: path of the weather file
+    :param settings: the ``radiation`` section of the configuration
+    :return: the fingerprint of each zone building
+    :rtype: dict
+    """
+    simulation_settings = [getattr(settings, parameter) for parameter in SIMULATION_PARAMETERS]
+    simulation_settings.append(calc_files_hash([weather_path]))
+    materials = {name: properties for name, properties in zip(building_surface_properties.index,
+                                                                building_surface_properties.values.tolist())}
+
+    zone_building_names = list(zone_footprints.index)
+    all_building_names = zone_building_names + list(surroundings_footprints.index)
+    context_names = geometry_generator.calc_neighbour_names(zone_footprints,
+                                                            list(zone_footprints) + list(surroundings_footprints),
+                                                            all_building_names, settings.shading_radius)
+    return {name: calc_fingerprint(simulation_settings,
+                                   [(n, geometry_fingerprints[n], materials.get(n)) for n in context])
+            for name, context in zip(zone_building_names, context_names)}
+
+
+def read_fingerprints(path):
+    """
+    The fingerprints stored in ``path`` (none, if the file does not exist)
+
+    :rtype: dict
+    """
+    if not os.path.exists(path):
+        return {}
+    fingerprints_df = pd.read_csv(path, dtype=str)
+    return dict(zip(fingerprints_df['Name'], fingerprints_df['fingerprint']))
+
+
+def write_fingerprints(path, fingerprints):
+    """
+    Store the fingerprint of each building in ``path``
+
+    :param dict fingerprints: the fingerprint of each building
+    """
+    if not os.path.exists(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    pd.DataFrame({'Name': list(fingerprints.keys()),
+                  'fingerprint': list(fingerprints.values())}).to_csv(path, index=False)
+
+
+def find_changed_buildings(fingerprints, previous_fingerprints, get_result_paths):
+    """
+    The buildings whose fingerprint changed since the previous run or whose results are missing
+
+    :param dict fingerprints: the fingerprint of each building
+    :param dict previous_fingerprints: the fingerprints stored by the previous run
+    :param get_result_paths: ``get_result_paths(name)`` returns the paths of the results of a building
+    :rtype: list
+    """
+    return [name for name, fingerprint in fingerprints.items()
+            if previous_fingerprints.get(name) != fingerprint
+            or not all(os.path.exists(path) for path in get_result_paths(name))]
+
+
+def get_geometry_pickle_paths(geometry_pickle_dir, name, is_zone_building, consider_intersections):
+    """The geometry pickles of a building (see :py:mod:`cea.resources.radiation_daysim.geometry_generator`)"""
+    paths = [os.path.join(geometry_pickle_dir, 'zone' if is_zone_building else 'surroundings', str(name))]
+    if consider_intersections:
+        paths.append(geometry_generator.get_building_solid_path(geometry_pickle_dir, name))
+    return paths
+
+
+def get_radiation_result_paths(locator, name, settings):
+    """The radiation results of a building"""
+    paths = [locator.get_radiation_building(name), locator.get_radiation_metadata(name)]
+    if settings.write_sensor_data:
+        if settings.sensor_data_format == 'npy':
+            paths += [locator.get_radiation_building_sensors_npy(name),
+                      locator.get_radiation_building_sensors_index(name)]
+        else:
+            paths.append(locator.get_radiation_building_sensors(name))
+    return paths
@@ -5,7 +5,6 @@ Radiation engine and geometry handler for CEA
 import os
 import sys
 import time
-from itertools import repeat
 
 import pandas as pd
 from geopandas import GeoDataFrame as gpdf
@@ -13,10 +12,11 @@ from geopandas import GeoDataFrame as gpdf
 import cea.config
 import cea.inputlocator
 from cea.datamanagement.databases_verification import verify_input_geometry_zone, verify_input_geometry_surroundings
-from cea.resources.radiation_daysim import daysim_main, geometry_generator
+from cea.resources.radiation_daysim import daysim_main, geometry_generator, incremental
 from cea.resources.radiation_daysim.radiance import CEADaySim
 from cea.utilities import epwreader
-from cea.utilities.parallel import vectorize
+from cea.utilities.dbf import dbf_to_dataframe
+from cea.utilities.parallel import stream, broadcast
 
 __author__ = "Paul Neitzel, Kian Wee Chen"
 __copyright__ = "Copyright 2016, Architecture and Building Systems - ETH Zurich"
@@ -69,6 +69,7 @@ def radiation_singleprocessing(cea_daysim, zone_building_names, locator, setting
                     settings.n_buildings_in_chunk)]
 
     write_sensor_data = settings.write_sensor_data
+    sensor_data_format = settings.sensor_data_format
     radiance_parameters = {"rad_ab": settings.rad_ab, "rad_ad": settings.rad_ad, "rad_as": settings.rad_as,
                            "rad_ar": settings.rad_ar, "rad_aa": settings.rad_aa,
                            "rad_lr": settings.rad_lr, "rad_st": settings.rad_st, "rad_sj": settings.rad_sj,
@@ -81,20 +82,27 @@ def radiation_singleprocessing(cea_daysim, zone_building_names, locator, setting
         for chunk_n, building_names in enumerate(chunks):
             daysim_main.isolation_daysim(
                 chunk_n, cea_daysim, building_names, locator, radiance_parameters, write_sensor_data, grid_size,
-                max_global, weatherfile, geometry_pickle_dir)
+                max_global, weatherfile, geometry_pickle_dir, sensor_data_format)
     else:
-        vectorize(daysim_main.isolation_daysim, num_processes)(
-            range(0, num_chunks),
-            repeat(cea_daysim, num_chunks),
-            chunks,
-            repeat(locator, num_chunks),
-            repeat(radiance_parameters, num_chunks),
-            repeat(write_sensor_data, num_chunks),
-            repeat(grid_size, num_chunks),
-            repeat(max_global, num_chunks),
-            repeat(weatherfile, num_chunks),
-            repeat(geometry_pickle_dir, num_chunks)
-        )
+        # each chunk writes its own results, so they are consumed as soon as they are done (and a slow chunk does
+        # not hold back the others)
+        for _ in stream(daysim_main.isolation_daysim, num_processes, on_complete=print_progress)(
+                range(0, num_chunks),
+                broadcast(cea_daysim),
+                chunks,
+                broadcast(locator),
+                broadcast(radiance_parameters),
+                broadcast(write_sensor_data),
+                broadcast(grid_size),
+                broadcast(max_global),
+                broadcast(weatherfile),
+                broadcast(geometry_pickle_dir),
+                broadcast(sensor_data_format)):
+            pass
+
+
+def print_progress(i, n, args, _):
+    print("Daysim chunk No. {i} completed out of {n}: {buildings}".format(i=i + 1, n=n, buildings=", ".join(args[2])))
 
 
 def check_daysim_bin_directory(path_hint, latest_binaries):
@@ -226,9 +234,55 @@ def main(config):
     geometry_pickle_dir = os.path.join(
         locator.get_temporary_folder(), "{}_radiation_geometry_pickle".format(config.scenario_name))
     print("Saving geometry pickle files in: {}".format(geometry_pickle_dir))
+
+    # the fingerprints are only calculated and stored in incremental runs, the other runs remove the fingerprints of
+    # the buildings they calculate, so the next incremental run calculates these buildings again
+    settings = config.radiation
+    geometry_fingerprints_path = os.path.join(geometry_pickle_dir, incremental.GEOMETRY_FINGERPRINTS_FILE)
+    buildings_to_update = None
+    if settings.incremental:
+        zone_df, surroundings_df, _ = geometry_generator.standardize_coordinate_systems(locator)
+        surroundings_df = geometry_generator.filter_surroundings(zone_df, surroundings_df)
+        architecture_df = dbf_to_dataframe(locator.get_building_architecture()).set_index('Name')
+        geometry_fingerprints, zone_footprints, surroundings_footprints = incremental.calc_geometry_fingerprints(
+            zone_df, surroundings_df, architecture_df, locator.get_terrain(), settings)
+        simulation_fingerprints = incremental.calc_simulation_fingerprints(
+            geometry_fingerprints, zone_footprints, surroundings_footprints, building_surface_properties,
+            locator.get_weather_file(), settings)
+
+        zone_names = set(zone_footprints.index)
+        buildings_to_update = incremental.find_changed_buildings(
+            geometry_fingerprints, incremental.read_fingerprints(geometry_fingerprints_path),
+            lambda name: incremental.get_geometry_pickle_paths(geometry_pickle_dir, name,
+                                                               name in zone_names,
+                                                               settings.consider_intersections))
+        print("Generating the geometry of {} of {} buildings (the others did not change)".format(
+            len(buildings_to_update), len(geometry_fingerprints)))
+    if os.path.exists(geometry_fingerprints_path):
+        os.remove(geometry_fingerprints_path)
+
     # create geometrical faces of terrain and buildings
     geometry_terrain, zone_building_names, surroundings_building_names = geometry_generator.geometry_main(
-        locator, config, geometry_pickle_dir)
+        locator, config, geometry_pickle_dir, buildings_to_update)
+    if settings.incremental:
+        incremental.write_fingerprints(geometry_fingerprints_path, geometry_fingerprints)
+
+    buildings_to_simulate = [building_name for building_name in settings.buildings
+                             if building_name in zone_building_names]
+    previous_simulation_fingerprints = incremental.read_fingerprints(locator.get_radiation_fingerprints())
+    if settings.incremental:
+        changed_buildings = set(incremental.find_changed_buildings(
+            simulation_fingerprints, previous_simulation_fingerprints,
+            lambda name: incremental.get_radiation_result_paths(locator, name, settings)))
+        buildings_to_simulate = [b for b in buildings_to_simulate if b in changed_buildings]
+        print("Simulating the radiation of {} buildings (the results of the others are up to date)".format(
+            len(buildings_to_simulate)))
+        if not buildings_to_simulate:
+            return
+
+    fingerprints = {name: fingerprint for name, fingerprint in previous_simulation_fingerprints.items()
+                    if name in zone_building_names and name not in buildings_to_simulate}
+    incremental.write_fingerprints(locator.get_radiation_fingerprints(), fingerprints)
 
     # daysim_bin_directory might contain two paths (e.g. "C:\Daysim\bin;C:\Daysim\lib") - in which case, only
     # use the "bin" folder
@@ -236,7 +290,7 @@ def main(config):
     daysim_staging_location = os.path.join(locator.get_temporary_folder(), 'cea_radiation')
     cea_daysim = CEADaySim(daysim_staging_location, bin_directory)
 
-    # create radiance input files
+    # create radiance input files (the scene always contains all buildings)
     print("Creating radiance material file")
     cea_daysim.create_radiance_material(building_surface_properties)
     print("Creating radiance geometry file")
@@ -251,11 +305,14 @@ def main(config):
     cea_daysim.execute_radfiles2daysim()
 
     time1 = time.time()
-    radiation_singleprocessing(cea_daysim, zone_building_names, locator, config.radiation, geometry_pickle_dir,
+    radiation_singleprocessing(cea_daysim, buildings_to_simulate, locator, config.radiation, geometry_pickle_dir,
                                num_processes=config.get_number_of_processes())
 
-    print("Daysim simulation finished in %.2f mins" % ((time.time() - time1) / 60.0))
+    if settings.incremental:
+        fingerprints.update({name: simulation_fingerprints[name] for name in buildings_to_simulate})
+        incremental.write_fingerprints(locator.get_radiation_fingerprints(), fingerprints)
 
+    print("Daysim simulation finished in %.2f mins" % ((time.time() - time1) / 60.0))
 
 if __name__ == '__main__':
     main(cea.config.Configuration())
@@ -59,7 +59,7 @@ def schemas(plugins):
         # compare the dates of the two files - use the pickle if it's newer
         schemas_dict = None
         if os.path.exists(schemas_pickle) and os.path.getmtime(schemas_pickle) > os.path.getmtime(schemas_yml):
-            with open(schemas_pickle, "r") as schemas_pickle_fp:
+            with open(schemas_pickle, "rb") as schemas_pickle_fp:
                 try:
                     schemas_dict = pickle.load(schemas_pickle_fp)
                 except:
@@ -163,6 +163,7 @@ def create_schema_io(locator, lm, schema, original_function=None):
         "csv": CsvSchemaIo,
         "dbf": DbfSchemaIo,
         "shp": ShapefileSchemaIo,
+        "h5": Hdf5SchemaIo,
     }
     if file_type not in file_type_to_schema_io:
         # just return the default - no read() and write() possible
@@ -378,4 +379,71 @@ class ShapefileSchemaIo(SchemaIo):
         # get coordinate system and re project to UTM
         df = df.to_crs(get_projected_coordinate_system(lat, lon))
 
-        df.to_file(path_to_shp)
\ No newline at end of file
+        df.to_file(path_to_shp)
+
+
+class Hdf5SchemaIo(SchemaIo):
+    """
+    Read and write the tables of a .h5 store (one table per key, e.g. one table per building) - requires PyTables.
+    The tables are stored in the "table" format, so a subset of the columns can be read without loading the whole
+    table.
+    """
+
+    def read(self, key, columns=None, *args, **kwargs):
+        """
+        Open the store indicated by the locator method and return the table ``key`` as a DataFrame.
+        args and kwargs are passed to the original (undecorated) locator method to figure out the location of the
+        file.
+
+        :param str key: the key of the table in the store
+        :param columns: the columns to read (default: all columns)
+        :type columns: list[str]
+        :rtype: pd.DataFrame
+        """
+        return pd.read_hdf(self(*args, **kwargs), key=key, columns=columns)
+
+    def write(self, df, key, *args, **kwargs):
+        """
+        Add the DataFrame as table ``key`` to the store (replacing the table if it exists already)
+
+        :type df: pd.Dataframe
+        :param str key: the key of the table in the store
+        """
+        path_to_h5 = self(*args, **kwargs)
+        parent_folder = os.path.dirname(path_to_h5)
+        if not os.path.exists(parent_folder):
+            os.makedirs(parent_folder)
+        df.to_hdf(path_to_h5, key=key, mode="a", format="table", complevel=5, complib="blosc")
+
+    def remove(self, keys, *args, **kwargs):
+        """
+        Remove the tables ``keys`` from the store, if the store and the tables exist
+
+        :param list[str] keys: the keys of the tables in the store
+        """
+        path_to_h5 = self(*args, **kwargs)
+        if not os.path.exists(path_to_h5):
+            return
+        with pd.HDFStore(path_to_h5, mode="a") as store:
+            for key in keys:
+                if key in store:
+                    store.remove(key)
+
+    def contains(self, key, *args, **kwargs):
+        """
+        True, if the store exists and contains the table ``key`` - only the node of the table is looked up, instead
+        of listing all the tables of the store
+
+        :param str key: the key of the table in the store
+        :rtype: bool
+        """
+        path_to_h5 = self(*args, **kwargs)
+        if not os.path.exists(path_to_h5):
+            return False
+        with pd.HDFStore(path_to_h5, mode="r") as store:
+            return key in store
+
+    def keys(self, *args, **kwargs):
+        """Return the keys of the tables in the store"""
+        with pd.HDFStore(self(*args, **kwargs), mode="r") as store:
+            return [key.lstrip("/") for key in store.keys()]
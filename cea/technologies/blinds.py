@@ -3,8 +3,7 @@
 blinds
 """
 
-
-
+import numpy as np
 
 
 def calc_blinds_activation(radiation, g_gl, Rf_sh):
@@ -20,3 +19,15 @@ def calc_blinds_activation(radiation, g_gl, Rf_sh):
         return g_gl * Rf_sh
     else:
         return g_gl
+
+
+def calc_blinds_activation_array(radiation, g_gl, Rf_sh):
+    """
+    Array version of :py:func:`calc_blinds_activation` for all hours of the year.
+
+    :param radiation: radiation in [W/m2]
+    :param g_gl: window g value
+    :param Rf_sh: shading factor
+    :rtype: numpy.ndarray
+    """
+    return np.where(np.asarray(radiation) > 300, g_gl * Rf_sh, g_gl)
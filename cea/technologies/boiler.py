@@ -25,6 +25,15 @@ __status__ = "Production"
 
 # operation costs
 
+# Implement Curves provided by http://www.greenshootscontrols.net/?p=153 (condensing boilers of the DH plant)
+cond_boiler_eff_of_T_return = interp1d([0, 15.5, 21, 26.7, 32.2, 37.7, 43.3, 49, 54.4, 60, 65.6, 71.1, 100],
+                                       [96.8, 96.8, 96.2, 95.5, 94.7, 93.2, 91.2, 88.9, 87.3, 86.3, 86.0, 85.9, 85.8],
+                                       kind='linear')  # Return Temperature Dependency
+cond_boiler_eff_of_phi = interp1d([0, 0.05, 0.25, 0.5, 0.75, 1],
+                                  [99.5, 99.3, 98.3, 97.6, 97.1, 96.8],
+                                  kind='cubic')  # Load Point Dependency
+
+
 def cond_boiler_operation(Q_load_W, Q_design_W, T_return_to_boiler_K):
     """
     This function calculates efficiency for operation of condensing Boilers supplying hot water up to 100 C
@@ -34,8 +43,8 @@ def cond_boiler_operation(Q_load_W, Q_design_W, T_return_to_boiler_K):
     operational efficiency after:
         http://www.greenshootscontrols.net/?p=153
 
-    :param Q_load_W: Load of time step
-    :type Q_load_W: float
+    :param Q_load_W: Load of time step (or of all time steps)
+    :type Q_load_W: float or np.ndarray
 
     :type Q_design_W: float
     :param Q_design_W: Design Load of Boiler
@@ -50,27 +59,18 @@ def cond_boiler_operation(Q_load_W, Q_design_W, T_return_to_boiler_K):
     Master Thesis, ETH Zurich. 2016.
     """
 
-    x = [0, 15.5, 21, 26.7, 32.2, 37.7, 43.3, 49, 54.4, 60, 65.6, 71.1, 100]  # Return Temperature Dependency
-    y = [96.8, 96.8, 96.2, 95.5, 94.7, 93.2, 91.2, 88.9, 87.3, 86.3, 86.0, 85.9, 85.8]  # Return Temperature Dependency
-    x1 = [0, 0.05, 0.25, 0.5, 0.75, 1]  # Load Point dependency
-    y1 = [99.5, 99.3, 98.3, 97.6, 97.1, 96.8]  # Load Point Dependency
-
-    # do the interpolation
-    eff_of_T_return = interp1d(x, y, kind='linear')
-    eff_of_phi = interp1d(x1, y1, kind='cubic')
+    Q_load_W = np.asarray(Q_load_W, dtype=float)
+    Q_design_W = np.asarray(Q_design_W, dtype=float)
+    T_return_to_boiler_K = np.asarray(T_return_to_boiler_K, dtype=float)
 
     # get input variables
-    if Q_design_W > 0:
-        phi = float(Q_load_W) / float(Q_design_W)
-    else:
-        phi = 0
-
-    if T_return_to_boiler_K == 0:  # accounting with times with no flow
-        T_return = 0
-    else:
-        T_return = T_return_to_boiler_K - 273
-    eff_score = eff_of_phi(phi) / eff_of_phi(1)
-    boiler_eff = (eff_score * eff_of_T_return(T_return)) / 100.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        phi = np.where(Q_design_W > 0, Q_load_W / Q_design_W, 0.0)
+
+    # accounting with times with no flow
+    T_return = np.where(T_return_to_boiler_K == 0, 0.0, T_return_to_boiler_K - 273)
+    eff_score = cond_boiler_eff_of_phi(phi) / cond_boiler_eff_of_phi(1)
+    boiler_eff = (eff_score * cond_boiler_eff_of_T_return(T_return)) / 100.0
 
     return boiler_eff
 
@@ -79,8 +79,8 @@ def cond_boiler_op_cost(Q_therm_W, Q_design_W, T_return_to_boiler_K):
     """
     Calculates the operation cost of a Condensing Boiler supplying hot water up to 100 C
 
-    :type Q_therm_W : float
-    :param Q_therm_W: Load of time step
+    :type Q_therm_W : float or np.ndarray
+    :param Q_therm_W: Load of time step (or of all time steps)
 
     :type Q_design_W: float
     :param Q_design_W: Design Load of Boiler
@@ -100,17 +100,17 @@ def cond_boiler_op_cost(Q_therm_W, Q_design_W, T_return_to_boiler_K):
     :rtype E_aux_Boiler: float
     :returns E_aux_Boiler: auxiliary electricity of boiler operation
     """
-    if Q_therm_W > 0.0:
+    Q_therm_W = np.asarray(Q_therm_W, dtype=float)
+    operating = Q_therm_W > 0.0
 
-        # boiler efficiency
-        eta_boiler = cond_boiler_operation(Q_therm_W, Q_design_W, T_return_to_boiler_K)
+    # boiler efficiency (of the time steps the boiler operates in)
+    eta_boiler = cond_boiler_operation(np.where(operating, Q_therm_W, 0.0), Q_design_W,
+                                       np.where(operating, T_return_to_boiler_K, 0.0))
 
-        E_aux_Boiler_req_W = BOILER_P_AUX * Q_therm_W
+    E_aux_Boiler_req_W = np.where(operating, BOILER_P_AUX * Q_therm_W, 0.0)
 
-        Q_primary_W = Q_therm_W / eta_boiler
-    else:
-        Q_primary_W = 0.0
-        E_aux_Boiler_req_W = 0.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Q_primary_W = np.where(operating, Q_therm_W / eta_boiler, 0.0)
 
     return Q_primary_W, E_aux_Boiler_req_W
 
@@ -135,8 +135,8 @@ def calc_Cop_boiler(q_load_Wh, Q_nom_W, T_return_to_boiler_K):
         http://www.greenshootscontrols.net/?p=153
 
 
-    :param q_load_Wh: Load of time step
-    :type q_load_Wh: float
+    :param q_load_Wh: Load of time step (or of all time steps)
+    :type q_load_Wh: float or np.ndarray
 
     :type Q_nom_W: float
     :param Q_nom_W: Design Load of Boiler
@@ -149,17 +149,17 @@ def calc_Cop_boiler(q_load_Wh, Q_nom_W, T_return_to_boiler_K):
     :returns boiler_eff: efficiency of Boiler (Lower Heating Value), in abs. numbers
     """
 
-    if (Q_nom_W > 0.0) and (q_load_Wh > 0.0):
-
-        # calculate efficiency according to partload
-        phi = float(q_load_Wh) / float(Q_nom_W)
-        if phi >=1.0: # avoid rounding error
-            phi = 0.98
-        T_return_C = np.float(T_return_to_boiler_K - 273.15)
-        eff_score = eff_of_phi(phi) / eff_of_phi(1)
-        boiler_eff = (eff_score * eff_of_T_return([T_return_C]))[0] / 100.0
-    else:
-        boiler_eff = 0.0
+    q_load_Wh = np.asarray(q_load_Wh, dtype=float)
+    Q_nom_W = np.asarray(Q_nom_W, dtype=float)
+    operating = (Q_nom_W > 0.0) & (q_load_Wh > 0.0)
+
+    # calculate efficiency according to partload
+    with np.errstate(divide='ignore', invalid='ignore'):
+        phi = np.where(operating, q_load_Wh / Q_nom_W, 0.0)
+    phi = np.where(phi >= 1.0, 0.98, phi)  # avoid rounding error
+    T_return_C = np.where(operating, np.asarray(T_return_to_boiler_K, dtype=float) - 273.15, 0.0)
+    eff_score = eff_of_phi(phi) / eff_of_phi(1)
+    boiler_eff = np.where(operating, eff_score * eff_of_T_return(T_return_C) / 100.0, 0.0)
 
     return boiler_eff
 
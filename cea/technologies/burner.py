@@ -9,6 +9,8 @@ gas burners
 
 from math import log, ceil
 
+import numpy as np
+
 from cea.analysis.costs.equations import calc_capex_annualized
 from cea.technologies.constants import BOILER_P_AUX
 
@@ -30,15 +32,15 @@ def calc_cop_burner(Q_load_W, Q_design_W):
     """
     This function calculates efficiency of gas burners supplying heat directly to the high temperature generators
     in double effect absorption chillers.
-    :param Q_load_W: Load of time step
-    :type Q_load_W: float
+    :param Q_load_W: Load of time step (or of all time steps)
+    :type Q_load_W: float or np.ndarray
     :type Q_design_W: float
     :param Q_design_W: Design Load of Boiler
-    :retype burner_eff: float
+    :retype burner_eff: float or np.ndarray
     :returns burner_eff: efficiency of Boiler (Lower Heating Value), in abs. numbers
     """
 
-    burner_eff = 0.85  # assumption taken from the lowest efficiency of gas boilers
+    burner_eff = np.full(np.shape(Q_load_W), 0.85)  # assumption taken from the lowest efficiency of gas boilers
 
     return burner_eff
 
@@ -42,65 +42,47 @@ def calc_chiller_main(mdot_chw_kgpers, T_chw_sup_K, T_chw_re_K, T_hw_in_C, T_gro
     :param T_ground_K: ground temperature
     :type T_ground_K: float
     :param locator: locator class
-    :return:
+    :return: the chiller operation, the inputs and outputs can be floats or arrays of all hours
     ..[Kuhn A. & Ziegler F., 2005] Operational results of a 10kW absorption chiller and adaptation of the characteristic
     equation. In: Proceedings of the interantional conference solar air conditioning. Bad Staffelstein, Germany: 2005.
     ..[Puig-Arnavat M. et al, 2010] Analysis and parameter identification for characteristic equations of single- and
     double-effect absorption chillers by means of multivariable regression. Int J Refrig: 2010.
     """
     chiller_prop = absorption_chiller.chiller_prop # get data from the class
-    # create a dict of input operating conditions
-    input_conditions = {'T_chw_sup_K': T_chw_sup_K,
-                        'T_chw_re_K': T_chw_re_K,
-                        'T_hw_in_C': T_hw_in_C,
-                        'T_ground_K': T_ground_K}
+    mdot_chw_kgpers, T_chw_sup_K, T_chw_re_K, T_hw_in_C, T_ground_K = [
+        np.asarray(value, dtype=float) for value in
+        np.broadcast_arrays(mdot_chw_kgpers, T_chw_sup_K, T_chw_re_K, T_hw_in_C, T_ground_K)]
     mcp_chw_WperK = mdot_chw_kgpers * HEAT_CAPACITY_OF_WATER_JPERKGK
     q_chw_total_W = mcp_chw_WperK * (T_chw_re_K - T_chw_sup_K)
 
-    if np.isclose(q_chw_total_W, 0.0):
-        wdot_W = 0.0
-        q_cw_W = 0.0
-        q_hw_W = 0.0
-        T_hw_out_C = np.nan
-        EER = 0.0
-        input_conditions['q_chw_W'] = 0.0
-    else:
-        min_chiller_size_W = min(chiller_prop['cap_min'].values)
-        max_chiller_size_W = max(chiller_prop['cap_max'].values)
-        # get chiller properties and input conditions according to load
-        if q_chw_total_W < min_chiller_size_W:
-            # get chiller property according to load
-            chiller_prop = chiller_prop[chiller_prop['cap_min'] == min_chiller_size_W]
-            # operate at minimum load
-            number_of_chillers_activated = 1.0  # only activate one chiller
-            input_conditions['q_chw_W'] = chiller_prop['cap_min'].values  # minimum load
-        elif q_chw_total_W <= max_chiller_size_W:
-            # get chiller property according to load
-            chiller_prop = chiller_prop[(chiller_prop['cap_min'] <= q_chw_total_W) &
-                                        (chiller_prop['cap_max'] >= q_chw_total_W)]
-            # operate one chiller at the cooling load
-            number_of_chillers_activated = 1.0  # only activate one chiller
-            input_conditions['q_chw_W'] = q_chw_total_W # operate at the chilled water load
-        else:
-            # get chiller property according to load
-            chiller_prop = chiller_prop[chiller_prop['cap_max'] == max_chiller_size_W]
-            # distribute loads to multiple chillers
-            number_of_chillers_activated = q_chw_total_W / max_chiller_size_W
-            # operate at maximum load
-            input_conditions['q_chw_W'] = max(chiller_prop['cap_max'].values)
-
-        absorption_chiller.update_data(chiller_prop)
+    wdot_W = np.zeros(q_chw_total_W.shape)
+    q_cw_W = np.zeros(q_chw_total_W.shape)
+    q_hw_W = np.zeros(q_chw_total_W.shape)
+    T_hw_out_C = np.full(q_chw_total_W.shape, np.nan)
+    EER = np.zeros(q_chw_total_W.shape)
+
+    # get chiller properties and input conditions according to load, in the hours with a load
+    for operating, chiller_prop_load, number_of_chillers_activated, q_chw_W in chiller_operating_modes(
+            chiller_prop, q_chw_total_W, ~np.isclose(q_chw_total_W, 0.0)):
+        input_conditions = {'T_chw_sup_K': T_chw_sup_K[operating],
+                            'T_chw_re_K': T_chw_re_K[operating],
+                            'T_hw_in_C': T_hw_in_C[operating],
+                            'T_ground_K': T_ground_K[operating],
+                            'q_chw_W': q_chw_W}
+        absorption_chiller.update_data(chiller_prop_load)
         operating_conditions = calc_operating_conditions(absorption_chiller, input_conditions)
 
         # calculate chiller outputs
-        wdot_W = calc_power_demand(input_conditions['q_chw_W'], chiller_prop) * number_of_chillers_activated
-        q_cw_W = operating_conditions['q_cw_W'] * number_of_chillers_activated
-        q_hw_W = operating_conditions['q_hw_W'] * number_of_chillers_activated
-        T_hw_out_C = operating_conditions['T_hw_out_C']
-        EER = q_chw_total_W / (q_hw_W + wdot_W)
+        wdot_W[operating] = calc_power_demand(q_chw_W, chiller_prop_load) * number_of_chillers_activated
+        q_cw_W[operating] = operating_conditions['q_cw_W'] * number_of_chillers_activated
+        q_hw_W[operating] = operating_conditions['q_hw_W'] * number_of_chillers_activated
+        T_hw_out_C[operating] = operating_conditions['T_hw_out_C']
+        EER[operating] = q_chw_total_W[operating] / (q_hw_W[operating] + wdot_W[operating])
 
-        if T_hw_out_C < 0.0 :
-            print ('T_hw_out_C = ', T_hw_out_C, ' incorrect condition, check absorption chiller script.')
+    if np.any(T_hw_out_C < 0.0):
+        # only the hours with the incorrect condition, not the arrays of all hours
+        print('T_hw_out_C = ', T_hw_out_C[T_hw_out_C < 0.0], ' in {} hours, incorrect condition, check absorption '
+              'chiller script.'.format(np.count_nonzero(T_hw_out_C < 0.0)))
 
     chiller_operation = {'wdot_W': wdot_W, 'q_cw_W': q_cw_W, 'q_hw_W': q_hw_W, 'T_hw_out_C': T_hw_out_C,
                          'q_chw_W': q_chw_total_W, 'EER': EER}
@@ -108,6 +90,50 @@ def calc_chiller_main(mdot_chw_kgpers, T_chw_sup_K, T_chw_re_K, T_hw_in_C, T_gro
     return chiller_operation
 
 
+def chiller_operating_modes(chiller_prop, q_chw_total_W, operating):
+    """
+    Group the hours with a cooling load by the chiller that operates:
+
+    - below the minimum size, one chiller of the minimum size operates at its minimum load
+    - up to the maximum size, one chiller of the size of the load operates at the load
+    - above the maximum size, the load is distributed to several chillers of the maximum size operating at full load
+
+    :param pd.DataFrame chiller_prop: the properties of the absorption chillers of one type
+    :param np.ndarray q_chw_total_W: cooling load of each hour
+    :param np.ndarray operating: True in the hours with a cooling load
+    :return: yields the hours, the properties of the chiller, the number of chillers activated and the load of each
+        chiller
+    """
+    min_chiller_size_W = min(chiller_prop['cap_min'].values)
+    max_chiller_size_W = max(chiller_prop['cap_max'].values)
+
+    below_min = operating & (q_chw_total_W < min_chiller_size_W)
+    if below_min.any():
+        chiller_prop_load = chiller_prop[chiller_prop['cap_min'] == min_chiller_size_W]
+        # operate at minimum load, only activate one chiller
+        yield below_min, chiller_prop_load, 1.0, chiller_prop_load['cap_min'].values[0]
+
+    within = operating & (q_chw_total_W >= min_chiller_size_W) & (q_chw_total_W <= max_chiller_size_W)
+    for i in range(len(chiller_prop)):
+        # the first chiller whose capacity covers the load
+        chiller_prop_load = chiller_prop.iloc[[i]]
+        covered = within & (chiller_prop_load['cap_min'].values[0] <= q_chw_total_W) & (
+                chiller_prop_load['cap_max'].values[0] >= q_chw_total_W)
+        if covered.any():
+            # operate one chiller at the chilled water load
+            yield covered, chiller_prop_load, 1.0, q_chw_total_W[covered]
+            within = within & ~covered
+    if within.any():
+        raise ValueError('No absorption chiller covers a cooling load of %s W' % q_chw_total_W[within][0])
+
+    above_max = operating & (q_chw_total_W > max_chiller_size_W)
+    if above_max.any():
+        chiller_prop_load = chiller_prop[chiller_prop['cap_max'] == max_chiller_size_W]
+        # distribute loads to multiple chillers, operating at maximum load
+        yield above_max, chiller_prop_load, q_chw_total_W[above_max] / max_chiller_size_W, max(
+            chiller_prop_load['cap_max'].values)
+
+
 def calc_operating_conditions(absorption_chiller, input_conditions):
     """
     Calculates chiller operating conditions at given input conditions by solving the characteristic equations and the
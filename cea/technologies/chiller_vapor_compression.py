@@ -42,23 +42,29 @@ def calc_VCC(peak_cooling_load, q_chw_load_Wh, T_chw_sup_K, T_chw_re_K, T_cw_in_
     :returns Q_VCC_unit_size_W: chiller installed capacity
     ..[D.J. Swider, 2003] D.J. Swider (2003). A comparison of empirically based steady-state models for
     vapor-compression liquid chillers. Applied Thermal Engineering.
-    """
 
-    if q_chw_load_Wh == 0.0:
-        wdot_W = 0.0
-        q_cw_W = 0.0
+    The hourly values (cooling load and temperatures) can be floats or arrays of all hours, the outputs are arrays of
+    the same shape.
+    """
+    q_chw_load_Wh = np.asarray(q_chw_load_Wh, dtype=float)
+    if not np.all(q_chw_load_Wh >= 0.0):
+        raise ValueError('negative cooling load to VCC: ', np.nanmin(q_chw_load_Wh))
 
-    elif q_chw_load_Wh > 0.0:
+    # the chiller only operates in the hours with a cooling load
+    operating = q_chw_load_Wh > 0.0
+    with np.errstate(divide='ignore', invalid='ignore'):
         COP = calc_COP_with_carnot_efficiency(peak_cooling_load, q_chw_load_Wh, T_chw_sup_K, T_cw_in_K, VCC_chiller)
-        if COP < 0.0:
-            print(f'Negative COP: {COP} {T_chw_sup_K} {T_chw_re_K} {q_chw_load_Wh}', )
+        negative_COP = operating & (COP < 0.0)
+        if np.any(negative_COP):
+            # only the hours with a negative COP (the first one in detail), not the arrays of all hours
+            hours = np.flatnonzero(negative_COP)
+            first_hour = [np.broadcast_to(values, negative_COP.shape).flat[hours[0]]
+                          for values in [COP, T_chw_sup_K, T_chw_re_K, q_chw_load_Wh]]
+            print('Negative COP in {} hours, e.g. hour {}: {} {} {} {}'.format(len(hours), hours[0], *first_hour))
 
         # calculate chiller outputs
-        # print('COP is: ', COP)
-        wdot_W = q_chw_load_Wh / COP
-        q_cw_W = wdot_W + q_chw_load_Wh  # heat rejected to the cold water (cw) loop
-    else:
-        raise ValueError('negative cooling load to VCC: ', q_chw_load_Wh)
+        wdot_W = np.where(operating, q_chw_load_Wh / COP, 0.0)
+    q_cw_W = wdot_W + q_chw_load_Wh  # heat rejected to the cold water (cw) loop
 
     chiller_operation = {'wdot_W': wdot_W, 'q_cw_W': q_cw_W, 'q_chw_W': q_chw_load_Wh}
 
@@ -194,9 +200,9 @@ def calc_averaged_PLF(peak_cooling_load, q_chw_load_Wh, T_chw_sup_K, T_cw_in_K,
     Calculates the part load factor of installed Vapor compression chillers for a given cooling load.
     Includes the design of the chillers based on peak load and chiller plant scale to define the part load ratio.
     :param float peak_cooling_load: in W
-    :param float q_chw_load_Wh: in W
-    :param float T_chw_sup_K: in Kelvin
-    :param float T_cw_in_K: in Kelvin
+    :param q_chw_load_Wh: in W (float or array of all hours)
+    :param T_chw_sup_K: in Kelvin (float or array of all hours)
+    :param T_cw_in_K: in Kelvin (float or array of all hours)
     :param VaporCompressionChiller VCC_chiller: VCC_chiller object containing scale, capacity and config properties
     :param str scale: either "BUILDING" or "DISTRICT"
     :return float averaged_PLF: averaged part load factor over all chillers [0..1]
@@ -244,19 +250,14 @@ def calc_averaged_PLF(peak_cooling_load, q_chw_load_Wh, T_chw_sup_K, T_cw_in_K,
     available_capacity_per_unit = calc_available_capacity(cooling_capacity_per_unit, ch_configuration_values['Qs'], T_chw_sup_K, T_cw_in_K) # calculate the available capacity(dependent on conditions)
 
     # calculate the load distribution across the chillers heuristically,
-    # assuming the PLF factor is monotonously increasing with increasing PLR. Filling one chiller after the other.
-    n_chillers_filled = int(q_chw_load_Wh // available_capacity_per_unit)
-    part_load_chiller = float(divmod(q_chw_load_Wh, available_capacity_per_unit)[1])/float(available_capacity_per_unit)
-
-    load_distribution_list = []
-    for i in range(n_chillers_filled):
-        load_distribution_list.append(1)
-    load_distribution_list.append(part_load_chiller)
-    for i in range(int(n_units)-n_chillers_filled-1):
-        load_distribution_list.append(0)
-    load_distribution = np.array(load_distribution_list)
-
-    averaged_PLF = np.sum(calc_PLF(load_distribution, ch_configuration_values['PLFs']) * load_distribution * available_capacity_per_unit) / q_chw_load_Wh # calculates the weighted average PLF value
+    # assuming the PLF factor is monotonously increasing with increasing PLR. Filling one chiller after the other:
+    # the filled chillers operate at full load, one chiller at part load and the rest is off (PLR = 0).
+    n_chillers_filled = np.floor_divide(q_chw_load_Wh, available_capacity_per_unit)
+    part_load_chiller = np.mod(q_chw_load_Wh, available_capacity_per_unit) / available_capacity_per_unit
+
+    averaged_PLF = (n_chillers_filled * calc_PLF(1.0, ch_configuration_values['PLFs'])
+                    + calc_PLF(part_load_chiller, ch_configuration_values['PLFs']) * part_load_chiller
+                    ) * available_capacity_per_unit / q_chw_load_Wh  # calculates the weighted average PLF value
     return averaged_PLF
 
 
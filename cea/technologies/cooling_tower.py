@@ -4,6 +4,7 @@ System Modeling: Cooling tower
 
 
 
+import numpy as np
 import pandas as pd
 from math import ceil, log
 from cea.technologies.constants import CT_MIN_PARTLOAD_RATIO
@@ -24,27 +25,28 @@ def calc_CT(q_hot_Wh, Q_nom_W):
     For the operation of a water condenser + direct cooling tower based on [B. Stephane, 2012]_
     Maximum cooling power is 10 MW.
     
-    :type q_hot_Wh : float
-    :param q_hot_Wh: heat rejected from chiller condensers
+    :type q_hot_Wh : float or np.ndarray
+    :param q_hot_Wh: heat rejected from chiller condensers (of one hour or of all hours)
     :type Q_nom_W : float
     :param Q_nom_W: installed CT size
 
     ..[B. Stephane, 2012] B. Stephane (2012), Evidence-Based Model Calibration for Efficient Building Energy Services.
     PhD Thesis, University de Liege, Belgium
     """
-    if (Q_nom_W > 0.0 and q_hot_Wh > 0.0):
-        # calculate CT operation at part load
-        q_partload_ratio = q_hot_Wh / Q_nom_W
-        w_partload_factor = calc_CT_partload_factor(q_partload_ratio)
+    q_hot_Wh = np.asarray(q_hot_Wh, dtype=float)
+    Q_nom_W = np.asarray(Q_nom_W, dtype=float)
+    operating = (Q_nom_W > 0.0) & (q_hot_Wh > 0.0)
 
-        # calculate nominal fan power
-        w_nom_fan = 0.011 * Q_nom_W # _[B. Stephane, 2012]
+    # calculate CT operation at part load
+    with np.errstate(divide='ignore', invalid='ignore'):
+        q_partload_ratio = np.where(operating, q_hot_Wh / Q_nom_W, 0.0)
+    w_partload_factor = calc_CT_partload_factor(q_partload_ratio)
 
-        # calculate total electricity consumption
-        el_W = w_partload_factor * w_nom_fan
+    # calculate nominal fan power
+    w_nom_fan = 0.011 * Q_nom_W # _[B. Stephane, 2012]
 
-    else:
-        el_W = 0.0
+    # calculate total electricity consumption
+    el_W = np.where(operating, w_partload_factor * w_nom_fan, 0.0)
 
     return el_W
 
@@ -61,8 +63,7 @@ def calc_CT_partload_factor(q_part_load_ratio):
     OPTIMAL DIMENSIONS TO MINIMIZE COSTS OR EMISSIONS. Presented at the Forth German-Austrian IBPSA Conference BauSIM,
     Berlin University of the Arts.
     """
-    if q_part_load_ratio < CT_MIN_PARTLOAD_RATIO:
-        q_part_load_ratio = CT_MIN_PARTLOAD_RATIO
+    q_part_load_ratio = np.maximum(q_part_load_ratio, CT_MIN_PARTLOAD_RATIO)
     w_partload_factor = 0.8603 * q_part_load_ratio ** 3 + 0.2045 * q_part_load_ratio ** 2 - 0.0623 * q_part_load_ratio + 0.0026
     return w_partload_factor
 
@@ -151,10 +152,9 @@ def calc_Cinv_CT(Q_nom_CT_W, locator, technology_type):
 
 
 def main():
-    import numpy as np
     q_hot_Wh = np.arange(0.0, 1E3, 100)
     Q_nom_W = 1E3
-    wdot_W = np.vectorize(calc_CT)(q_hot_Wh, Q_nom_W)
+    wdot_W = calc_CT(q_hot_Wh, Q_nom_W)
     print(wdot_W)
 
 
@@ -28,21 +28,21 @@ PRICE_DX_PER_W = 1.6  # USD FIXME: to be moved to database
 # operation costs
 
 def calc_cop_DX(Q_load_W):
-    cop = 2.3
+    cop = np.full(np.shape(Q_load_W), 2.3)
 
     return cop
 
 
 def calc_DX(mdot_kgpers, T_sup_K, T_re_K):
-    if np.isclose(mdot_kgpers, 0.0):
-        q_chw_W = 0.0
-        wdot_W = 0.0
-    else:
-        q_chw_W = mdot_kgpers * HEAT_CAPACITY_OF_WATER_JPERKGK * (T_re_K - T_sup_K)
+    """
+    Operation of direct expansion units in one time step or in all time steps (arrays of all time steps).
+    """
+    operating = ~np.isclose(mdot_kgpers, 0.0)
+    q_chw_W = np.where(operating, mdot_kgpers * HEAT_CAPACITY_OF_WATER_JPERKGK * (np.asarray(T_re_K) - T_sup_K), 0.0)
 
-        cop_DX = calc_cop_DX(q_chw_W)
+    cop_DX = calc_cop_DX(q_chw_W)
 
-        wdot_W = q_chw_W / cop_DX
+    wdot_W = np.where(operating, q_chw_W / cop_DX, 0.0)
 
     return wdot_W, q_chw_W
 
@@ -69,7 +69,39 @@ def calc_heating_coil(Qhsf, Qhsf_0, Ta_sup_hs, Ta_re_hs, Ths_sup_0, Ths_re_0, ma
         tho = np.nan
         ch = 0.0
 
-    return np.float(thi-273), np.float(tho), np.float(ch)
+    return float(thi-273), float(tho), float(ch)
+
+
+def calc_heating_coil_array(Qhsf, Qhsf_0, Ta_sup_hs, Ta_re_hs, Ths_sup_0, Ths_re_0, ma_sup_hs, ma_sup_0, Ta_sup_0,
+                            Ta_re_0):
+    """
+    Array version of :py:func:`calc_heating_coil` for all hours of the year: the heat exchanger is sized once and the
+    hours with a load are solved at once with :py:func:`cea.technologies.substation.calc_HEX_heating_array`.
+
+    :return: supply temperature [C], return temperature [C], capacity mass flow rate [W/C]
+    :rtype: tuple[numpy.ndarray]
+    """
+    Q, Ta_sup_hs, Ta_re_hs, ma_sup_hs = np.broadcast_arrays(
+        np.abs(np.asarray(Qhsf, dtype=float)), *(np.asarray(x, dtype=float) for x in (Ta_sup_hs, Ta_re_hs, ma_sup_hs)))
+    thi = np.full(Q.shape, np.nan)
+    tho = np.full(Q.shape, np.nan)
+    ch = np.zeros(Q.shape)
+    on = (Q > 0) & (ma_sup_hs > 0)
+    if not on.any():
+        return thi, tho, ch
+
+    Qnom = abs(Qhsf_0)
+    thi_0 = Ths_sup_0 + 273
+    tho_0 = Ths_re_0 + 273
+    U_HEAT = 450.0  # W/m2K for air-based heat exchanger
+    # nominal conditions network side
+    dTm_0 = substation.calc_dTm_HEX(thi_0, tho_0, Ta_re_0, Ta_sup_0)
+    # Area heat exchange and UA_heating
+    Area_HEX_heating, UA_heating = substation.calc_area_HEX(Qnom, dTm_0, U_HEAT)
+    tho[on], ch[on] = substation.calc_HEX_heating_array(Q[on], UA_heating, thi_0, Ta_sup_hs[on] + 273,
+                                                        Ta_re_hs[on] + 273, ma_sup_hs[on] * C_A)
+    thi[on] = thi_0 - 273
+    return thi, tho, ch
 
     # tasup = Ta_sup_hs + 273
     # tare = Ta_re_hs + 273
@@ -187,7 +219,39 @@ def calc_cooling_coil(Qcsf, Qcsf_0, Ta_sup_cs, Ta_re_cs, Tcs_sup_0, Tcs_re_0, ma
         tci = np.nan
         cc = 0.0
 
-    return np.float(tci-273), np.float(tco), np.float(cc)
+    return float(tci-273), float(tco), float(cc)
+
+
+def calc_cooling_coil_array(Qcsf, Qcsf_0, Ta_sup_cs, Ta_re_cs, Tcs_sup_0, Tcs_re_0, ma_sup_cs, ma_sup_0, Ta_sup_0,
+                            Ta_re_0):
+    """
+    Array version of :py:func:`calc_cooling_coil` for all hours of the year: the heat exchanger is sized once and the
+    hours with a load are solved at once with :py:func:`cea.technologies.substation.calc_HEX_cooling_array`.
+
+    :return: supply temperature [C], return temperature [C], capacity mass flow rate [W/C]
+    :rtype: tuple[numpy.ndarray]
+    """
+    Q, Ta_sup_cs, Ta_re_cs, ma_sup_cs = np.broadcast_arrays(
+        np.abs(np.asarray(Qcsf, dtype=float)), *(np.asarray(x, dtype=float) for x in (Ta_sup_cs, Ta_re_cs, ma_sup_cs)))
+    tci = np.full(Q.shape, np.nan)
+    tco = np.full(Q.shape, np.nan)
+    cc = np.zeros(Q.shape)
+    on = (Q > 0) & (ma_sup_cs > 0)
+    if not on.any():
+        return tci, tco, cc
+
+    Qnom = abs(Qcsf_0)
+    tci_0 = Tcs_sup_0 + 273
+    tco_0 = Tcs_re_0 + 273
+    U_COOL = 450.0  # W/m2K for air cooled heat exchanger
+    # nominal conditions network side
+    dTm_0 = substation.calc_dTm_HEX(Ta_re_0, Ta_sup_0, tci_0, tco_0)
+    # Area heat exchange and UA_heating
+    Area_HEX_cooling, UA_cooling = substation.calc_area_HEX(Qnom, dTm_0, U_COOL)
+    tco[on], cc[on] = substation.calc_HEX_cooling_array(Q[on], UA_cooling, Ta_re_cs[on] + 273, Ta_sup_cs[on] + 273,
+                                                        tci_0, ma_sup_cs[on] * C_A)
+    tci[on] = tci_0 - 273
+    return tci, tco, cc
 
 
 # def calc_cooling_coil(Qcsf, Qcsf_0, Ta_sup_cs, Ta_re_cs, Tcs_sup_0, Tcs_re_0, ma_sup_cs, ma_sup_0, Ta_sup_0, Ta_re_0):
@@ -81,7 +81,8 @@ def HP_air_air(mdot_cp_WC, t_sup_K, t_re_K, tsource_K):
 
 def calc_Cop_GHP(ground_temp_K, mdot_kgpers, T_DH_sup_K, T_re_K):
     """
-    For the operation of a Geothermal heat pump (GSHP) supplying DHN.
+    For the operation of a Geothermal heat pump (GSHP) supplying DHN. The inputs can be floats or arrays (e.g. of all
+    hours), the outputs have the shape of the inputs.
 
     :type mdot_kgpers : float
     :param mdot_kgpers: supply mass flow rate to the DHN
@@ -104,14 +105,11 @@ def calc_Cop_GHP(ground_temp_K, mdot_kgpers, T_DH_sup_K, T_re_K):
     ..[C. Montagud et al., 2014] C. Montagud, J.M. Corberan, A. Montero (2014). In situ optimization methodology for
     the water circulation pump frequency of ground source heat pump systems. Energy and Buildings
     """
-    tsup2_K = T_DH_sup_K      # tsup2 = tsup, if all load can be provided by the HP
-
     # calculate condenser temperature
     tcond_K = T_DH_sup_K + HP_DELTA_T_COND
-    if tcond_K > HP_MAX_T_COND:
-        #raise ModelError
-        tcond_K = HP_MAX_T_COND
-        tsup2_K = tcond_K - HP_DELTA_T_COND  # lower the supply temp if necessary, tsup2 < tsup if max load is not enough
+    # tsup2 = tsup, if all load can be provided by the HP, otherwise lower the supply temp (tsup2 < tsup)
+    tsup2_K = np.where(tcond_K > HP_MAX_T_COND, HP_MAX_T_COND - HP_DELTA_T_COND, T_DH_sup_K)
+    tcond_K = np.minimum(tcond_K, HP_MAX_T_COND)
 
     # calculate evaporator temperature
     tevap_K = ground_temp_K - HP_DELTA_T_EVAP
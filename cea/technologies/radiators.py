@@ -6,9 +6,11 @@ heating radiators
 
 
 from scipy.optimize import newton
-import math
 import numpy as np
 
+from cea.utilities.jit import jit
+from cea.utilities.solvers import newton_array
+
 
 __author__ = "Jimeno A. Fonseca"
 __copyright__ = "Copyright 2015, Architecture and Building Systems - ETH Zurich"
@@ -56,8 +58,46 @@ def calc_radiator(Qh, tair, Qh0, tair0, tsh0, trh0):
         tsh = np.nan
         trh = np.nan
     # return floats with numpy function. Needed when np.vectorize is use to call this function
-    return np.float(tsh), np.float(trh), np.float(mCw) # C, C, W/C
+    return float(tsh), float(trh), float(mCw) # C, C, W/C
+
+
+def calc_radiator_array(Qh, tair, Qh0, tair0, tsh0, trh0):
+    """
+    Array version of :py:func:`calc_radiator` for all hours of the year: the heat balance of the hours with a load is
+    solved at once with :py:func:`cea.utilities.solvers.newton_array` (the hours without load are skipped).
 
+    :param Qh: Space heating demand in the building (hourly)
+    :param tair: environment temperature in the building (hourly)
+    :param Qh0: nominal radiator power
+    :param tair0: nominal environment temperature
+    :param tsh0: nominal supply temperature
+    :param trh0: nominal return temperature
+    :return: supply temperature [C], return temperature [C], capacity flow rate [W/C]
+    :rtype: tuple[numpy.ndarray]
+    """
+    Qh, tair = np.broadcast_arrays(np.asarray(Qh, dtype=float), np.asarray(tair, dtype=float))
+    tsh = np.full(Qh.shape, np.nan)
+    trh = np.full(Qh.shape, np.nan)
+    mCw = np.zeros(Qh.shape)
+    on = (Qh > 0) | (Qh < 0)  # use radiator function also for sensible cooling panels (ceiling cooling, chilled beam,...)
+    if not on.any():
+        return tsh, trh, mCw
+
+    nh = 0.3  # radiator constant
+    tair0 = tair0 + 273
+    tsh0 = tsh0 + 273
+    trh0 = trh0 + 273
+    mCw0 = Qh0 / (tsh0 - trh0)
+    LMRT0 = lmrt(tair0, trh0, tsh0)
+    Qh_on = Qh[on]
+    delta_t = Qh_on / mCw0
+    trh[on] = newton_array(fh, np.full(Qh_on.shape, trh0), args=(delta_t, Qh0, Qh_on, tair[on] + 273, LMRT0, nh),
+                           maxiter=100, tol=0.01) - 273
+    tsh[on] = trh[on] + Qh_on / mCw0
+    mCw[on] = Qh_on / (tsh[on] - trh[on])
+    return tsh, trh, mCw  # C, C, W/C
+
+@jit
 def fh(x, delta_t, Qh0, Qh, tair, LMRT0, nh):
     '''
     Static radiator heat balance equation from Holst (1996), eq. 6.
@@ -76,23 +116,14 @@ def fh(x, delta_t, Qh0, Qh, tair, LMRT0, nh):
     Eq = Qh - Qh0 * (LMRT / LMRT0) ** (nh + 1)
     return Eq
 
+@jit
 def lmrt(tair, trh, tsh):
     '''
-    Logarithmic temperature difference (Eq. 3 in Holst, 1996)
+    Logarithmic temperature difference (Eq. 3 in Holst, 1996), also for arrays of temperatures
     :param tair: environment temperature in the room
     :param trh: radiator exhaust temperature
     :param tsh: radiator supply temperature
     :return:
     '''
-    LMRT = (tsh - trh) / math.log((tsh - tair) / (trh - tair))
+    LMRT = (tsh - trh) / np.log((tsh - tair) / (trh - tair))
     return LMRT
-
-
-
-try:
-    # import Numba AOT versions of the functions above, overwriting them
-    from calc_radiator import fh, lmrt
-except ImportError:
-    # fall back to using the python version
-    # print('failed to import from calc_radiator.pyd, falling back to pure python functions')
-    pass
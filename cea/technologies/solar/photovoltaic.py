@@ -8,7 +8,6 @@ Photovoltaic
 
 import os
 import time
-from itertools import repeat
 from math import *
 
 import numpy as np
@@ -19,6 +18,7 @@ from scipy import interpolate
 import cea.config
 import cea.inputlocator
 import cea.utilities.parallel
+from cea.utilities.parallel import broadcast
 from cea.constants import HOURS_IN_YEAR
 from cea.technologies.solar import constants
 from cea.utilities import epwreader
@@ -62,7 +62,7 @@ def calc_PV(locator, config, latitude, longitude, weather_data, datetime_local,
     """
 
     t0 = time.perf_counter()
-    radiation_path = locator.get_radiation_building_sensors(building_name)
+    radiation_path, sensor_index_path = solar_equations.get_radiation_sensor_paths(locator, building_name)
     metadata_csv_path = locator.get_radiation_metadata(building_name)
 
     # solar properties
@@ -75,7 +75,7 @@ def calc_PV(locator, config, latitude, longitude, weather_data, datetime_local,
 
     # select sensor point with sufficient solar radiation
     max_annual_radiation, annual_radiation_threshold, sensors_rad_clean, sensors_metadata_clean = \
-        solar_equations.filter_low_potential(radiation_path, metadata_csv_path, config)
+        solar_equations.filter_low_potential(radiation_path, metadata_csv_path, config, sensor_index_path)
 
     print('filtering low potential sensor points done')
 
@@ -166,21 +166,15 @@ def calc_pv_generation(sensor_groups, weather_data, date_local, solar_properties
     """
 
     # local variables
-    number_groups = sensor_groups['number_groups']  # number of groups of sensor points
     prop_observers = sensor_groups['prop_observers']  # mean values of sensor properties of each group of sensors
     hourly_radiation = sensor_groups['hourlydata_groups']  # mean hourly radiation of sensors in each group [Wh/m2]
+    groups = prop_observers.index.values
 
     # convert degree to radians
     lat = radians(latitude)
     g_rad = np.radians(solar_properties.g)
     ha_rad = np.radians(solar_properties.ha)
     Sz_rad = np.radians(solar_properties.Sz)
-    Az_rad = np.radians(solar_properties.Az)
-
-    # empty list to store results
-    list_groups_area = [0 for i in range(number_groups)]
-    total_el_output_PV_kWh = [0 for i in range(number_groups)]
-    total_radiation_kWh = [0 for i in range(number_groups)]
 
     potential = pd.DataFrame(index=range(HOURS_IN_YEAR))
     panel_orientations = ['walls_south', 'walls_north', 'roofs_top', 'walls_east', 'walls_west']
@@ -194,55 +188,39 @@ def calc_pv_generation(sensor_groups, weather_data, date_local, solar_properties
 
     misc_losses = panel_properties_PV['misc_losses']  # cabling, resistances etc..
 
-    for group in prop_observers.index.values:
-        # calculate radiation types (direct/diffuse) in group
-        radiation_Wperm2 = solar_equations.cal_radiation_type(group, hourly_radiation, weather_data)
-
-        # read panel properties of each group
-        teta_z_deg = prop_observers.loc[group, 'surface_azimuth_deg']
-        tot_module_area_m2 = prop_observers.loc[group, 'area_installed_module_m2']
-        tilt_angle_deg = prop_observers.loc[group, 'B_deg']  # tilt angle of panels
-        # degree to radians
-        tilt_rad = radians(tilt_angle_deg)  # tilt angle
-        teta_z_deg = radians(teta_z_deg)  # surface azimuth
-
-        # calculate effective indicent angles necessary
-        teta_rad = np.vectorize(solar_equations.calc_angle_of_incidence)(g_rad, lat, ha_rad, tilt_rad, teta_z_deg)
-        teta_ed_rad, teta_eg_rad = calc_diffuseground_comp(tilt_rad)
-
-        absorbed_radiation_Wperm2 = np.vectorize(calc_absorbed_radiation_PV)(radiation_Wperm2.I_sol,
-                                                                             radiation_Wperm2.I_direct,
-                                                                             radiation_Wperm2.I_diffuse, tilt_rad,
-                                                                             Sz_rad, teta_rad, teta_ed_rad,
-                                                                             teta_eg_rad, panel_properties_PV)
-
-        T_cell_C = np.vectorize(calc_cell_temperature)(absorbed_radiation_Wperm2, weather_data.drybulb_C,
-                                                       panel_properties_PV)
-
-        el_output_PV_kW = np.vectorize(calc_PV_power)(absorbed_radiation_Wperm2, T_cell_C, eff_nom, tot_module_area_m2,
-                                                      Bref, misc_losses)
-
-        # write results from each group
-        panel_orientation = prop_observers.loc[group, 'type_orientation']
-        potential['PV_' + panel_orientation + '_E_kWh'] = potential[
-                                                              'PV_' + panel_orientation + '_E_kWh'] + el_output_PV_kW
-        potential['PV_' + panel_orientation + '_m2'] = potential['PV_' + panel_orientation + '_m2'] + tot_module_area_m2
-
-        # aggregate results from all modules
-        list_groups_area[group] = tot_module_area_m2
-        total_el_output_PV_kWh[group] = el_output_PV_kW
-        total_radiation_kWh[group] = (radiation_Wperm2['I_sol'] * tot_module_area_m2 / 1000)  # kWh
-
-    # check for missing groups and asign 0 as el_output_PV_kW
-    # panel_orientations = ['walls_south', 'walls_north', 'roofs_top', 'walls_east', 'walls_west']
-    # for panel_orientation in panel_orientations:
-    #     if panel_orientation not in prop_observers['type_orientation'].values:
-    #         potential['PV_' + panel_orientation + '_E_kWh'] = 0
-    #         potential['PV_' + panel_orientation + '_m2'] = 0
-
-    potential['E_PV_gen_kWh'] = sum(total_el_output_PV_kWh)
-    potential['radiation_kWh'] = sum(total_radiation_kWh).values
-    potential['Area_PV_m2'] = sum(list_groups_area)
+    # all groups are calculated at once: properties of the groups are columns (group x 1), hourly values are
+    # (group x hour) arrays and the weather / solar position are rows (1 x hour)
+    I_sol, I_direct, I_diffuse = solar_equations.calc_radiation_type_array(hourly_radiation[groups].values.T, weather_data)
+
+    # read panel properties of each group
+    tot_module_area_m2 = prop_observers['area_installed_module_m2'].values.astype(float)[:, np.newaxis]
+    tilt_rad = np.radians(prop_observers['B_deg'].values.astype(float))[:, np.newaxis]  # tilt angle of panels
+    teta_z_rad = np.radians(prop_observers['surface_azimuth_deg'].values.astype(float))[:, np.newaxis]  # azimuth
+
+    # calculate effective indicent angles necessary
+    teta_rad = solar_equations.calc_angle_of_incidence_array(g_rad.values, lat, ha_rad.values, tilt_rad, teta_z_rad)
+    teta_ed_rad, teta_eg_rad = calc_diffuseground_comp(tilt_rad)
+
+    absorbed_radiation_Wperm2 = calc_absorbed_radiation_PV_array(I_sol, I_direct, I_diffuse, tilt_rad,
+                                                                 Sz_rad.values, teta_rad, teta_ed_rad, teta_eg_rad,
+                                                                 panel_properties_PV)
+
+    T_cell_C = calc_cell_temperature(absorbed_radiation_Wperm2, weather_data.drybulb_C.values, panel_properties_PV)
+
+    el_output_PV_kW = calc_PV_power(absorbed_radiation_Wperm2, T_cell_C, eff_nom, tot_module_area_m2, Bref,
+                                    misc_losses)
+
+    # write results of the groups of each orientation
+    for panel_orientation, positions in prop_observers.groupby('type_orientation').indices.items():
+        potential['PV_' + panel_orientation + '_E_kWh'] = potential['PV_' + panel_orientation + '_E_kWh'] + \
+                                                          el_output_PV_kW[positions].sum(axis=0)
+        potential['PV_' + panel_orientation + '_m2'] = potential['PV_' + panel_orientation + '_m2'] + \
+                                                       tot_module_area_m2[positions].sum()
+
+    # aggregate results from all modules
+    potential['E_PV_gen_kWh'] = el_output_PV_kW.sum(axis=0)
+    potential['radiation_kWh'] = (I_sol * tot_module_area_m2 / 1000).sum(axis=0)  # kWh
+    potential['Area_PV_m2'] = tot_module_area_m2.sum()
     potential['Date'] = date_local
     potential = potential.set_index('Date')
 
@@ -310,7 +288,7 @@ def calc_diffuseground_comp(tilt_radians):
     """
     To calculate reflected radiation and diffuse radiation.
     :param tilt_radians:  surface tilt angle [rad]
-    :type tilt_radians: float
+    :type tilt_radians: float or np.ndarray
     :return teta_ed: effective incidence angle from diffuse radiation [rad]
     :return teta_eg: effective incidence angle from ground-reflected radiation [rad]
     :rtype teta_ed: float
@@ -321,10 +299,10 @@ def calc_diffuseground_comp(tilt_radians):
                  doi: 10.1002/9781118671603.ch5
 
     """
-    tilt = degrees(tilt_radians)
+    tilt = np.degrees(tilt_radians)
     teta_ed = 59.68 - 0.1388 * tilt + 0.001497 * tilt ** 2  # [degrees] (5.4.2)
     teta_eG = 90 - 0.5788 * tilt + 0.002693 * tilt ** 2  # [degrees] (5.4.1)
-    return radians(teta_ed), radians(teta_eG)
+    return np.radians(teta_ed), np.radians(teta_eG)
 
 
 def calc_absorbed_radiation_PV(I_sol, I_direct, I_diffuse, tilt, Sz, teta, tetaed, tetaeg, panel_properties_PV):
@@ -432,6 +410,74 @@ def calc_absorbed_radiation_PV(I_sol, I_direct, I_diffuse, tilt, Sz, teta, tetae
     return absorbed_radiation_Wperm2
 
 
+def calc_absorbed_radiation_PV_array(I_sol, I_direct, I_diffuse, tilt, Sz, teta, tetaed, tetaeg, panel_properties_PV):
+    """
+    Array version of :py:func:`calc_absorbed_radiation_PV`. The arguments are broadcast against each other, e.g. the
+    radiation and angle of incidence as (group x hour) arrays, the zenith angle per hour and the tilt and effective
+    incidence angles per group (as (group x 1) arrays).
+
+    :return: absorbed radiation [W/m2]
+    :rtype: np.ndarray
+    """
+
+    # read variables
+    n = constants.n  # refractive index of glass
+    Pg = constants.Pg  # ground reflectance
+    K = constants.K  # glazing extinction coefficient
+    a0 = panel_properties_PV['PV_a0']
+    a1 = panel_properties_PV['PV_a1']
+    a2 = panel_properties_PV['PV_a2']
+    a3 = panel_properties_PV['PV_a3']
+    a4 = panel_properties_PV['PV_a4']
+    L = panel_properties_PV['PV_th']
+
+    # calcualte ratio of beam radiation on a tilted plane
+    # to avoid inconvergence when I_sol = 0
+    lim1 = radians(0)
+    lim2 = radians(90)
+    lim3 = radians(89.999)
+
+    teta = np.where(teta < lim1, np.minimum(lim3, np.abs(teta)), teta)
+    teta = np.where(teta >= lim2, lim3, teta)
+
+    Sz = np.where(Sz < lim1, np.minimum(lim3, np.abs(Sz)), Sz)
+    Sz = np.where(Sz >= lim2, lim3, Sz)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Rb: ratio of beam radiation of tilted surface to that on horizontal surface
+        Rb = np.where(Sz <= radians(85), np.cos(teta) / np.cos(Sz), 0.0)  # no direct radiation close to the horizon
+
+        # calculate air mass modifier
+        m = 1 / np.cos(Sz)  # air mass
+        M = a0 + a1 * m + a2 * m ** 2 + a3 * m ** 3 + a4 * m ** 4  # air mass modifier
+
+        # incidence angle modifier for direct (beam) radiation
+        Ta_n = exp(-K * L) * (1 - ((n - 1) / (n + 1)) ** 2)
+        kteta_B = np.where(teta < radians(90), calc_incidence_angle_modifier(teta, n, K, L) / Ta_n, 0.0)
+
+        # incidence angle modifier for diffuse and ground-reflected radiation
+        kteta_D = calc_incidence_angle_modifier(tetaed, n, K, L) / Ta_n
+        kteta_eG = calc_incidence_angle_modifier(tetaeg, n, K, L) / Ta_n
+
+    # absorbed solar radiation
+    absorbed_radiation_Wperm2 = M * Ta_n * (
+            kteta_B * I_direct * Rb + kteta_D * I_diffuse * (1 + np.cos(tilt)) / 2 + kteta_eG * I_sol * Pg * (
+            1 - np.cos(tilt)) / 2)  # [W/m2] (5.12.1)
+    return np.where(absorbed_radiation_Wperm2 < 0.0, 0.0, absorbed_radiation_Wperm2)  # points are 0 or too much losses
+
+
+def calc_incidence_angle_modifier(teta, n, K, L):
+    """
+    Transmittance of the glazing for radiation with the incidence angle ``teta`` [rad] (5.1.4 - 5.2.2, before
+    normalization to the transmittance at normal incidence).
+    """
+    teta_r = np.arcsin(np.sin(teta) / n)  # refraction angle in radians(aproximation accrding to Soteris A.) (5.1.4)
+    part1 = teta_r + teta
+    part2 = teta_r - teta
+    return np.exp((-K * L) / np.cos(teta_r)) * (
+            1 - 0.5 * ((np.sin(part2) ** 2) / (np.sin(part1) ** 2) + (np.tan(part2) ** 2) / (np.tan(part1) ** 2)))
+
+
 def calc_PV_power(absorbed_radiation_Wperm2, T_cell_C, eff_nom, tot_module_area_m2, Bref_perC, misc_losses):
     """
     To calculate the power production of PV panels.
@@ -800,13 +846,12 @@ def main(config):
     weather_data = epwreader.epw_reader(locator.get_weather_file())
     date_local = solar_equations.calc_datetime_local_from_weather_file(weather_data, latitude, longitude)
 
-    n = len(buildings_names)
-    cea.utilities.parallel.vectorize(calc_PV, config.get_number_of_processes())(repeat(locator, n),
-                                                                                repeat(config, n),
-                                                                                repeat(latitude, n),
-                                                                                repeat(longitude, n),
-                                                                                repeat(weather_data, n),
-                                                                                repeat(date_local, n),
+    cea.utilities.parallel.vectorize(calc_PV, config.get_number_of_processes())(broadcast(locator),
+                                                                                broadcast(config),
+                                                                                broadcast(latitude),
+                                                                                broadcast(longitude),
+                                                                                broadcast(weather_data),
+                                                                                broadcast(date_local),
                                                                                 buildings_names)
 
     # aggregate results from all buildings
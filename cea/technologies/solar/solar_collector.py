@@ -7,7 +7,6 @@ solar collectors
 
 import os
 import time
-from itertools import repeat
 from math import *
 
 import geopandas as gpd
@@ -19,6 +18,7 @@ from numba import jit
 import cea.config
 import cea.inputlocator
 import cea.utilities.parallel
+from cea.utilities.parallel import broadcast
 from cea.constants import HOURS_IN_YEAR
 from cea.technologies.solar import constants
 from cea.utilities import epwreader
@@ -62,7 +62,7 @@ def calc_SC(locator, config, latitude, longitude, weather_data, date_local, buil
 
     type_panel = config.solar.type_SCpanel
 
-    radiation_csv = locator.get_radiation_building_sensors(building=building_name)
+    radiation_path, sensor_index_path = solar_equations.get_radiation_sensor_paths(locator, building_name)
     metadata_csv = locator.get_radiation_metadata(building=building_name)
 
     # solar properties
@@ -75,7 +75,7 @@ def calc_SC(locator, config, latitude, longitude, weather_data, date_local, buil
 
     # select sensor point with sufficient solar radiation
     max_annual_radiation, annual_radiation_threshold, sensors_rad_clean, sensors_metadata_clean = \
-        solar_equations.filter_low_potential(radiation_csv, metadata_csv, config)
+        solar_equations.filter_low_potential(radiation_path, metadata_csv, config, sensor_index_path)
 
     print('filtering low potential sensor points done for building %s' % building_name)
 
@@ -1004,13 +1004,12 @@ def main(config):
     date_local = solar_equations.calc_datetime_local_from_weather_file(weather_data, latitude, longitude)
     print('reading weather data done')
 
-    n = len(building_names)
-    cea.utilities.parallel.vectorize(calc_SC, config.get_number_of_processes())(repeat(locator, n),
-                                                                                repeat(config, n),
-                                                                                repeat(latitude, n),
-                                                                                repeat(longitude, n),
-                                                                                repeat(weather_data, n),
-                                                                                repeat(date_local, n),
+    cea.utilities.parallel.vectorize(calc_SC, config.get_number_of_processes())(broadcast(locator),
+                                                                                broadcast(config),
+                                                                                broadcast(latitude),
+                                                                                broadcast(longitude),
+                                                                                broadcast(weather_data),
+                                                                                broadcast(date_local),
                                                                                 building_names)
 
     # aggregate results from all buildings
@@ -9,13 +9,13 @@ Sensible Heat Storage - Fully Mixed tank
 import math
 
 import numpy as np
-from scipy.integrate import odeint
 
 from cea.constants import ASPECT_RATIO, HEAT_CAPACITY_OF_WATER_JPERKGK, P_WATER_KGPERM3, WH_TO_J
 from cea.demand.constants import TWW_SETPOINT, B_F
 from cea.optimization.constants import T_TANK_FULLY_DISCHARGED_K, T_TANK_FULLY_CHARGED_K, DT_COOL
 from cea.technologies.constants import U_COOL, U_HEAT, TANK_HEX_EFFECTIVENESS
 from cea.technologies.thermal_network.substation_matrix import calc_area_HEX, calc_dTm_HEX
+from cea.utilities.jit import jit
 
 __author__ = "Shanshan Hsieh"
 __copyright__ = "Copyright 2016, Architecture and Building Systems - ETH Zurich"
@@ -171,7 +171,8 @@ def ode_cold_water_tank(y, t, q_gain_W, q_discharged_W, q_charged_W, V_tank_m3):
 
 def calc_tank_temperature(T_start_C, q_loss_W, q_discharged_W, q_charged_W, V_tank_m3, tank_type):
     """
-    This algorithm solves the differential equation, ode.
+    This algorithm solves the differential equation of the tank (``ode_hot_water_tank`` or ``ode_cold_water_tank``)
+    over one hour. The heat flows are constant over the hour, so the exact solution is a linear step.
 
     :param T_start_C: initial tank temperature in [C]
     :param q_loss_W: storage tank sensible heat loss in Wh.
@@ -188,27 +189,69 @@ def calc_tank_temperature(T_start_C, q_loss_W, q_discharged_W, q_charged_W, V_ta
     :returns T_tank_C: tank temperature after the energy balance
     :rtype T_tank_C: float
     """
-    t = np.linspace(0, 1, 2)
     if tank_type == 'hot_water':
-        y = odeint(ode_hot_water_tank, T_start_C, t, args=(
-            q_loss_W, q_discharged_W, q_charged_W, V_tank_m3))
+        dydt = ode_hot_water_tank(T_start_C, 0.0, q_loss_W, q_discharged_W, q_charged_W, V_tank_m3)
     elif tank_type == 'cold_water':
-        y = odeint(ode_cold_water_tank, T_start_C, t, args=(
-            q_loss_W, q_discharged_W, q_charged_W, V_tank_m3))
+        dydt = ode_cold_water_tank(T_start_C, 0.0, q_loss_W, q_discharged_W, q_charged_W, V_tank_m3)
     else:
         raise ValueError('Please specified the tank type, it should be either cold_water or hot_water.')
-    T_tank_C = y[1]
-    return T_tank_C[0]
-
-
-# use the optimized (numba_cc) versions of the ode function in this module if available
-try:
-    # import Numba AOT versions of the functions above, overwriting them
-    from .storagetank_cc import (ode)
-except ImportError:
-    # fall back to using the python version
-    # print('failed to import from storagetank_cc.pyd, falling back to pure python functions')
-    pass
+    T_tank_C = T_start_C + dydt  # over one hour
+    return T_tank_C
+
+
+def calc_dhw_tank(T_int_C, T_ext_C, q_tank_discharged_W, V_tank_m3, area_tank_surface_m2, T_start_C=TWW_SETPOINT):
+    """
+    The heat balance (see ``calc_dhw_tank_heat_balance``) and the temperature (see ``calc_tank_temperature``) of the
+    DHW tank for a series of hours. The tank is charged back to the set point in every hour with a discharge, so the
+    temperature only changes by the heat loss in the other hours.
+
+    :param T_int_C: room temperature of each hour in [C]
+    :param T_ext_C: ambient temperature of each hour in [C]
+    :param q_tank_discharged_W: heat discharged from the tank in each hour in [Wh]
+    :param V_tank_m3: DHW tank size in [m3]
+    :param area_tank_surface_m2: surface area of the tank in [m2]
+    :param T_start_C: tank temperature at the beginning of the first hour in [C]
+    :type T_int_C: ndarray
+    :type T_ext_C: ndarray
+    :type q_tank_discharged_W: ndarray
+
+    :return T_tank_C: tank temperature at the end of each hour in [C]
+    :return q_loss_W: storage sensible heat loss in each hour in [Wh]
+    :return q_charged_W: heat charged into the tank in each hour in [Wh]
+    :rtype T_tank_C: ndarray
+    :rtype q_loss_W: ndarray
+    :rtype q_charged_W: ndarray
+    """
+    T_basement_C = T_int_C - B_F * (T_int_C - T_ext_C)  # Calculate T_basement_C in basement according to EN
+    mcp_tank_WhperK = P_WATER_KGPERM3 * V_tank_m3 * (HEAT_CAPACITY_OF_WATER_JPERKGK / 1000) / 3.6
+    UA_tank_WperK = U_DHWTANK * area_tank_surface_m2
+    charged = q_tank_discharged_W > 0
+
+    T_tank_C = calc_dhw_tank_temperatures(charged, T_basement_C.astype(float), q_tank_discharged_W.astype(float),
+                                          float(T_start_C), float(TWW_SETPOINT), UA_tank_WperK, mcp_tank_WhperK)
+    T_tank_start_C = np.concatenate([[T_start_C], T_tank_C[:-1]])
+    q_loss_W = calc_hot_tank_heat_loss(area_tank_surface_m2, T_tank_start_C, T_basement_C)
+    q_charged_W = np.where(charged, q_tank_discharged_W + q_loss_W + mcp_tank_WhperK * (TWW_SETPOINT - T_tank_start_C),
+                           0.0)
+    return T_tank_C, q_loss_W, q_charged_W
+
+
+@jit
+def calc_dhw_tank_temperatures(charged, T_basement_C, q_tank_discharged_W, T_start_C, T_setpoint_C, UA_tank_WperK,
+                               mcp_tank_WhperK):
+    """
+    The temperature of the DHW tank at the end of each hour (see ``calc_dhw_tank``): a recurrence, only the hours
+    without discharge depend on the temperature of the last hour.
+    """
+    T_tank_C = np.empty(len(q_tank_discharged_W))
+    T_C = T_start_C
+    for k in range(len(q_tank_discharged_W)):
+        if charged[k]:
+            T_C = T_setpoint_C
+        else:
+            T_C = T_C - (UA_tank_WperK * (T_C - T_basement_C[k]) + q_tank_discharged_W[k]) / mcp_tank_WhperK
+        T_tank_C[k] = T_C
+    return T_tank_C
 
 
 # ================================
@@ -13,6 +13,7 @@ from numba import jit
 import cea.config
 from cea.constants import HEAT_CAPACITY_OF_WATER_JPERKGK
 from cea.constants import HOURS_IN_YEAR
+from cea.demand.demand_writers import read_demand_results
 from cea.technologies.constants import DT_HEAT, DT_COOL, U_COOL, U_HEAT
 
 __author__ = "Jimeno A. Fonseca"
@@ -33,7 +34,7 @@ def substation_main_heating(locator, total_demand, buildings_name_with_heating,
         heating_system_temperatures_dict = {}
         T_DHN_supply = np.zeros(HOURS_IN_YEAR)
         for name in buildings_name_with_heating:
-            buildings_dict[name] = pd.read_csv(locator.get_demand_results_file(name))
+            buildings_dict[name] = read_demand_results(locator, name)
             print(name)
             ## calculates the building side supply and return temperatures for each unit
             Ths_supply_C, Ths_re_C = calc_temp_hex_building_side_heating(buildings_dict[name],
@@ -64,7 +65,7 @@ def substation_main_heating(locator, total_demand, buildings_name_with_heating,
     else:
         # CALCULATE SUBSTATIONS DURING DECENTRALIZED OPTIMIZATION
         for name in buildings_name_with_heating:
-            substation_demand = pd.read_csv(locator.get_demand_results_file(name))
+            substation_demand = read_demand_results(locator, name)
             Ths_supply_C, Ths_return_C = calc_temp_hex_building_side_heating(substation_demand, heating_configuration)
             T_heating_system_supply = calc_temp_this_building_heating(Ths_supply_C)
             substation_model_heating(name,
@@ -103,7 +104,7 @@ def substation_main_cooling(locator, total_demand, buildings_name_with_cooling,
         T_DCN_supply_to_cs_ref = np.zeros(HOURS_IN_YEAR) + 1E6
         T_DCN_supply_to_cs_ref_data = np.zeros(HOURS_IN_YEAR) + 1E6
         for name in buildings_name_with_cooling:
-            buildings_dict[name] = pd.read_csv(locator.get_demand_results_file(name))
+            buildings_dict[name] = read_demand_results(locator, name)
 
             T_supply_to_cs_ref, T_supply_to_cs_ref_data, \
             Tcs_return_C, Tcs_supply_C = calc_temp_hex_building_side_cooling(buildings_dict[name],
@@ -142,7 +143,7 @@ def substation_main_cooling(locator, total_demand, buildings_name_with_cooling,
     else:
         # CALCULATE SUBSTATIONS DURING DECENTRALIZED OPTIMIZATION
         for name in buildings_name_with_cooling:
-            substation_demand = pd.read_csv(locator.get_demand_results_file(name))
+            substation_demand = read_demand_results(locator, name)
             T_supply_to_cs_ref, T_supply_to_cs_ref_data, \
             Tcs_return_C, Tcs_supply_C = calc_temp_hex_building_side_cooling(substation_demand, cooling_configuration)
 
@@ -712,7 +713,7 @@ def calc_HEX_cooling(Q_cooling_W, UA, thi_K, tho_K, tci_K, ch_kWperK):
     else:
         tco_C = 0.0
         cc_kWperK = 0.0
-    return np.float(tco_C), np.float(cc_kWperK)
+    return float(tco_C), float(cc_kWperK)
 
 
 @jit(nopython=True)
@@ -815,7 +816,112 @@ def calc_HEX_heating(Q_heating_W, UA, thi_K, tco_K, tci_K, cc_kWperK):
     else:
         tho_C = 0
         ch_kWperK = 0
-    return np.float(tho_C), np.float(ch_kWperK)
+    return float(tho_C), float(ch_kWperK)
+
+
+def isclose_array(a, b):
+    """Array version of :py:func:`isclose`"""
+    return np.abs(a - b) <= 1e-09 * np.maximum(np.abs(a), np.abs(b))
+
+
+def calc_HEX_cooling_array(Q_cooling_W, UA, thi_K, tho_K, tci_K, ch_kWperK):
+    """
+    Array version of :py:func:`calc_HEX_cooling`: the efficiencies of all hours are iterated at once, each hour until
+    it converged.
+
+    :return:
+        - ``tco``, out temperature of secondary side (district cooling network)
+        - ``cc``, capacity mass flow rate secondary side
+    :rtype: tuple[numpy.ndarray]
+    """
+    Q_cooling_W, UA, thi_K, tho_K, tci_K, ch_kWperK = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (Q_cooling_W, UA, thi_K, tho_K, tci_K, ch_kWperK)))
+    tco_C = np.zeros(Q_cooling_W.shape)
+    cc_kWperK = np.zeros(Q_cooling_W.shape)
+    on = (ch_kWperK > 0) & ~isclose_array(thi_K, tho_K)
+    if not on.any():
+        return tco_C, cc_kWperK
+    Q_cooling_W, UA, thi_K, tho_K, tci_K, ch_kWperK = (x[on] for x in (Q_cooling_W, UA, thi_K, tho_K, tci_K,
+                                                                           ch_kWperK))
+
+    previous_efficiency = np.full(Q_cooling_W.shape, 0.1)
+    current_efficiency = np.full(Q_cooling_W.shape, -1.0)  # dummy value for first iteration
+    cmin_kWperK = ch_kWperK * (thi_K - tho_K) / ((thi_K - tci_K) * previous_efficiency)
+    cc_on_kWperK = np.zeros(Q_cooling_W.shape)
+    tco_K = np.full(Q_cooling_W.shape, 273.0)  # actual value calculated in iteration
+    active = np.arange(Q_cooling_W.size)
+    while active.size:
+        assert not np.any(cmin_kWperK[active] < 0.0), "substation.calc_HEX_cooling_array: cmin is negative!!"
+        cc_on_kWperK[active] = cmin_kWperK[active]
+        swap = cmin_kWperK[active] >= ch_kWperK[active]
+        cmax = np.where(swap, cc_on_kWperK[active], ch_kWperK[active])
+        cmin = np.where(swap, ch_kWperK[active], cmin_kWperK[active])
+        cr = cmin / cmax
+        NTU = UA[active] / cmin
+
+        previous_efficiency[active] = current_efficiency[active]
+        current_efficiency[active] = calc_plate_HEX(NTU, cr)
+
+        cmin_kWperK[active] = ch_kWperK[active] * (thi_K[active] - tho_K[active]) / (
+                (thi_K[active] - tci_K[active]) * current_efficiency[active])
+        tco_K[active] = tci_K[active] + current_efficiency[active] * cmin_kWperK[active] * (
+                thi_K[active] - tci_K[active]) / cc_on_kWperK[active]
+        active = active[np.abs((previous_efficiency[active] - current_efficiency[active])
+                               / previous_efficiency[active]) > 0.00000001]
+
+    cc_kWperK[on] = Q_cooling_W / np.abs(tci_K - tco_K)
+    tco_C[on] = tco_K - 273.0
+    return tco_C, cc_kWperK
+
+
+def calc_HEX_heating_array(Q_heating_W, UA, thi_K, tco_K, tci_K, cc_kWperK):
+    """
+    Array version of :py:func:`calc_HEX_heating`: the efficiencies of all hours are iterated at once, each hour until
+    it converged.
+
+    :return:
+        - ``tho``, out temperature of secondary side (district cooling network)
+        - ``ch``, capacity mass flow rate secondary side
+    :rtype: tuple[numpy.ndarray]
+    """
+    Q_heating_W, UA, thi_K, tco_K, tci_K, cc_kWperK = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (Q_heating_W, UA, thi_K, tco_K, tci_K, cc_kWperK)))
+    tho_C = np.zeros(Q_heating_W.shape)
+    ch_kWperK = np.zeros(Q_heating_W.shape)
+    on = Q_heating_W > 0.0
+    if not on.any():
+        return tho_C, ch_kWperK
+    UA, thi_K, tco_K, tci_K, cc_kWperK = (x[on] for x in (UA, thi_K, tco_K, tci_K, cc_kWperK))
+
+    # to avoid errors with temperature changes < 0.001
+    dT_primary = np.where(isclose_array(tco_K, tci_K), 0.0001, tco_K - tci_K)
+    previous_efficiency = np.full(dT_primary.shape, 0.1)
+    current_efficiency = np.full(dT_primary.shape, 0.8)  # dummy value for first iteration
+    cmin_kWperK = cc_kWperK * dT_primary / ((thi_K - tci_K) * previous_efficiency)
+    ch_on_kWperK = np.zeros(dT_primary.shape)
+    tho_K = np.zeros(dT_primary.shape)
+    active = np.arange(dT_primary.size)
+    while active.size:
+        ch_on_kWperK[active] = cmin_kWperK[active]
+        swap = cmin_kWperK[active] >= cc_kWperK[active]
+        cmax = np.where(swap, cmin_kWperK[active], cc_kWperK[active])
+        cmin = np.where(swap, cc_kWperK[active], cmin_kWperK[active])
+        cr = cmin / cmax
+        NTU = UA[active] / cmin
+
+        previous_efficiency[active] = current_efficiency[active]
+        current_efficiency[active] = calc_shell_HEX(NTU, cr)
+
+        cmin_kWperK[active] = cc_kWperK[active] * dT_primary[active] / (
+                (thi_K[active] - tci_K[active]) * current_efficiency[active])
+        tho_K[active] = thi_K[active] - current_efficiency[active] * cmin_kWperK[active] * (
+                thi_K[active] - tci_K[active]) / ch_on_kWperK[active]
+        active = active[np.abs((previous_efficiency[active] - current_efficiency[active])
+                               / previous_efficiency[active]) > 0.00000001]
+
+    tho_C[on] = tho_K - 273
+    ch_kWperK[on] = ch_on_kWperK
+    return tho_C, ch_kWperK
 
 
 def calc_dTm_HEX(thi, tho, tci, tco):
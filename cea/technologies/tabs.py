@@ -9,6 +9,8 @@ Termoactivated building surfaces (TABS)
 import numpy as np
 import scipy.optimize
 
+from cea.utilities.solvers import newton_array
+
 __author__ = "Martin Mosteiro"
 __copyright__ = "Copyright 2016, Architecture and Building Systems - ETH Zurich"
 __credits__ = ["Martin Mosteiro"]
@@ -49,10 +51,6 @@ def calc_floorheating(Qh, tm, Qh0, tsh0, trh0, Af):
         A_tabs = 0.8 * Af   # m2
         H_tabs = A_tabs / R_tabs
 
-        def fh(x, mCw0, k2, tm, H_tabs):
-            Eq = mCw0 * k2 - (x+k2-tm) * H_tabs
-            return Eq
-
         k2 = Qh * k1
         result = scipy.optimize.newton(fh, trh0, args=(mCw0, k2, tsh0, H_tabs),  maxiter=1000, tol=0.1) - 273
         trh = result.real
@@ -63,3 +61,49 @@ def calc_floorheating(Qh, tm, Qh0, tsh0, trh0, Af):
         tsh = np.nan
         trh = np.nan
     return tsh, trh, mCw # C,C, W/C
+
+
+def fh(x, mCw0, k2, tm, H_tabs):
+    """TABS heat balance (SIA 2044) of :py:func:`calc_floorheating`, also for arrays"""
+    Eq = mCw0 * k2 - (x+k2-tm) * H_tabs
+    return Eq
+
+
+def calc_floorheating_array(Qh, tm, Qh0, tsh0, trh0, Af):
+    """
+    Array version of :py:func:`calc_floorheating` for all hours of the year: the heat balance of the hours with a
+    heating demand is solved at once with :py:func:`cea.utilities.solvers.newton_array`.
+
+    :param Qh: heating demand (hourly)
+    :param tm: Temperature of the thermal mass (hourly)
+    :param Qh0: nominal heating power of the heating system
+    :param tsh0: nominal supply temperature to the TABS system
+    :param trh0: nominal return temperature from the TABS system
+    :param Af: heated area
+
+    :return: supply temperature [C], return temperature [C], flow rate [W/C]
+    :rtype: tuple[numpy.ndarray]
+    """
+    Qh = np.asarray(Qh, dtype=float)
+    tsh = np.full(Qh.shape, np.nan)
+    trh = np.full(Qh.shape, np.nan)
+    mCw = np.zeros(Qh.shape)
+    on = Qh > 0
+    if not on.any():
+        return tsh, trh, mCw
+
+    tsh0 = tsh0 + 273
+    trh0 = trh0 + 273
+    mCw0 = Qh0 / (tsh0 - trh0)
+    k1 = 1 / mCw0
+
+    R_tabs = 0.08       # m2-K/W from SIA 2044
+    A_tabs = 0.8 * Af   # m2
+    H_tabs = A_tabs / R_tabs
+
+    k2 = Qh[on] * k1
+    # like calc_floorheating, the nominal supply temperature is used as the temperature in the heat balance
+    trh[on] = newton_array(fh, np.full(k2.shape, trh0), args=(mCw0, k2, tsh0, H_tabs), maxiter=1000, tol=0.1) - 273
+    tsh[on] = trh[on] + k2
+    mCw[on] = Qh[on] / (tsh[on] - trh[on])
+    return tsh, trh, mCw  # C,C, W/C
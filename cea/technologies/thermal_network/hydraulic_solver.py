@@ -0,0 +1,103 @@
+"""
+Sparse solver for the linear systems of the edge-node incidence matrix of a thermal network
+"""
+
+
+
+
+import collections
+
+import numpy as np
+import scipy.sparse
+import scipy.sparse.linalg
+
+LAPLACIAN_FACTORS_CACHE_SIZE = 8  # number of network topologies whose factorization is kept by each process
+
+
+class EdgeNodeSolver(object):
+    """
+    Solves the mass flow balance (A * m_edges = m_nodes) and the pressure equation (A^T * p_nodes = dp_edges) of a
+    thermal network with the edge-node incidence matrix A (n x e) stored as a sparse matrix.
+
+    Both systems are reduced to the weighted graph laplacian L = A * A^T, with the row and column of one (ground) node
+    removed. L only depends on the topology of the network - changing the flow direction of an edge (the sign of a
+    column of A) does not change L - so it is factorized once per network and ground node and the factorization is
+    reused for every time step and every flow direction. The results are the same as those of ``np.linalg.lstsq``:
+
+    - mass flows: the minimum norm solution of the system without the equation of the ground node (for networks
+      without loops, this is the unique solution)
+    - pressures: the minimum norm least squares solution (the pressures are only defined up to a constant, so the mean
+      of the node pressures is zero)
+
+    The right hand sides can be vectors or matrices with one column per time step.
+    """
+    # {(topology, ground node): factorized reduced laplacian (None if singular)} of the last topologies - the
+    # optimization evaluates many network layouts in one process
+    laplacian_factors_cache = collections.OrderedDict()
+
+    def __init__(self, edge_node):
+        """
+        :param edge_node: edge-node incidence matrix (n x e), e.g. ``ThermalNetwork.edge_node_df``
+        :type edge_node: pd.DataFrame or np.ndarray
+        """
+        self.edge_node = scipy.sparse.csr_matrix(np.asarray(edge_node, dtype=float))
+        self.n_nodes, self.n_edges = self.edge_node.shape
+        self.topology = (self.edge_node.shape, self.edge_node.indptr.tobytes(), self.edge_node.indices.tobytes())
+
+    def reduced_laplacian_factor(self, ground):
+        """Return the LU factorization of the laplacian without the ground node (``None`` if it is singular)"""
+        key = (self.topology, ground)
+        cache = EdgeNodeSolver.laplacian_factors_cache
+        if key in cache:
+            cache.move_to_end(key)
+        else:
+            keep = np.delete(np.arange(self.n_nodes), ground)
+            reduced = self.edge_node[keep]
+            try:
+                factor = scipy.sparse.linalg.splu((reduced * reduced.T).tocsc())
+            except RuntimeError:
+                # the network is not connected, fall back to the dense least squares solution
+                factor = None
+            cache[key] = factor
+            if len(cache) > LAPLACIAN_FACTORS_CACHE_SIZE:
+                cache.popitem(last=False)
+        return cache[key]
+
+    def solve_edge_flows(self, node_flows, ground):
+        """
+        Calculate the mass flow in each edge from the mass flow at each node, ignoring the (redundant) mass balance
+        equation of the ``ground`` node.
+
+        :param np.ndarray node_flows: mass flow at each node (n) or (n x t)
+        :param int ground: index of the node without mass balance equation (e.g. a plant node)
+        :return: mass flow in each edge (e) or (e x t)
+        :rtype: np.ndarray
+        """
+        reduced = self.edge_node[np.delete(np.arange(self.n_nodes), ground)]
+        b = np.delete(np.asarray(node_flows, dtype=float), ground, axis=0)
+        factor = self.reduced_laplacian_factor(ground)
+        if factor is None:
+            return np.linalg.lstsq(reduced.toarray(), b, rcond=-1)[0]
+        return reduced.T * factor.solve(b)
+
+    def solve_node_potentials(self, edge_differences):
+        """
+        Calculate the value (e.g. the pressure) at each node, such that the difference between the two nodes of each
+        edge (A^T * x) matches ``edge_differences`` as closely as possible.
+
+        :param np.ndarray edge_differences: difference over each edge (e) or (e x t)
+        :return: value at each node (n) or (n x t), the mean of the values of all nodes is zero
+        :rtype: np.ndarray
+        """
+        edge_differences = np.asarray(edge_differences, dtype=float)
+        factor = self.reduced_laplacian_factor(0)
+        if factor is None:
+            return np.linalg.lstsq(self.edge_node.T.toarray(), edge_differences, rcond=-1)[0]
+        b = self.edge_node * edge_differences
+        node_values = np.zeros(b.shape)
+        node_values[1:] = factor.solve(b[1:])
+        return node_values - node_values.mean(axis=0)
+
+    def node_balance(self, edge_flows):
+        """The net mass flow at each node (A * m_edges)"""
+        return self.edge_node * np.asarray(edge_flows, dtype=float)
@@ -0,0 +1,223 @@
+"""
+Temperature propagation through thermal networks without loops
+"""
+
+
+
+
+import collections
+
+import numpy as np
+
+from cea.constants import HEAT_CAPACITY_OF_WATER_JPERKGK
+from cea.technologies.thermal_network.thermal_network_loss import calc_temperature_out_per_pipe
+
+SOLVERS_CACHE_SIZE = 8  # number of network topologies whose solver is kept by each process
+
+
+class TreeTemperatureSolver(object):
+    """
+    Calculates the supply and return temperatures of a thermal network without loops and with a single plant in one
+    ordered sweep over the nodes, instead of searching the edge-node matrix for nodes with known inflow temperatures
+    until all nodes are solved (see :py:func:`cea.technologies.thermal_network.thermal_network.calc_supply_temperatures`
+    and :py:func:`cea.technologies.thermal_network.thermal_network.calc_return_temperatures`, which implement the same
+    model for any network).
+
+    In such a network, water always flows away from the plant in the supply network (and towards the plant in the
+    return network), so the order of the nodes only depends on the topology and is computed once. All hourly inputs
+    can be given for one hour (e.g. mass flows as (e) arrays) or for several hours at once (e.g. (e x t) arrays).
+    """
+    # {(topology, plant node): TreeTemperatureSolver} of the last topologies - the optimization evaluates many network
+    # layouts in one process
+    solvers_cache = collections.OrderedDict()
+
+    def __init__(self, edge_node, plant_node):
+        """
+        :param np.ndarray edge_node: edge-node incidence matrix (n x e), the direction of the edges is ignored
+        :param int plant_node: index of the plant node
+        """
+        n_nodes, n_edges = edge_node.shape
+        self.n_nodes = n_nodes
+        self.n_edges = n_edges
+        self.plant_node = plant_node
+
+        edge_nodes = [np.nonzero(edge_node[:, edge])[0] for edge in range(n_edges)]
+        neighbours = collections.defaultdict(list)
+        for edge, (node_a, node_b) in enumerate(edge_nodes):
+            neighbours[node_a].append((node_b, edge))
+            neighbours[node_b].append((node_a, edge))
+
+        # order the nodes by distance from the plant (breadth first)
+        self.parent = np.full(n_nodes, -1)
+        self.parent_edge = np.full(n_nodes, -1)
+        self.order = [plant_node]
+        visited = {plant_node}
+        for node in self.order:
+            for neighbour, edge in neighbours[node]:
+                if neighbour not in visited:
+                    visited.add(neighbour)
+                    self.parent[neighbour] = node
+                    self.parent_edge[neighbour] = edge
+                    self.order.append(neighbour)
+
+        # incidence matrix of the edges oriented away from the plant
+        self.edge_node = np.zeros((n_nodes, n_edges))
+        for node in self.order[1:]:
+            self.edge_node[self.parent[node], self.parent_edge[node]] = -1
+            self.edge_node[node, self.parent_edge[node]] = 1
+
+    @classmethod
+    def for_network(cls, edge_node, plant_nodes):
+        """
+        Return the (cached) solver for the network or ``None`` if the network has loops or more than one plant.
+
+        :param edge_node: edge-node incidence matrix (n x e)
+        :param plant_nodes: indices of the plant nodes
+        """
+        edge_node = np.asarray(edge_node)
+        n_nodes, n_edges = edge_node.shape
+        if len(plant_nodes) != 1 or n_edges != n_nodes - 1 or (np.count_nonzero(edge_node, axis=0) != 2).any():
+            return None
+        key = (edge_node.shape, np.flatnonzero(edge_node).tobytes(), plant_nodes[0])
+        if key in cls.solvers_cache:
+            cls.solvers_cache.move_to_end(key)
+        else:
+            solver = cls(edge_node, plant_nodes[0])
+            cls.solvers_cache[key] = solver if len(solver.order) == n_nodes else None  # None if not connected
+            if len(cls.solvers_cache) > SOLVERS_CACHE_SIZE:
+                cls.solvers_cache.popitem(last=False)
+        return cls.solvers_cache[key]
+
+    def flows_away_from_plant(self, edge_node, mass_flow):
+        """True if all edges of ``edge_node`` with mass flow point away from the plant (as in the supply network)"""
+        edge_node = np.asarray(edge_node)
+        flowing = np.asarray(mass_flow).reshape(self.n_edges, -1).max(axis=1) > 0
+        return (edge_node[:, flowing] == self.edge_node[:, flowing]).all()
+
+    def nodes_without_flow(self, mass_flow):
+        """Nodes without any mass flow in their edges, the temperatures of these nodes are not defined (n) or (n x t)"""
+        inflow = np.dot(self.edge_node.clip(min=0), mass_flow)
+        outflow = np.dot(-self.edge_node.clip(max=0), mass_flow)
+        return np.isclose(inflow, 0.0) & np.isclose(outflow, 0.0)
+
+    def has_flowing_children(self, no_flow):
+        """Nodes with at least one child node with mass flow (n) or (n x t)"""
+        result = np.zeros(no_flow.shape, dtype=bool)
+        for node in self.order[1:]:
+            result[self.parent[node]] |= ~no_flow[node]
+        return result
+
+    def calc_supply_temperatures(self, t_plant_K, mass_flow, k, t_ground_K, network_type, problematic_edges):
+        """
+        Propagate the plant supply temperature through the supply network.
+
+        :param t_plant_K: plant supply temperature [K] (1) or (t)
+        :param mass_flow: mass flow in each edge, flowing away from the plant [kg/s] (e) or (e x t)
+        :param k: aggregated heat conduction coefficient of each edge [kW/K] (e) or (e x t)
+        :param t_ground_K: ground temperature [K] (1) or (t)
+        :param network_type: 'DH' or 'DC'
+        :param dict problematic_edges: edges with high temperature losses and the lowest mass flow at which they
+            occurred (see ``ThermalNetwork.problematic_edges``), updated in place
+        :return: node temperatures [K] (n) or (n x t) and heat losses of each edge [kW] (e) or (e x t)
+        """
+        mass_flow = np.asarray(mass_flow, dtype=float)
+        no_flow = self.nodes_without_flow(mass_flow)
+        flowing_children = self.has_flowing_children(no_flow)
+
+        t_node = np.zeros(no_flow.shape)
+        t_edge_in = np.zeros(mass_flow.shape)
+        t_edge_out = np.zeros(mass_flow.shape)
+        t_node[self.plant_node] = np.where(no_flow[self.plant_node], np.nan, t_plant_K)
+        for node in self.order[1:]:
+            edge = self.parent_edge[node]
+            t_edge_in[edge] = t_node[self.parent[node]]
+            t_edge_out[edge] = self.calc_t_out(edge, t_edge_in[edge], mass_flow, k, t_ground_K, network_type,
+                                               problematic_edges)
+            m = mass_flow[edge]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                t_mixed = m * np.nan_to_num(t_edge_out[edge]) / m  # single inflow in networks without loops
+            if (np.isnan(t_mixed) & flowing_children[node] & ~no_flow[node]).any():
+                raise ValueError('There are no flow entering/existing node', node,
+                                 '. Please check if the edge_node_df make sense.')
+            t_node[node] = np.where(no_flow[node], np.nan,
+                                    np.where(flowing_children[node], t_mixed, t_edge_out[edge]))
+
+        return t_node, self.calc_edge_heat_losses(mass_flow, t_edge_in, t_edge_out)
+
+    def calc_return_temperatures(self, t_return_K, mass_flow, mass_flow_substation, k, t_ground_K, network_type,
+                                 problematic_edges):
+        """
+        Mix the substation return temperatures in the return network, from the end of the branches to the plant.
+
+        :param t_return_K: return temperature of each substation, nan for other nodes [K] (n) or (n x t)
+        :param mass_flow: mass flow in each edge (towards the plant in the return network) [kg/s] (e) or (e x t)
+        :param mass_flow_substation: mass flow of each substation (negative at the plant) [kg/s] (n) or (n x t)
+        :return: node temperatures [K] (n) or (n x t) and heat losses of each edge [kW] (e) or (e x t), or ``None`` if
+            a node at the end of a branch has no return temperature (use the general solver in this case)
+        """
+        mass_flow = np.asarray(mass_flow, dtype=float)
+        t_return_K = np.asarray(t_return_K, dtype=float)
+        m_sub = np.asarray(mass_flow_substation, dtype=float).clip(min=0)
+        m_sub[self.plant_node] = 0.0
+        no_flow = self.nodes_without_flow(mass_flow)
+        flowing_children = self.has_flowing_children(no_flow)
+
+        branch_ends = ~no_flow & ~flowing_children
+        branch_ends[self.plant_node] = False
+        if np.isnan(t_return_K[branch_ends]).any():
+            return None
+
+        # mass flow and heat capacity flow from the substation of each node
+        mass_flow_in = m_sub.copy()
+        mcp_in = np.where(np.isclose(m_sub, 0.0), 0.0, m_sub * t_return_K)
+
+        t_node = np.zeros(no_flow.shape)
+        t_edge_in = np.zeros(mass_flow.shape)
+        t_edge_out = np.zeros(mass_flow.shape)
+        for node in self.order[:0:-1] + [self.plant_node]:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                t_mixed = np.where(np.isclose(mass_flow_in[node], 0.0), np.nan, mcp_in[node] / mass_flow_in[node])
+            if node == self.plant_node:
+                t_node[node] = t_mixed
+                break
+            t_node[node] = np.where(no_flow[node], np.nan, np.where(branch_ends[node], t_return_K[node], t_mixed))
+
+            edge = self.parent_edge[node]
+            parent = self.parent[node]
+            t_edge_in[edge] = t_node[node]
+            t_edge_out[edge] = self.calc_t_out(edge, t_edge_in[edge], mass_flow, k, t_ground_K, network_type,
+                                               problematic_edges)
+            mass_flow_in[parent] += mass_flow[edge]
+            mcp_in[parent] += mass_flow[edge] * np.nan_to_num(t_edge_out[edge])
+
+        return t_node, self.calc_edge_heat_losses(mass_flow, t_edge_in, t_edge_out)
+
+    @staticmethod
+    def calc_t_out(edge, t_in, mass_flow, k, t_ground_K, network_type, problematic_edges):
+        """Outlet temperature of an edge, limited to a temperature loss of 30 K (see ``thermal_network.calc_t_out``)"""
+        m = np.round(mass_flow[edge], decimals=5)  # round to avoid errors at very very low massflows
+        k_edge = k[edge]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_out = np.where(np.isclose(np.abs(m), 0.0), np.nan,
+                             calc_temperature_out_per_pipe(t_in, m, k_edge, t_ground_K))
+        d_t = np.abs(t_in - t_out)
+        high_loss = np.atleast_1d(d_t > 30)
+        if high_loss.any():
+            for m_hour, k_hour, d_t_hour in zip(*[np.broadcast_to(x, high_loss.shape)[high_loss]
+                                                  for x in (m, k_edge, d_t)]):
+                print('High temperature loss on edge', edge, '. Loss:', d_t_hour)
+                if str(edge) not in problematic_edges or problematic_edges[str(edge)] > m_hour:
+                    problematic_edges[str(edge)] = m_hour
+                if (k_hour / 2 - m_hour * HEAT_CAPACITY_OF_WATER_JPERKGK / 1000) > 0:
+                    print('Exit temperature decreasing at entry temperature increase. Possible at low massflows. '
+                          'Massflow:', m_hour, ' on edge: ', edge)
+            # assumes maximum 30 K temperature loss
+            t_limited = t_in - 30 if network_type == 'DH' else t_in + 30
+            t_out = np.where(d_t > 30, t_limited, t_out)
+        return t_out
+
+    @staticmethod
+    def calc_edge_heat_losses(mass_flow, t_edge_in, t_edge_out):
+        """heat losses of each edge with mass flow [kW]"""
+        d_t = np.fmax(t_edge_in, 0.0) - np.fmax(t_edge_out, 0.0)
+        return np.where(mass_flow > 0, mass_flow * HEAT_CAPACITY_OF_WATER_JPERKGK / 1000 * d_t, 0.0)
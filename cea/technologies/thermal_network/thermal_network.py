@@ -10,7 +10,7 @@ import math
 import os
 import random
 import time
-from itertools import repeat, chain
+from itertools import chain
 from math import ceil
 
 import geopandas as gpd
@@ -21,8 +21,11 @@ import pandas as pd
 import cea.config
 import cea.inputlocator
 import cea.technologies.thermal_network.substation_matrix as substation_matrix
+from cea.technologies.thermal_network.hydraulic_solver import EdgeNodeSolver
+from cea.technologies.thermal_network.temperature_solver import TreeTemperatureSolver
 from cea.technologies.thermal_network.thermal_network_loss import calc_temperature_out_per_pipe
 import cea.utilities.parallel
+from cea.utilities.parallel import broadcast
 import cea.utilities.workerstream
 from cea.constants import HEAT_CAPACITY_OF_WATER_JPERKGK, P_WATER_KGPERM3, HOURS_IN_YEAR
 from cea.constants import PUR_lambda_WmK, STEEL_lambda_WmK, SOIL_lambda_WmK
@@ -512,16 +515,19 @@ def thermal_network_main(locator, thermal_network, processes=1):
 
     print('Solving hydraulic and thermal network')
     ## Start solving hydraulic and thermal equations at each time-step
-    nhours = (thermal_network.stop_t - thermal_network.start_t)
 
-    hourly_thermal_results = cea.utilities.parallel.vectorize(hourly_thermal_calculation, processes)(
-        range(thermal_network.start_t, thermal_network.stop_t),
-        repeat(thermal_network, nhours))
+    # sort the hourly results into the outputs as they complete (in any order)
+    nhours = thermal_network.stop_t - thermal_network.start_t
+    csv_outputs = {field: [None] * nhours for field in HourlyThermalResults._fields}
+    for i, hourly_thermal_results in cea.utilities.parallel.stream(hourly_thermal_calculation, processes,
+                                                                   chunksize=24)(
+            range(thermal_network.start_t, thermal_network.stop_t),
+            broadcast(thermal_network)):
+        for field, value in zip(HourlyThermalResults._fields, hourly_thermal_results):
+            csv_outputs[field][i] = value
 
     # save results of hourly values over full year, write to csv
     # edge flow rates (flow direction corresponding to edge_node_df)
-    csv_outputs = {field: [getattr(htr, field) for htr in hourly_thermal_results]
-                   for field in HourlyThermalResults._fields}
     save_all_results_to_csv(csv_outputs, thermal_network)
 
     # identify all plants
@@ -1055,6 +1061,8 @@ def calc_mass_flow_edges(edge_node_df, mass_flow_substation_df, all_nodes_df, pi
     """
     edge_node_df = edge_node_df.copy()
     loops, graph = find_loops(edge_node_df)  # identifies all linear independent loops
+    solver = EdgeNodeSolver(edge_node_df)  # sparse solver, factorized once per network topology
+    node_mass_flows = np.nan_to_num(mass_flow_substation_df.values[0])  # solution vector b of node demands
     if loops:
         # print('Fundamental loops in the network:', loops)  # returns nodes that define loop, useful for visiual
         # verification in testing phase,
@@ -1064,10 +1072,8 @@ def calc_mass_flow_edges(edge_node_df, mass_flow_substation_df, all_nodes_df, pi
         # if loops exist:
         # 1. calculate initial guess solution of matrix A
         # delete first plant on an edge of matrix and solution space b as these are redundant
-        A = edge_node_df.drop(edge_node_df.index[0], 0)  # solution matrix A without loop equations (kirchhoff 2)
-        b_init = np.nan_to_num(mass_flow_substation_df.drop(mass_flow_substation_df.columns[0], 1).transpose())
-        # solution vector b of node demands
-        mass_flow_edge = np.linalg.lstsq(A, b_init, rcond=-1)[0].transpose()[0]  # solve system
+        # without loop equations (kirchhoff 2), so the minimum norm solution is used as initial guess
+        mass_flow_edge = solver.solve_edge_flows(node_mass_flows, ground=0)  # solve system
 
         # setup iterations for implicit matrix solver
         tolerance = 0.01  # tolerance for mass flow convergence
@@ -1147,17 +1153,12 @@ def calc_mass_flow_edges(edge_node_df, mass_flow_substation_df, all_nodes_df, pi
     else:  # no loops
         # remove one equation (at plant node) to build a well-determined matrix, A.
         plant_index = np.where(all_nodes_df['Type'] == 'PLANT')[0][0]  # find index of the first plant node
-        A = edge_node_df.drop(edge_node_df.index[plant_index])
-        b = np.nan_to_num(mass_flow_substation_df.T)
-        b = np.delete(b, plant_index)
-        mass_flow_edge = np.linalg.solve(A.values, b)
+        mass_flow_edge = solver.solve_edge_flows(node_mass_flows, ground=plant_index)
 
     # verify calculated solution
     plant_index = np.where(all_nodes_df['Type'] == 'PLANT')[0][0]  # find index of the first plant node
-    A = edge_node_df.drop(edge_node_df.index[plant_index])
-    b_verification = A.dot(mass_flow_edge)
-    b_original = np.nan_to_num(mass_flow_substation_df.T)
-    b_original = np.delete(b_original, plant_index)
+    b_verification = np.delete(solver.node_balance(mass_flow_edge), plant_index)
+    b_original = np.delete(node_mass_flows, plant_index)
     if max(abs(b_original - b_verification)) > 0.01:
         print('Error in the defined mass flows, deviation of ', max(abs(b_original - b_verification)),
               ' from node demands.')
@@ -1349,16 +1350,10 @@ def calc_pressure_nodes(t_supply_node__k, t_return_node__k, thermal_network, t):
     # A12 * H + F(Q) = -A10 * H0 = 0
     # edge_node_transpose * pressure_nodes = - (pressure_loss_pipe) (Ax = b)
     # ToDo: does not apply for looped networks
-    edge_node_transpose = np.transpose(edge_node_df.values)
-    pressure_nodes_supply__pa = np.round(
-        np.transpose(
-            np.linalg.lstsq(edge_node_transpose, np.transpose(pressure_loss_pipe_supply__pa) * (-1), rcond=-1)[0]),
-        decimals=5)
-    pressure_nodes_return__pa = np.round(
-        np.transpose(
-            np.linalg.lstsq(-edge_node_transpose, np.transpose(pressure_loss_pipe_return__pa) * (-1), rcond=-1)[0]),
-        decimals=5)
-    return pressure_nodes_supply__pa[0], linear_pressure_loss_supply_Paperm[0], linear_pressure_loss_return_Paperm[0], \
+    solver = EdgeNodeSolver(edge_node_df)
+    pressure_nodes_supply__pa = np.round(solver.solve_node_potentials(pressure_loss_pipe_supply__pa[0] * (-1)),
+                                         decimals=5)
+    return pressure_nodes_supply__pa, linear_pressure_loss_supply_Paperm[0], linear_pressure_loss_return_Paperm[0], \
            pressure_loss_system__pa, pressure_loss_total_kw, pressure_loss_pipe_supply_kW[0], pressure_loss_substations_kW
 
 
@@ -1767,12 +1762,11 @@ def calc_max_edge_flowrate(thermal_network, processes=1):
 
         # hourly_mass_flow_calculation
         time_step_slice = range(thermal_network.start_t, thermal_network.stop_t)
-        nhours = thermal_network.stop_t - thermal_network.start_t
 
         mass_flows = cea.utilities.parallel.vectorize(hourly_mass_flow_calculation, processes)(
             time_step_slice,
-            repeat(diameter_guess, nhours),
-            repeat(thermal_network, nhours))
+            broadcast(diameter_guess),
+            broadcast(thermal_network))
 
         # write mass flows to the dataframes
         thermal_network.edge_mass_flow_df.iloc[time_step_slice] = [mfe[0] for mfe in mass_flows]
@@ -2699,6 +2693,12 @@ def calc_supply_temperatures(t, edge_node_df, mass_flow_df, k, thermal_network):
     t_node = np.zeros(z.shape[0])
     z_note = z.copy()  # matrix to store information of solved nodes
 
+    # networks without loops and with a single plant are solved in the order of the nodes from the plant
+    plant_nodes = np.flatnonzero(all_nodes_df['Type'].values == 'PLANT')
+    tree_solver = TreeTemperatureSolver.for_network(z, plant_nodes)
+    if tree_solver is not None and not tree_solver.flows_away_from_plant(z, m_d.diagonal()):
+        tree_solver = None
+
     # start node temperature calculation
     flag = 0
     # set initial supply temperature guess to the target substation supply temperature
@@ -2710,95 +2710,102 @@ def calc_supply_temperatures(t, edge_node_df, mass_flow_df, k, thermal_network):
     t_plant_sup = t_plant_sup_0
     iteration = 0
     while flag == 0:
-        # not_stuck variable is necessary because of looped networks. Here it is possible that we have only a closed
-        # loop remaining and no obvious place to start. In this case, iteration with an initial value is necessary
-        not_stuck = np.array([True] * z.shape[0])
-        # count number of iterations
-        temp_iter = 0
-        # tolerance for convergence of temperature
-        temp_tolerance = 1
-        # initialize delta to some value above the tolerance
-        delta_temp_0 = 2
-        # iterate over temperatures for loop networks
-        while delta_temp_0 >= temp_tolerance:
-            t_e_out_old = np.array(t_e_out)
-
-            # reset_matrixes
-            z_note = z.copy()
-            t_e_out = z_pipe_out.copy()
-            t_e_in = z_pipe_in.copy().dot(-1)
-            t_node = np.zeros(z.shape[0])
-
-            # # calculate the pipe outlet temperature from the plant node
-            for i in range(z.shape[0]):
-                if all_nodes_df.iloc[i]['Type'] == 'PLANT':  # find plant node
-                    # write plant inlet temperature
-                    t_node[i] = t_plant_sup  # assume plant inlet temperature
-                    edge = np.where(t_e_in[i] != 0)[0]  # find edge index
-                    t_e_in[i] = t_e_in[i] * t_node[i]
-                    # calculate pipe outlet temperature
-                    calc_t_out(i, edge, k, m_d, z, t_e_in, t_e_out, t_ground__k, z_note, thermal_network)
-            plant_node = t_node.nonzero()[0]  # the node indices of the plant nodes in the edge-node index
-
-            # Identify all nodes with no in or outflows and delete those values from the z matrixes
-            # This is necessary to avoid getting stuck in a loop network with no mass flows inside the loop
-            for i in range(z_note.shape[0]):
-                if np.isclose(sum(np.dot(m_d, z_pipe_out[i])), 0.0) and np.isclose(sum(np.dot(m_d, z_pipe_in[i])), 0.0):
-                    t_node[i] = np.nan
-                    # no in our outflows, clear in and outflows at this node
-                    # and clear node incoming flows from the corresponding edges
-                    outflowing_edges = [a for a, x in enumerate(z_note[i]) if np.isclose(x, 1.0)]
-                    if outflowing_edges:
-                        for edge in outflowing_edges:  # delete values where we were supposed to flow to
-                            target_node = np.where(z_note[:, edge] == -1)[0]
-                            z_note[target_node, edge] = 0.0
-                            z_pipe_in[target_node, edge] = 0.0
-                            t_e_in[target_node, edge] = 0.0
-                    outflowing_edges = [a for a, x in enumerate(z_note[i]) if np.isclose(x, -1.0)]
-                    if outflowing_edges:
-                        for edge in outflowing_edges:  # delete values where we were supposed to flow to
-                            target_node = np.where(z_note[:, edge] == 1)[0]
-                            z_note[target_node, edge] = 0.0
-                            z_pipe_out[target_node, edge] = 0.0
-                            t_e_out[target_node, edge] = 0.0
-                    target_edges = [a for a, x in enumerate(z_note[i]) if not np.isclose(x, 0.0)]
-                    if target_edges:
-                        for target_edge in target_edges:
-                            z_note[i, target_edge] = 0.0
-                            z_pipe_in[i, target_edge] = 0.0
-                            z_pipe_out[i, target_edge] = 0.0
-                            t_e_in[i, target_edge] = 0.0
-                            t_e_out[i, target_edge] = 0.0
-
-            # # calculate pipe outlet temperature and node temperature for the rest
-            while np.count_nonzero(np.isclose(t_node, 0)) > 0:
-                if not_stuck.any():  # if there are no changes for all elements but we have not yet solved the system
-                    z, z_note, m_d, t_e_out, z_pipe_out, t_node, t_e_in, t_ground__k, not_stuck = calculate_outflow_temp(
-                        z,
-                        z_note,
-                        m_d,
-                        t_e_out,
-                        z_pipe_out,
-                        t_node,
-                        t_e_in,
-                        t_ground__k,
-                        not_stuck,
-                        k, thermal_network)
-                else:  # stuck! this can happen with loops
-                    for i in range(np.shape(t_e_out)[1]):
-                        # check if we have a mass flow on this edge
-                        if np.any(t_e_out[:, i] == 1):
-                            z_note[np.where(t_e_out[:, i] == 1), i] = 0  # remove inflow value from z_note
-                            if temp_iter < 1:  # do this in first iteration only, since there is no previous value
-                                t_e_out[np.where(t_e_out[:, i] == 1), i] = t_node[
-                                    t_node.nonzero()].mean()  # assume some node temperature
-                            else:
-                                t_e_out[np.where(t_e_out[:, i] == 1), i] = t_e_out_old[np.where(t_e_out[:, i] == 1), i]
-                            break
-                    not_stuck = np.array([True] * z.shape[0])
+        if tree_solver is not None:
+            # networks without loops are solved in one sweep from the plant
+            t_node, q_loss_edges_kw = tree_solver.calc_supply_temperatures(t_plant_sup, m_d.diagonal(), np.diag(k),
+                                                                           t_ground__k, network_type,
+                                                                           thermal_network.problematic_edges)
+            plant_node = plant_nodes
+        else:
+            # not_stuck variable is necessary because of looped networks. Here it is possible that we have only a closed
+            # loop remaining and no obvious place to start. In this case, iteration with an initial value is necessary
+            not_stuck = np.array([True] * z.shape[0])
+            # count number of iterations
+            temp_iter = 0
+            # tolerance for convergence of temperature
+            temp_tolerance = 1
+            # initialize delta to some value above the tolerance
+            delta_temp_0 = 2
+            # iterate over temperatures for loop networks
+            while delta_temp_0 >= temp_tolerance:
+                t_e_out_old = np.array(t_e_out)
+
+                # reset_matrixes
+                z_note = z.copy()
+                t_e_out = z_pipe_out.copy()
+                t_e_in = z_pipe_in.copy().dot(-1)
+                t_node = np.zeros(z.shape[0])
+
+                # # calculate the pipe outlet temperature from the plant node
+                for i in range(z.shape[0]):
+                    if all_nodes_df.iloc[i]['Type'] == 'PLANT':  # find plant node
+                        # write plant inlet temperature
+                        t_node[i] = t_plant_sup  # assume plant inlet temperature
+                        edge = np.where(t_e_in[i] != 0)[0]  # find edge index
+                        t_e_in[i] = t_e_in[i] * t_node[i]
+                        # calculate pipe outlet temperature
+                        calc_t_out(i, edge, k, m_d, z, t_e_in, t_e_out, t_ground__k, z_note, thermal_network)
+                plant_node = t_node.nonzero()[0]  # the node indices of the plant nodes in the edge-node index
+
+                # Identify all nodes with no in or outflows and delete those values from the z matrixes
+                # This is necessary to avoid getting stuck in a loop network with no mass flows inside the loop
+                for i in range(z_note.shape[0]):
+                    if np.isclose(sum(np.dot(m_d, z_pipe_out[i])), 0.0) and np.isclose(sum(np.dot(m_d, z_pipe_in[i])), 0.0):
+                        t_node[i] = np.nan
+                        # no in our outflows, clear in and outflows at this node
+                        # and clear node incoming flows from the corresponding edges
+                        outflowing_edges = [a for a, x in enumerate(z_note[i]) if np.isclose(x, 1.0)]
+                        if outflowing_edges:
+                            for edge in outflowing_edges:  # delete values where we were supposed to flow to
+                                target_node = np.where(z_note[:, edge] == -1)[0]
+                                z_note[target_node, edge] = 0.0
+                                z_pipe_in[target_node, edge] = 0.0
+                                t_e_in[target_node, edge] = 0.0
+                        outflowing_edges = [a for a, x in enumerate(z_note[i]) if np.isclose(x, -1.0)]
+                        if outflowing_edges:
+                            for edge in outflowing_edges:  # delete values where we were supposed to flow to
+                                target_node = np.where(z_note[:, edge] == 1)[0]
+                                z_note[target_node, edge] = 0.0
+                                z_pipe_out[target_node, edge] = 0.0
+                                t_e_out[target_node, edge] = 0.0
+                        target_edges = [a for a, x in enumerate(z_note[i]) if not np.isclose(x, 0.0)]
+                        if target_edges:
+                            for target_edge in target_edges:
+                                z_note[i, target_edge] = 0.0
+                                z_pipe_in[i, target_edge] = 0.0
+                                z_pipe_out[i, target_edge] = 0.0
+                                t_e_in[i, target_edge] = 0.0
+                                t_e_out[i, target_edge] = 0.0
+
+                # # calculate pipe outlet temperature and node temperature for the rest
+                while np.count_nonzero(np.isclose(t_node, 0)) > 0:
+                    if not_stuck.any():  # if there are no changes for all elements but we have not yet solved the system
+                        z, z_note, m_d, t_e_out, z_pipe_out, t_node, t_e_in, t_ground__k, not_stuck = calculate_outflow_temp(
+                            z,
+                            z_note,
+                            m_d,
+                            t_e_out,
+                            z_pipe_out,
+                            t_node,
+                            t_e_in,
+                            t_ground__k,
+                            not_stuck,
+                            k, thermal_network)
+                    else:  # stuck! this can happen with loops
+                        for i in range(np.shape(t_e_out)[1]):
+                            # check if we have a mass flow on this edge
+                            if np.any(t_e_out[:, i] == 1):
+                                z_note[np.where(t_e_out[:, i] == 1), i] = 0  # remove inflow value from z_note
+                                if temp_iter < 1:  # do this in first iteration only, since there is no previous value
+                                    t_e_out[np.where(t_e_out[:, i] == 1), i] = t_node[
+                                        t_node.nonzero()].mean()  # assume some node temperature
+                                else:
+                                    t_e_out[np.where(t_e_out[:, i] == 1), i] = t_e_out_old[np.where(t_e_out[:, i] == 1), i]
+                                break
+                        not_stuck = np.array([True] * z.shape[0])
 
-            delta_temp_0 = np.max(abs(t_e_out_old - t_e_out))  # exit condition
-            temp_iter = temp_iter + 1
+                delta_temp_0 = np.max(abs(t_e_out_old - t_e_out))  # exit condition
+                temp_iter = temp_iter + 1
 
         # set maximum/minimum allowable plant supply temperatures
         t_boiling_K = 100 + 273.15
@@ -2882,12 +2889,13 @@ def calc_supply_temperatures(t, edge_node_df, mass_flow_df, k, thermal_network):
                 switch_control = True
                 print('switched control: ', thermal_network.temperature_control, ' temperature:', t_plant_sup)
 
-    # calculate pipe heat losses
-    q_loss_edges_kw = np.zeros(z_note.shape[1])
-    for edge in range(z_note.shape[1]):
-        if m_d[edge, edge] > 0:
-            dT_edge = np.nanmax(t_e_in[:, edge]) - np.nanmax(t_e_out[:, edge])
-            q_loss_edges_kw[edge] = m_d[edge, edge] * HEAT_CAPACITY_OF_WATER_JPERKGK / 1000 * dT_edge  # kW
+    if tree_solver is None:
+        # calculate pipe heat losses
+        q_loss_edges_kw = np.zeros(z_note.shape[1])
+        for edge in range(z_note.shape[1]):
+            if m_d[edge, edge] > 0:
+                dT_edge = np.nanmax(t_e_in[:, edge]) - np.nanmax(t_e_out[:, edge])
+                q_loss_edges_kw[edge] = m_d[edge, edge] * HEAT_CAPACITY_OF_WATER_JPERKGK / 1000 * dT_edge  # kW
 
     return t_node.T, plant_node, q_loss_edges_kw, switch_control
 
@@ -2997,6 +3005,17 @@ def calc_return_temperatures(t_ground, edge_node_df, mass_flow_df, mass_flow_sub
 
     """
 
+    # networks without loops and with a single plant are solved in one sweep from the end of the branches
+    plant_nodes = np.flatnonzero(thermal_network.all_nodes_df['Type'].values == 'PLANT')
+    tree_solver = TreeTemperatureSolver.for_network(edge_node_df, plant_nodes)
+    if tree_solver is not None and tree_solver.flows_away_from_plant(edge_node_df, mass_flow_df):
+        result = tree_solver.calc_return_temperatures(t_return.values[0], np.asarray(mass_flow_df).ravel(),
+                                                      np.asarray(mass_flow_substation_df).ravel(), np.diag(k),
+                                                      t_ground, thermal_network.network_type,
+                                                      thermal_network.problematic_edges)
+        if result is not None:
+            return result
+
     z = np.asarray(edge_node_df.copy()) * (-1)  # (n x e) edge-node matrix
     z_pipe_out = z.clip(min=0)  # pipe outlet matrix
     z_pipe_in = z.clip(max=0)  # pipe inlet matrix
@@ -0,0 +1,76 @@
+"""
+Benchmark the array solvers of the emission systems (``radiators.calc_radiator_array``,
+``heating_coils.calc_heating_coil_array`` and ``heating_coils.calc_cooling_coil_array``) used by
+``cea.demand.sensible_loads.calc_temperatures_emission_systems`` against the scalar reference implementations, which
+were called with ``np.vectorize`` for each hour.
+
+Run this script on the reference case (or any scenario) after running the radiation and schedule scripts. It runs the
+demand calculation (without multiprocessing) and, for each building, calculates the temperatures of the emission
+systems with both implementations, checks that they produce the same results and prints the time spent by each.
+"""
+
+
+
+
+import os
+import time
+from unittest import mock
+
+import numpy as np
+
+import cea.config
+import cea.inputlocator
+from cea.demand import demand_main
+from cea.demand import sensible_loads
+from cea.technologies import radiators, heating_coils
+
+EMISSION_SYSTEM_KEYS = ['T%s_sys_%s_%s' % (service, temperature, unit) for service in ['hs', 'cs']
+                        for temperature in ['sup', 're'] for unit in ['ahu', 'aru', 'shu', 'scu']] + \
+                       ['mcp%s_sys_%s' % (service, unit) for service in ['hs', 'cs']
+                        for unit in ['ahu', 'aru', 'shu', 'scu']]
+
+
+def calc_temperatures_emission_systems_per_hour(bpr, tsd):
+    """``calc_temperatures_emission_systems`` with the scalar functions called for each hour"""
+    with mock.patch.object(radiators, 'calc_radiator_array', np.vectorize(radiators.calc_radiator)), \
+            mock.patch.object(heating_coils, 'calc_heating_coil_array',
+                              np.vectorize(heating_coils.calc_heating_coil)), \
+            mock.patch.object(heating_coils, 'calc_cooling_coil_array',
+                              np.vectorize(heating_coils.calc_cooling_coil)):
+        return sensible_loads.calc_temperatures_emission_systems(bpr, tsd)
+
+
+def main(config):
+    assert os.path.exists(config.scenario), 'Scenario not found: %s' % config.scenario
+    locator = cea.inputlocator.InputLocator(scenario=config.scenario)
+    config.multiprocessing = False
+
+    calc_temperatures_emission_systems = sensible_loads.calc_temperatures_emission_systems
+    times = {}
+
+    def benchmark(bpr, tsd):
+        t0 = time.perf_counter()
+        expected = calc_temperatures_emission_systems_per_hour(bpr, dict(tsd))
+        t1 = time.perf_counter()
+        actual = calc_temperatures_emission_systems(bpr, tsd)
+        t2 = time.perf_counter()
+
+        for key in EMISSION_SYSTEM_KEYS:
+            if key in expected:
+                np.testing.assert_allclose(actual[key], expected[key], rtol=1e-9, equal_nan=True,
+                                           err_msg='%s: %s' % (bpr.name, key))
+        times[bpr.name] = (t1 - t0, t2 - t1)
+        print('%s: per hour %.3fs, array %.3fs' % (bpr.name, t1 - t0, t2 - t1))
+        return actual
+
+    with mock.patch.object(sensible_loads, 'calc_temperatures_emission_systems', benchmark):
+        demand_main.demand_calculation(locator=locator, config=config)
+
+    time_per_hour = sum(per_hour for per_hour, _ in times.values())
+    time_array = sum(array for _, array in times.values())
+    print('total (%i buildings): per hour %.2fs, array %.2fs (speedup %.1fx)' % (
+        len(times), time_per_hour, time_array, time_per_hour / max(time_array, 1e-9)))
+
+
+if __name__ == '__main__':
+    main(cea.config.Configuration())
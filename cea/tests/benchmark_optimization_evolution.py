@@ -0,0 +1,98 @@
+"""
+Benchmark the steady-state evolution scheme of the optimization against the generational scheme: the wall time each
+scheme needs to reach a hypervolume of the pareto front.
+
+The individuals of the optimization take very different times to evaluate (e.g. an individual with district heating
+and cooling networks and many technologies takes much longer than a decentralized one). The benchmark uses a test
+problem (ZDT1) with evaluation times that vary in the same way, so it runs without a scenario. Both schemes run with
+the pool size of ``config.get_number_of_processes()`` and the same population size and number of generations.
+"""
+
+
+
+
+import multiprocessing
+import random
+import time
+from itertools import repeat
+
+from deap import tools
+from deap.benchmarks.tools import hypervolume
+
+import cea.config
+from cea.optimization.master.evolution import evolve_generational, evolve_steady_state
+from cea.tests.test_evolution import create_toolbox, evaluate
+
+MU = 24
+NUMBER_OF_GENERATIONS = 15
+MIN_EVALUATION_SECONDS = 0.02
+MAX_EVALUATION_SECONDS = 0.5
+REFERENCE_POINT = (1.1, 10.0)  # worse than any fitness of the test problem
+HYPERVOLUME_TARGETS = [0.5, 0.7, 0.8, 0.85, 0.9]
+
+
+def evaluate_slowly(args):
+    """ZDT1 with an evaluation time that depends on the individual, like the slave routines of the optimization"""
+    individual = args[0]
+    time.sleep(MIN_EVALUATION_SECONDS + (MAX_EVALUATION_SECONDS - MIN_EVALUATION_SECONDS) * individual[1] ** 4)
+    return evaluate(args)
+
+
+def evaluation_args(individuals, individual_numbers, generation):
+    return zip(individuals, individual_numbers, repeat(generation, len(individuals)))
+
+
+def run(evolution_scheme, number_of_processes):
+    """Return the wall time and the hypervolume of the pareto front after each generation"""
+    random.seed(100)
+    toolbox = create_toolbox()
+    toolbox.register("evaluate", evaluate_slowly)
+    pool = multiprocessing.Pool(processes=number_of_processes)
+    toolbox.register("map", pool.map)
+    toolbox.register("apply_async", pool.apply_async)
+
+    start = time.time()
+    pop = toolbox.population(n=MU)
+    for ind, fit in zip(pop, toolbox.map(toolbox.evaluate, evaluation_args(pop, range(MU), 0))):
+        ind.fitness.values = fit
+    paretofrontier = tools.ParetoFront()
+    paretofrontier.update(pop)
+
+    if evolution_scheme == 'steady-state':
+        generations = evolve_steady_state(pop, toolbox, evaluation_args, lambda f: f, MU, 0.9, 0.1,
+                                          NUMBER_OF_GENERATIONS, number_of_processes)
+    else:
+        generations = evolve_generational(pop, toolbox, evaluation_args, lambda f: f, MU, 0.9, 0.1,
+                                          NUMBER_OF_GENERATIONS)
+    progress = [(time.time() - start, hypervolume(paretofrontier, REFERENCE_POINT))]
+    for generation, pop, evaluated_individuals in generations:
+        paretofrontier.update(evaluated_individuals)
+        progress.append((time.time() - start, hypervolume(paretofrontier, REFERENCE_POINT)))
+    pool.close()
+    pool.join()
+    return progress
+
+
+def time_to_hypervolume(progress, target):
+    for wall_time, hv in progress:
+        if hv >= target:
+            return wall_time
+    return float('nan')
+
+
+def main(config):
+    number_of_processes = config.get_number_of_processes()
+    print('Pool size: %i, population size: %i, generations: %i' % (number_of_processes, MU, NUMBER_OF_GENERATIONS))
+
+    results = {scheme: run(scheme, number_of_processes) for scheme in ['generational', 'steady-state']}
+    max_hypervolume = max(progress[-1][1] for progress in results.values())
+    print('%-20s %14s %14s' % ('hypervolume', 'generational', 'steady-state'))
+    for fraction in HYPERVOLUME_TARGETS:
+        print('%-20s %13.2fs %13.2fs' % ('%.0f%% of %.3f' % (fraction * 100, max_hypervolume),
+                                         time_to_hypervolume(results['generational'], fraction * max_hypervolume),
+                                         time_to_hypervolume(results['steady-state'], fraction * max_hypervolume)))
+    print('%-20s %13.2fs %13.2fs' % ('total', results['generational'][-1][0], results['steady-state'][-1][0]))
+
+
+if __name__ == '__main__':
+    main(cea.config.Configuration())
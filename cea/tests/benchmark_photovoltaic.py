@@ -0,0 +1,130 @@
+"""
+Benchmark the (group x hour) array implementation of ``cea.technologies.solar.photovoltaic.calc_pv_generation`` against
+the previous implementation, which called ``np.vectorize`` on the scalar functions for each group of sensors.
+
+Run this script on the reference case (or any scenario) after running the radiation script. It checks that both
+implementations produce the same results for each building and prints the time spent by each.
+"""
+
+
+
+
+import os
+import time
+from math import radians
+
+import numpy as np
+import pandas as pd
+from geopandas import GeoDataFrame as gdf
+
+import cea.config
+import cea.inputlocator
+from cea.constants import HOURS_IN_YEAR
+from cea.technologies.solar import photovoltaic
+from cea.utilities import epwreader
+from cea.utilities import solar_equations
+from cea.utilities.standardize_coordinates import get_lat_lon_projected_shapefile
+
+
+def calc_pv_generation_per_group(sensor_groups, weather_data, date_local, solar_properties, latitude,
+                                 panel_properties_PV):
+    """The implementation of ``calc_pv_generation`` before it was vectorized over the groups of sensors"""
+    prop_observers = sensor_groups['prop_observers']
+    hourly_radiation = sensor_groups['hourlydata_groups']
+
+    lat = radians(latitude)
+    g_rad = np.radians(solar_properties.g)
+    ha_rad = np.radians(solar_properties.ha)
+    Sz_rad = np.radians(solar_properties.Sz)
+
+    potential = pd.DataFrame(index=range(HOURS_IN_YEAR))
+    for panel_orientation in ['walls_south', 'walls_north', 'roofs_top', 'walls_east', 'walls_west']:
+        potential['PV_' + panel_orientation + '_E_kWh'] = 0
+        potential['PV_' + panel_orientation + '_m2'] = 0
+
+    list_groups_area = []
+    total_el_output_PV_kWh = []
+    total_radiation_kWh = []
+    for group in prop_observers.index.values:
+        radiation_Wperm2 = solar_equations.cal_radiation_type(group, hourly_radiation, weather_data)
+        tot_module_area_m2 = prop_observers.loc[group, 'area_installed_module_m2']
+        tilt_rad = radians(prop_observers.loc[group, 'B_deg'])
+        teta_z_rad = radians(prop_observers.loc[group, 'surface_azimuth_deg'])
+
+        teta_rad = np.vectorize(solar_equations.calc_angle_of_incidence)(g_rad, lat, ha_rad, tilt_rad, teta_z_rad)
+        teta_ed_rad, teta_eg_rad = photovoltaic.calc_diffuseground_comp(tilt_rad)
+        absorbed_radiation_Wperm2 = np.vectorize(photovoltaic.calc_absorbed_radiation_PV)(
+            radiation_Wperm2.I_sol, radiation_Wperm2.I_direct, radiation_Wperm2.I_diffuse, tilt_rad, Sz_rad, teta_rad,
+            teta_ed_rad, teta_eg_rad, panel_properties_PV)
+        T_cell_C = np.vectorize(photovoltaic.calc_cell_temperature)(absorbed_radiation_Wperm2, weather_data.drybulb_C,
+                                                                    panel_properties_PV)
+        el_output_PV_kW = np.vectorize(photovoltaic.calc_PV_power)(
+            absorbed_radiation_Wperm2, T_cell_C, panel_properties_PV['PV_n'], tot_module_area_m2,
+            panel_properties_PV['PV_Bref'], panel_properties_PV['misc_losses'])
+
+        panel_orientation = prop_observers.loc[group, 'type_orientation']
+        potential['PV_' + panel_orientation + '_E_kWh'] += el_output_PV_kW
+        potential['PV_' + panel_orientation + '_m2'] += tot_module_area_m2
+
+        list_groups_area.append(tot_module_area_m2)
+        total_el_output_PV_kWh.append(el_output_PV_kW)
+        total_radiation_kWh.append(radiation_Wperm2['I_sol'] * tot_module_area_m2 / 1000)
+
+    potential['E_PV_gen_kWh'] = sum(total_el_output_PV_kWh)
+    potential['radiation_kWh'] = sum(total_radiation_kWh).values
+    potential['Area_PV_m2'] = sum(list_groups_area)
+    potential['Date'] = date_local
+    return potential.set_index('Date')
+
+
+def calc_sensor_groups(locator, config, building_name, latitude, solar_properties, panel_properties_PV):
+    """The groups of sensors of a building as calculated by ``calc_PV`` (``None`` if there are no sensors left)"""
+    radiation_path, sensor_index_path = solar_equations.get_radiation_sensor_paths(locator, building_name)
+    max_annual_radiation, _, sensors_rad_clean, sensors_metadata_clean = solar_equations.filter_low_potential(
+        radiation_path, locator.get_radiation_metadata(building_name), config, sensor_index_path)
+    if sensors_metadata_clean.empty:
+        return None
+    max_roof_coverage = config.solar.max_roof_coverage if config.solar.custom_roof_coverage else 1.0
+    sensors_metadata_cat = solar_equations.optimal_angle_and_tilt(sensors_metadata_clean, latitude, solar_properties,
+                                                                  max_annual_radiation, panel_properties_PV,
+                                                                  max_roof_coverage)
+    return solar_equations.calc_groups(sensors_rad_clean, sensors_metadata_cat)
+
+
+def main(config):
+    assert os.path.exists(config.scenario), 'Scenario not found: %s' % config.scenario
+    locator = cea.inputlocator.InputLocator(scenario=config.scenario)
+
+    latitude, longitude = get_lat_lon_projected_shapefile(gdf.from_file(locator.get_zone_geometry()))
+    weather_data = epwreader.epw_reader(locator.get_weather_file())
+    date_local = solar_equations.calc_datetime_local_from_weather_file(weather_data, latitude, longitude)
+    solar_properties = solar_equations.calc_sun_properties(latitude, longitude, weather_data, date_local, config)
+    panel_properties_PV = photovoltaic.calc_properties_PV_db(locator.get_database_conversion_systems(), config)
+
+    time_per_group, time_array = 0.0, 0.0
+    for building_name in locator.get_zone_building_names():
+        sensor_groups = calc_sensor_groups(locator, config, building_name, latitude, solar_properties,
+                                           panel_properties_PV)
+        if sensor_groups is None:
+            continue
+
+        t0 = time.perf_counter()
+        expected = calc_pv_generation_per_group(sensor_groups, weather_data, date_local, solar_properties, latitude,
+                                                panel_properties_PV)
+        t1 = time.perf_counter()
+        actual = photovoltaic.calc_pv_generation(sensor_groups, weather_data, date_local, solar_properties, latitude,
+                                                 panel_properties_PV)
+        t2 = time.perf_counter()
+
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False, rtol=1e-9)
+        time_per_group += t1 - t0
+        time_array += t2 - t1
+        print('%s (%i groups): per group %.3fs, array %.3fs' % (building_name, sensor_groups['number_groups'],
+                                                               t1 - t0, t2 - t1))
+
+    print('total: per group %.2fs, array %.2fs (speedup %.1fx)' % (time_per_group, time_array,
+                                                                   time_per_group / max(time_array, 1e-9)))
+
+
+if __name__ == '__main__':
+    main(cea.config.Configuration())
@@ -13,6 +13,7 @@ import cea.inputlocator
 from cea.demand.schedule_maker.schedule_maker import schedule_maker_main
 from cea.demand.building_properties import BuildingProperties
 from cea.demand.thermal_loads import calc_thermal_loads
+from cea.demand.batched_thermal_loads import calc_thermal_loads_batch
 from cea.utilities.date import get_date_range_hours_from_year
 from cea.utilities import epwreader
 
@@ -107,6 +108,30 @@ class TestCalcThermalLoads(unittest.TestCase):
                                    msg="qww_sys_kwh for %(b)s should be: %(qww_sys_kwh).5f, was %(expected_qww_sys_kwh).5f" % locals(),
                                    places=3)
 
+    def test_calc_thermal_loads_batch(self):
+        """The batched calculation engine gives the same results as the building by building calculation"""
+        buildings = json.loads(self.test_config.get('test_calc_thermal_loads_other_buildings', 'results'))
+        building_names = list(buildings.keys())
+        self.config.general.multiprocessing = False
+        for building in building_names:
+            schedule_maker_main(self.locator, self.config, building=building)
+
+        calc_thermal_loads_batch(building_names, [self.building_properties[b] for b in building_names],
+                                 self.weather_data, self.date_range, self.locator,
+                                 self.use_dynamic_infiltration_calculation, self.resolution_output,
+                                 self.loads_output, self.massflows_output, self.temperatures_output,
+                                 self.config, self.debug)
+
+        for b in building_names:
+            df = pd.read_csv(self.locator.get_demand_results_file(b))
+            expected_qhs_sys_kwh, expected_qcs_sys_kwh, expected_qww_sys_kwh = buildings[b]
+            self.assertAlmostEqual(expected_qhs_sys_kwh, float(df['Qhs_sys_kWh'].sum()), places=3,
+                                   msg="qhs_sys_kwh for %s differs" % b)
+            self.assertAlmostEqual(expected_qcs_sys_kwh, float(df['Qcs_sys_kWh'].sum()), places=3,
+                                   msg="qcs_sys_kwh for %s differs" % b)
+            self.assertAlmostEqual(expected_qww_sys_kwh, float(df['Qww_sys_kWh'].sum()), places=3,
+                                   msg="qww_sys_kwh for %s differs" % b)
+
 
 def run_for_single_building(building, bpr, weather_data, date, locator,
                             use_dynamic_infiltration_calculation, resolution_output, loads_output,
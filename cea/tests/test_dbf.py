@@ -5,13 +5,17 @@ Test the utilities/dbf.py file
 
 
 
+import os
 import unittest
 import tempfile
 import pandas as pd
 from pandas.testing import assert_frame_equal
 import numpy as np
+import pysal
+import cea.inputlocator
 import cea.utilities.dbf as dbf
 
+
 class TestDbf(unittest.TestCase):
     def test_roundtrip(self):
         """Make sure the roundtrip df -> dbf -> df keeps the data intact."""
@@ -20,5 +24,46 @@ class TestDbf(unittest.TestCase):
         dbf.dataframe_to_dbf(df, dbf_path)
         assert_frame_equal(df, dbf.dbf_to_dataframe(dbf_path))
 
+    def test_roundtrip_types(self):
+        """Integers, long strings (also non-ascii) and missing strings"""
+        df = pd.DataFrame({'Name': ['B1000', 'B1001', 'Gebaeude-Zuerich-Hoengg-0001', 'Zürich'],
+                           'YEAR': [1950, 1960, 2010, 2020],
+                           'area': [10.5, 0.0, 1e6, -3.25],
+                           'REFERENCE': ['a', None, 'c', 'd']})
+        dbf_path = tempfile.mktemp(suffix='.dbf')
+        dbf.dataframe_to_dbf(df, dbf_path)
+        result = dbf.dbf_to_dataframe(dbf_path)
+        assert_frame_equal(df.fillna(''), result)
+
+    def test_same_as_pysal_writer(self):
+        """The file is the same as written record by record with PySAL (except for the date in the header)"""
+        df = pd.DataFrame({'Name': ['B%i' % i for i in range(100)], 'YEAR': np.arange(100),
+                           'area': np.random.randn(100)})
+        specs = [('C', 25, 0), ('N', 20, 0), ('N', 36, 15)]
+        pysal_path = tempfile.mktemp(suffix='.dbf')
+        pysal_dbf = pysal.lib.io.open(pysal_path, 'w', 'dbf')
+        pysal_dbf.header = list(df.columns)
+        pysal_dbf.field_spec = specs
+        for row in range(len(df)):
+            pysal_dbf.write(df.iloc[row])
+        pysal_dbf.close()
+
+        dbf_path = tempfile.mktemp(suffix='.dbf')
+        dbf.dataframe_to_dbf(df, dbf_path)
+        with open(pysal_path, 'rb') as pysal_fp, open(dbf_path, 'rb') as fp:
+            expected, actual = pysal_fp.read(), fp.read()
+        self.assertEqual(expected[:1] + expected[4:], actual[:1] + actual[4:])
+
+    def test_schema_specs(self):
+        """The types of the columns of the input files are taken from schemas.yml"""
+        locator = cea.inputlocator.InputLocator(scenario=tempfile.mkdtemp())
+        dbf_path = locator.get_building_typology()
+        os.makedirs(os.path.dirname(dbf_path))
+        df = pd.DataFrame({'Name': ['B1000'], 'YEAR': [1950.0], '1ST_USE_R': [1]})
+        dbf.dataframe_to_dbf(df, dbf_path)
+        result = dbf.dbf_to_dataframe(dbf_path)
+        self.assertEqual(result['YEAR'].dtype, np.int64)
+        self.assertEqual(result['1ST_USE_R'].dtype, np.float64)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
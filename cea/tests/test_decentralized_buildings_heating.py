@@ -0,0 +1,56 @@
+"""
+Test the decentralized heating configurations with a GHP (3-12), which are calculated as matrices of all configurations
+and hours at once, against the calculation of one configuration at a time: the expected results (in
+``cea/tests/test_decentralized_buildings_heating.config``) were recorded with the loop over the configurations on the
+same (random) inputs.
+"""
+
+
+
+
+import configparser
+import json
+import os
+import unittest
+
+import numpy as np
+
+from cea.optimization.preprocessing.decentralized_buildings_heating import calc_GHP_configurations, calc_new_load
+
+NUMBER_OF_HOURS = 48
+
+
+class TestCalcGHPConfigurations(unittest.TestCase):
+    def check_GHP_configurations(self, supply_temperatures_K, option):
+        random = np.random.RandomState(42)
+        mdot_kgpers = np.where(random.rand(NUMBER_OF_HOURS) < 0.1, 0.0, 0.5 + 4.5 * random.rand(NUMBER_OF_HOURS))
+        Tsup_K = random.choice(supply_temperatures_K, NUMBER_OF_HOURS)
+        Tret_K = Tsup_K - 10.0 - 20.0 * random.rand(NUMBER_OF_HOURS)
+        T_ground_K = 283.0 + 5.0 * random.rand(NUMBER_OF_HOURS)
+        q_load_Wh = calc_new_load(mdot_kgpers, Tsup_K, Tret_K)
+
+        results = calc_GHP_configurations(q_load_Wh.max(), q_load_Wh, T_ground_K, Tret_K, Tsup_K, mdot_kgpers)
+
+        config = configparser.ConfigParser()
+        config.read(get_test_config_path())
+        reference_results = json.loads(config.get('test_calc_GHP_configurations', option))
+        self.assertEqual(sorted(results.keys()), sorted(reference_results.keys()))
+        for key, reference_result in reference_results.items():
+            np.testing.assert_allclose(results[key], reference_result, rtol=1e-9, atol=1e-6, err_msg=key)
+
+    def test_below_condenser_limit(self):
+        """the GHP supplies its share of the load, the NG boiler the rest"""
+        self.check_GHP_configurations([333.0, 343.0, 353.0], 'expected_results_below_condenser_limit')
+
+    def test_above_condenser_limit(self):
+        """the supply temperature is above the limit of the condenser in some hours, the backup boiler is used"""
+        self.check_GHP_configurations([353.0, 408.0, 413.0], 'expected_results_above_condenser_limit')
+
+
+def get_test_config_path():
+    """return the path to the test data configuration file (``cea/tests/test_decentralized_buildings_heating.config``)"""
+    return os.path.join(os.path.dirname(__file__), 'test_decentralized_buildings_heating.config')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Test the cache of the results of the decentralized supply systems of the buildings.
+"""
+
+
+
+
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import cea.inputlocator
+from cea.optimization.preprocessing.decentralized_cache import DecentralizedCache, calc_inputs_hash
+
+
+class TestDecentralizedCache(unittest.TestCase):
+    def setUp(self):
+        self.scenario = tempfile.mkdtemp()
+        self.locator = cea.inputlocator.InputLocator(scenario=self.scenario)
+        self.demand_path = self.locator.get_demand_results_file('B1000')
+        self.result_paths = [self.locator.get_optimization_decentralized_folder_building_result_heating('B1000'),
+                             self.locator.get_optimization_decentralized_folder_building_result_heating_activation(
+                                 'B1000')]
+        self.write_demand([1.0, 2.0, 3.0])
+
+    def tearDown(self):
+        shutil.rmtree(self.scenario)
+
+    def write_demand(self, Qhs_sys_kWh):
+        pd.DataFrame({'Name': ['B1000'] * len(Qhs_sys_kWh), 'Qhs_sys_kWh': Qhs_sys_kWh}).to_csv(self.demand_path,
+                                                                                                index=False)
+
+    def cache(self, *inputs):
+        return DecentralizedCache(self.locator, 'B1000', 'DH', self.result_paths,
+                                  calc_inputs_hash([self.demand_path], *inputs))
+
+    def calculate(self, cache):
+        cache.invalidate()
+        for path in self.result_paths:
+            pd.DataFrame({'TAC_USD': [1.0]}).to_csv(path, index=False)
+        cache.store()
+
+    def test_up_to_date(self):
+        cache = self.cache('database-version', np.arange(3.0))
+        self.assertFalse(cache.is_up_to_date())
+        self.calculate(cache)
+        self.assertTrue(self.cache('database-version', np.arange(3.0)).is_up_to_date())
+
+        # another database or other inputs
+        self.assertFalse(self.cache('other-database-version', np.arange(3.0)).is_up_to_date())
+        self.assertFalse(self.cache('database-version', np.arange(4.0)).is_up_to_date())
+
+        # the demand of the building changed
+        self.write_demand([1.0, 2.0, 4.0])
+        self.assertFalse(self.cache('database-version', np.arange(3.0)).is_up_to_date())
+
+    def test_interrupted(self):
+        cache = self.cache('database-version')
+        self.calculate(cache)
+        # a run that is interrupted while writing the results
+        cache.invalidate()
+        self.assertFalse(self.cache('database-version').is_up_to_date())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,180 @@
+"""
+Compare the array versions of the hourly demand functions (``*_array``) to their scalar reference implementations
+evaluated with ``np.vectorize`` - which is how the demand script used to call them.
+"""
+
+
+
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import cea.config
+import cea.inputlocator
+from cea.constants import HOURS_IN_YEAR
+from cea.demand import electrical_loads, hotwater_loads, datacenter_loads, control_heating_cooling_systems
+from cea.technologies import blinds, radiators, tabs, heating_coils
+from cea.utilities import solvers
+
+def random_load(random, low, high, fraction_off=0.4):
+    """hourly load profile between ``low`` and ``high`` that is zero for ``fraction_off`` of the hours"""
+    load = random.uniform(low, high, HOURS_IN_YEAR)
+    load[random.uniform(size=HOURS_IN_YEAR) < fraction_off] = 0.0
+    return load
+
+
+class TestDemandArrayKernels(unittest.TestCase):
+    def setUp(self):
+        self.random = np.random.RandomState(42)
+        self.T_int = self.random.uniform(15.0, 28.0, HOURS_IN_YEAR)
+        self.T_ext = self.random.uniform(-10.0, 35.0, HOURS_IN_YEAR)
+
+    def assert_equivalent(self, scalar_result, array_result):
+        np.testing.assert_allclose(array_result, np.asarray(scalar_result, dtype=float), rtol=1e-12, atol=1e-9,
+                                   equal_nan=True)
+
+    def test_calc_Eauxf_hs_dis(self):
+        Qhs_sys = random_load(self.random, 0.0, 50000.0)
+        ts = self.random.uniform(35.0, 70.0, HOURS_IN_YEAR)
+        tr = ts - self.random.choice([0.0, 5.0, 10.0, 20.0], HOURS_IN_YEAR)
+        for b in (1, 2):
+            self.assert_equivalent(
+                np.vectorize(electrical_loads.calc_Eauxf_hs_dis)(Qhs_sys, Qhs_sys.max(), 60.0, b, ts, tr),
+                electrical_loads.calc_Eauxf_hs_dis_array(Qhs_sys, Qhs_sys.max(), 60.0, b, ts, tr))
+
+    def test_calc_Eauxf_cs_dis(self):
+        Qcs_sys = -random_load(self.random, 0.0, 50000.0)
+        ts = self.random.uniform(6.0, 16.0, HOURS_IN_YEAR)
+        tr = ts + self.random.choice([0.0, 5.0, 10.0], HOURS_IN_YEAR)
+        for b in (1, 2):
+            self.assert_equivalent(
+                np.vectorize(electrical_loads.calc_Eauxf_cs_dis)(Qcs_sys, Qcs_sys.min(), 60.0, b, ts, tr),
+                electrical_loads.calc_Eauxf_cs_dis_array(Qcs_sys, Qcs_sys.min(), 60.0, b, ts, tr))
+
+    def test_calc_Eauxf_ww_and_fw(self):
+        Qww = random_load(self.random, 0.0, 20000.0)
+        m_kgs = np.where(self.random.uniform(size=HOURS_IN_YEAR) < 0.1, 0.0, Qww / 1e5)
+        Vfw_m3h = random_load(self.random, 0.0, 2.0)
+        self.assert_equivalent(np.vectorize(electrical_loads.calc_Eauxf_ww)(Qww, 40.0, 2, m_kgs),
+                               electrical_loads.calc_Eauxf_ww_array(Qww, 40.0, 2, m_kgs))
+        self.assert_equivalent(np.vectorize(electrical_loads.calc_Eauxf_fw)(Vfw_m3h, 40.0, 1),
+                               electrical_loads.calc_Eauxf_fw_array(Vfw_m3h, 40.0, 1))
+
+    def test_calc_heating_cooling_fraction(self):
+        Q_sen_sys = self.random.uniform(-5000.0, 5000.0, HOURS_IN_YEAR)
+        Q_sen_sys[::7] = 0.0
+        Q_sen_sub = Q_sen_sys * self.random.uniform(0.0, 1.0, HOURS_IN_YEAR)
+        self.assert_equivalent([sub / sys if sys > 0 else 0 for sub, sys in zip(Q_sen_sub, Q_sen_sys)],
+                               electrical_loads.calc_heating_fraction(Q_sen_sub, Q_sen_sys))
+        self.assert_equivalent([sub / sys if sys < 0 else 0 for sub, sys in zip(Q_sen_sub, Q_sen_sys)],
+                               electrical_loads.calc_cooling_fraction(Q_sen_sub, Q_sen_sys))
+
+    def test_calc_Qww_dis_ls(self):
+        Qww = random_load(self.random, 0.0, 30000.0, fraction_off=0.6)
+        V = 120.0 * ((hotwater_loads.D / 1000) / 2) ** 2 * np.pi
+        self.assert_equivalent(
+            np.vectorize(hotwater_loads.calc_Qww_dis_ls_r)(self.T_int, Qww, 120.0, 80.0, 0.3, Qww.max(), V, 60.0),
+            hotwater_loads.calc_Qww_dis_ls_r_array(self.T_int, Qww, 120.0, 80.0, 0.3, Qww.max(), V, 60.0))
+        self.assert_equivalent(
+            np.vectorize(hotwater_loads.calc_Qww_dis_ls_nr)(self.T_int, Qww, 40.0, 30.0, 0.4, Qww.max(), V, 60.0,
+                                                            self.T_ext),
+            hotwater_loads.calc_Qww_dis_ls_nr_array(self.T_int, Qww, 40.0, 30.0, 0.4, Qww.max(), V, 60.0,
+                                                    self.T_ext))
+
+    def test_calc_mcpcdata(self):
+        Qcdata_sys = random_load(self.random, 0.0, 80000.0)
+        Qcdata_sys[0] = 0.0  # np.vectorize infers the output type of the reference from the first hour
+        for scalar_result, array_result in zip(np.vectorize(datacenter_loads.calc_mcpcdata)(Qcdata_sys),
+                                               datacenter_loads.calc_mcpcdata_array(Qcdata_sys)):
+            self.assert_equivalent(scalar_result, array_result)
+
+    def test_calc_blinds_activation(self):
+        radiation = random_load(self.random, 0.0, 900.0)
+        self.assert_equivalent(np.vectorize(blinds.calc_blinds_activation)(radiation, 0.6, 0.08),
+                               blinds.calc_blinds_activation_array(radiation, 0.6, 0.08))
+
+    def assert_equivalent_emission_system(self, scalar_function, array_function, *args):
+        for scalar_result, array_result in zip(np.vectorize(scalar_function)(*args), array_function(*args)):
+            self.assert_equivalent(scalar_result, array_result)
+
+    def test_calc_radiator(self):
+        Qhs_sys = random_load(self.random, 0.0, 20000.0)
+        Qhs_sys[0] = 0.0  # np.vectorize infers the output type of the reference from the first hour
+        self.assert_equivalent_emission_system(radiators.calc_radiator, radiators.calc_radiator_array,
+                                               Qhs_sys, self.T_int, Qhs_sys.max(), 21.0, 70.0, 50.0)
+        # sensible cooling panels
+        T_int = self.random.uniform(24.0, 28.0, HOURS_IN_YEAR)
+        self.assert_equivalent_emission_system(radiators.calc_radiator, radiators.calc_radiator_array,
+                                               -Qhs_sys, T_int, -Qhs_sys.max(), 26.0, 16.0, 20.0)
+        Ths_sup, Ths_re, mcphs = radiators.calc_radiator_array(np.zeros(HOURS_IN_YEAR), self.T_int, 0.0, 21.0, 70.0,
+                                                               50.0)
+        self.assertTrue(np.isnan(Ths_sup).all() and np.isnan(Ths_re).all() and not mcphs.any())
+
+    def test_calc_floorheating(self):
+        Qhs_sys = random_load(self.random, 0.0, 20000.0)
+        self.assert_equivalent_emission_system(tabs.calc_floorheating, tabs.calc_floorheating_array,
+                                               Qhs_sys, self.T_int, Qhs_sys.max(), 35.0, 30.0, 500.0)
+
+    def test_calc_coils(self):
+        Qhs_sys = random_load(self.random, 0.0, 20000.0)
+        Qhs_sys[0] = 0.0
+        ma_sup = random_load(self.random, 0.1, 2.0, fraction_off=0.1)
+        nominal = np.argmax(Qhs_sys)
+        ta_sup = self.random.uniform(30.0, 40.0, HOURS_IN_YEAR)
+        ta_re = self.random.uniform(18.0, 22.0, HOURS_IN_YEAR)
+        self.assert_equivalent_emission_system(heating_coils.calc_heating_coil, heating_coils.calc_heating_coil_array,
+                                               Qhs_sys, Qhs_sys.max(), ta_sup, ta_re, 60.0, 40.0, ma_sup,
+                                               ma_sup[nominal], ta_sup[nominal] + 273, ta_re[nominal] + 273)
+        ta_sup = self.random.uniform(14.0, 16.0, HOURS_IN_YEAR)
+        ta_re = self.random.uniform(24.0, 26.0, HOURS_IN_YEAR)
+        self.assert_equivalent_emission_system(heating_coils.calc_cooling_coil, heating_coils.calc_cooling_coil_array,
+                                               -Qhs_sys, -Qhs_sys.max(), ta_sup, ta_re, 7.0, 15.0, ma_sup,
+                                               ma_sup[nominal], ta_sup[nominal] + 273, ta_re[nominal] + 273)
+
+    def test_newton_array(self):
+        x0 = np.array([1.0, 1.0, 1.0, 5.0])
+        a = np.array([2.0, 9.0, 1.0, 0.25])
+        roots = solvers.newton_array(lambda x, a, b: x ** 2 - a - b, x0, args=(a, 0.0), tol=1e-12)
+        np.testing.assert_allclose(roots, np.sqrt(a), atol=1e-9)
+        with self.assertRaises(RuntimeError):
+            solvers.newton_array(lambda x: x ** 2 + 1.0, np.ones(3), maxiter=10)
+
+
+class TestDemandArrayKernelsReferenceCase(unittest.TestCase):
+    """Compare the set point temperatures of all buildings of the reference case"""
+
+    @classmethod
+    def setUpClass(cls):
+        import cea.examples
+        cls.locator = cea.inputlocator.ReferenceCaseOpenLocator()
+        cls.config = cea.config.Configuration(cea.config.DEFAULT_CONFIG)
+        cls.config.general.multiprocessing = False
+        cls.config.schedule_maker.schedule_model = "deterministic"
+
+        import cea.datamanagement.archetypes_mapper
+        cea.datamanagement.archetypes_mapper.archetypes_mapper(cls.locator, True, True, True, True, True, True,
+                                                               cls.locator.get_zone_building_names())
+        from cea.demand.building_properties import BuildingProperties
+        cls.building_properties = BuildingProperties(cls.locator)
+
+    def test_get_temperature_setpoints_incl_seasonality(self):
+        from cea.demand.schedule_maker.schedule_maker import schedule_maker_main
+        for building_name in self.building_properties.list_building_names():
+            schedule_maker_main(self.locator, self.config, building=building_name)
+            schedules = pd.read_csv(self.locator.get_schedule_model_file(building_name))
+            bpr = self.building_properties[building_name]
+            hours = range(HOURS_IN_YEAR)
+            for scalar, array, schedule in [
+                (control_heating_cooling_systems.get_heating_system_set_point,
+                 control_heating_cooling_systems.get_heating_system_set_point_array, schedules['Ths_set_C']),
+                (control_heating_cooling_systems.get_cooling_system_set_point,
+                 control_heating_cooling_systems.get_cooling_system_set_point_array, schedules['Tcs_set_C'])]:
+                np.testing.assert_array_equal(array(schedule, bpr),
+                                              np.vectorize(scalar, otypes=[float])(hours, schedule, bpr),
+                                              err_msg=building_name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Test the demand results store: the results of each building are read from the store or from the csv file of the
+building, whichever format the last demand calculation of the building used.
+"""
+
+
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import cea.inputlocator
+from cea.demand.demand_writers import HourlyDemandWriter, YearlyDemandWriter, read_demand_results, \
+    demand_results_exist, get_demand_results_path
+
+COLUMNS = ['Name', 'people', 'x_int', 'QH_sys_kWh', 'T_ext_C']
+
+
+class TestDemandResultsStore(unittest.TestCase):
+    def setUp(self):
+        self.scenario = tempfile.mkdtemp()
+        self.locator = cea.inputlocator.InputLocator(scenario=self.scenario)
+        self.hourly_writer = HourlyDemandWriter([], [], [])
+        self.yearly_writer = YearlyDemandWriter([], [], [])
+
+    def tearDown(self):
+        shutil.rmtree(self.scenario)
+
+    def calculate_demand(self, building_names, value, results_format):
+        """Write results of ``building_names`` like the demand script does - all hourly loads are ``value``"""
+        date = pd.date_range('2020-01-01', periods=3, freq='h', name='DATE')
+        for building_name in building_names:
+            hourly_data = pd.DataFrame({'Name': building_name, 'people': [1.0, 2.0, 3.0], 'x_int': 0.5,
+                                        'QH_sys_kWh': value, 'T_ext_C': [5.0, 6.0, 7.0]}, index=date)
+            totals = pd.DataFrame({'Name': [building_name], 'QH_sys_MWhyr': [3 * value / 1000]})
+            if results_format == 'hdf5':
+                self.hourly_writer.write_to_hdf5(building_name, COLUMNS, hourly_data, self.locator)
+                totals.to_hdf(self.locator.get_temporary_file('%sT.hdf' % building_name), key='dataset')
+            else:
+                self.hourly_writer.write_to_csv(building_name, COLUMNS, hourly_data, self.locator)
+                totals.to_csv(self.locator.get_temporary_file('%sT.csv' % building_name), index=False)
+        if results_format == 'hdf5':
+            self.yearly_writer.write_to_hdf5(building_names, self.locator)
+        else:
+            self.yearly_writer.write_to_csv(building_names, self.locator)
+
+    def assert_results(self, building_name, value):
+        np.testing.assert_array_equal(read_demand_results(self.locator, building_name, columns=['QH_sys_kWh'])
+                                      ['QH_sys_kWh'], [value] * 3)
+
+    def test_round_trip(self):
+        self.calculate_demand(['B1000', 'B1001'], 10.0, 'csv')
+        csv_results = read_demand_results(self.locator, 'B1000')
+        self.calculate_demand(['B1000', 'B1001'], 10.0, 'hdf5')
+
+        self.assertEqual(get_demand_results_path(self.locator, 'B1000'), self.locator.get_demand_results_store())
+        self.assertFalse(os.path.exists(self.locator.get_demand_results_file('B1000')))
+        store_results = read_demand_results(self.locator, 'B1000')
+        self.assertEqual(list(store_results.columns), list(csv_results.columns))
+        pd.testing.assert_frame_equal(store_results.drop(columns='DATE'), csv_results.drop(columns='DATE'))
+        self.assertEqual(list(read_demand_results(self.locator, 'B1000', columns=['Name', 'T_ext_C'])['Name']),
+                         ['B1000'] * 3)
+        self.assertTrue(demand_results_exist(self.locator, 'B1001'))
+        self.assertFalse(demand_results_exist(self.locator, 'B1002'))
+
+    def test_no_store(self):
+        self.calculate_demand(['B1000'], 10.0, 'csv')
+        self.assertFalse(self.locator.get_demand_results_store.contains('B1000'))
+        self.assert_results('B1000', 10.0)
+
+    def test_subset(self):
+        """A demand calculation of some of the buildings keeps the results of the others"""
+        self.calculate_demand(['B1000', 'B1001'], 10.0, 'hdf5')
+        self.calculate_demand(['B1001'], 20.0, 'hdf5')
+        self.assert_results('B1000', 10.0)
+        self.assert_results('B1001', 20.0)
+
+    def test_csv_fallback(self):
+        """Buildings calculated with the csv format are read from their csv files"""
+        self.calculate_demand(['B1000', 'B1001'], 10.0, 'hdf5')
+        self.calculate_demand(['B1001', 'B1002'], 20.0, 'csv')
+        self.assertEqual(sorted(self.locator.get_demand_results_store.keys()), ['B1000'])
+        self.assertTrue(self.locator.get_demand_results_store.contains('B1000'))
+        self.assertFalse(self.locator.get_demand_results_store.contains('B1001'))
+        self.assert_results('B1000', 10.0)
+        self.assert_results('B1001', 20.0)
+        self.assert_results('B1002', 20.0)
+        self.assertEqual(get_demand_results_path(self.locator, 'B1002'), self.locator.get_demand_results_file('B1002'))
+
+
+if __name__ == "__main__":
+    unittest.main()
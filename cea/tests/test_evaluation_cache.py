@@ -0,0 +1,72 @@
+"""
+Test the persistent cache of the evaluation of individuals of the optimization.
+"""
+
+
+
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+import cea.inputlocator
+from cea.optimization.master.evaluation_cache import EvaluationCache, calc_inputs_hash
+import cea.utilities.input_cache as input_cache
+
+
+class TestEvaluationCache(unittest.TestCase):
+    def setUp(self):
+        self.scenario = tempfile.mkdtemp()
+        self.locator = cea.inputlocator.InputLocator(scenario=self.scenario)
+        self.results = (1000.0, 20.0, {'Capex_a_sys_connected_USD': 10.0}, pd.DataFrame({'Q_GEN_W': [1.0, 2.0]}))
+
+    def tearDown(self):
+        shutil.rmtree(self.scenario)
+
+    def test_store_and_get(self):
+        cache = EvaluationCache(self.locator, calc_inputs_hash(self.locator, ['B1000']))
+        individual = [0.5, 0.25, 1, 0, 1]
+        self.assertIsNone(cache.get_fitness(individual))
+        self.assertIsNone(cache.get_results(individual))
+        cache.store(individual, self.results)
+
+        # a new cache with the same inputs (e.g. in a later run) finds the individual
+        cache = EvaluationCache(self.locator, calc_inputs_hash(self.locator, ['B1000']))
+        self.assertEqual(cache.get_fitness([0.5, 0.25, 1.0, 0.0, 1.0]), (1000.0, 20.0))
+        results = cache.get_results(individual)
+        self.assertEqual(results[2], self.results[2])
+        pd.testing.assert_frame_equal(results[3], self.results[3])
+        self.assertIsNone(cache.get_fitness([0.5, 0.25, 1, 1, 1]))
+        self.assertEqual([f for f in os.listdir(cache.folder) if f.endswith('.tmp')], [])
+
+    def test_inputs_hash(self):
+        inputs_hash = calc_inputs_hash(self.locator, ['B1000'])
+        self.assertEqual(inputs_hash, calc_inputs_hash(self.locator, ['B1000']))
+        self.assertNotEqual(inputs_hash, calc_inputs_hash(self.locator, ['B1000', 'B1001']))
+
+        with open(os.path.join(self.locator.get_demand_results_folder(), 'Total_demand.csv'), 'w') as fp:
+            fp.write('Name,QH_sys_MWhyr\nB1000,1.0\n')
+        self.assertNotEqual(inputs_hash, calc_inputs_hash(self.locator, ['B1000']))
+
+    def test_inputs_hash_ignores_input_cache(self):
+        """reading the inputs through the binary cache of the input files does not change the inputs"""
+        os.makedirs(self.locator.get_building_properties_folder())
+        typology_path = os.path.join(self.locator.get_building_properties_folder(), 'typology.csv')
+        pd.DataFrame({'Name': ['B1000'], 'YEAR': [2010]}).to_csv(typology_path, index=False)
+        inputs_hash = calc_inputs_hash(self.locator, ['B1000'])
+        cache_folder = tempfile.mkdtemp()
+        try:
+            with mock.patch.object(input_cache, 'CACHE_FOLDER', cache_folder):
+                input_cache.read_cached(typology_path, pd.read_csv)
+            self.assertEqual(len(os.listdir(cache_folder)), 1)
+        finally:
+            shutil.rmtree(cache_folder)
+        self.assertEqual(inputs_hash, calc_inputs_hash(self.locator, ['B1000']))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+"""
+Test the evolution schemes of the genetic algorithm of the optimization on a small test problem.
+"""
+
+
+
+
+import multiprocessing
+import random
+import unittest
+from itertools import repeat
+
+from deap import base, creator, tools
+
+from cea.optimization.master.evolution import evolve_generational, evolve_steady_state, apply_synchronously
+
+MU = 8
+NUMBER_OF_GENES = 4
+
+creator.create("FitnessMinEvolutionTest", base.Fitness, weights=(-1.0, -1.0))
+creator.create("IndividualEvolutionTest", list, fitness=creator.FitnessMinEvolutionTest)
+
+
+def evaluate(args):
+    """two conflicting objectives of the genes (ZDT1)"""
+    individual, individual_number, generation = args
+    g = 1.0 + 9.0 * sum(individual[1:]) / (len(individual) - 1)
+    return individual[0], g * (1.0 - (individual[0] / g) ** 0.5)
+
+
+def fail(args):
+    raise ValueError("evaluation failed")
+
+
+def create_toolbox():
+    toolbox = base.Toolbox()
+    toolbox.register("gene", random.random)
+    toolbox.register("individual", tools.initRepeat, creator.IndividualEvolutionTest, toolbox.gene, NUMBER_OF_GENES)
+    toolbox.register("population", tools.initRepeat, list, toolbox.individual)
+    toolbox.register("mate", tools.cxSimulatedBinaryBounded, low=0.0, up=1.0, eta=20.0)
+    toolbox.register("mutate", tools.mutPolynomialBounded, low=0.0, up=1.0, eta=20.0, indpb=1.0 / NUMBER_OF_GENES)
+    toolbox.register("select", tools.selNSGA3WithMemory(tools.uniform_reference_points(2, 12)))
+    toolbox.register("evaluate", evaluate)
+    toolbox.register("map", map)
+    toolbox.register("apply_async", apply_synchronously)
+    return toolbox
+
+
+class TestEvolution(unittest.TestCase):
+    def setUp(self):
+        random.seed(100)
+        self.toolbox = create_toolbox()
+        self.pop = self.toolbox.population(n=MU)
+        for ind in self.pop:
+            ind.fitness.values = evaluate((ind, 0, 0))
+        self.evaluated = []  # (individual number, generation) of the individuals sent to evaluation
+
+    def evaluation_args(self, individuals, individual_numbers, generation):
+        individual_numbers = list(individual_numbers)
+        self.evaluated.extend((n, generation) for n in individual_numbers)
+        return zip(individuals, individual_numbers, repeat(generation, len(individuals)))
+
+    def check_generations(self, generations, number_of_generations):
+        self.assertEqual([generation for generation, _, _ in generations], list(range(1, number_of_generations + 1)))
+        for generation, pop, evaluated_individuals in generations:
+            self.assertEqual(len(pop), MU)
+            self.assertTrue(all(ind.fitness.valid for ind in pop))
+            self.assertTrue(all(ind.fitness.valid for ind in evaluated_individuals))
+            self.assertLessEqual(len(evaluated_individuals), MU)
+            self.assertEqual(sorted(n for n, g in self.evaluated if g == generation),
+                             list(range(len(evaluated_individuals))))
+
+    def test_generational(self):
+        generations = [(generation, list(pop), list(evaluated_individuals)) for generation, pop, evaluated_individuals
+                       in evolve_generational(self.pop, self.toolbox, self.evaluation_args, lambda f: f, MU, 0.9, 0.1,
+                                              5)]
+        self.check_generations(generations, 5)
+
+    def test_steady_state(self):
+        generations = [(generation, list(pop), list(evaluated_individuals)) for generation, pop, evaluated_individuals
+                       in evolve_steady_state(self.pop, self.toolbox, self.evaluation_args, lambda f: f, MU, 0.9, 0.1,
+                                              5, 3)]
+        self.check_generations(generations, 5)
+        self.assertEqual([len(evaluated_individuals) for _, _, evaluated_individuals in generations], [MU] * 5)
+
+        # the population improves on the initial population
+        initial_front = min(sum(ind.fitness.values) for ind in self.pop)
+        self.assertLessEqual(min(sum(ind.fitness.values) for ind in generations[-1][1]), initial_front)
+
+    def test_steady_state_pool(self):
+        pool = multiprocessing.Pool(processes=2)
+        try:
+            self.toolbox.register("apply_async", pool.apply_async)
+            generations = [(generation, list(pop), list(evaluated_individuals)) for
+                           generation, pop, evaluated_individuals in
+                           evolve_steady_state(self.pop, self.toolbox, self.evaluation_args, lambda f: f, MU, 0.9, 0.1,
+                                               3, 2)]
+        finally:
+            pool.close()
+            pool.join()
+        self.check_generations(generations, 3)
+
+    def test_steady_state_error(self):
+        self.toolbox.register("evaluate", fail)
+        with self.assertRaises(ValueError):
+            list(evolve_steady_state(self.pop, self.toolbox, self.evaluation_args, lambda f: f, MU, 0.9, 0.1, 2, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+"""
+Test the search of the neighbours of the buildings of the geometry generator of the radiation script.
+"""
+
+
+
+
+import unittest
+
+from shapely.geometry import Polygon, box
+
+from cea.resources.radiation_daysim.geometry_generator import calc_neighbour_names, INTERSECTION_SEARCH_DISTANCE
+
+
+class TestCalcNeighbourNames(unittest.TestCase):
+    def setUp(self):
+        self.building_names = ['B1000', 'B1001', 'B1002', 'B1003', 'B1004']
+        self.footprints = [box(0.0, 0.0, 10.0, 10.0),
+                           box(10.0, 0.0, 20.0, 10.0),  # touching B1000
+                           box(-10.5, 0.0, -0.5, 10.0),  # 0.5 m from B1000
+                           box(0.0, 15.0, 10.0, 25.0),  # 5 m from B1000
+                           # a large L-shaped building 0.5 m from B1000, with the corner of its bounding box far away
+                           Polygon([(0.0, -0.5), (8.0, -0.5), (8.0, -210.0), (-200.0, -210.0), (-200.0, -200.0),
+                                    (0.0, -200.0)])]
+
+    def test_intersection_search_distance(self):
+        neighbour_names = calc_neighbour_names(self.footprints, self.footprints, self.building_names,
+                                               INTERSECTION_SEARCH_DISTANCE)
+        self.assertEqual(neighbour_names, [['B1000', 'B1001', 'B1002', 'B1004'],
+                                           ['B1000', 'B1001'],
+                                           ['B1000', 'B1002', 'B1004'],
+                                           ['B1003'],
+                                           ['B1000', 'B1002', 'B1004']])
+
+    def test_larger_distance(self):
+        neighbour_names = calc_neighbour_names(self.footprints[:1], self.footprints, self.building_names, 6.0)
+        self.assertEqual(neighbour_names, [['B1000', 'B1001', 'B1002', 'B1003', 'B1004']])
+
+
+if __name__ == "__main__":
+    unittest.main()
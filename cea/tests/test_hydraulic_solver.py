@@ -0,0 +1,98 @@
+"""
+Test the sparse EdgeNodeSolver of the thermal network against the dense ``np.linalg`` solutions it replaces.
+"""
+
+
+
+
+import unittest
+
+import numpy as np
+
+from cea.technologies.thermal_network import hydraulic_solver
+from cea.technologies.thermal_network.hydraulic_solver import EdgeNodeSolver
+
+
+def random_edge_node_matrix(random, n_nodes, n_loops):
+    """a connected network (random tree plus ``n_loops`` extra edges) as edge-node incidence matrix (n x e)"""
+    edges = [(random.randint(0, node + 1), node + 1) for node in range(n_nodes - 1)]
+    while len(edges) < n_nodes - 1 + n_loops:
+        start, end = random.choice(n_nodes, 2, replace=False)
+        if (start, end) not in edges and (end, start) not in edges:
+            edges.append((start, end))
+    edge_node = np.zeros((n_nodes, len(edges)))
+    for edge, (start, end) in enumerate(edges):
+        edge_node[start, edge] = -1
+        edge_node[end, edge] = 1
+    return edge_node
+
+
+class TestEdgeNodeSolver(unittest.TestCase):
+    def setUp(self):
+        self.random = np.random.RandomState(42)
+
+    def random_node_flows(self, n_nodes, plant):
+        node_flows = self.random.uniform(0.0, 5.0, n_nodes)
+        node_flows[plant] = -(node_flows.sum() - node_flows[plant])
+        return node_flows
+
+    def test_solve_edge_flows_tree(self):
+        edge_node = random_edge_node_matrix(self.random, 50, 0)
+        node_flows = self.random_node_flows(50, plant=3)
+        expected = np.linalg.solve(np.delete(edge_node, 3, axis=0), np.delete(node_flows, 3))
+        np.testing.assert_allclose(EdgeNodeSolver(edge_node).solve_edge_flows(node_flows, ground=3), expected,
+                                   atol=1e-9)
+
+    def test_solve_edge_flows_loops(self):
+        edge_node = random_edge_node_matrix(self.random, 50, 5)
+        node_flows = self.random_node_flows(50, plant=0)
+        expected = np.linalg.lstsq(edge_node[1:], node_flows[1:], rcond=-1)[0]
+        np.testing.assert_allclose(EdgeNodeSolver(edge_node).solve_edge_flows(node_flows, ground=0), expected,
+                                   atol=1e-9)
+
+    def test_flow_direction_changes(self):
+        """the cached factorization is reused when flow directions (signs of columns) change"""
+        edge_node = random_edge_node_matrix(self.random, 50, 0)
+        node_flows = self.random_node_flows(50, plant=0)
+        EdgeNodeSolver(edge_node).solve_edge_flows(node_flows, ground=0)
+        edge_node[:, ::3] *= -1
+        solver = EdgeNodeSolver(edge_node)
+        self.assertIn((solver.topology, 0), EdgeNodeSolver.laplacian_factors_cache)
+        expected = np.linalg.solve(edge_node[1:], node_flows[1:])
+        np.testing.assert_allclose(solver.solve_edge_flows(node_flows, ground=0), expected, atol=1e-9)
+
+    def test_cache_size(self):
+        """only the factorizations of the last topologies are kept"""
+        node_flows = self.random_node_flows(20, plant=0)
+        for _ in range(hydraulic_solver.LAPLACIAN_FACTORS_CACHE_SIZE + 3):
+            EdgeNodeSolver(random_edge_node_matrix(self.random, 20, 0)).solve_edge_flows(node_flows, ground=0)
+        self.assertEqual(len(EdgeNodeSolver.laplacian_factors_cache), hydraulic_solver.LAPLACIAN_FACTORS_CACHE_SIZE)
+
+    def test_solve_node_potentials(self):
+        for n_loops in (0, 5):
+            edge_node = random_edge_node_matrix(self.random, 50, n_loops)
+            pressure_loss = self.random.uniform(0.0, 1000.0, edge_node.shape[1])
+            expected = np.linalg.lstsq(edge_node.T, -pressure_loss, rcond=-1)[0]
+            np.testing.assert_allclose(EdgeNodeSolver(edge_node).solve_node_potentials(-pressure_loss), expected,
+                                       atol=1e-6)
+
+    def test_multiple_time_steps(self):
+        edge_node = random_edge_node_matrix(self.random, 50, 0)
+        node_flows = np.array([self.random_node_flows(50, plant=0) for _ in range(24)]).T  # (n x t)
+        solver = EdgeNodeSolver(edge_node)
+        edge_flows = solver.solve_edge_flows(node_flows, ground=0)
+        self.assertEqual(edge_flows.shape, (edge_node.shape[1], 24))
+        for t in range(24):
+            np.testing.assert_allclose(edge_flows[:, t], solver.solve_edge_flows(node_flows[:, t], ground=0))
+
+    def test_disconnected_network(self):
+        edge_node = np.zeros((4, 2))
+        edge_node[[0, 1], 0] = [-1, 1]
+        edge_node[[2, 3], 1] = [-1, 1]
+        node_flows = np.array([-1.0, 1.0, -2.0, 2.0])
+        expected = np.linalg.lstsq(edge_node[1:], node_flows[1:], rcond=-1)[0]
+        np.testing.assert_allclose(EdgeNodeSolver(edge_node).solve_edge_flows(node_flows, ground=0), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
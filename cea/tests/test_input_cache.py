@@ -0,0 +1,110 @@
+"""
+Test the binary cache of the input tables of a scenario (cea/utilities/input_cache.py)
+"""
+
+
+
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+from geopandas import GeoDataFrame as Gdf
+from pandas.testing import assert_frame_equal
+from shapely.geometry import Polygon
+
+import cea.utilities.input_cache as input_cache
+
+
+class TestInputCache(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'typology.csv')
+        pd.DataFrame({'Name': ['B1000', 'B1001'], 'YEAR': [1950, 2010]}).to_csv(self.path, index=False)
+        self.reads = 0
+        # the caches of the test are kept apart from the caches of the user
+        self.cache_folder = tempfile.mkdtemp()
+        patcher = mock.patch.object(input_cache, 'CACHE_FOLDER', self.cache_folder)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+        shutil.rmtree(self.cache_folder)
+
+    def reader(self, path):
+        self.reads += 1
+        return pd.read_csv(path)
+
+    def test_read_cached(self):
+        expected = pd.read_csv(self.path)
+        assert_frame_equal(input_cache.read_cached(self.path, self.reader), expected)
+        assert_frame_equal(input_cache.read_cached(self.path, self.reader), expected)
+        self.assertEqual(self.reads, 1)
+        self.assertTrue(os.path.exists(input_cache.get_cache_path(self.path)))
+        # nothing is written to the scenario (which is shared with others)
+        self.assertEqual(os.listdir(self.folder), ['typology.csv'])
+
+    def test_other_source_path(self):
+        """a copy of the source in another folder (e.g. another scenario) has a cache of its own"""
+        other_folder = os.path.join(self.folder, 'other')
+        os.makedirs(other_folder)
+        other_path = os.path.join(other_folder, 'typology.csv')
+        pd.DataFrame({'Name': ['B1000'], 'YEAR': [2020]}).to_csv(other_path, index=False)
+        self.assertNotEqual(input_cache.get_cache_path(self.path), input_cache.get_cache_path(other_path))
+        input_cache.read_cached(self.path, self.reader)
+        self.assertEqual(list(input_cache.read_cached(other_path, self.reader)['YEAR']), [2020])
+        self.assertEqual(self.reads, 2)
+
+    def test_changed_source(self):
+        input_cache.read_cached(self.path, self.reader)
+        pd.DataFrame({'Name': ['B1000', 'B1001'], 'YEAR': [1960, 2010]}).to_csv(self.path, index=False)
+        os.utime(self.path, ns=(0, 0))  # make sure the modification time changed, even on coarse file systems
+        self.assertEqual(list(input_cache.read_cached(self.path, self.reader)['YEAR']), [1960, 2010])
+        self.assertEqual(self.reads, 2)
+
+    def test_touched_source(self):
+        """A source with a new modification time, but the same contents (e.g. copied) is read from the cache"""
+        input_cache.read_cached(self.path, self.reader)
+        os.utime(self.path, ns=(0, 0))
+        input_cache.read_cached(self.path, self.reader)
+        input_cache.read_cached(self.path, self.reader)
+        self.assertEqual(self.reads, 1)
+
+    def test_corrupt_cache(self):
+        input_cache.read_cached(self.path, self.reader)
+        with open(input_cache.get_cache_path(self.path), 'wb') as fp:
+            fp.write(b'not a header\nnot a pickle')
+        assert_frame_equal(input_cache.read_cached(self.path, self.reader), pd.read_csv(self.path))
+        self.assertEqual(self.reads, 2)
+
+    def test_shapefile(self):
+        """All the files of a shapefile are checked (e.g. a new attribute table in the .dbf)"""
+        shapefile_path = os.path.join(self.folder, 'zone.shp')
+        for extension in ['.shp', '.shx', '.dbf']:
+            with open(shapefile_path[:-len('.shp')] + extension, 'w') as fp:
+                fp.write(extension)
+
+        def read_zone(path):
+            self.reads += 1
+            return Gdf({'Name': ['B1000'], 'height_ag': [10.0 * self.reads]},
+                       geometry=[Polygon([(0, 0), (10, 0), (10, 10), (0, 10)])], crs='EPSG:2056')
+
+        first = input_cache.read_cached(shapefile_path, read_zone, input_cache.SHAPEFILE_EXTENSIONS)
+        second = input_cache.read_cached(shapefile_path, read_zone, input_cache.SHAPEFILE_EXTENSIONS)
+        self.assertEqual(self.reads, 1)
+        self.assertIsInstance(second, Gdf)
+        self.assertEqual(second.crs, first.crs)
+        self.assertTrue(second.geometry.equals(first.geometry))
+
+        with open(os.path.join(self.folder, 'zone.dbf'), 'w') as fp:
+            fp.write('new attributes')
+        zone = input_cache.read_cached(shapefile_path, read_zone, input_cache.SHAPEFILE_EXTENSIONS)
+        self.assertEqual(list(zone['height_ag']), [20.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
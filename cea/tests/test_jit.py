@@ -0,0 +1,62 @@
+"""
+Test the just-in-time compilation of the numeric kernels (cea/utilities/jit.py)
+"""
+
+
+
+
+import os
+import unittest
+
+import numpy as np
+
+import cea.utilities.jit
+from cea.demand import rc_model_SIA
+
+
+def kernel(a, b):
+    return a / b
+
+
+class TestJit(unittest.TestCase):
+    def setUp(self):
+        self.environment = os.environ.pop(cea.utilities.jit.JIT_ENVIRONMENT_VARIABLE, None)
+
+    def tearDown(self):
+        os.environ.pop(cea.utilities.jit.JIT_ENVIRONMENT_VARIABLE, None)
+        if self.environment is not None:
+            os.environ[cea.utilities.jit.JIT_ENVIRONMENT_VARIABLE] = self.environment
+
+    def test_turned_off(self):
+        os.environ[cea.utilities.jit.JIT_ENVIRONMENT_VARIABLE] = 'false'
+        self.assertFalse(cea.utilities.jit.is_enabled())
+        self.assertIs(cea.utilities.jit.jit(kernel), kernel)
+        self.assertIn('pure python', cea.utilities.jit.get_backend())
+
+    def test_configure(self):
+        """The environment variable takes precedence over the configuration"""
+        cea.utilities.jit.configure(False)
+        self.assertFalse(cea.utilities.jit.is_enabled())
+        os.environ[cea.utilities.jit.JIT_ENVIRONMENT_VARIABLE] = '1'
+        cea.utilities.jit.configure(False)
+        self.assertEqual(os.environ[cea.utilities.jit.JIT_ENVIRONMENT_VARIABLE], '1')
+
+    @unittest.skipIf(cea.utilities.jit.numba is None, 'numba is not installed')
+    def test_compiled(self):
+        compiled = cea.utilities.jit.jit(kernel)
+        self.assertIs(compiled.py_func, kernel)
+        self.assertEqual(compiled(1.0, 4.0), 0.25)
+        # divisions by zero behave like numpy floats
+        self.assertEqual(compiled(1.0, 0.0), np.inf)
+
+    def test_rc_model(self):
+        """The (compiled) RC model gives the same temperatures as the python version"""
+        function = rc_model_SIA._calc_rc_model_temperatures
+        python_function = getattr(function, 'py_func', function)
+        args = (200.0, 150.0, 0.0, 500.0, 400.0, 300.0, 1000.0, 20.0, 900.0, 1200.0, 100.0, 50000.0, 0.1, 0.05, 0.02,
+                100.0, 200.0, 20.0, 18.0)
+        np.testing.assert_allclose(function(*args), python_function(*args))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Test that the network summaries of the optimization are calculated once, also when several processes need them.
+"""
+
+
+
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import pandas as pd
+
+import cea.inputlocator
+from cea.optimization.master import network_summary_cache
+
+
+def calc_network_summary(calls_file, barcode):
+    """network summary that records each call and takes some time to calculate"""
+    with open(calls_file, 'a') as fp:
+        fp.write(barcode + '\n')
+    time.sleep(0.5)
+    return pd.DataFrame({'Q_DHNf_W': [float(int(barcode, 2))] * 3})
+
+
+def get_network_summary(scenario, barcode):
+    locator = cea.inputlocator.InputLocator(scenario=scenario)
+    calls_file = os.path.join(scenario, 'calls.txt')
+    summary = network_summary_cache.get_network_summary(locator, 'DH', barcode, calc_network_summary, calls_file,
+                                                        barcode)
+    return summary['Q_DHNf_W'].max()
+
+
+class TestNetworkSummaryCache(unittest.TestCase):
+    def setUp(self):
+        self.scenario = tempfile.mkdtemp()
+        self.calls_file = os.path.join(self.scenario, 'calls.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.scenario)
+
+    def read_calls(self):
+        with open(self.calls_file, 'r') as fp:
+            return sorted(fp.read().split())
+
+    def test_calculated_once_per_barcode(self):
+        barcodes = ['101', '110', '101', '101', '110', '101']
+        pool = multiprocessing.Pool(processes=4)
+        try:
+            results = pool.starmap(get_network_summary, [(self.scenario, barcode) for barcode in barcodes])
+        finally:
+            pool.close()
+            pool.join()
+        self.assertEqual(results, [5.0, 6.0, 5.0, 5.0, 6.0, 5.0])
+        self.assertEqual(self.read_calls(), ['101', '110'])
+        self.assertEqual([f for f in os.listdir(os.path.join(self.scenario, 'outputs', 'data', 'optimization',
+                                                             'network')) if not f.endswith('.pickle')], [])
+
+    def test_memory_cache(self):
+        self.assertEqual(get_network_summary(self.scenario, '11'), 3.0)
+        self.assertEqual(get_network_summary(self.scenario, '11'), 3.0)
+        self.assertEqual(self.read_calls(), ['11'])
+
+        # results deleted by the pre-processing of a new run are calculated again
+        shutil.rmtree(os.path.join(self.scenario, 'outputs', 'data', 'optimization', 'network'))
+        self.assertEqual(get_network_summary(self.scenario, '11'), 3.0)
+        self.assertEqual(self.read_calls(), ['11', '11'])
+
+
+if __name__ == "__main__":
+    unittest.main()
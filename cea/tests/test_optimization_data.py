@@ -0,0 +1,93 @@
+"""
+Test the in-memory data context of the evaluation of the individuals of the optimization.
+"""
+
+
+
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import cea.inputlocator
+from cea.demand.demand_writers import get_demand_results_path
+from cea.optimization.optimization_data import OptimizationData
+
+
+class TestOptimizationData(unittest.TestCase):
+    def setUp(self):
+        self.scenario = tempfile.mkdtemp()
+        self.locator = cea.inputlocator.InputLocator(scenario=self.scenario)
+        pd.DataFrame({'Name': ['B1000'] * 3,
+                      'E_cs_kWh': [1.0, 2.0, 3.0],
+                      'NG_hs_kWh': [0.0, 1.5, 0.0]}).to_csv(self.locator.get_demand_results_file('B1000'), index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.scenario)
+        OptimizationData.data_contexts.pop(self.scenario, None)
+
+    def test_for_locator(self):
+        optimization_data = OptimizationData.for_locator(self.locator)
+        self.assertIs(optimization_data, OptimizationData.for_locator(cea.inputlocator.InputLocator(self.scenario)))
+
+    def test_demand(self):
+        optimization_data = OptimizationData.for_locator(self.locator)
+        demand = optimization_data.demand('B1000', ['E_cs_kWh'])
+        np.testing.assert_array_equal(demand['E_cs_kWh'], [1.0, 2.0, 3.0])
+        self.assertEqual(list(demand.keys()), ['E_cs_kWh'])
+        self.assertIs(optimization_data.demand('B1000', ['E_cs_kWh', 'NG_hs_kWh'])['E_cs_kWh'], demand['E_cs_kWh'])
+        with self.assertRaises(ValueError):
+            demand['E_cs_kWh'][0] = 0.0
+
+        # the results are read again, if the demand is calculated again
+        time.sleep(0.01)
+        pd.DataFrame({'Name': ['B1000'] * 3,
+                      'E_cs_kWh': [4.0, 5.0, 6.0]}).to_csv(self.locator.get_demand_results_file('B1000'), index=False)
+        np.testing.assert_array_equal(optimization_data.demand('B1000', ['E_cs_kWh'])['E_cs_kWh'], [4.0, 5.0, 6.0])
+
+    def test_demand_results_store(self):
+        """The file with the results of a building is looked up again only if the demand results store changed"""
+        optimization_data = OptimizationData.for_locator(self.locator)
+        with mock.patch('cea.optimization.optimization_data.get_demand_results_path',
+                        side_effect=get_demand_results_path) as lookup:
+            for _ in range(3):
+                np.testing.assert_array_equal(optimization_data.demand('B1000', ['E_cs_kWh'])['E_cs_kWh'],
+                                              [1.0, 2.0, 3.0])
+            self.assertEqual(lookup.call_count, 1)
+
+            # the demand of the building is calculated again with the hdf5 format
+            time.sleep(0.01)
+            self.locator.get_demand_results_store.write(pd.DataFrame({'E_cs_kWh': [7.0, 8.0, 9.0]}), key='B1000')
+            for _ in range(3):
+                np.testing.assert_array_equal(optimization_data.demand('B1000', ['E_cs_kWh'])['E_cs_kWh'],
+                                              [7.0, 8.0, 9.0])
+            self.assertEqual(lookup.call_count, 2)
+
+    def test_solar_results(self):
+        path = self.locator.PV_results('B1000')
+        pd.DataFrame({'E_PV_gen_kWh': [1.0, np.nan], 'Area_PV_m2': [10.0, 10.0]}).to_csv(path, index=False)
+        optimization_data = OptimizationData.for_locator(self.locator)
+        np.testing.assert_array_equal(optimization_data.solar_results(path, ['E_PV_gen_kWh'])['E_PV_gen_kWh'],
+                                      [1.0, 0.0])
+        self.assertTrue(np.isnan(optimization_data.csv_columns(path, ['E_PV_gen_kWh'])['E_PV_gen_kWh'][1]))
+
+    def test_substation_peak_load_and_best_configuration(self):
+        path = os.path.join(self.scenario, 'substation.csv')
+        pd.DataFrame({'Q_dhw_W': [1.0, 5.0, 2.0], 'Q_heating_W': [7.0, 0.0, 4.0]}).to_csv(path, index=False)
+        optimization_data = OptimizationData.for_locator(self.locator)
+        self.assertEqual(optimization_data.substation_peak_load(path, ['Q_dhw_W', 'Q_heating_W']), 8.0)
+        self.assertEqual(optimization_data.substation_peak_load(path, ['Q_dhw_W']), 5.0)
+
+        path = os.path.join(self.scenario, 'decentralized.csv')
+        pd.DataFrame({'Best configuration': [0, 1], 'TAC_USD': [10.0, 5.0]}).to_csv(path, index=False)
+        self.assertEqual(optimization_data.best_decentralized_configuration(path)['TAC_USD'].iloc[0], 5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Test cea/utilities/parallel.py
+"""
+
+
+
+
+import unittest
+
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from cea.utilities.parallel import vectorize, broadcast, stream
+
+
+def summarize_weather(hour, weather_data, factor):
+    """a module level function (so it can be pickled) using a broadcast DataFrame"""
+    return weather_data['drybulb_C'].values[hour] * factor, weather_data['name'][hour], weather_data.shape
+
+
+def write_to_weather(hour, weather_data):
+    weather_data['drybulb_C'].values[hour] = 0.0
+
+
+class TestParallel(unittest.TestCase):
+    def setUp(self):
+        self.weather_data = pd.DataFrame({'drybulb_C': np.linspace(-5.0, 30.0, 24),
+                                          'date': pd.date_range('2020-01-01', periods=24, freq='H'),
+                                          'name': ['hour %i' % h for h in range(24)]})
+        self.hours = list(range(24))
+        self.expected = [summarize_weather(h, self.weather_data, 2) for h in self.hours]
+
+    def test_broadcast_single_process(self):
+        result = vectorize(summarize_weather, processes=1)(self.hours, broadcast(self.weather_data), broadcast(2))
+        self.assertEqual(result, self.expected)
+
+    def test_broadcast_multiprocessing(self):
+        result = vectorize(summarize_weather, processes=2)(self.hours, broadcast(self.weather_data), [2] * 24)
+        self.assertEqual(result, self.expected)
+
+    def test_broadcast_is_not_modified(self):
+        weather_data = self.weather_data.copy()
+        vectorize(write_to_weather, processes=2)(self.hours, broadcast(self.weather_data))
+        assert_frame_equal(weather_data, self.weather_data)
+
+    def test_broadcast_only(self):
+        with self.assertRaises(ValueError):
+            vectorize(summarize_weather, processes=1)(broadcast(0), broadcast(self.weather_data), broadcast(2))
+
+    def test_stream(self):
+        for processes in (1, 2):
+            completed = []
+            results = stream(summarize_weather, processes=processes,
+                             on_complete=lambda i, n, args, result: completed.append((i, args[0])))(
+                self.hours, broadcast(self.weather_data), broadcast(2))
+            results = dict(results)
+            self.assertEqual([results[h] for h in self.hours], self.expected)
+            self.assertEqual(sorted(i for i, _ in completed), self.hours)
+            self.assertEqual(sorted(hour for _, hour in completed), self.hours)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+Compare the (group x hour) array functions of the PV model to the scalar functions they replace, which the PV script
+used to call with ``np.vectorize`` for each group of sensors.
+"""
+
+
+
+
+import unittest
+
+import numpy as np
+
+from cea.technologies.solar import photovoltaic
+from cea.utilities import solar_equations
+
+# a monocrystalline module (air mass coefficients, thickness of the glazing and nominal operating cell temperature)
+PANEL_PROPERTIES_PV = {'PV_a0': 0.935823, 'PV_a1': 0.054289, 'PV_a2': -0.008677, 'PV_a3': 0.000527,
+                       'PV_a4': -0.000011, 'PV_th': 0.002, 'PV_noct': 45.0}
+
+
+class TestPhotovoltaicArrays(unittest.TestCase):
+    def setUp(self):
+        random = np.random.RandomState(42)
+        hours = 240
+        self.lat = np.radians(47.4)
+        self.g = np.radians(random.uniform(-23.45, 23.45, hours))  # declination
+        self.ha = np.radians(random.uniform(-180.0, 180.0, hours))  # hour angle
+        # zenith angles of the sun above, close to and below the horizon (and the invalid values the model clips)
+        self.Sz = np.radians(np.concatenate([random.uniform(0.0, 85.0, hours - 40), random.uniform(85.0, 90.0, 20),
+                                             random.uniform(90.0, 100.0, 10), random.uniform(-10.0, 0.0, 10)]))
+        # groups of panels: flat, tilted roofs and walls in all directions (as (group x 1) arrays)
+        self.tilt = np.radians([[0.0], [15.0], [30.0], [45.0], [90.0], [90.0]])
+        self.teta_z = np.radians([[0.0], [180.0], [135.0], [225.0], [90.0], [0.0]])
+        self.I_direct = random.uniform(0.0, 800.0, (len(self.tilt), hours))
+        self.I_diffuse = random.uniform(0.0, 300.0, (len(self.tilt), hours))
+        self.I_sol = self.I_direct + self.I_diffuse
+
+    def test_calc_angle_of_incidence(self):
+        expected = np.vectorize(solar_equations.calc_angle_of_incidence)(self.g, self.lat, self.ha, self.tilt,
+                                                                         self.teta_z)
+        actual = solar_equations.calc_angle_of_incidence_array(self.g, self.lat, self.ha, self.tilt, self.teta_z)
+        self.assertEqual(actual.shape, (len(self.tilt), len(self.g)))
+        np.testing.assert_allclose(actual, expected, rtol=1e-12)
+        # angles of incidence behind the panels are part of the test
+        self.assertTrue((actual > np.radians(90)).any())
+
+    def test_calc_absorbed_radiation_PV(self):
+        teta = solar_equations.calc_angle_of_incidence_array(self.g, self.lat, self.ha, self.tilt, self.teta_z)
+        teta_ed, teta_eg = photovoltaic.calc_diffuseground_comp(self.tilt)
+
+        expected = np.vectorize(photovoltaic.calc_absorbed_radiation_PV, excluded=['panel_properties_PV'])(
+            self.I_sol, self.I_direct, self.I_diffuse, self.tilt, self.Sz, teta, teta_ed, teta_eg,
+            panel_properties_PV=PANEL_PROPERTIES_PV)
+        actual = photovoltaic.calc_absorbed_radiation_PV_array(self.I_sol, self.I_direct, self.I_diffuse, self.tilt,
+                                                               self.Sz, teta, teta_ed, teta_eg, PANEL_PROPERTIES_PV)
+        self.assertEqual(actual.shape, expected.shape)
+        np.testing.assert_allclose(actual, expected, rtol=1e-10, atol=1e-9)
+        self.assertTrue((actual > 0.0).any() and (actual == 0.0).any())
+
+
+if __name__ == "__main__":
+    unittest.main()
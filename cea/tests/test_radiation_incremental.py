@@ -0,0 +1,106 @@
+"""
+Test the fingerprints of the incremental radiation simulation: which buildings are generated and simulated again
+after a change of the inputs.
+"""
+
+
+
+
+import os
+import shutil
+import tempfile
+import types
+import unittest
+
+import geopandas as gpd
+import pandas as pd
+from shapely.geometry import box
+
+from cea.resources.radiation_daysim import incremental
+
+
+class TestIncrementalRadiation(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.terrain_path = os.path.join(self.folder, 'terrain.tif')
+        self.weather_path = os.path.join(self.folder, 'weather.epw')
+        for path in [self.terrain_path, self.weather_path]:
+            with open(path, 'w') as f:
+                f.write(os.path.basename(path))
+        self.settings = types.SimpleNamespace(zone_geometry=2, surrounding_geometry=5, consider_intersections=True,
+                                              shading_radius=30.0, **{parameter: 1 for parameter in
+                                                                      incremental.SIMULATION_PARAMETERS})
+        # B1000 and B1001 are 0.5 m apart, S1 is within the shading radius of both, B1002 and S2 are far away
+        self.zone_df = gpd.GeoDataFrame({'Name': ['B1000', 'B1001', 'B1002'], 'height_ag': [10.0, 10.0, 10.0],
+                                         'floors_ag': [3, 3, 3]},
+                                        geometry=[box(0.0, 0.0, 10.0, 10.0), box(10.5, 0.0, 20.0, 10.0),
+                                                  box(100.0, 0.0, 110.0, 10.0)])
+        self.surroundings_df = gpd.GeoDataFrame({'Name': ['S1', 'S2'], 'height_ag': [10.0, 10.0],
+                                                 'floors_ag': [3, 3]},
+                                                geometry=[box(30.0, 0.0, 40.0, 10.0), box(200.0, 0.0, 210.0, 10.0)])
+        self.architecture_df = pd.DataFrame({'Name': ['B1000', 'B1001', 'B1002'],
+                                             **{column: [0.3] * 3 for column in incremental.WWR_COLUMNS}}
+                                            ).set_index('Name')
+        self.materials_df = pd.DataFrame({'Name': ['B1000', 'B1001', 'B1002'], 'G_win': [0.5] * 3}).set_index('Name')
+        self.geometry_fingerprints, self.simulation_fingerprints = self.calc_fingerprints()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def calc_fingerprints(self):
+        geometry_fingerprints, zone_footprints, surroundings_footprints = incremental.calc_geometry_fingerprints(
+            self.zone_df, self.surroundings_df, self.architecture_df, self.terrain_path, self.settings)
+        simulation_fingerprints = incremental.calc_simulation_fingerprints(
+            geometry_fingerprints, zone_footprints, surroundings_footprints, self.materials_df, self.weather_path,
+            self.settings)
+        return geometry_fingerprints, simulation_fingerprints
+
+    def assert_changed(self, geometry_changed, simulation_changed):
+        """Check the buildings whose geometry and radiation are calculated again after a change of the inputs"""
+        geometry_fingerprints, simulation_fingerprints = self.calc_fingerprints()
+        self.assertEqual(incremental.find_changed_buildings(geometry_fingerprints, self.geometry_fingerprints,
+                                                           lambda name: []), geometry_changed)
+        self.assertEqual(incremental.find_changed_buildings(simulation_fingerprints, self.simulation_fingerprints,
+                                                           lambda name: []), simulation_changed)
+
+    def test_unchanged(self):
+        self.assert_changed([], [])
+
+    def test_height_changed(self):
+        self.zone_df.loc[0, 'height_ag'] = 12.0
+        self.assert_changed(['B1000', 'B1001'], ['B1000', 'B1001'])
+
+    def test_window_to_wall_ratio_changed(self):
+        self.architecture_df.loc['B1002', 'wwr_south'] = 0.5
+        self.assert_changed(['B1002'], ['B1002'])
+
+    def test_neighbour_within_shading_radius_changed(self):
+        self.surroundings_df.loc[0, 'height_ag'] = 20.0
+        self.assert_changed(['S1'], ['B1000', 'B1001'])
+
+    def test_neighbour_outside_shading_radius_changed(self):
+        self.surroundings_df.loc[1, 'height_ag'] = 20.0
+        self.assert_changed(['S2'], [])
+
+    def test_surrounding_building_removed(self):
+        self.surroundings_df = self.surroundings_df.iloc[1:]
+        self.assert_changed([], ['B1000', 'B1001'])
+
+    def test_missing_results(self):
+        fingerprints_path = os.path.join(self.folder, 'radiation', 'fingerprints.csv')
+        incremental.write_fingerprints(fingerprints_path, self.simulation_fingerprints)
+        self.assertEqual(incremental.read_fingerprints(fingerprints_path), self.simulation_fingerprints)
+
+        result_paths = {name: os.path.join(self.folder, '%s_radiation.csv' % name) for name in ['B1000', 'B1002']}
+        for path in result_paths.values():
+            with open(path, 'w') as f:
+                f.write('results')
+        changed_buildings = incremental.find_changed_buildings(
+            self.simulation_fingerprints, incremental.read_fingerprints(fingerprints_path),
+            lambda name: [result_paths.get(name, os.path.join(self.folder, 'missing.csv'))])
+        self.assertEqual(changed_buildings, ['B1001'])
+        self.assertEqual(incremental.read_fingerprints(os.path.join(self.folder, 'missing.csv')), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,12 +9,14 @@ import json
 import os
 import unittest
 
+import numpy as np
 import pandas as pd
 
 import cea.config
 from cea.datamanagement.archetypes_mapper import calculate_average_multiuse
 from cea.demand.building_properties import BuildingProperties
-from cea.demand.schedule_maker.schedule_maker import schedule_maker_main
+from cea.demand.schedule_maker.schedule_maker import schedule_maker_main, calc_stochastic_occupancy, \
+    get_yearly_schedule_indices, get_yearly_vectors
 from cea.inputlocator import ReferenceCaseOpenLocator
 from cea.utilities import epwreader
 
@@ -76,6 +78,35 @@ class TestScheduleCreation(unittest.TestCase):
                                                                                        reference_results[schedule]))
 
 
+class TestYearlySchedules(unittest.TestCase):
+    def setUp(self):
+        self.schedule_indices = get_yearly_schedule_indices(pd.date_range('2005-01-01', periods=8760, freq='H'))
+        self.daily_schedule = np.concatenate([np.linspace(0.0, 0.9, 24), np.full(24, 0.5), np.zeros(24)])
+
+    def test_get_yearly_vectors(self):
+        monthly_multiplier = np.linspace(0.5, 1.0, 12)
+        yearly_array = get_yearly_vectors(self.schedule_indices, 3, self.daily_schedule, monthly_multiplier)
+        # 2005-01-01 is a saturday, 2005-01-03 a monday
+        self.assertAlmostEqual(yearly_array[10], 0.5 * 0.5)
+        self.assertAlmostEqual(yearly_array[24 + 10], 0.0)
+        self.assertAlmostEqual(yearly_array[48 + 10], 0.9 * 10 / 23 * 0.5)
+        self.assertAlmostEqual(yearly_array[8759], 0.5 * 1.0)
+
+        yearly_array = get_yearly_vectors(self.schedule_indices, 3, self.daily_schedule, monthly_multiplier,
+                                          normalize_first_daily_profile=True)
+        self.assertAlmostEqual(yearly_array[:24].sum(), 0.5)
+        self.assertAlmostEqual(yearly_array[24:48].sum(), 0.0)
+
+    def test_stochastic_occupancy_is_reproducible(self):
+        yearly_array = get_yearly_vectors(self.schedule_indices, 3, self.daily_schedule, np.ones(12))
+        occupancy = calc_stochastic_occupancy(yearly_array, 50, np.random.default_rng(42))
+        np.testing.assert_array_equal(occupancy, calc_stochastic_occupancy(yearly_array, 50,
+                                                                           np.random.default_rng(42)))
+        self.assertTrue(((occupancy >= 0) & (occupancy <= 50)).all())
+        # on average, the stochastic model follows the deterministic schedule
+        self.assertAlmostEqual(occupancy.mean() / 50, yearly_array.mean(), delta=0.02)
+
+
 def get_test_config_path():
     """return the path to the test data configuration file (``cea/tests/test_schedules.config``)"""
     return os.path.join(os.path.dirname(__file__), 'test_schedules.config')
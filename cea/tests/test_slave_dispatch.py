@@ -0,0 +1,155 @@
+"""
+Test the dispatch of the supply units of the slave routines of the optimization, which runs on arrays of all hours at
+once, against the dispatch of one hour at a time: the expected results of the electricity and heating dispatch (in
+``cea/tests/test_slave_dispatch.config``) were recorded with the hourly dispatch on the same (random) inputs.
+"""
+
+
+
+
+import configparser
+import json
+import os
+import types
+import unittest
+
+import numpy as np
+
+import cea.optimization.slave.cooling_resource_activation as cooling_resource_activation
+from cea.optimization.slave.daily_storage.load_leveling import LoadLevelingDailyStorage
+from cea.optimization.slave.electricity_main import electricity_activation_curve
+from cea.optimization.slave.heating_resource_activation import heating_source_activator
+from cea.technologies.cogeneration import calc_cop_CCGT
+
+NUMBER_OF_HOURS = 48
+
+
+class TestSlaveDispatch(unittest.TestCase):
+    def setUp(self):
+        self.random = np.random.RandomState(42)
+
+    def random_load(self, peak_W):
+        """hourly load with hours without load"""
+        return np.where(self.random.rand(NUMBER_OF_HOURS) < 0.1, 0.0, self.random.rand(NUMBER_OF_HOURS) * peak_W)
+
+    def assert_outputs_equal(self, outputs, section, option):
+        config = configparser.ConfigParser()
+        config.read(get_test_config_path())
+        reference_results = json.loads(config.get(section, option))
+        self.assertEqual(len(outputs), len(reference_results))
+        for output, reference_result in zip(outputs, reference_results):
+            np.testing.assert_allclose(output, reference_result, rtol=1e-8, atol=1e-6)
+
+    def test_electricity_activation_curve(self):
+        E_req_W = self.random_load(2e6)
+        E_gen_W = [self.random_load(1e6) for _ in range(6)]
+        outputs = electricity_activation_curve(*(E_gen_W + [E_req_W]))
+        self.assert_outputs_equal(outputs, 'test_electricity_activation_curve', 'expected_results')
+
+    def test_heating_source_activator(self):
+        T_supply_K = self.random.choice([343.0, 353.0, 363.0], NUMBER_OF_HOURS)
+        T_return_K = np.where(self.random.rand(NUMBER_OF_HOURS) < 0.05, T_supply_K,
+                              T_supply_K - 10.0 - 20.0 * self.random.rand(NUMBER_OF_HOURS))
+        args = [self.random_load(8e6),
+                None,
+                self.random_load(5e5),  # ground
+                280.0 + 5.0 * self.random.rand(NUMBER_OF_HOURS),
+                278.0 + 5.0 * self.random.rand(NUMBER_OF_HOURS),
+                self.random_load(5e5),  # lake
+                self.random_load(5e5),  # sewage
+                285.0 + 5.0 * self.random.rand(NUMBER_OF_HOURS),
+                T_supply_K,
+                T_return_K]
+        for units_on in [1, 0]:
+            master_to_slave_vars = types.SimpleNamespace(CC_on=1, CCGT_SIZE_W=2e6,
+                                                         Furnace_wet_on=units_on, WBFurnace_Q_max_W=3e5,
+                                                         Furnace_dry_on=units_on, DBFurnace_Q_max_W=3e5,
+                                                         HPSew_on=1, HPLake_on=units_on, GHP_on=1,
+                                                         Boiler_on=1, Boiler_Q_max_W=1e6,
+                                                         BoilerPeak_on=units_on, BoilerPeak_Q_max_W=1e6)
+            args[1] = master_to_slave_vars
+            outputs = heating_source_activator(*args)
+            self.assert_outputs_equal(outputs, 'test_heating_source_activator',
+                                      'expected_results_units_on_%i' % units_on)
+
+    def test_cooling_resource_dispatch(self):
+        # simple models of the chillers, so the test runs without the database of the technologies
+        models = {'calc_chiller_absorption_operation': lambda Q_W, T_re_K, T_sup_K, T_in_C, T_ground_K, chiller, size_W: (
+                      1.7 * Q_W, 1.4 * Q_W * T_ground_K / 290.0, 0.05 * Q_W),
+                  'calc_vcc_operation': lambda Q_W, T_re_K, T_sup_K, T_source_K, size_W, chiller: (
+                      np.minimum(Q_W, size_W), Q_W * (T_source_K - T_sup_K + 5.0) / 50.0),
+                  'calc_vcc_CT_operation': lambda Q_W, T_re_K, T_sup_K, T_source_K, size_W, chiller: (
+                      Q_W, Q_W / 4.0 + 0.01 * size_W),
+                  'calc_water_body_uptake_pumping': lambda Q_W, T_re_K, T_sup_K: 0.02 * Q_W}
+        originals = {name: getattr(cooling_resource_activation, name) for name in models}
+        for name, model in models.items():
+            setattr(cooling_resource_activation, name, model)
+        try:
+            self.check_cooling_resource_dispatch()
+        finally:
+            for name, model in originals.items():
+                setattr(cooling_resource_activation, name, model)
+
+    def check_cooling_resource_dispatch(self):
+        T_supply_K = self.random.choice([279.0, 281.0], NUMBER_OF_HOURS)
+        T_return_K = np.where(self.random.rand(NUMBER_OF_HOURS) < 0.05, T_supply_K,
+                              T_supply_K + 5.0 + 5.0 * self.random.rand(NUMBER_OF_HOURS))
+        Q_thermal_req_W = self.random_load(6e6)
+        Q_therm_Lake_W = self.random_load(2e6)
+        T_source_average_Lake_K = 272.0 + 12.0 * self.random.rand(NUMBER_OF_HOURS)
+        T_ground_K = 285.0 + 5.0 * self.random.rand(NUMBER_OF_HOURS)
+        CCGT_operation_data = calc_cop_CCGT(3e6, 363.0, "NG")
+
+        for units_on in [1, 0]:
+            master_to_slave_variables = types.SimpleNamespace(NG_Trigen_on=1, NG_Trigen_ACH_size_W=1.5e6,
+                                                              WS_BaseVCC_on=1, WS_BaseVCC_size_W=1e6,
+                                                              WS_PeakVCC_on=units_on, WS_PeakVCC_size_W=1e6,
+                                                              AS_BaseVCC_on=1, AS_BaseVCC_size_W=1e6,
+                                                              AS_PeakVCC_on=units_on, AS_PeakVCC_size_W=1e6)
+            outputs = cooling_resource_activation.cooling_resource_dispatch(Q_thermal_req_W,
+                                                                            T_supply_K,
+                                                                            T_return_K,
+                                                                            Q_therm_Lake_W,
+                                                                            T_source_average_Lake_K,
+                                                                            T_ground_K,
+                                                                            master_to_slave_variables,
+                                                                            None,
+                                                                            CCGT_operation_data,
+                                                                            None)
+
+            daily_storage = LoadLevelingDailyStorage(False, 0.0, 280.0, 290.0, 290.0, 285.0)
+            outputs_per_hour = [{key: np.zeros(NUMBER_OF_HOURS) for key in output} for output in outputs]
+            for hour in range(NUMBER_OF_HOURS):
+                if Q_thermal_req_W[hour] > 0.0:
+                    daily_storage, \
+                    thermal_output, \
+                    electricity_output, \
+                    gas_output = cooling_resource_activation.cooling_resource_activator(Q_thermal_req_W[hour],
+                                                                                        T_supply_K[hour],
+                                                                                        T_return_K[hour],
+                                                                                        Q_therm_Lake_W[hour],
+                                                                                        T_source_average_Lake_K[hour],
+                                                                                        daily_storage,
+                                                                                        T_ground_K[hour],
+                                                                                        master_to_slave_variables,
+                                                                                        None,
+                                                                                        CCGT_operation_data,
+                                                                                        None)
+                    for output_per_hour, output in zip(outputs_per_hour,
+                                                       [thermal_output, electricity_output, gas_output]):
+                        for key, value in output.items():
+                            output_per_hour[key][hour] = value
+
+            for output, output_per_hour in zip(outputs, outputs_per_hour):
+                self.assertEqual(sorted(output.keys()), sorted(output_per_hour.keys()))
+                for key in output:
+                    np.testing.assert_allclose(output[key], output_per_hour[key], rtol=1e-9, atol=1e-6, err_msg=key)
+
+
+def get_test_config_path():
+    """return the path to the test data configuration file (``cea/tests/test_slave_dispatch.config``)"""
+    return os.path.join(os.path.dirname(__file__), 'test_slave_dispatch.config')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Test the heat balance of the fully mixed storage tanks (cea/technologies/storage_tank.py) against the numerical
+solution of the tank ODEs with odeint.
+"""
+
+
+
+
+import unittest
+
+import numpy as np
+from scipy.integrate import odeint
+
+import cea.technologies.storage_tank as storage_tank
+from cea.demand.constants import TWW_SETPOINT
+
+
+def calc_tank_temperature_odeint(T_start_C, q_loss_W, q_discharged_W, q_charged_W, V_tank_m3, tank_type):
+    ode = storage_tank.ode_hot_water_tank if tank_type == 'hot_water' else storage_tank.ode_cold_water_tank
+    y = odeint(ode, T_start_C, np.linspace(0, 1, 2), args=(q_loss_W, q_discharged_W, q_charged_W, V_tank_m3))
+    return y[1][0]
+
+
+class TestStorageTank(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(42)
+        hours = 24 * 14
+        self.T_ext_C = 10.0 + 10.0 * np.sin(np.arange(hours) * 2 * np.pi / 24)
+        self.T_int_C = np.full(hours, 21.0)
+        # hot water is drawn in about half of the hours
+        self.q_discharged_W = np.where(np.random.rand(hours) > 0.5, np.random.rand(hours) * 2000.0, 0.0)
+        self.V_tank_m3 = 0.05
+        self.area_tank_surface_m2 = storage_tank.calc_tank_surface_area(self.V_tank_m3)
+
+    def test_calc_tank_temperature(self):
+        for tank_type in ['hot_water', 'cold_water']:
+            for q_loss_W, q_discharged_W, q_charged_W in [(10.0, 500.0, 0.0), (5.0, 0.0, 800.0), (2.0, 0.0, 0.0)]:
+                self.assertAlmostEqual(
+                    storage_tank.calc_tank_temperature(50.0, q_loss_W, q_discharged_W, q_charged_W, 0.1, tank_type),
+                    calc_tank_temperature_odeint(50.0, q_loss_W, q_discharged_W, q_charged_W, 0.1, tank_type),
+                    places=6)
+        self.assertEqual(storage_tank.calc_tank_temperature(50.0, 10.0, 500.0, 0.0, 0.0, 'hot_water'), 50.0)
+
+    def test_calc_dhw_tank(self):
+        """The whole series at once gives the same results as the heat balance and odeint hour by hour"""
+        hours = len(self.q_discharged_W)
+        expected_T_tank_C = np.zeros(hours)
+        expected_q_loss_W = np.zeros(hours)
+        expected_q_charged_W = np.zeros(hours)
+        T_tank_start_C = TWW_SETPOINT
+        for k in range(hours):
+            expected_q_loss_W[k], q_discharged_W, expected_q_charged_W[k] = storage_tank.calc_dhw_tank_heat_balance(
+                self.T_int_C[k], self.T_ext_C[k], T_tank_start_C, self.V_tank_m3, self.q_discharged_W[k],
+                self.area_tank_surface_m2)
+            expected_T_tank_C[k] = calc_tank_temperature_odeint(T_tank_start_C, expected_q_loss_W[k], q_discharged_W,
+                                                                expected_q_charged_W[k], self.V_tank_m3, 'hot_water')
+            T_tank_start_C = expected_T_tank_C[k]
+
+        T_tank_C, q_loss_W, q_charged_W = storage_tank.calc_dhw_tank(self.T_int_C, self.T_ext_C, self.q_discharged_W,
+                                                                      self.V_tank_m3, self.area_tank_surface_m2)
+        np.testing.assert_allclose(T_tank_C, expected_T_tank_C, rtol=1e-6)
+        np.testing.assert_allclose(q_loss_W, expected_q_loss_W, rtol=1e-6)
+        np.testing.assert_allclose(q_charged_W, expected_q_charged_W, rtol=1e-6, atol=1e-6)
+        # the tank cools down in the hours without discharge
+        self.assertTrue(np.all(T_tank_C[self.q_discharged_W <= 0] < TWW_SETPOINT))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,10 +7,32 @@ Test cea.technologies
 
 import unittest
 import numpy as np
+import pandas as pd
 import configparser
 import json
 import os
 from cea.technologies.cooling_tower import calc_CT_partload_factor, calc_CT
+from cea.technologies.boiler import calc_Cop_boiler, cond_boiler_op_cost
+from cea.technologies.chiller_vapor_compression import VaporCompressionChiller, calc_VCC, calc_averaged_PLF
+from cea.technologies.chiller_absorption import AbsorptionChiller, calc_chiller_main
+from cea.technologies.direct_expansion_units import calc_DX
+
+# the properties of the chillers in the database of the technologies (cea/databases/CH/components/CONVERSION.xls)
+CHILLER_CONFIGURATION = pd.DataFrame(
+    [{'SOURCE': 'WATER', 'COMPRESSOR': 'SCREW', 'plf_a': 0.33018833, 'plf_b': 0.23554291, 'plf_c': 0.46070828,
+      'q_a': 0.33269598, 'q_b': 0.00729116, 'q_c': -0.00049938, 'q_d': 0.01598983, 'q_e': -0.00028254,
+      'q_f': 0.00052346},
+     {'SOURCE': 'WATER', 'COMPRESSOR': 'CENTRIFUGAL', 'plf_a': 0.17149273, 'plf_b': 0.58820208, 'plf_c': 0.23737257,
+      'q_a': -0.29861976, 'q_b': 0.02996076, 'q_c': -0.00080125, 'q_d': 0.01736268, 'q_e': -0.00032606,
+      'q_f': 0.00063139}])
+ABSORPTION_CHILLERS = pd.DataFrame(
+    [['ACH1', 'single', 0, 51150, 0.42, 0.9, 0.53, -2.5, -2.5, 1.8, -2.1, 1.5, 0.722, 0.333],
+     ['ACH2', 'single', 51150, 1176000, 68.12, -3281.1, 88.05, -4216.1, -1.45, 1.75, -1.45, 1.75, 81.0, 33.0],
+     ['ACH3', 'double', 0, 58150, 0.42, 0.9, 0.53, -2.5, -2.5, 1.8, -2.1, 1.5, 0.722, 0.333],
+     ['ACH4', 'double', 58150, 1337450, 18.1, -1350.5, 12.54, -917.3, -2.46, 4.38, -2.46, 4.38, 68.0, 14.0],
+     ['ACH4', 'double', 1337450, 10000000000, 18.1, -1350.5, 12.54, -917.3, -2.46, 4.38, -2.46, 4.38, 68.0, 14.0]],
+    columns=['code', 'type', 'cap_min', 'cap_max', 's_e', 'r_e', 's_g', 'r_g', 'a_e', 'e_e', 'a_g', 'e_g', 'm_cw',
+             'm_hw'])
 
 
 class TestCoolingTower(unittest.TestCase):
@@ -31,6 +53,107 @@ class TestCoolingTower(unittest.TestCase):
         reference_results = json.loads(config.get('test_calc_CT', 'expected_results'))
         np.testing.assert_allclose(el_W, reference_results)
 
+    def test_calc_CT_array(self):
+        """The cooling tower model takes the arrays of all hours"""
+        q_hot_Wh = np.arange(0.0, 1E6, 1E5)
+        config = configparser.ConfigParser()
+        config.read(get_test_config_path())
+        reference_results = json.loads(config.get('test_calc_CT', 'expected_results'))
+        np.testing.assert_allclose(calc_CT(q_hot_Wh, max(q_hot_Wh)), reference_results)
+
+
+class TestBoiler(unittest.TestCase):
+    def test_boiler_array(self):
+        """The boiler models take the arrays of all hours and calculate the same as hour by hour"""
+        q_load_Wh = np.array([0.0, 1E4, 2.5E5, 5E5, 1E6, 0.0])
+        T_return_K = np.array([0.0, 303.15, 323.15, 333.15, 343.15, 353.15])
+        Q_nom_W = 1E6
+
+        boiler_eff = calc_Cop_boiler(q_load_Wh, Q_nom_W, T_return_K)
+        self.assertEqual(boiler_eff[0], 0.0)
+        np.testing.assert_allclose(boiler_eff, get_reference_results('test_calc_Cop_boiler'))
+
+        Q_primary_W, E_aux_W = cond_boiler_op_cost(q_load_Wh, Q_nom_W, T_return_K)
+        self.assertTrue(np.all(Q_primary_W >= q_load_Wh))
+        np.testing.assert_allclose([Q_primary_W, E_aux_W], get_reference_results('test_cond_boiler_op_cost'))
+
+
+class ReferenceVaporCompressionChiller(VaporCompressionChiller):
+    """The vapor compression chillers of the database, so the tests run without the database of the technologies"""
+    __slots__ = []
+
+    def setup(self):
+        if self.scale == 'DISTRICT':
+            self.max_VCC_capacity, self.min_VCC_capacity, self.g_value = 70000000, 1000000, 0.47
+        else:
+            self.max_VCC_capacity, self.min_VCC_capacity, self.g_value = 10000000000, 1, 0.4
+        self.chiller_configuration = CHILLER_CONFIGURATION
+
+
+class TestVaporCompressionChiller(unittest.TestCase):
+    """The chiller models take the arrays of all hours and calculate the same as hour by hour"""
+    # the peak loads of the different designs of chillers (number of chillers and compressor types) of each scale
+    PEAK_LOADS_W = {'BUILDING': [8E5, 1.5E6, 9E6], 'DISTRICT': [1.5E6, 9E6, 1E8]}
+
+    def setUp(self):
+        self.q_chw_load_Wh = np.array([0.0, 1E4, 2E5, 5E5, 8E5, 1.2E6, 2.5E6, 4E6, 9E6])
+        self.T_chw_sup_K = np.array([279.15, 279.15, 280.15, 281.15, 279.15, 280.15, 281.15, 279.15, 280.15])
+        self.T_chw_re_K = self.T_chw_sup_K + 6.0
+        self.T_cw_in_K = np.array([293.15, 298.15, 301.15, 303.15, 296.15, 299.15, 302.15, 304.15, 300.15])
+
+    def test_calc_averaged_PLF(self):
+        operating = self.q_chw_load_Wh > 0.0
+        for scale, peak_loads_W in self.PEAK_LOADS_W.items():
+            VCC_chiller = ReferenceVaporCompressionChiller(None, scale)
+            averaged_PLF = [calc_averaged_PLF(peak_load_W, self.q_chw_load_Wh[operating],
+                                              self.T_chw_sup_K[operating], self.T_cw_in_K[operating], VCC_chiller)
+                            for peak_load_W in peak_loads_W]
+            np.testing.assert_allclose(averaged_PLF, get_reference_results('test_calc_averaged_PLF', scale))
+
+    def test_calc_VCC(self):
+        for scale, peak_loads_W in self.PEAK_LOADS_W.items():
+            VCC_chiller = ReferenceVaporCompressionChiller(None, scale)
+            results = []
+            for peak_load_W in peak_loads_W:
+                chiller_operation = calc_VCC(peak_load_W, self.q_chw_load_Wh, self.T_chw_sup_K, self.T_chw_re_K,
+                                             self.T_cw_in_K, VCC_chiller)
+                self.assertEqual(chiller_operation['wdot_W'][0], 0.0)
+                results.append([chiller_operation['wdot_W'], chiller_operation['q_cw_W']])
+            np.testing.assert_allclose(results, get_reference_results('test_calc_VCC', scale))
+
+
+class TestAbsorptionChiller(unittest.TestCase):
+    def test_calc_chiller_main(self):
+        """The absorption chiller model takes the arrays of all hours and calculates the same as hour by hour"""
+        # loads without chiller, of one chiller of each size and of several chillers of the maximum size
+        mdot_chw_kgpers = np.array([0.0, 0.5, 2.0, 10.0, 30.0, 60.0, 120.0])
+        T_chw_sup_K = np.array([280.15, 280.15, 281.15, 279.15, 280.15, 281.15, 280.15])
+        T_chw_re_K = T_chw_sup_K + 5.0
+        T_hw_in_C = np.array([90.0, 85.0, 95.0, 90.0, 150.0, 170.0, 160.0])
+        T_ground_K = np.array([290.0, 288.0, 292.0, 291.0, 289.0, 290.0, 293.0])
+        for ACH_type in ['single', 'double']:
+            chiller_operation = calc_chiller_main(mdot_chw_kgpers, T_chw_sup_K, T_chw_re_K, T_hw_in_C, T_ground_K,
+                                                  AbsorptionChiller(ABSORPTION_CHILLERS, ACH_type))
+            np.testing.assert_allclose([chiller_operation[key] for key in ['wdot_W', 'q_cw_W', 'q_hw_W', 'q_chw_W']],
+                                       get_reference_results('test_calc_chiller_main', ACH_type))
+
+
+class TestDirectExpansion(unittest.TestCase):
+    def test_calc_DX(self):
+        """The direct expansion units take the arrays of all hours and calculate the same as hour by hour"""
+        mdot_kgpers = np.array([0.0, 0.1, 1.0, 5.0, 1E-12])
+        T_sup_K = np.array([280.15, 280.15, 282.15, 281.15, 280.15])
+        T_re_K = np.array([280.15, 285.15, 290.15, 288.15, 285.15])
+        wdot_W, q_chw_W = calc_DX(mdot_kgpers, T_sup_K, T_re_K)
+        np.testing.assert_allclose([wdot_W, q_chw_W], get_reference_results('test_calc_DX'))
+
+
+def get_reference_results(section, option='expected_results'):
+    """the reference results of a test, calculated hour by hour with the models before they took arrays of hours"""
+    config = configparser.ConfigParser()
+    config.read(get_test_config_path())
+    return json.loads(config.get(section, option))
+
 
 def get_test_config_path():
     """return the path to the test data configuration file (``cea/tests/test_schedules.config``)"""
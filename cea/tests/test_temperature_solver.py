@@ -0,0 +1,105 @@
+"""
+Test the TreeTemperatureSolver, which calculates the temperatures of thermal networks without loops in one sweep.
+"""
+
+
+
+
+import unittest
+
+import numpy as np
+
+from cea.constants import HEAT_CAPACITY_OF_WATER_JPERKGK
+from cea.technologies.thermal_network import temperature_solver
+from cea.technologies.thermal_network.temperature_solver import TreeTemperatureSolver
+from cea.technologies.thermal_network.thermal_network_loss import calc_temperature_out_per_pipe
+
+
+def edge_node_matrix(n_nodes, edges):
+    """edge-node incidence matrix (n x e) of a list of (start node, end node) edges"""
+    edge_node = np.zeros((n_nodes, len(edges)))
+    for edge, (start, end) in enumerate(edges):
+        edge_node[start, edge] = -1
+        edge_node[end, edge] = 1
+    return edge_node
+
+
+class TestTreeTemperatureSolver(unittest.TestCase):
+    def setUp(self):
+        # plant (node 2) -> 0 -> 1 and 0 -> 3, node 3 -> 4 without flow
+        self.edge_node = edge_node_matrix(5, [(0, 1), (2, 0), (0, 3), (3, 4)])
+        self.mass_flow = np.array([1.0, 3.0, 2.0, 0.0])
+        self.k = np.array([0.1, 0.2, 0.3, 0.4])
+        self.t_ground = 283.15
+        self.solver = TreeTemperatureSolver.for_network(self.edge_node, [2])
+
+    def test_networks_with_loops_or_several_plants(self):
+        self.assertIsNone(TreeTemperatureSolver.for_network(self.edge_node, [1, 2]))
+        with_loop = edge_node_matrix(4, [(0, 1), (1, 2), (2, 0)])
+        self.assertIsNone(TreeTemperatureSolver.for_network(with_loop, [0]))
+
+    def test_cache_size(self):
+        """only the solvers of the last topologies are kept, the solver of a network is reused"""
+        for n_nodes in range(2, temperature_solver.SOLVERS_CACHE_SIZE + 5):
+            chain = edge_node_matrix(n_nodes, [(node, node + 1) for node in range(n_nodes - 1)])
+            self.assertIs(TreeTemperatureSolver.for_network(chain, [0]), TreeTemperatureSolver.for_network(chain, [0]))
+        self.assertEqual(len(TreeTemperatureSolver.solvers_cache), temperature_solver.SOLVERS_CACHE_SIZE)
+
+    def test_flow_direction(self):
+        self.assertTrue(self.solver.flows_away_from_plant(self.edge_node, self.mass_flow))
+        reversed_edge = self.edge_node.copy()
+        reversed_edge[:, 0] *= -1
+        self.assertFalse(self.solver.flows_away_from_plant(reversed_edge, self.mass_flow))
+        reversed_edge = self.edge_node.copy()
+        reversed_edge[:, 3] *= -1  # no flow in this edge
+        self.assertTrue(self.solver.flows_away_from_plant(reversed_edge, self.mass_flow))
+
+    def test_supply_temperatures(self):
+        t_node, q_loss = self.solver.calc_supply_temperatures(353.15, self.mass_flow, self.k, self.t_ground, 'DH', {})
+        t_0 = calc_temperature_out_per_pipe(353.15, 3.0, 0.2, self.t_ground)
+        expected = [t_0, calc_temperature_out_per_pipe(t_0, 1.0, 0.1, self.t_ground), 353.15,
+                    calc_temperature_out_per_pipe(t_0, 2.0, 0.3, self.t_ground), np.nan]
+        np.testing.assert_allclose(t_node, expected)
+        self.assertAlmostEqual(q_loss[1], 3.0 * HEAT_CAPACITY_OF_WATER_JPERKGK / 1000 * (353.15 - t_0), places=6)
+        self.assertEqual(q_loss[3], 0.0)
+
+    def test_return_temperatures(self):
+        t_return = np.array([np.nan, 313.15, np.nan, 323.15, np.nan])
+        node_flows = np.array([0.0, 1.0, -3.0, 2.0, 0.0])
+        t_node, q_loss = self.solver.calc_return_temperatures(t_return, self.mass_flow, node_flows, self.k,
+                                                              self.t_ground, 'DH', {})
+        t_in_0 = (calc_temperature_out_per_pipe(313.15, 1.0, 0.1, self.t_ground) * 1.0 +
+                  calc_temperature_out_per_pipe(323.15, 2.0, 0.3, self.t_ground) * 2.0) / 3.0
+        expected = [t_in_0, 313.15, calc_temperature_out_per_pipe(t_in_0, 3.0, 0.2, self.t_ground), 323.15, np.nan]
+        np.testing.assert_allclose(t_node, expected)
+        self.assertTrue((q_loss[:3] > 0).all())
+
+    def test_return_temperature_missing(self):
+        t_return = np.array([np.nan, np.nan, np.nan, 323.15, np.nan])
+        node_flows = np.array([0.0, 1.0, -3.0, 2.0, 0.0])
+        self.assertIsNone(self.solver.calc_return_temperatures(t_return, self.mass_flow, node_flows, self.k,
+                                                               self.t_ground, 'DH', {}))
+
+    def test_high_temperature_loss(self):
+        problematic_edges = {}
+        t_node, _ = self.solver.calc_supply_temperatures(353.15, self.mass_flow * 1e-4, self.k * 100, self.t_ground,
+                                                         'DH', problematic_edges)
+        self.assertAlmostEqual(t_node[0], 353.15 - 30)
+        self.assertIn('1', problematic_edges)
+
+    def test_multiple_time_steps(self):
+        random = np.random.RandomState(42)
+        mass_flow = np.array([self.mass_flow * random.uniform(0.5, 1.5) for _ in range(24)]).T  # (e x t)
+        mass_flow[:, 5] = 0.0
+        t_plant = random.uniform(340.0, 360.0, 24)
+        t_node, q_loss = self.solver.calc_supply_temperatures(t_plant, mass_flow, self.k, self.t_ground, 'DH', {})
+        self.assertEqual(t_node.shape, (5, 24))
+        for t in range(24):
+            t_node_t, q_loss_t = self.solver.calc_supply_temperatures(t_plant[t], mass_flow[:, t], self.k,
+                                                                      self.t_ground, 'DH', {})
+            np.testing.assert_allclose(t_node[:, t], t_node_t)
+            np.testing.assert_allclose(q_loss[:, t], q_loss_t)
+
+
+if __name__ == "__main__":
+    unittest.main()
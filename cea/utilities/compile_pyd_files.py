@@ -1,96 +1,44 @@
 """
-Compile the .pyd files using Numba pycc to speed up the calculation of certain modules.
-Currently used for:
+Compile the numeric kernels of the CEA (see ``cea.utilities.jit``) into the on-disk cache of Numba, so the first run of
+the scripts (e.g. on each node of a cluster) doesn't wait for the compilation. Currently used for:
 
-- calc_tm.pyd (used in demand/sensible_loads.py)
-- calc_radiator.pyd (used in technologies/radiators.py)
+- the RC model (demand/rc_model_SIA.py)
+- the radiators (technologies/radiators.py)
+- the DHW storage tank (technologies/storage_tank.py)
 
-In order to run this script, you will need to install Numba. Try: `conda install numba`
+This replaces the ahead-of-time compiled ``*.pyd`` files, which only worked on Windows.
 """
 
 
 
-from numba.pycc import CC
-import shutil
-import os
 
+import inspect
 
-def main():
-    delete_pyd('..', 'demand', 'rc_model_sia_cc.pyd')
-    delete_pyd('rc_model_sia_cc.pyd')
-    compile_rc_model_sia()
-    copy_pyd('rc_model_sia_cc.pyd', ['..', 'demand', 'rc_model_sia_cc.pyd'])
-    delete_pyd('rc_model_sia_cc.pyd')
+import numpy as np
 
-    delete_pyd('..', 'technologies', 'calc_radiator.pyd')
-    delete_pyd('calc_radiator.pyd')
-    compile_radiators()
-    copy_pyd('calc_radiator.pyd', ['..', 'technologies', 'calc_radiator.pyd'])
-    delete_pyd('calc_radiator.pyd')
+import cea.config
+import cea.demand.rc_model_SIA
+import cea.technologies.radiators
+import cea.technologies.storage_tank
+import cea.utilities.jit
 
-    delete_pyd('..', 'technologies', 'storagetank_cc.pyd')
-    delete_pyd('storagetank_cc.pyd')
-    compile_storagetank()
-    copy_pyd('storagetank_cc.pyd', ['..', 'technologies', 'storagetank_cc.pyd'])
-    delete_pyd('storagetank_cc.pyd')
 
+def main(config):
+    print('Numeric kernels: %s' % cea.utilities.jit.get_backend())
+    if not cea.utilities.jit.is_enabled():
+        return
 
-def delete_pyd(*pathspec):
-    """Delete the file with the pathspec. `pathspec` is an array of path segments."""
-    path_to_calc_tm_pyd = os.path.join(os.path.dirname(__file__), *pathspec)
-    if os.path.exists(path_to_calc_tm_pyd):
-        os.remove(path_to_calc_tm_pyd)
+    # the kernels of the RC model and the radiators take floats
+    for module in [cea.demand.rc_model_SIA, cea.technologies.radiators]:
+        for name, kernel in sorted(vars(module).items()):
+            if hasattr(kernel, 'py_func') and kernel.py_func.__module__ == module.__name__:
+                print('Compiling %s.%s' % (module.__name__, name))
+                kernel(*[1.0] * len(inspect.signature(kernel.py_func).parameters))
 
-def copy_pyd(source, destination):
-    parent = os.path.dirname(__file__)
-    shutil.copy(os.path.join(parent, source),
-                os.path.join(parent, *destination))
+    print('Compiling cea.technologies.storage_tank.calc_dhw_tank_temperatures')
+    cea.technologies.storage_tank.calc_dhw_tank_temperatures(np.zeros(1, dtype=bool), np.zeros(1), np.zeros(1), 60.0,
+                                                             60.0, 1.0, 1.0)
 
 
-def compile_rc_model_sia():
-    import cea.demand.rc_model_SIA
-    reload(cea.demand.rc_model_SIA)
-    cc = CC('rc_model_sia_cc')
-
-    # cc.export('calc_h_ec', "f8(f8)")(cea.demand.rc_model_SIA.calc_h_ec)
-    # cc.export('calc_h_ac', "f8(f8)")(cea.demand.rc_model_SIA.calc_h_ac)
-    # cc.export('calc_h_ea', "f8(f8, f8, f8)")(cea.demand.rc_model_SIA.calc_h_ea)
-    # cc.export('calc_f_sc', "f8(f8, f8, f8, f8)")(cea.demand.rc_model_SIA.calc_f_sc)
-    cc.export('calc_phi_m', "f8(f8, f8, f8, f8, f8, f8, f8)")(cea.demand.rc_model_SIA.calc_phi_m)
-    cc.export('calc_phi_c', "f8(f8, f8, f8, f8, f8, f8, f8)")(cea.demand.rc_model_SIA.calc_phi_c)
-    cc.export('calc_theta_c', "f8(f8, f8, f8, f8, f8, f8, f8, f8, f8)")(cea.demand.rc_model_SIA.calc_theta_c)
-    cc.export('calc_phi_m_tot', "f8(f8, f8, f8, f8, f8, f8, f8, f8, f8, f8, f8, f8)")(
-        cea.demand.rc_model_SIA.calc_phi_m_tot)
-    cc.export('calc_phi_a', "f8(f8, f8, f8, f8, f8)")(cea.demand.rc_model_SIA.calc_phi_a)
-    cc.export('calc_theta_m', "f8(f8, f8)")(cea.demand.rc_model_SIA.calc_theta_m)
-    cc.export('calc_h_ea', "f8(f8, f8, f8)")(cea.demand.rc_model_SIA.calc_h_ea)
-    cc.export('calc_theta_m_t', "f8(f8, f8, f8, f8, f8)")(cea.demand.rc_model_SIA.calc_theta_m_t)
-    cc.export('calc_theta_ea', "f8(f8, f8, f8, f8, f8)")(cea.demand.rc_model_SIA.calc_theta_ea)
-    cc.export('calc_h_em', "f8(f8, f8)")(cea.demand.rc_model_SIA.calc_h_em)
-    cc.export('calc_h_3', "f8(f8, f8)")(cea.demand.rc_model_SIA.calc_h_3)
-
-    cc.compile()
-
-
-def compile_radiators():
-    import cea.technologies.radiators
-    reload(cea.technologies.radiators)
-    cc = CC('calc_radiator')
-
-    cc.export('fh', "f8(f8, f8, f8, f8, f8, f8, f8)")(cea.technologies.radiators.fh)
-    cc.export('lmrt', "f8(f8, f8, f8)")(cea.technologies.radiators.lmrt)
-
-    cc.compile()
-
-
-def compile_storagetank():
-    import cea.technologies.storage_tank
-    reload(cea.technologies.storage_tank)
-    cc = CC('storagetank_cc')
-
-    cc.export('ode', "f8(f8[:], f8, f8, f8, f8, f8, f8, f8)")(cea.technologies.storage_tank.ode_hot_water_tank)
-
-    cc.compile()
-
 if __name__ == '__main__':
-    main()
+    main(cea.config.Configuration())
@@ -2,10 +2,13 @@
 A collection of utility functions for working with ``*.DBF`` (dBase database) files.
 """
 
+import datetime
+import struct
 import numpy as np
 import pandas as pd
 import os
 import cea.config
+import cea.utilities.input_cache
 
 # import PySAL without the warning
 import warnings
@@ -31,53 +34,125 @@ TYPE_MAPPING = {
     str: ('C', 25, 0),
     np.bool_: ('L', 1, 0)}
 
+NUMERIC_SCHEMA_TYPES = {
+    'int': int,
+    'float': float}
+
 
 def dataframe_to_dbf(df, dbf_path, specs=None):
     """Given a pandas Dataframe, write a dbase database to ``dbf_path``.
 
+    The records are formatted column by column and written as one block (the same format as the PySAL dbf writer).
+
     :type df: pandas.Dataframe
     :type dbf_path: str
     :param specs: A list of column specifications for the dbase table. Each column is specified by a tuple (datatype,
-        size, decimal) - we support ``datatype in ('N', 'C')`` for strings, integers and floating point numbers, if
-        no specs are provided (see ``TYPE_MAPPING``)
+        size, decimal) - we support ``datatype in ('N', 'C', 'L')`` for strings, integers, floating point numbers and
+        booleans, if no specs are provided, these are taken from the types of the columns (see ``get_column_spec``)
     :type specs: list[tuple(str, int, int)]
     """
     if specs is None:
-        types = [type(df[i].iloc[0]) for i in df.columns]
-        specs = [TYPE_MAPPING[t] for t in types]
+        schema_columns = get_schema_columns(dbf_path)
+        specs = [get_column_spec(df[column], schema_columns.get(column, {}).get('type')) for column in df.columns]
+    specs = list(specs)
 
-    # handle case of strings that are longer than 25 characters (e.g. for the "Name" column)
-    for i in range(len(specs)):
+    fields = []
+    for i, column in enumerate(df.columns):
         t, l, d = specs[i]  # type, length, decimals
+        values = format_field(df[column].values, t, l, d)
         if t == 'C':
-            l = max(l, df[df.columns[i]].apply(len).max())
+            # handle case of strings that are longer than 25 characters (e.g. for the "Name" column)
+            l = max([l] + [len(value) for value in values])
             specs[i] = t, l, d
-
-    dbf = pysal.lib.io.open(dbf_path, 'w', 'dbf')
-    dbf.header = list(df.columns)
-    dbf.field_spec = specs
-    for row in range(len(df)):
-        dbf.write(df.iloc[row])
-    dbf.close()
+        fields.append(np.array([value.ljust(l, b' ')[:l] for value in values], dtype='S%i' % l))
+
+    # the records: the deletion flag and the fields, without padding
+    records = np.empty(len(df), dtype=[('deleted', 'S1')] + [('f%i' % i, 'S%i' % spec[1])
+                                                             for i, spec in enumerate(specs)])
+    records['deleted'] = b' '
+    for i, field in enumerate(fields):
+        records['f%i' % i] = field
+
+    today = datetime.date.today()
+    record_length = sum(spec[1] for spec in specs) + 1
+    header = [struct.pack('<BBBBLHH20x', 3, today.year - 1900, today.month, today.day, len(df),
+                          len(specs) * 32 + 33, record_length)]
+    for column, (t, l, d) in zip(df.columns, specs):
+        header.append(struct.pack('<11sc4xBB14x', str(column).ljust(11, '\x00').encode(), t.encode(), l, d))
+    header.append(b'\r')
+
+    cea.utilities.input_cache.invalidate(dbf_path)
+    with open(dbf_path, 'wb') as fp:
+        fp.write(b''.join(header))
+        fp.write(records.tobytes())
+        fp.write(b'\x1a')
     return dbf_path
 
 
+def get_column_spec(column, schema_type=None):
+    """
+    The field specification (datatype, size, decimal) of a column of a DataFrame (see ``TYPE_MAPPING``). For numbers,
+    the type in ``schemas.yml`` decides between integers and floating point numbers (e.g. a column of floats read
+    from json may only contain whole numbers).
+
+    :param pd.Series column: the column to write
+    :param str schema_type: the type of the column in ``schemas.yml`` (if described there)
+    """
+    if column.dtype.kind in 'iuf':
+        if schema_type in NUMERIC_SCHEMA_TYPES:
+            return TYPE_MAPPING[NUMERIC_SCHEMA_TYPES[schema_type]]
+        return TYPE_MAPPING[int] if column.dtype.kind in 'iu' else TYPE_MAPPING[float]
+    if column.dtype.kind == 'b':
+        return TYPE_MAPPING[np.bool_]
+    values = column.dropna()
+    if len(values) == 0:
+        return TYPE_MAPPING[str]
+    return TYPE_MAPPING[type(values.iloc[0])]
+
+
+def get_schema_columns(dbf_path):
+    """The schemas of the columns of ``dbf_path`` in ``schemas.yml`` (empty, if the file is not described there)"""
+    import cea.schemas
+    dbf_path = os.path.abspath(dbf_path).replace('\\', '/')
+    for schema in cea.schemas.schemas(plugins=[]).values():
+        if schema.get('file_type') == 'dbf' and dbf_path.endswith('/' + schema['file_path']):
+            return schema['schema']['columns']
+    return {}
+
+
+def format_field(values, t, l, d):
+    """Format the values of a column as the (encoded) fields of the dbase records"""
+    if t == 'N' or t == 'F':
+        number_format = '%%%i.%if' % (l, d)
+        return [b'\x00' * l if value is None else (number_format % value)[:l].encode() for value in values]
+    if t == 'L':
+        return [b'\x00' if value is None else str(value)[0].upper().encode() for value in values]
+    if t == 'D':
+        return [b'\x00' * 8 if value is None else value.strftime('%Y%m%d').encode() for value in values]
+    return [b'' if value is None else str(value).encode() for value in values]
+
+
 def dbf_to_dataframe(dbf_path, index=None, cols=None, include_index=False):
-    dbf = pysal.lib.io.open(dbf_path)
+    table = cea.utilities.input_cache.read_cached(dbf_path, read_dbf)
     if cols:
         if include_index:
             cols.append(index)
         vars_to_read = cols
     else:
-        vars_to_read = dbf.header
-    data = dict([(var, dbf.by_col(var)) for var in vars_to_read])
+        vars_to_read = list(table.columns)
+    data = table[vars_to_read]
     if index:
-        index = dbf.by_col(index)
-        dbf.close()
-        return pd.DataFrame(data, index=index)
+        return data.set_index(pd.Index(table[index].values))
     else:
-        dbf.close()
-        return pd.DataFrame(data)
+        return data
+
+
+def read_dbf(dbf_path):
+    """Read all the columns of a dbase database (see ``dbf_to_dataframe`` for the cached version)"""
+    dbf = pysal.lib.io.open(dbf_path)
+    data = dict([(var, dbf.by_col(var)) for var in dbf.header])
+    dbf.close()
+    return pd.DataFrame(data)
 
 
 def xls_to_dbf(input_file, output_path, output_file_name):
@@ -0,0 +1,157 @@
+"""
+A binary cache of the input tables of a scenario (``*.dbf`` property tables and shapefiles), so the tools that read the
+same inputs over and over (demand, schedule maker, archetypes mapper, dashboard) skip parsing them.
+
+The caches are kept in a folder of the user (``~/.cea/input_cache``), addressed by the absolute path of the source
+file - never in the scenario, which is shared with others (e.g. zipped) and must not contain pickles that are loaded.
+The cache of a file is used as long as the source file is not changed: the modification time and size of the source
+files are checked first and, if these changed, a hash of their contents (e.g. a scenario that was copied back).
+"""
+
+
+
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+import pandas as pd
+from geopandas import GeoDataFrame as Gdf
+
+CACHE_FOLDER = os.path.expanduser('~/.cea/input_cache')
+CACHE_VERSION = [2, pd.__version__]  # a cache written by another version of pandas is read again from the source
+SHAPEFILE_EXTENSIONS = ['.shp', '.shx', '.dbf', '.prj', '.cpg']
+
+
+def get_cache_path(source_path):
+    """The path of the cache of ``source_path`` (in the folder of the user, named after the absolute source path)"""
+    absolute_path = os.path.normcase(os.path.abspath(source_path))
+    path_hash = hashlib.sha256(absolute_path.encode('utf-8')).hexdigest()
+    return os.path.join(CACHE_FOLDER, '%s-%s.pickle' % (os.path.basename(absolute_path), path_hash))
+
+
+def get_source_paths(source_path, extensions=None):
+    """The files that make up ``source_path`` (for a shapefile, the files with the same name and ``extensions``)"""
+    if not extensions:
+        return [source_path]
+    base_path = os.path.splitext(source_path)[0]
+    return [base_path + extension for extension in extensions]
+
+
+def calc_signature(source_paths):
+    """Modification time and size of each source file (``None`` for missing files)"""
+    signature = []
+    for path in source_paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            signature.append(None)
+        else:
+            signature.append([stat.st_mtime_ns, stat.st_size])
+    return signature
+
+
+def calc_hash(source_paths):
+    source_hash = hashlib.sha256()
+    for path in source_paths:
+        source_hash.update(os.path.basename(path).encode('utf-8'))
+        if not os.path.exists(path):
+            source_hash.update(b'missing')
+            continue
+        with open(path, 'rb') as fp:
+            for chunk in iter(lambda: fp.read(1 << 20), b''):
+                source_hash.update(chunk)
+    return source_hash.hexdigest()
+
+
+def read_cache_header(cache_path):
+    """
+    The header of the cache (or ``None`` if there is no valid cache) and the open cache file. The header is the first
+    line of the file (JSON), the pickled data follows.
+    """
+    try:
+        fp = open(cache_path, 'rb')
+    except IOError:
+        return None, None
+    try:
+        header = json.loads(fp.readline().decode('utf-8'))
+    except Exception:
+        fp.close()
+        return None, None
+    if not isinstance(header, dict) or header.get('version') != CACHE_VERSION:
+        fp.close()
+        return None, None
+    return header, fp
+
+
+def write_cache(cache_path, header, data):
+    """Write the cache atomically (other processes may read the same inputs at the same time)"""
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), suffix='.tmp')
+    except (IOError, OSError):
+        # the cache is an optimization only (e.g. the home folder may be read-only)
+        return
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(json.dumps(header).encode('utf-8') + b'\n')
+            pickle.dump(data, fp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def invalidate(source_path):
+    """Remove the cache of ``source_path`` (e.g. before it is written)"""
+    try:
+        os.remove(get_cache_path(source_path))
+    except OSError:
+        pass
+
+
+def read_cached(source_path, reader, extensions=None):
+    """
+    Read ``source_path`` with ``reader`` - or from the cache, if the source files did not change since it was last
+    read.
+
+    :param str source_path: path of the input file
+    :param reader: ``reader(source_path)`` returns the contents of the file (a pandas DataFrame or GeoDataFrame)
+    :param list extensions: the extensions of the files that make up the input (e.g. a shapefile), by default only
+        ``source_path`` itself
+    :return: the contents of the file
+    """
+    source_paths = get_source_paths(source_path, extensions)
+    cache_path = get_cache_path(source_path)
+    signature = calc_signature(source_paths)
+
+    header, fp = read_cache_header(cache_path)
+    if header is not None:
+        try:
+            source_hash = None
+            if header['signature'] != signature:
+                source_hash = calc_hash(source_paths)
+            if source_hash is None or source_hash == header['hash']:
+                data = pickle.load(fp)
+                if source_hash is not None:
+                    # same contents, new modification time: skip the hash next time
+                    write_cache(cache_path, dict(header, signature=signature), data)
+                return data
+        except Exception:
+            pass
+        finally:
+            fp.close()
+
+    data = reader(source_path)
+    if calc_signature(source_paths) == signature:
+        # don't cache a file that was changed while it was read
+        header = {'version': CACHE_VERSION, 'signature': signature, 'hash': calc_hash(source_paths)}
+        write_cache(cache_path, header, data)
+    return data
+
+
+def shapefile_to_geodataframe(shapefile_path):
+    """Read a shapefile (e.g. the zone geometry) to a GeoDataFrame - like ``Gdf.from_file``, but cached"""
+    return read_cached(shapefile_path, Gdf.from_file, SHAPEFILE_EXTENSIONS)
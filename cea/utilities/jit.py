@@ -0,0 +1,61 @@
+"""
+Just-in-time compilation of the numeric kernels of the CEA (e.g. the RC model of the demand, the radiator heat
+balance and the DHW storage tank) with Numba.
+
+The kernels are compiled on their first call and the machine code is cached on disk (``numba.njit(cache=True)``),
+so - unlike the ahead-of-time compiled ``*.pyd`` files of ``cea/utilities/compile_pyd_files.py`` - this works on any
+platform. Without Numba, or with the environment variable ``CEA_JIT=0`` (the ``cea`` command line interface sets it
+from the ``general:jit`` parameter, if it is not set yet), the kernels run as plain python functions.
+"""
+
+
+
+
+import os
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+JIT_ENVIRONMENT_VARIABLE = 'CEA_JIT'
+
+
+def is_enabled():
+    """True, if the kernels are compiled (Numba is installed and not turned off with ``CEA_JIT``)"""
+    if numba is None:
+        return False
+    return os.environ.get(JIT_ENVIRONMENT_VARIABLE, '1').strip().lower() not in {'0', 'false', 'no', 'off'}
+
+
+def configure(enabled):
+    """
+    Turn the compilation of the kernels on or off for this process and the processes it starts - unless ``CEA_JIT``
+    is already set. The kernels are compiled (or not) when their modules are imported, so call this before importing
+    the scripts.
+
+    :param bool enabled: the value of the ``general:jit`` parameter
+    """
+    os.environ.setdefault(JIT_ENVIRONMENT_VARIABLE, '1' if enabled else '0')
+
+
+def get_backend():
+    """A description of how the kernels run, for the log"""
+    if numba is None:
+        return 'pure python (numba is not installed)'
+    if not is_enabled():
+        return 'pure python (turned off with %s=%s)' % (JIT_ENVIRONMENT_VARIABLE,
+                                                         os.environ[JIT_ENVIRONMENT_VARIABLE])
+    return 'numba %s (just-in-time, cached on disk)' % numba.__version__
+
+
+def jit(function):
+    """
+    Decorator for the numeric kernels: compile ``function`` with Numba (in nopython mode), if enabled. The kernels may
+    only call other kernels. Divisions by zero return ``inf`` or ``nan``, as they do with numpy floats.
+
+    The python version of a compiled kernel is ``function.py_func``.
+    """
+    if not is_enabled():
+        return function
+    return numba.njit(cache=True, error_model='numpy')(function)
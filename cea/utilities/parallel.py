@@ -11,13 +11,30 @@ not applying this technique to the demand script.
 
 This module exports the function `map` which is intended to replace both ``map_async`` and the builtin ``map`` function
 (which was used when ``config.multiprocessing == False``). This simplifies multiprocessing.
+
+Arguments that are the same for every call (the locator, the config, the weather data...) should be passed wrapped
+with ``broadcast`` instead of ``itertools.repeat``: They are then sent to each worker process only once (NumPy arrays
+through shared memory, all other values - including DataFrames - pickled once per worker) instead of being pickled into
+every single task.
+
+Use ``stream`` instead of ``vectorize`` to process the results as they come in (e.g. to write them to disk) instead of
+collecting all of them in memory first.
 """
 
 import multiprocessing
 import sys
 import logging
-from itertools import repeat
-from cea.utilities.workerstream import stream_from_queue, QueueWorkerStream
+import threading
+
+import numpy as np
+
+from cea.utilities.workerstream import stream_from_queue_until_closed, QueueWorkerStream
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    # Python < 3.8: broadcast arguments are pickled once per worker process instead
+    shared_memory = None
 
 __author__ = "Daren Thomas"
 __copyright__ = "Copyright 2019, Architecture and Building Systems - ETH Zurich"
@@ -48,9 +65,12 @@ def vectorize(func, processes=1, on_complete=None):
 
     .. note: due to the way multiprocessing works, ``func`` and ``on_complete`` need to be module-level functions
 
-    .. note: the if processes > 1, then the first argument to the vectorized ``func`` will be converted to a list before
-        running. This should not have any side effects, but is necessary if the args are constructed with
-        ``itertools.repeat``.
+    .. note: the if processes > 1, then the arguments to the vectorized ``func`` will be converted to lists before
+        running. This should not have any side effects, but is necessary since we need the number of calls.
+
+    Arguments wrapped with :py:func:`broadcast` are passed unchanged to every call of ``func``. With multiprocessing,
+    they are sent to each worker process only once, so the per-call inter-process communication is limited to the
+    other arguments.
 
     :param func: The function to vectorize
     :param int processes: The number of processes to use (use ``config.get_number_of_processes()``)
@@ -62,54 +82,175 @@ def vectorize(func, processes=1, on_complete=None):
         return single_process_wrapper(func, on_complete)
 
 
+class Broadcast(object):
+    """An argument to a vectorized function that is the same for all calls - use :py:func:`broadcast` to create"""
+
+    def __init__(self, value):
+        self.value = value
+
+
+def broadcast(value):
+    """
+    Mark ``value`` as an argument to a function wrapped by :py:func:`vectorize` that is the same for every call. This
+    replaces ``itertools.repeat(value, n)``.
+
+    :param value: the value to pass to every call
+    :rtype: Broadcast
+    """
+    return Broadcast(value)
+
+
+def split_broadcast_args(args):
+    """
+    Separate the broadcast arguments from the sequences to map over.
+
+    :return: a dict mapping the position of each broadcast argument to its value, the list of the other arguments
+             (as lists) and the number of calls to make
+    :rtype: (dict, list[list], int)
+    """
+    broadcast_args = {i: a.value for i, a in enumerate(args) if isinstance(a, Broadcast)}
+    mapped_args = [list(a) for i, a in enumerate(args) if i not in broadcast_args]
+    if not mapped_args:
+        raise ValueError("At least one argument of a vectorized function must be a sequence (not broadcast)")
+    n = min(len(a) for a in mapped_args)  # the number of iterations to map
+    return broadcast_args, mapped_args, n
+
+
+def merge_broadcast_args(broadcast_args, instance_args):
+    """
+    The inverse of :py:func:`split_broadcast_args` for a single call: Insert the broadcast arguments at their
+    position in the ``instance_args`` of that call.
+
+    :rtype: tuple
+    """
+    if not broadcast_args:
+        return tuple(instance_args)
+    num_args = len(broadcast_args) + len(instance_args)
+    instance_args = iter(instance_args)
+    return tuple(broadcast_args[i] if i in broadcast_args else next(instance_args) for i in range(num_args))
+
+
+def stream(func, processes=1, on_complete=None, chunksize=1):
+    """
+    Like :py:func:`vectorize`, but the wrapped function returns a generator that yields a tuple ``(i, result)`` for
+    each call of ``func`` as soon as it is completed, where ``i`` is the index of the arguments of the call. With
+    multiprocessing, the results are yielded in the order of completion (see ``multiprocessing.Pool.imap_unordered``),
+    so the caller can write them out incrementally instead of keeping all of them in memory.
+
+    ``on_complete`` is called in the calling process, just before each result is yielded.
+
+    :param func: The function to vectorize
+    :param int processes: The number of processes to use (use ``config.get_number_of_processes()``)
+    :param on_complete: An optional function to call for each completed call to ``func``.
+    :param int chunksize: The number of calls sent to a worker process at once. Keep this small if the calls take a
+                          long (and varying) time, so that one slow call does not hold back the others.
+    """
+    if processes > 1:
+        return __multiprocess_stream_wrapper(func, processes, on_complete, chunksize)
+    else:
+        return single_process_stream_wrapper(func, on_complete)
+
+
 def __multiprocess_wrapper(func, processes, on_complete):
     """Create a worker pool to map the function, taking care to set up STDOUT and STDERR"""
 
     def wrapper(*args):
         print("Using {processes} CPU's".format(processes=processes))
-        pool = multiprocessing.Pool(processes)
+        broadcast_args, mapped_args, n = split_broadcast_args(args)
+        shared_args = SharedBroadcastArgs(broadcast_args)
         manager = multiprocessing.Manager()
 
         # a queue for STDOUT and STDERR output of sub-processes (see cea.utilities.workerstream.QueueWorkerStream)
         queue = manager.Queue()
-
-        # make sure the first arg is a list (not a generator) since we need the length of the sequence
-        args = [list(a) for a in args]
-        n = len(args[0])  # the number of iterations to map
+        output_thread = __start_streaming_worker_output(queue)
 
         # set up the list of i-values for on_complete
         i_queue = manager.Queue()
         for i in range(n):
             i_queue.put(i)
 
-        args = [repeat(func, n),
-                repeat(queue, n),
-                repeat(on_complete, n),
-                repeat(i_queue, n),
-                repeat(n, n)] + args
-        args = zip(*args)
+        # everything that is the same for each call is sent to the workers once, when they are started
+        pool = multiprocessing.Pool(processes, initializer=__initialize_worker,
+                                    initargs=(func, queue, on_complete, i_queue, n, shared_args))
+        try:
+            result = pool.map_async(__apply_func_with_worker_stream, zip(*mapped_args)).get()
+            pool.close()
+            pool.join()
+        finally:
+            pool.terminate()
+            shared_args.release()
+            __stop_streaming_worker_output(queue, output_thread)
+        return result
 
-        map_result = pool.map_async(__apply_func_with_worker_stream, args)
+    return wrapper
 
-        while not map_result.ready():
-            stream_from_queue(queue)
-        result = map_result.get()
 
-        pool.close()
-        pool.join()
+def __multiprocess_stream_wrapper(func, processes, on_complete, chunksize):
+    """Create a worker pool to map the function with ``imap_unordered``, yielding the results as they complete"""
 
-        # process the rest of the queue
-        while not queue.empty():
-            stream_from_queue(queue)
-        return result
+    def wrapper(*args):
+        print("Using {processes} CPU's".format(processes=processes))
+        broadcast_args, mapped_args, n = split_broadcast_args(args)
+        shared_args = SharedBroadcastArgs(broadcast_args)
+        manager = multiprocessing.Manager()
+
+        # a queue for STDOUT and STDERR output of sub-processes (see cea.utilities.workerstream.QueueWorkerStream)
+        queue = manager.Queue()
+        output_thread = __start_streaming_worker_output(queue)
+
+        # on_complete is called in this process, so the workers don't need it
+        pool = multiprocessing.Pool(processes, initializer=__initialize_worker,
+                                    initargs=(func, queue, None, None, n, shared_args))
+        try:
+            tasks = zip(range(n), *mapped_args)
+            results = pool.imap_unordered(__apply_indexed_func_with_worker_stream, tasks, chunksize=chunksize)
+            for completed, (i, result) in enumerate(results):
+                if on_complete:
+                    on_complete(completed, n, merge_broadcast_args(broadcast_args, [a[i] for a in mapped_args]),
+                                result)
+                yield i, result
+            pool.close()
+            pool.join()
+        finally:
+            pool.terminate()
+            shared_args.release()
+            __stop_streaming_worker_output(queue, output_thread)
 
     return wrapper
 
 
+def __start_streaming_worker_output(queue):
+    """Start a thread that writes the STDOUT and STDERR output of the sub-processes as it comes in"""
+    output_thread = threading.Thread(target=stream_from_queue_until_closed, args=(queue,))
+    output_thread.daemon = True
+    output_thread.start()
+    return output_thread
+
+
+def __stop_streaming_worker_output(queue, output_thread):
+    """Write the rest of the output of the sub-processes and stop the thread"""
+    queue.put(None)
+    output_thread.join()
+
+
+# the arguments passed to __initialize_worker, only set inside the worker processes
+__worker_context = {}
+
+
+def __initialize_worker(func, queue, on_complete, i_queue, n, shared_args):
+    """
+    Store the arguments that are the same for each call of ``func`` in the worker process.
+
+    This function is called _inside_ a separate process, once, when the process is started.
+    """
+    __worker_context.update(func=func, queue=queue, on_complete=on_complete, i_queue=i_queue, n=n,
+                            broadcast_args=shared_args.attach())
+
+
 def __apply_func_with_worker_stream(args):
     """
     Call func, using ``queue`` to redirect stdout and stderr, with a tuple of args because multiprocessing.Pool.map
-    only accepts one argument for the function.
+    only accepts one argument for the function. The broadcast arguments are taken from the worker context.
 
     This function is called _inside_ a separate process.
     """
@@ -121,7 +262,10 @@ def __apply_func_with_worker_stream(args):
     suppress_3rd_party_debug_loggers()
 
     # unpack the arguments
-    func, queue, on_complete, i_queue, n, args = args[0], args[1], args[2], args[3], args[4], args[5:]
+    func = __worker_context['func']
+    queue = __worker_context['queue']
+    on_complete = __worker_context['on_complete']
+    args = merge_broadcast_args(__worker_context['broadcast_args'], args)
 
     # set up printing to stderr and stdout to go through the queue
     sys.stdout = QueueWorkerStream('stdout', queue)
@@ -131,26 +275,102 @@ def __apply_func_with_worker_stream(args):
     result = func(*args)
 
     if on_complete:
-        on_complete(i_queue.get(), n, args, result)
+        on_complete(__worker_context['i_queue'].get(), __worker_context['n'], args, result)
 
     return result
 
 
+def __apply_indexed_func_with_worker_stream(args):
+    """
+    Same as :py:func:`__apply_func_with_worker_stream`, but the first argument is the index of the call, which is
+    returned together with the result (the results of ``imap_unordered`` are not in order).
+
+    This function is called _inside_ a separate process.
+    """
+    return args[0], __apply_func_with_worker_stream(args[1:])
+
+
+class SharedBroadcastArgs(object):
+    """
+    The broadcast arguments of a vectorized function, as sent to the worker processes. NumPy arrays are copied to shared
+    memory (if available) and only their name, shape and dtype is pickled. All other values are pickled as is (once per
+    worker) - this includes DataFrames: pandas copies the columns into its own blocks, so a DataFrame can't be built
+    around shared memory without making it read-only for the function.
+    """
+
+    def __init__(self, broadcast_args):
+        self.shared_arrays = []
+        self.broadcast_args = {i: self.share(value) for i, value in broadcast_args.items()}
+
+    def share(self, value):
+        if shared_memory is None:
+            return value
+        if isinstance(value, np.ndarray) and value.dtype.kind in 'biufcmM' and value.size:
+            shared_array = SharedArray(value)
+            self.shared_arrays.append(shared_array)
+            return shared_array
+        return value
+
+    def attach(self):
+        """Called in the worker: the broadcast arguments with the shared memory placeholders replaced by the values"""
+        return {i: value.attach() if isinstance(value, SharedArray) else value
+                for i, value in self.broadcast_args.items()}
+
+    def release(self):
+        """Called in the parent process when all workers are done"""
+        for shared_array in self.shared_arrays:
+            shared_array.release()
+        self.shared_arrays = []
+
+
+class SharedArray(object):
+    """A NumPy array copied to shared memory, pickles to the name of the shared memory block, the shape and dtype"""
+
+    def __init__(self, array):
+        self.shm = shared_memory.SharedMemory(create=True, size=array.nbytes)
+        self.name = self.shm.name
+        self.shape = array.shape
+        self.dtype = array.dtype
+        np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)[...] = array
+
+    def __getstate__(self):
+        return {'name': self.name, 'shape': self.shape, 'dtype': self.dtype, 'shm': None}
+
+    def attach(self):
+        """:return: a read-only view of the shared array (the shared memory block is kept open with this object)"""
+        if self.shm is None:
+            self.shm = shared_memory.SharedMemory(name=self.name)
+        array = np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)
+        array.flags.writeable = False
+        return array
+
+    def release(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
 def single_process_wrapper(func, on_complete):
     """The simplest form of vectorization: Just loop"""
 
+    def wrapper(*args):
+        return [result for _, result in single_process_stream_wrapper(func, on_complete)(*args)]
+
+    return wrapper
+
+
+def single_process_stream_wrapper(func, on_complete):
+    """Just loop, yielding the index and result of each call"""
+
     def wrapper(*args):
         print("Using single process")
 
-        args = [list(a) for a in args]
-        n = len(args[0])
-        map_result = []
-        for i, instance_args in enumerate(zip(*args)):
+        broadcast_args, mapped_args, n = split_broadcast_args(args)
+        for i, instance_args in enumerate(zip(*mapped_args)):
+            instance_args = merge_broadcast_args(broadcast_args, instance_args)
             result = func(*instance_args)
             if on_complete:
                 on_complete(i, n, instance_args, result)
-            map_result.append(result)
-        return map_result
+            yield i, result
 
     return wrapper
 
@@ -162,3 +382,4 @@ def test(a, b):
 
 if __name__ == '__main__':
     print(vectorize(test, 4)(range(10, 20), range(20, 30)))
+    print(vectorize(test, 4)(range(10, 20), broadcast(np.arange(3))))
@@ -5,6 +5,7 @@ solar equations
 
 
 
+import os
 import numpy as np
 import pandas as pd
 import ephem
@@ -205,7 +206,43 @@ def get_equation_of_time(day_date):
 
 # filter sensor points with low solar potential
 
-def filter_low_potential(radiation_json_path, metadata_csv_path, config):
+def get_radiation_sensor_paths(locator, building_name):
+    """
+    Find the hourly sensor radiation written by the radiation script for a building. The binary (``.npy``) layout is
+    used if it was written by the latest radiation run, else the JSON file.
+
+    :return: path to the sensor radiation and path to the index of sensor codes (``None`` for the JSON file)
+    :rtype: tuple(str, str)
+    """
+    json_path = locator.get_radiation_building_sensors(building_name)
+    npy_path = locator.get_radiation_building_sensors_npy(building_name)
+    if os.path.exists(npy_path) and (not os.path.exists(json_path)
+                                     or os.path.getmtime(npy_path) >= os.path.getmtime(json_path)):
+        return npy_path, locator.get_radiation_building_sensors_index(building_name)
+    return json_path, None
+
+
+def read_sensor_radiation(radiation_path, sensor_index_path=None):
+    """
+    Read the hourly radiation of the sensors of a building, either from the JSON file (sensor code -> list of hourly
+    values) or from the binary ``.npy`` layout, which is memory-mapped, so only the sensors used are read from disk.
+
+    :param radiation_path: path to the sensor radiation (``.json`` or ``.npy``)
+    :param sensor_index_path: path to the csv file with the sensor codes of the ``.npy`` layout
+    :return: the sensor codes and the radiation per sensor and hour [Wh/m2] (sensors x hours)
+    :rtype: tuple(np.ndarray, np.ndarray)
+    """
+    if sensor_index_path is not None:
+        sensor_codes = pd.read_csv(sensor_index_path)['SURFACE'].values
+        sensors_rad = np.load(radiation_path, mmap_mode='r')
+    else:
+        sensors_rad_df = pd.read_json(radiation_path)
+        sensor_codes = sensors_rad_df.columns.values
+        sensors_rad = sensors_rad_df.values.T
+    return sensor_codes, sensors_rad
+
+
+def filter_low_potential(radiation_path, metadata_csv_path, config, sensor_index_path=None):
     """
     To filter the sensor points/hours with low radiation potential.
 
@@ -213,10 +250,12 @@ def filter_low_potential(radiation_json_path, metadata_csv_path, config):
     #. eliminate points when hourly production < 50 W/m2
     #. augment the solar radiation due to differences between panel reflectance and original reflectances used in daysim
 
-    :param radiation_csv: solar insulation data on all surfaces of each building
-    :type radiation_csv: .csv
-    :param metadata_csv: solar insulation sensor data of each building
-    :type metadata_csv: .csv
+    :param radiation_path: solar insulation data on all surfaces of each building (``.json`` or ``.npy``)
+    :type radiation_path: str
+    :param metadata_csv_path: solar insulation sensor data of each building
+    :type metadata_csv_path: .csv
+    :param sensor_index_path: sensor codes of ``radiation_path``, if it is a ``.npy`` file
+    :type sensor_index_path: str
     :return max_annual_radiation: yearly horizontal radiation [Wh/m2/year]
     :rtype max_annual_radiation: float
     :return annual_radiation_threshold: minimum yearly radiation threshold for sensor selection [Wh/m2/year]
@@ -234,18 +273,12 @@ def filter_low_potential(radiation_json_path, metadata_csv_path, config):
     #. No solar panels on windows.
     """
 
-    def f(x):
-        if x <= 50:
-            return 0
-        else:
-            return x
-
     # read radiation file
-    sensors_rad = pd.read_json(radiation_json_path)
+    sensor_codes, sensors_rad = read_sensor_radiation(radiation_path, sensor_index_path)
     sensors_metadata = pd.read_csv(metadata_csv_path)
 
     # join total radiation to sensor_metadata
-    sensors_rad_sum = sensors_rad.sum(0).to_frame('total_rad_Whm2')  # add new row with yearly radiation
+    sensors_rad_sum = pd.DataFrame({'total_rad_Whm2': sensors_rad.sum(axis=1)}, index=sensor_codes)  # yearly radiation
     sensors_metadata.set_index('SURFACE', inplace=True)
     sensors_metadata = sensors_metadata.merge(sensors_rad_sum, left_index=True, right_index=True)  # [Wh/m2]
 
@@ -264,9 +297,12 @@ def filter_low_potential(radiation_json_path, metadata_csv_path, config):
     max_annual_radiation = sensors_rad_sum.max().values[0]
     annual_radiation_threshold_Whperm2 = float(config.solar.annual_radiation_threshold)*1000
     sensors_metadata_clean = sensors_metadata[sensors_metadata.total_rad_Whm2 >= annual_radiation_threshold_Whperm2]
-    sensors_rad_clean = sensors_rad[sensors_metadata_clean.index.tolist()]  # keep sensors above min radiation
 
-    sensors_rad_clean = sensors_rad_clean.applymap(lambda x: f(x))
+    # keep sensors above min radiation (indexing by position copies the selected rows out of the memory map)
+    sensor_positions = pd.Index(sensor_codes).get_indexer(sensors_metadata_clean.index)
+    sensors_rad_clean = np.array(sensors_rad[sensor_positions], dtype=float)
+    sensors_rad_clean[sensors_rad_clean <= 50] = 0.0
+    sensors_rad_clean = pd.DataFrame(sensors_rad_clean.T, columns=sensors_metadata_clean.index)
 
     return max_annual_radiation, annual_radiation_threshold_Whperm2, sensors_rad_clean, sensors_metadata_clean
 
@@ -313,8 +349,7 @@ def calc_spacing_custom_angle(sensors_metadata_clean, solar_properties, max_rad_
 
     # calculate panel tilt angle (B) for flat roofs (tilt < 5 degrees), slope roofs and walls.
     input_angle_rad = radians(panel_tilt_angle)
-    sensors_metadata_clean['tilt_deg'] = np.vectorize(acos)(sensors_metadata_clean['Zdir'])  # surface tilt angle in rad
-    sensors_metadata_clean['tilt_deg'] = np.vectorize(degrees)(sensors_metadata_clean['tilt_deg'])  # surface tilt angle in degrees
+    sensors_metadata_clean['tilt_deg'] = np.degrees(np.arccos(sensors_metadata_clean['Zdir']))  # surface tilt angle in degrees
     sensors_metadata_clean['B_deg'] = np.where(sensors_metadata_clean['tilt_deg'] >= 5,
                                                sensors_metadata_clean['tilt_deg'],
                                                degrees(input_angle_rad))  # panel tilt angle in degrees
@@ -324,10 +359,9 @@ def calc_spacing_custom_angle(sensors_metadata_clean, solar_properties, max_rad_
     optimal_spacing_flat_m = calc_optimal_spacing(solar_properties, input_angle_rad, module_length_m)
     sensors_metadata_clean['array_spacing_m'] = np.where(sensors_metadata_clean['tilt_deg'] >= 5, 0,
                                                          optimal_spacing_flat_m)
-    sensors_metadata_clean['surface_azimuth_deg'] = np.vectorize(calc_surface_azimuth)(sensors_metadata_clean['Xdir'],
-                                                                                       sensors_metadata_clean['Ydir'],
-                                                                                       sensors_metadata_clean[
-                                                                                           'B_deg'])  # degrees
+    sensors_metadata_clean['surface_azimuth_deg'] = calc_surface_azimuth_array(sensors_metadata_clean['Xdir'],
+                                                                               sensors_metadata_clean['Ydir'],
+                                                                               sensors_metadata_clean['B_deg'])  # degrees
 
     # calculate the surface area required to install one pv panel on flat roofs with defined tilt angle and array spacing
     if panel_properties['type'] == 'PV':
@@ -395,9 +429,7 @@ def optimal_angle_and_tilt(sensors_metadata_clean, latitude, solar_properties, m
     # calculate panel tilt angle (B) for flat roofs (tilt < 5 degrees), slope roofs and walls.
     optimal_angle_flat_rad = calc_optimal_angle(180, latitude,
                                                 solar_properties.trr_mean)  # assume surface azimuth = 180 (N,E), south facing
-    sensors_metadata_clean['tilt_deg'] = np.vectorize(acos)(sensors_metadata_clean['Zdir'])  # surface tilt angle in rad
-    sensors_metadata_clean['tilt_deg'] = np.vectorize(degrees)(
-        sensors_metadata_clean['tilt_deg'])  # surface tilt angle in degrees
+    sensors_metadata_clean['tilt_deg'] = np.degrees(np.arccos(sensors_metadata_clean['Zdir']))  # surface tilt angle in degrees
     sensors_metadata_clean['B_deg'] = np.where(sensors_metadata_clean['tilt_deg'] >= 5,
                                                sensors_metadata_clean['tilt_deg'],
                                                degrees(optimal_angle_flat_rad))  # panel tilt angle in degrees
@@ -407,10 +439,9 @@ def optimal_angle_and_tilt(sensors_metadata_clean, latitude, solar_properties, m
     optimal_spacing_flat_m = calc_optimal_spacing(solar_properties, optimal_angle_flat_rad, module_length_m)
     sensors_metadata_clean['array_spacing_m'] = np.where(sensors_metadata_clean['tilt_deg'] >= 5, 0,
                                                          optimal_spacing_flat_m)
-    sensors_metadata_clean['surface_azimuth_deg'] = np.vectorize(calc_surface_azimuth)(sensors_metadata_clean['Xdir'],
-                                                                                       sensors_metadata_clean['Ydir'],
-                                                                                       sensors_metadata_clean[
-                                                                                           'B_deg'])  # degrees
+    sensors_metadata_clean['surface_azimuth_deg'] = calc_surface_azimuth_array(sensors_metadata_clean['Xdir'],
+                                                                               sensors_metadata_clean['Ydir'],
+                                                                               sensors_metadata_clean['B_deg'])  # degrees
 
     # calculate the surface area required to install one pv panel on flat roofs with defined tilt angle and array spacing
     if panel_properties['type'] == 'PV':
@@ -640,6 +671,25 @@ def calc_surface_azimuth(xdir, ydir, B):
     return surface_azimuth  # degree
 
 
+def calc_surface_azimuth_array(xdir, ydir, B):
+    """
+    Array version of :py:func:`calc_surface_azimuth`.
+
+    :param np.ndarray xdir: surface normal vector x in (x,y,z) representing east-west direction
+    :param np.ndarray ydir: surface normal vector y in (x,y,z) representing north-south direction
+    :param np.ndarray B: surface tilt angle in degree
+    :returns surface azimuth: the azimuth of the surface of a solar panel in degree
+    :rtype surface_azimuth: np.ndarray
+    """
+    xdir = np.asarray(xdir, dtype=float)
+    ydir = np.asarray(ydir, dtype=float)
+    teta_z = np.degrees(np.arcsin(xdir / np.sin(np.radians(B))))
+    # set the surface azimuth with on the sing convention (E,N)=(+,+)
+    return np.where(ydir < 0, 180 + teta_z,  # (xdir,ydir) = (+,-) or (-,-)
+                    np.where(xdir < 0, 360 + teta_z,  # (xdir,ydir) = (-,+)
+                             teta_z))  # (xdir,ydir) = (+,+)
+
+
 # calculate angle of incident
 
 def calc_incident_angle_beam(g, lat, ha, tilt, teta_z):
@@ -686,6 +736,27 @@ def calc_angle_of_incidence(g, lat, ha, tilt, teta_z):
     return teta_B
 
 
+def calc_angle_of_incidence_array(g, lat, ha, tilt, teta_z):
+    """
+    Array version of :py:func:`calc_angle_of_incidence`, the arguments are broadcast against each other (e.g. the
+    solar position per hour and the tilt / surface azimuth per group of panels as (group x 1) arrays).
+
+    :return teta_B: angle of incidence [radians]
+    :rtype teta_B: np.ndarray
+    """
+    # surface normal vector
+    n_E = np.sin(tilt) * np.sin(teta_z)
+    n_N = np.sin(tilt) * np.cos(teta_z)
+    n_Z = np.cos(tilt)
+    # solar vector
+    s_E = -np.cos(g) * np.sin(ha)
+    s_N = np.sin(g) * np.cos(lat) - np.cos(g) * np.sin(lat) * np.cos(ha)
+    s_Z = np.cos(g) * np.cos(lat) * np.cos(ha) + np.sin(g) * np.sin(lat)
+
+    # angle of incidence
+    return np.arccos(n_E * s_E + n_N * s_N + n_Z * s_Z)
+
+
 # calculate sensor properties in each group
 
 def calc_groups(radiation_of_sensors_clean, sensors_metadata_cat):
@@ -778,3 +849,16 @@ def cal_radiation_type(group, hourly_radiation, weather_data):
         'I_diffuse']  # calculate direct radiation
     radiation_Wperm2.fillna(0, inplace=True)  # set nan to zero
     return radiation_Wperm2
+
+
+def calc_radiation_type_array(I_sol, weather_data):
+    """
+    Array version of :py:func:`cal_radiation_type` for the hourly radiation of several groups of sensors at once
+    (group x hour).
+
+    :return: total, direct and diffuse radiation [Wh/m2]
+    :rtype: tuple(np.ndarray, np.ndarray, np.ndarray)
+    """
+    I_diffuse = weather_data.ratio_diffhout.values * I_sol  # calculate diffuse radiation
+    I_direct = I_sol - I_diffuse  # calculate direct radiation
+    return tuple(np.where(np.isnan(I), 0.0, I) for I in (I_sol, I_direct, I_diffuse))  # set nan to zero
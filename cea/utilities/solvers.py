@@ -0,0 +1,63 @@
+"""
+Numerical solvers that work on the whole hourly vector of a building at once (instead of calling a scipy solver for
+each hour)
+"""
+
+
+
+
+import numpy as np
+
+
+def newton_array(func, x0, args=(), tol=1.48e-8, maxiter=50):
+    """
+    Solve ``func(x, *args) == 0`` for a vector of independent equations with the secant method - the same iterations
+    as ``scipy.optimize.newton`` without a derivative, but on all elements at once. An element stops iterating as soon
+    as it converged, so ``func`` is only evaluated for the elements that are still being solved: the array arguments in
+    ``args`` (of the same length as ``x0``) are sliced accordingly, scalar arguments are passed as they are.
+
+    :param func: ``func(x, *args)``, works on numpy arrays
+    :param x0: initial estimates (1D array)
+    :param tuple args: extra arguments of ``func`` (1D arrays of the same length as ``x0`` or scalars)
+    :param float tol: absolute tolerance of the roots
+    :param int maxiter: maximum number of iterations
+    :return: the roots
+    :rtype: numpy.ndarray
+    :raises RuntimeError: if an element did not converge after ``maxiter`` iterations
+    """
+    p0 = np.array(x0, dtype=float, ndmin=1)
+    args = [np.asarray(arg) if np.ndim(arg) else arg for arg in args]
+    root = np.full(p0.shape, np.nan)
+    if not p0.size:
+        return root
+
+    eps = 1e-4
+    p1 = p0 * (1 + eps)
+    p1 += np.where(p1 >= 0, eps, -eps)
+    q0 = func(p0, *args)
+    q1 = func(p1, *args)
+    swap = np.abs(q1) < np.abs(q0)
+    p0, p1 = np.where(swap, p1, p0), np.where(swap, p0, p1)
+    q0, q1 = np.where(swap, q1, q0), np.where(swap, q0, q1)
+
+    active = np.arange(p0.size)  # the elements that are still being solved
+    for _ in range(maxiter):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            p = np.where(np.abs(q1) > np.abs(q0),
+                         (-q0 / q1 * p1 + p0) / (1 - q0 / q1),
+                         (-q1 / q0 * p0 + p1) / (1 - q1 / q0))
+        # with q1 == q0 the secant is flat (e.g. both estimates are roots already): use the midpoint
+        flat = q1 == q0
+        p[flat] = (p1[flat] + p0[flat]) / 2.0
+        converged = flat | (np.abs(p - p1) <= tol)
+        root[active[converged]] = p[converged]
+
+        not_converged = ~converged
+        if not not_converged.any():
+            return root
+        active = active[not_converged]
+        p0, q0, p1 = p1[not_converged], q1[not_converged], p[not_converged]
+        q1 = func(p1, *[arg[active] if np.ndim(arg) else arg for arg in args])
+
+    raise RuntimeError('Failed to converge after %i iterations for %i of %i elements, e.g. value is %s'
+                       % (maxiter, active.size, root.size, p1[0]))
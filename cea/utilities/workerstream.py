@@ -71,3 +71,15 @@ def stream_from_queue(q):
             sys.stderr.write(msg)
     except queue.Empty:
         pass
+
+
+def stream_from_queue_until_closed(q):
+    """
+    Stream the contents from the queue to STDOUT / STDERR until ``None`` is read from the queue - to be called from a
+    thread in the parent process. Blocks on the queue instead of polling it.
+    """
+    for stream, msg in iter(q.get, None):
+        if stream == 'stdout':
+            sys.stdout.write(msg)
+        elif stream == 'stderr':
+            sys.stderr.write(msg)